@@ -1,40 +1,31 @@
 #!/usr/bin/env python3
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
-from utils_openai_client import create_and_wait, get_output_text, get_reasoning_summary, format_prompt_for_responses_api, get_openai_client_for_model, build_error_raw_payload, get_usage_tokens
+from utils_openai_client import create_and_wait, acreate_and_wait, get_output_text, get_reasoning_summary, get_openai_client_for_model, get_async_openai_client_for_model, build_error_raw_payload, get_usage_tokens
 from utils_config_constants import DEFAULT_MODEL, PERSONA_LUCIM_OPERATION_MODEL_AUDITOR, RULES_LUCIM_OPERATION_MODEL, OUTPUT_DIR, get_reasoning_config, AGENT_TIMEOUTS, REVERSE_ENGINEERING_DRIVERS
 from utils_response_dump import write_input_instructions_before_api, serialize_response_to_dict
 from utils_audit_core import extract_audit_core
+from utils_prompt_layout import PromptLayout, build_prompt_layout
+from utils_rules_registry import read_prompt_text
 
 
-def audit_operation_model(
+def _build_operation_model_audit_prompt(
     operation_model_raw_content: str,
     netlogo_lucim_mapping: str,
     netlogo_source_code: str,
     output_dir: str,
-    model_name: str
-) -> Dict[str, Any]:
-    """Audit Operation Model with LLM persona.
-
-    Args:
-        operation_model_raw_content: Raw content from output-data.json (may be JSON or other text)
-        netlogo_lucim_mapping: NetLogo to LUCIM mapping content (mandatory, matches generator context)
-        netlogo_source_code: NetLogo source code (mandatory, matches generator context)
-        output_dir: Output directory (mandatory)
-        model_name: Model name to use (mandatory)
-    
-    Note: Python auditor is called separately by orchestrator, not as a fallback.
-    """
+) -> PromptLayout:
+    """Build the Operation Model auditor prompt layout and persist its system prompt as input-instructions.md."""
     try:
-        persona_text = PERSONA_LUCIM_OPERATION_MODEL_AUDITOR.read_text(encoding="utf-8")
+        persona_text = read_prompt_text(PERSONA_LUCIM_OPERATION_MODEL_AUDITOR)
     except Exception:
         persona_text = ""
     try:
-        rules_lucim_operation_model = RULES_LUCIM_OPERATION_MODEL.read_text(encoding="utf-8")
+        rules_lucim_operation_model = read_prompt_text(RULES_LUCIM_OPERATION_MODEL)
     except Exception:
         rules_lucim_operation_model = ""
     try:
-        reverse_engineering_drivers_text = REVERSE_ENGINEERING_DRIVERS.read_text(encoding="utf-8")
+        reverse_engineering_drivers_text = read_prompt_text(REVERSE_ENGINEERING_DRIVERS)
     except Exception:
         reverse_engineering_drivers_text = ""
 
@@ -56,78 +47,156 @@ def audit_operation_model(
 {om_content}
 </LUCIM-OPERATION-MODEL>
 """
-    system_prompt = f"{instructions}\n\n{input_text}"
+    # Static prefix (instructions) first, per-call input second: each is sent once
+    layout = build_prompt_layout("lucim_operation_model_auditor", instructions, input_text)
     try:
         # Persist exact prompt before API call
-        write_input_instructions_before_api(output_dir, system_prompt)
+        write_input_instructions_before_api(output_dir, layout.system_prompt)
     except Exception:
         pass
+    return layout
+
+
+def _build_operation_model_audit_api_config(
+    layout: PromptLayout,
+    model_name: str,
+    reasoning_effort: Optional[str] = None,
+    reasoning_summary: Optional[str] = None,
+    text_verbosity: Optional[str] = None,
+) -> Dict[str, Any]:
+    # Use get_reasoning_config to get reasoning parameters (same as generator)
+    api_config = get_reasoning_config("lucim_operation_model_auditor")
+    # Force the run-selected model (overrides DEFAULT_MODEL from configs)
+    api_config["model"] = model_name
+    # The run's reasoning and verbosity settings override the defaults (same as generator)
+    if reasoning_effort is not None:
+        api_config["reasoning"]["effort"] = reasoning_effort
+    if reasoning_summary is not None:
+        api_config["reasoning"]["summary"] = reasoning_summary
+    if text_verbosity is not None:
+        api_config["text"] = {"verbosity": text_verbosity}
+    return layout.apply(api_config)
+
+
+def _build_operation_model_audit_result(resp: Any) -> Dict[str, Any]:
+    # Serialize raw response for output-raw_response.json
+    raw_response_serialized = serialize_response_to_dict(resp)
+    content = get_output_text(resp) or ""
+    # Extract reasoning summary from response (same as Generator)
+    # Full reasoning text will be extracted from raw_response in write_all_output_files
+    reasoning_summary = get_reasoning_summary(resp)
+    # Store raw LLM response text directly (no JSON parsing)
+    # extract_audit_core will handle the raw text content
+    core = extract_audit_core(content)
+    
+    # Extract token usage from response (same as PlantUML auditor)
+    usage = get_usage_tokens(resp)
+    tokens_used = usage.get("total_tokens", 0)
+    input_tokens = usage.get("input_tokens", 0)
+    api_output_tokens = usage.get("output_tokens", 0)
+    reasoning_tokens = usage.get("reasoning_tokens", 0)
+    total_output_tokens = api_output_tokens if api_output_tokens is not None else 0
+    visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
+    
+    # Return raw audit data alongside derived fields, raw_response, and token metrics
+    # Full reasoning text will be extracted from raw_response in write_all_output_files
+    return {
+        "reasoning_summary": reasoning_summary,
+        "data": core["data"],
+        "verdict": core["verdict"],
+        "non-compliant-rules": core["non_compliant_rules"],
+        "coverage": core["coverage"],
+        "errors": core["errors"],
+        "tokens_used": tokens_used,
+        "input_tokens": input_tokens,
+        "visible_output_tokens": visible_output_tokens,
+        "raw_usage": usage,
+        "reasoning_tokens": reasoning_tokens,
+        "total_output_tokens": total_output_tokens,
+        "raw_response": raw_response_serialized
+    }
+
+
+def _build_operation_model_audit_error(e: Exception) -> Dict[str, Any]:
+    # No fallback: Python auditor is called separately by orchestrator
+    return {
+        "reasoning_summary": f"Error during model inference: {e}",
+        "verdict": "non-compliant",
+        "non-compliant-rules": [{"id": "OP-AUDIT-ERROR", "message": "LLM operation model audit failed"}],
+        "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
+        "data": {},
+        "errors": [f"LLM operation model audit error: {e}"],
+        "tokens_used": 0,
+        "input_tokens": 0,
+        "visible_output_tokens": 0,
+        "raw_usage": {},
+        "reasoning_tokens": 0,
+        "total_output_tokens": 0,
+        "raw_response": build_error_raw_payload(e)
+    }
+
+
+def audit_operation_model(
+    operation_model_raw_content: str,
+    netlogo_lucim_mapping: str,
+    netlogo_source_code: str,
+    output_dir: str,
+    model_name: str,
+    reasoning_effort: Optional[str] = None,
+    reasoning_summary: Optional[str] = None,
+    text_verbosity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Audit Operation Model with LLM persona.
 
+    Args:
+        operation_model_raw_content: Raw content from output-data.json (may be JSON or other text)
+        netlogo_lucim_mapping: NetLogo to LUCIM mapping content (mandatory, matches generator context)
+        netlogo_source_code: NetLogo source code (mandatory, matches generator context)
+        output_dir: Output directory (mandatory)
+        model_name: Model name to use (mandatory)
+        reasoning_effort: Run reasoning effort (AGENT_CONFIGS default when None)
+        reasoning_summary: Run reasoning summary mode (AGENT_CONFIGS default when None)
+        text_verbosity: Run text verbosity (AGENT_CONFIGS default when None)
+    
+    Note: Python auditor is called separately by orchestrator, not as a fallback.
+    """
+    layout = _build_operation_model_audit_prompt(
+        operation_model_raw_content, netlogo_lucim_mapping, netlogo_source_code, output_dir
+    )
     try:
         # Use provided model (mandatory parameter)
         client = get_openai_client_for_model(model_name)
-        # Use get_reasoning_config to get reasoning parameters (same as generator)
-        api_config = get_reasoning_config("lucim_operation_model_auditor")
-        # Force the run-selected model (overrides DEFAULT_MODEL from configs)
-        api_config["model"] = model_name
-        api_config.update({
-            "instructions": format_prompt_for_responses_api(system_prompt),
-            "input": [{"role": "user", "content": system_prompt}]
-        })
+        api_config = _build_operation_model_audit_api_config(
+            layout, model_name, reasoning_effort, reasoning_summary, text_verbosity
+        )
         timeout = AGENT_TIMEOUTS.get("lucim_operation_model_auditor")
         resp = create_and_wait(client, api_config, timeout_seconds=timeout)
-        # Serialize raw response for output-raw_response.json
-        raw_response_serialized = serialize_response_to_dict(resp)
-        content = get_output_text(resp) or ""
-        # Extract reasoning summary from response (same as Generator)
-        # Full reasoning text will be extracted from raw_response in write_all_output_files
-        reasoning_summary = get_reasoning_summary(resp)
-        # Store raw LLM response text directly (no JSON parsing)
-        # extract_audit_core will handle the raw text content
-        core = extract_audit_core(content)
-        
-        # Extract token usage from response (same as PlantUML auditor)
-        usage = get_usage_tokens(resp)
-        tokens_used = usage.get("total_tokens", 0)
-        input_tokens = usage.get("input_tokens", 0)
-        api_output_tokens = usage.get("output_tokens", 0)
-        reasoning_tokens = usage.get("reasoning_tokens", 0)
-        total_output_tokens = api_output_tokens if api_output_tokens is not None else 0
-        visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
-        
-        # Return raw audit data alongside derived fields, raw_response, and token metrics
-        # Full reasoning text will be extracted from raw_response in write_all_output_files
-        return {
-            "reasoning_summary": reasoning_summary,
-            "data": core["data"],
-            "verdict": core["verdict"],
-            "non-compliant-rules": core["non_compliant_rules"],
-            "coverage": core["coverage"],
-            "errors": core["errors"],
-            "tokens_used": tokens_used,
-            "input_tokens": input_tokens,
-            "visible_output_tokens": visible_output_tokens,
-            "raw_usage": usage,
-            "reasoning_tokens": reasoning_tokens,
-            "total_output_tokens": total_output_tokens,
-            "raw_response": raw_response_serialized
-        }
+        return _build_operation_model_audit_result(resp)
     except Exception as e:
-        # No fallback: Python auditor is called separately by orchestrator
-        return {
-            "reasoning_summary": f"Error during model inference: {e}",
-            "verdict": "non-compliant",
-            "non-compliant-rules": [{"id": "OP-AUDIT-ERROR", "message": "LLM operation model audit failed"}],
-            "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
-            "data": {},
-            "errors": [f"LLM operation model audit error: {e}"],
-            "tokens_used": 0,
-            "input_tokens": 0,
-            "visible_output_tokens": 0,
-            "raw_usage": {},
-            "reasoning_tokens": 0,
-            "total_output_tokens": 0,
-            "raw_response": build_error_raw_payload(e)
-        }
+        return _build_operation_model_audit_error(e)
 
 
+async def aaudit_operation_model(
+    operation_model_raw_content: str,
+    netlogo_lucim_mapping: str,
+    netlogo_source_code: str,
+    output_dir: str,
+    model_name: str,
+    reasoning_effort: Optional[str] = None,
+    reasoning_summary: Optional[str] = None,
+    text_verbosity: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Awaitable variant of audit_operation_model (non-blocking model call)."""
+    layout = _build_operation_model_audit_prompt(
+        operation_model_raw_content, netlogo_lucim_mapping, netlogo_source_code, output_dir
+    )
+    try:
+        client = get_async_openai_client_for_model(model_name)
+        api_config = _build_operation_model_audit_api_config(
+            layout, model_name, reasoning_effort, reasoning_summary, text_verbosity
+        )
+        timeout = AGENT_TIMEOUTS.get("lucim_operation_model_auditor")
+        resp = await acreate_and_wait(client, api_config, timeout_seconds=timeout)
+        return _build_operation_model_audit_result(resp)
+    except Exception as e:
+        return _build_operation_model_audit_error(e)
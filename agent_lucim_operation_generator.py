@@ -7,9 +7,8 @@ Generates / Corrects LUCIM operation model from NetLogo source using OpenAI mode
 import os
 import json
 import datetime
-import pathlib
-import tiktoken
-from typing import Dict, Any
+from functools import partial
+from typing import Callable, Dict, Any
 from google.adk.agents import LlmAgent
 from openai import OpenAI
 from utils_response_dump import serialize_response_to_dict, write_input_instructions_before_api, write_all_output_files
@@ -18,8 +17,31 @@ from utils_config_constants import (
     PERSONA_LUCIM_OPERATION_MODEL_GENERATOR, OUTPUT_DIR,
     get_reasoning_config, DEFAULT_MODEL, RULES_LUCIM_OPERATION_MODEL, REVERSE_ENGINEERING_DRIVERS)
 from utils_path import sanitize_agent_name
+from utils_prompt_layout import PromptLayout, build_prompt_layout
+from utils_rules_registry import read_prompt_text
+from utils_tokenizer import get_tokenizer_service
 
 
+def _import_utils_openai_client():
+    """Lazy-import heavy client utilities with retry to avoid transient FS timeouts."""
+    import time as _time
+    last_err = None
+    for _ in range(3):
+        try:
+            from utils_openai_client import (
+                create_and_wait as _create_and_wait,
+                get_output_text as _get_output_text,
+                get_reasoning_summary as _get_reasoning_summary,
+                get_usage_tokens as _get_usage_tokens,
+            )
+            return _create_and_wait, _get_output_text, _get_reasoning_summary, _get_usage_tokens
+        except TimeoutError as e:  # Errno 60 on network FS
+            last_err = e
+            _time.sleep(0.5)
+        except Exception as e:
+            last_err = e
+            break
+    raise last_err if last_err else RuntimeError("Failed to import utils_openai_client")
 
 
 class LucimOperationModelGeneratorAgent(LlmAgent):
@@ -28,6 +50,7 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
     name: str = "NetLogo LUCIM Operation Model Generator"
 
     client: OpenAI = None
+    async_client: Any = None
     reasoning_effort: str = "medium"
     reasoning_summary: str = "auto"
     text_verbosity: str = "medium"
@@ -50,17 +73,17 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
         self.client = get_openai_client_for_model(self.model)
         try:
             self.persona_path = str(PERSONA_LUCIM_OPERATION_MODEL_GENERATOR)
-            self.persona_text = pathlib.Path(self.persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(self.persona_path)
         except Exception:
             self.persona_text = ""
         try:
             self.lucim_rules_path = str(RULES_LUCIM_OPERATION_MODEL)
-            self.rules_lucim_operation_model = pathlib.Path(self.lucim_rules_path).read_text(encoding="utf-8")
+            self.rules_lucim_operation_model = read_prompt_text(self.lucim_rules_path)
         except Exception:
             self.rules_lucim_operation_model = ""
         try:
             self.reverse_engineering_drivers_path = str(REVERSE_ENGINEERING_DRIVERS)
-            self.reverse_engineering_drivers_text = pathlib.Path(self.reverse_engineering_drivers_path).read_text(encoding="utf-8")
+            self.reverse_engineering_drivers_text = read_prompt_text(self.reverse_engineering_drivers_path)
         except Exception:
             self.reverse_engineering_drivers_text = ""
 
@@ -76,7 +99,7 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
             return
         self.persona_path = persona_path
         try:
-            self.persona_text = pathlib.Path(persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(persona_path)
         except Exception:
             self.persona_text = ""
 
@@ -85,7 +108,7 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
             return
         self.lucim_rules_path = rules_path
         try:
-            self.rules_lucim_operation_model = pathlib.Path(rules_path).read_text(encoding="utf-8")
+            self.rules_lucim_operation_model = read_prompt_text(rules_path)
         except Exception:
             self.rules_lucim_operation_model = ""
 
@@ -94,25 +117,26 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
             return
         self.reverse_engineering_drivers_path = drivers_path
         try:
-            self.reverse_engineering_drivers_text = pathlib.Path(drivers_path).read_text(encoding="utf-8")
+            self.reverse_engineering_drivers_text = read_prompt_text(drivers_path)
         except Exception:
             self.reverse_engineering_drivers_text = ""
 
     def count_input_tokens(self, instructions: str, input_text: str) -> int:
         try:
-            try:
-                encoding = tiktoken.encoding_for_model(self.model)
-            except Exception:
-                encoding = tiktoken.get_encoding("cl100k_base")
-            full_input = f"{instructions}\n\n{input_text}"
-            token_count = len(encoding.encode(full_input))
-            return token_count
+            return get_tokenizer_service().count_prompt(instructions, input_text, self.model)
         except Exception:
             full_input = f"{instructions}\n\n{input_text}"
             estimated_tokens = len(full_input) // 4
             return estimated_tokens
 
-    def generate_lucim_operation_model(
+    def _get_async_client(self) -> Any:
+        """Lazily create the async client used by the awaitable agent variant."""
+        if self.async_client is None:
+            from utils_openai_client import get_async_openai_client_for_model
+            self.async_client = get_async_openai_client_for_model(self.model)
+        return self.async_client
+
+    def _prepare_request(
         self,
         netlogo_source_code: str,
         netlogo_lucim_mapping: str,
@@ -121,32 +145,11 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
         output_dir: str = None,
     ) -> Dict[str, Any]:
         """
-        Generate / Correct LUCIM operation model
-        """
-        # Lazy-import heavy client utilities with retry to avoid transient FS timeouts
-        def _import_utils_openai_client():
-            import time as _time
-            last_err = None
-            for _ in range(3):
-                try:
-                    from utils_openai_client import (
-                        create_and_wait as _create_and_wait,
-                        get_output_text as _get_output_text,
-                        get_reasoning_summary as _get_reasoning_summary,
-                        get_usage_tokens as _get_usage_tokens,
-                        format_prompt_for_responses_api as _format_prompt_for_responses_api,
-                    )
-                    return _create_and_wait, _get_output_text, _get_reasoning_summary, _get_usage_tokens, _format_prompt_for_responses_api
-                except TimeoutError as e:  # Errno 60 on network FS
-                    last_err = e
-                    _time.sleep(0.5)
-                except Exception as e:
-                    last_err = e
-                    break
-            raise last_err if last_err else RuntimeError("Failed to import utils_openai_client")
-
-        create_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens, format_prompt_for_responses_api = _import_utils_openai_client()
+        Build the prompt, persist input-instructions.md and count input tokens.
 
+        Returns:
+            Dictionary with "system_prompt", "layout" (PromptLayout) and "exact_input_tokens"
+        """
         instructions = (
             f"{self.persona_text}\n\n"
             f"{self.reverse_engineering_drivers_text}\n\n"
@@ -185,72 +188,129 @@ class LucimOperationModelGeneratorAgent(LlmAgent):
         except Exception:
             prev_model_text = ""
         input_text += f"\n<PREVIOUS-LUCIM-OPERATION-MODEL>\n{prev_model_text}\n</PREVIOUS-LUCIM-OPERATION-MODEL>\n"
-        system_prompt = f"{instructions}\n\n{input_text}"
+        # Static prefix (instructions) first, per-call input second: each is sent once
+        layout = build_prompt_layout("lucim_operation_model_generator", instructions, input_text)
+        system_prompt = layout.system_prompt
         base_output_dir = output_dir if output_dir is not None else OUTPUT_DIR
         write_input_instructions_before_api(base_output_dir, system_prompt)
 
-        exact_input_tokens = self.count_input_tokens(instructions, input_text)
-        try:
-            api_config = get_reasoning_config("lucim_operation_model_generator")
-            # Force the run-selected model (overrides DEFAULT_MODEL from configs)
-            api_config["model"] = self.model
-            if "reasoning" in api_config:
-                api_config["reasoning"]["effort"] = self.reasoning_effort
-                api_config["reasoning"]["summary"] = self.reasoning_summary
-            api_config.update({
-                "instructions": format_prompt_for_responses_api(system_prompt),
-                "input": [{"role": "user", "content": system_prompt}]
-            })
-            from utils_config_constants import AGENT_TIMEOUTS
-            timeout = AGENT_TIMEOUTS.get("lucim_operation_model_generator")
-            response = create_and_wait(self.client, api_config, timeout_seconds=timeout)
-
-            content = get_output_text(response)
-            reasoning_summary = get_reasoning_summary(response)
-            raw_response_serialized = serialize_response_to_dict(response)
-            if not content or content.strip() == "":
-                return {
-                    "reasoning_summary": "Received empty response from API",
-                    "data": None,
-                    "errors": ["Empty response from API - this may indicate a model issue or timeout"],
-                    "tokens_used": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "raw_response": raw_response_serialized
-                }
-            # Store raw text content directly (no JSON parsing)
-            # The raw text will be written to output-data.json and passed to the auditor
-            operation_model_raw_text = content
-            usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
-            tokens_used = usage.get("total_tokens", 0)
-            input_tokens = usage.get("input_tokens", 0)
-            output_tokens = usage.get("output_tokens", 0)
-            reasoning_tokens = usage.get("reasoning_tokens", 0)
-            visible_output_tokens = max((output_tokens or 0) - (reasoning_tokens or 0), 0)
-            total_output_tokens = visible_output_tokens + (reasoning_tokens or 0)
-            return {
-                "reasoning_summary": reasoning_summary,
-                "data": operation_model_raw_text,  # Store raw text content (no JSON parsing)
-                "errors": None,
-                "tokens_used": tokens_used,
-                "input_tokens": input_tokens,
-                "visible_output_tokens": visible_output_tokens,
-                "raw_usage": usage,
-                "reasoning_tokens": reasoning_tokens,
-                "total_output_tokens": total_output_tokens,
-                "raw_response": raw_response_serialized
-            }
-        except Exception as e:
-            from utils_openai_client import build_error_raw_payload
+        return {
+            "system_prompt": system_prompt,
+            "layout": layout,
+            # Counted lazily, only when the response carries no input token count
+            "exact_input_tokens": partial(self.count_input_tokens, instructions, input_text),
+        }
+
+    def _build_api_config(self, layout: PromptLayout) -> Dict[str, Any]:
+        api_config = get_reasoning_config("lucim_operation_model_generator")
+        # Force the run-selected model (overrides DEFAULT_MODEL from configs)
+        api_config["model"] = self.model
+        if "reasoning" in api_config:
+            api_config["reasoning"]["effort"] = self.reasoning_effort
+            api_config["reasoning"]["summary"] = self.reasoning_summary
+        # Text verbosity of this agent (the sweep's verbosity axis), not the global default
+        api_config["text"] = {"verbosity": self.text_verbosity}
+        return layout.apply(api_config)
+
+    def _build_result(self, response: Any, exact_input_tokens: Callable[[], int], get_output_text, get_reasoning_summary, get_usage_tokens) -> Dict[str, Any]:
+        content = get_output_text(response)
+        reasoning_summary = get_reasoning_summary(response)
+        raw_response_serialized = serialize_response_to_dict(response)
+        if not content or content.strip() == "":
             return {
-                "reasoning_summary": f"Error during model inference: {e}",
+                "reasoning_summary": "Received empty response from API",
                 "data": None,
-                "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+                "errors": ["Empty response from API - this may indicate a model issue or timeout"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
-                "raw_response": build_error_raw_payload(e)
+                "raw_response": raw_response_serialized
             }
+        # Store raw text content directly (no JSON parsing)
+        # The raw text will be written to output-data.json and passed to the auditor
+        operation_model_raw_text = content
+        usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
+        tokens_used = usage.get("total_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        reasoning_tokens = usage.get("reasoning_tokens", 0)
+        visible_output_tokens = max((output_tokens or 0) - (reasoning_tokens or 0), 0)
+        total_output_tokens = visible_output_tokens + (reasoning_tokens or 0)
+        return {
+            "reasoning_summary": reasoning_summary,
+            "data": operation_model_raw_text,  # Store raw text content (no JSON parsing)
+            "errors": None,
+            "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "visible_output_tokens": visible_output_tokens,
+            "raw_usage": usage,
+            "reasoning_tokens": reasoning_tokens,
+            "total_output_tokens": total_output_tokens,
+            "raw_response": raw_response_serialized
+        }
+
+    def _build_error_result(self, e: Exception) -> Dict[str, Any]:
+        from utils_openai_client import build_error_raw_payload
+        return {
+            "reasoning_summary": f"Error during model inference: {e}",
+            "data": None,
+            "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+            "tokens_used": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "raw_response": build_error_raw_payload(e)
+        }
+
+    def generate_lucim_operation_model(
+        self,
+        netlogo_source_code: str,
+        netlogo_lucim_mapping: str,
+        auditor_feedback: Dict[str, Any],
+        previous_operation_model: Dict[str, Any] | None,
+        output_dir: str = None,
+    ) -> Dict[str, Any]:
+        """
+        Generate / Correct LUCIM operation model
+        """
+        create_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens = _import_utils_openai_client()
+
+        request = self._prepare_request(
+            netlogo_source_code, netlogo_lucim_mapping, auditor_feedback, previous_operation_model, output_dir
+        )
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_operation_model_generator")
+            response = create_and_wait(self.client, api_config, timeout_seconds=timeout, stream_stage="operation_model")
+            return self._build_result(response, request["exact_input_tokens"], get_output_text, get_reasoning_summary, get_usage_tokens)
+        except Exception as e:
+            return self._build_error_result(e)
+
+    async def agenerate_lucim_operation_model(
+        self,
+        netlogo_source_code: str,
+        netlogo_lucim_mapping: str,
+        auditor_feedback: Dict[str, Any],
+        previous_operation_model: Dict[str, Any] | None,
+        output_dir: str = None,
+    ) -> Dict[str, Any]:
+        """
+        Awaitable variant of generate_lucim_operation_model (non-blocking model call).
+        """
+        _, get_output_text, get_reasoning_summary, get_usage_tokens = _import_utils_openai_client()
+        from utils_openai_client import acreate_and_wait
+
+        request = self._prepare_request(
+            netlogo_source_code, netlogo_lucim_mapping, auditor_feedback, previous_operation_model, output_dir
+        )
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_operation_model_generator")
+            response = await acreate_and_wait(self._get_async_client(), api_config, timeout_seconds=timeout, stream_stage="operation_model")
+            return self._build_result(response, request["exact_input_tokens"], get_output_text, get_reasoning_summary, get_usage_tokens)
+        except Exception as e:
+            return self._build_error_result(e)
 
     def save_results(self, results: Dict[str, Any], base_name: str, model_name: str, step_number = None, output_dir = None):
         if output_dir is None:
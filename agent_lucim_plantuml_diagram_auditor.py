@@ -8,18 +8,21 @@ import os
 import json
 import datetime
 import pathlib
-import tiktoken
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import Callable, Dict, Any, Optional
 from google.adk.agents import LlmAgent
 from openai import OpenAI
 from utils_response_dump import serialize_response_to_dict, write_all_output_files, write_input_instructions_before_api
-from utils_openai_client import create_and_wait, get_output_text, get_reasoning_summary, format_prompt_for_responses_api
+from utils_openai_client import create_and_wait, acreate_and_wait, get_output_text, get_reasoning_summary
 from utils_audit_core import extract_audit_core
 
 from utils_config_constants import (
     PERSONA_LUCIM_PLANTUML_DIAGRAM_AUDITOR, OUTPUT_DIR,
     get_reasoning_config, DEFAULT_MODEL, AGENT_TIMEOUTS, RULES_LUCIM_PLANTUML_DIAGRAM)
 from utils_path import sanitize_agent_name
+from utils_prompt_layout import PromptLayout, build_prompt_layout
+from utils_rules_registry import read_prompt_text
+from utils_tokenizer import get_tokenizer_service
 
 # Configuration
 PERSONA_FILE = PERSONA_LUCIM_PLANTUML_DIAGRAM_AUDITOR
@@ -33,6 +36,7 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
     name: str = "NetLogo PlantUML Auditor"
     
     client: OpenAI = None
+    async_client: Any = None
     reasoning_effort: str = "medium"
     reasoning_summary: str = "auto"
     text_verbosity: str = "medium"
@@ -61,12 +65,12 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
         # Initialize persona and rules from defaults; orchestrator can override
         try:
             self.persona_path = str(PERSONA_FILE)
-            self.persona_text = pathlib.Path(self.persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(self.persona_path)
         except Exception:
             self.persona_text = ""
         try:
             self.rules_path = str(RULES_LUCIM_PLANTUML_DIAGRAM)
-            self.rules_text = pathlib.Path(self.rules_path).read_text(encoding="utf-8")
+            self.rules_text = read_prompt_text(self.rules_path)
         except Exception:
             self.rules_text = ""
         
@@ -104,7 +108,7 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
             return
         self.persona_path = persona_path
         try:
-            self.persona_text = pathlib.Path(persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(persona_path)
         except Exception as e:
             print(f"[WARNING] Failed to load persona file: {persona_path} ({e})")
             self.persona_text = ""
@@ -113,7 +117,10 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
     
     def count_input_tokens(self, instructions: str, input_text: str) -> int:
         """
-        Count input tokens exactly using tiktoken for the given model.
+        Count input tokens exactly using the native tokenizer of the model.
+        
+        The instructions (persona, rules, task) are a static segment: their count is
+        memoized by content, so only input_text is tokenized on each call.
         
         Args:
             instructions: The persona/instructions text
@@ -123,38 +130,28 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
             Exact token count for the input
         """
         try:
-            # Get the appropriate encoding for the model
-            try:
-                encoding = tiktoken.encoding_for_model(self.model)
-            except Exception:
-                encoding = tiktoken.get_encoding("cl100k_base")
-            
-            # Combine instructions and input text (this is what gets sent to the model)
-            full_input = f"{instructions}\n\n{input_text}"
-            
-            # Count tokens
-            token_count = len(encoding.encode(full_input))
-            return token_count
-            
+            return get_tokenizer_service().count_prompt(instructions, input_text, self.model)
         except Exception as e:
-            print(f"[WARNING] Failed to count input tokens with tiktoken: {e}")
+            print(f"[WARNING] Failed to count input tokens: {e}")
             # Fallback to character-based estimation
             full_input = f"{instructions}\n\n{input_text}"
             estimated_tokens = len(full_input) // 4  # Rough estimate: 4 chars per token
             return estimated_tokens
         
-    def audit_plantuml_diagrams(self, plantuml_diagram_file_path: str, lucim_scenario: Dict[str, Any] | str, output_dir: pathlib.Path | str, step: int = 6) -> Dict[str, Any]:
-        """
-        Audit PlantUML sequence diagrams for LUCIM UCI compliance using the PlantUML Auditor persona.
+    def _get_async_client(self) -> Any:
+        """Lazily create the async client used by the awaitable agent variant."""
+        if self.async_client is None:
+            from utils_openai_client import get_async_openai_client_for_model
+            self.async_client = get_async_openai_client_for_model(self.model)
+        return self.async_client
 
-        Args:
-            plantuml_diagram_file_path: Path to the standalone .puml file from Step 5 (mandatory)
-            lucim_scenario: LUCIM scenario data to include in the audit context (mandatory, matches generator context)
-            output_dir: Output directory for results (mandatory)
-            step: Step number for task file selection (default: 6)
+    def _prepare_request(self, plantuml_diagram_file_path: str, lucim_scenario: Dict[str, Any] | str, output_dir: pathlib.Path | str, step: int = 6) -> Dict[str, Any]:
+        """
+        Read the .puml file, build the prompt and persist input-instructions.md.
 
         Returns:
-            Dictionary containing reasoning, non-compliant rules, and any errors
+            {"result": <early result>} when an input is missing or unreadable, otherwise
+            {"system_prompt": ..., "layout": PromptLayout, "exact_input_tokens": ...}
         """
         # Resolve base output directory (mandatory parameter)
         if isinstance(output_dir, str):
@@ -175,27 +172,27 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
         try:
             puml_content = pathlib.Path(plantuml_diagram_file_path).read_text(encoding="utf-8")
         except FileNotFoundError:
-            return {
+            return {"result": {
                 "reasoning_summary": f"Error: .puml file not found at {plantuml_diagram_file_path}",
                 "data": None,
                 "errors": [f"Required .puml file not found: {plantuml_diagram_file_path}"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
         except Exception as e:
-            return {
+            return {"result": {
                 "reasoning_summary": f"Error reading .puml file: {e}",
                 "data": None,
                 "errors": [f"Failed to read .puml file {plantuml_diagram_file_path}: {e}"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
         
         # Validate mandatory lucim_scenario parameter
         if lucim_scenario is None:
-            return {
+            return {"result": {
                 "reasoning_summary": "Error: lucim_scenario is mandatory but not provided",
                 "data": None,
                 "errors": ["lucim_scenario parameter is required for PlantUML diagram audit"],
@@ -205,7 +202,7 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
         
         # Build input text matching generator structure: LUCIM-SCENARIO (mandatory) + PLANTUML-DIAGRAM
         # Normalize lucim_scenario (mandatory parameter, same normalization as generator)
@@ -256,99 +253,137 @@ class LUCIMPlantUMLDiagramAuditorAgent(LlmAgent):
 """
         
         # Create single system_prompt variable for both API call and file generation
-        system_prompt = f"{instructions}\n\n{input_text}"
+        # Static prefix (instructions) first, per-call input second: each is sent once
+        layout = build_prompt_layout("lucim_plantuml_diagram_auditor", instructions, input_text)
+        system_prompt = layout.system_prompt
         
         # Write input-instructions.md BEFORE API call for debugging
         write_input_instructions_before_api(base_output_dir, system_prompt)
         
         # Count input tokens exactly
-        exact_input_tokens = self.count_input_tokens(instructions, input_text)
-        
-        try:
-            # Create response using OpenAI Responses API
-            api_config = get_reasoning_config("lucim_plantuml_diagram_auditor")
-            # Force the run-selected model (overrides DEFAULT_MODEL from configs)
-            api_config["model"] = self.model
-            # Update reasoning configuration with agent's settings
-            if "reasoning" in api_config:
-                api_config["reasoning"]["effort"] = self.reasoning_effort
-                api_config["reasoning"]["summary"] = self.reasoning_summary
-            api_config.update({
-                "instructions": format_prompt_for_responses_api(system_prompt),
-                "input": [{"role": "user", "content": system_prompt}]
-            })
-            
-            # Use unified helper with configured timeout
-            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_auditor")
-            response = create_and_wait(self.client, api_config, timeout_seconds=timeout)
-            
-            # Extract content and reasoning via helpers
-            content = get_output_text(response)
-            reasoning_summary = get_reasoning_summary(response)
-            # Full reasoning text will be extracted from raw_response in write_all_output_files
-            raw_response_serialized = serialize_response_to_dict(response)
-            
-            # Check if response is empty
-            if not content or content.strip() == "":
-                return {
-                    "reasoning_summary": "Received empty response from API",
-                    "data": None,
-                    "errors": ["Empty response from API - this may indicate a model issue or timeout"],
-                    "verdict": "non-compliant",
-                    "non-compliant-rules": [],
-                    "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
-                    "tokens_used": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "raw_response": raw_response_serialized
-                }
-            
-            # Store raw LLM response text directly (no JSON parsing)
-            # extract_audit_core will handle the raw text content
-            core = extract_audit_core(content)
+        return {
+            "system_prompt": system_prompt,
+            "layout": layout,
+            # Counted lazily, only when the response carries no input token count
+            "exact_input_tokens": partial(self.count_input_tokens, instructions, input_text),
+        }
 
-            # Extract token usage from response (centralized helper)
-            from utils_openai_client import get_usage_tokens
-            usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
-            tokens_used = usage.get("total_tokens", 0)
-            input_tokens = usage.get("input_tokens", 0)
-            api_output_tokens = usage.get("output_tokens", 0)
-            reasoning_tokens = usage.get("reasoning_tokens", 0)
-            total_output_tokens = api_output_tokens if api_output_tokens is not None else 0
-            visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
-            usage_dict = usage
+    def _build_api_config(self, layout: PromptLayout) -> Dict[str, Any]:
+        # Create response using OpenAI Responses API
+        api_config = get_reasoning_config("lucim_plantuml_diagram_auditor")
+        # Force the run-selected model (overrides DEFAULT_MODEL from configs)
+        api_config["model"] = self.model
+        # Update reasoning configuration with agent's settings
+        if "reasoning" in api_config:
+            api_config["reasoning"]["effort"] = self.reasoning_effort
+            api_config["reasoning"]["summary"] = self.reasoning_summary
+        # Text verbosity of this agent (the sweep's verbosity axis), not the global default
+        api_config["text"] = {"verbosity": self.text_verbosity}
+        return layout.apply(api_config)
 
+    def _build_result(self, response: Any, exact_input_tokens: Callable[[], int]) -> Dict[str, Any]:
+        # Extract content and reasoning via helpers
+        content = get_output_text(response)
+        reasoning_summary = get_reasoning_summary(response)
+        # Full reasoning text will be extracted from raw_response in write_all_output_files
+        raw_response_serialized = serialize_response_to_dict(response)
+        
+        # Check if response is empty
+        if not content or content.strip() == "":
             return {
-                "reasoning_summary": reasoning_summary,
-                "data": core["data"],
-                "verdict": core["verdict"],
-                "non-compliant-rules": core["non_compliant_rules"],
-                "coverage": core["coverage"],
-                "errors": core["errors"],
-                "tokens_used": tokens_used,
-                "input_tokens": input_tokens,
-                "visible_output_tokens": visible_output_tokens,
-                "raw_usage": usage_dict,
-                "reasoning_tokens": reasoning_tokens,
-                "total_output_tokens": total_output_tokens,
-                "raw_response": raw_response_serialized
-            }
-                
-        except Exception as e:
-            return {
-                "reasoning_summary": f"Error during model inference: {e}",
+                "reasoning_summary": "Received empty response from API",
                 "data": None,
-                "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+                "errors": ["Empty response from API - this may indicate a model issue or timeout"],
                 "verdict": "non-compliant",
                 "non-compliant-rules": [],
                 "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
                 "tokens_used": 0,
                 "input_tokens": 0,
-                "output_tokens": 0
+                "output_tokens": 0,
+                "raw_response": raw_response_serialized
             }
-    
+        
+        # Store raw LLM response text directly (no JSON parsing)
+        # extract_audit_core will handle the raw text content
+        core = extract_audit_core(content)
+
+        # Extract token usage from response (centralized helper)
+        from utils_openai_client import get_usage_tokens
+        usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
+        tokens_used = usage.get("total_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        api_output_tokens = usage.get("output_tokens", 0)
+        reasoning_tokens = usage.get("reasoning_tokens", 0)
+        total_output_tokens = api_output_tokens if api_output_tokens is not None else 0
+        visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
+        usage_dict = usage
+
+        return {
+            "reasoning_summary": reasoning_summary,
+            "data": core["data"],
+            "verdict": core["verdict"],
+            "non-compliant-rules": core["non_compliant_rules"],
+            "coverage": core["coverage"],
+            "errors": core["errors"],
+            "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "visible_output_tokens": visible_output_tokens,
+            "raw_usage": usage_dict,
+            "reasoning_tokens": reasoning_tokens,
+            "total_output_tokens": total_output_tokens,
+            "raw_response": raw_response_serialized
+        }
+
+    def _build_error_result(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "reasoning_summary": f"Error during model inference: {e}",
+            "data": None,
+            "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+            "verdict": "non-compliant",
+            "non-compliant-rules": [],
+            "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
+            "tokens_used": 0,
+            "input_tokens": 0,
+            "output_tokens": 0
+        }
+
+    def audit_plantuml_diagrams(self, plantuml_diagram_file_path: str, lucim_scenario: Dict[str, Any] | str, output_dir: pathlib.Path | str, step: int = 6) -> Dict[str, Any]:
+        """
+        Audit PlantUML sequence diagrams for LUCIM UCI compliance using the PlantUML Auditor persona.
+
+        Args:
+            plantuml_diagram_file_path: Path to the standalone .puml file from Step 5 (mandatory)
+            lucim_scenario: LUCIM scenario data to include in the audit context (mandatory, matches generator context)
+            output_dir: Output directory for results (mandatory)
+            step: Step number for task file selection (default: 6)
+
+        Returns:
+            Dictionary containing reasoning, non-compliant rules, and any errors
+        """
+        request = self._prepare_request(plantuml_diagram_file_path, lucim_scenario, output_dir, step)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_auditor")
+            response = create_and_wait(self.client, api_config, timeout_seconds=timeout)
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
+
+    async def aaudit_plantuml_diagrams(self, plantuml_diagram_file_path: str, lucim_scenario: Dict[str, Any] | str, output_dir: pathlib.Path | str, step: int = 6) -> Dict[str, Any]:
+        """Awaitable variant of audit_plantuml_diagrams (non-blocking model call)."""
+        request = self._prepare_request(plantuml_diagram_file_path, lucim_scenario, output_dir, step)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_auditor")
+            response = await acreate_and_wait(self._get_async_client(), api_config, timeout_seconds=timeout)
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
 
-    
     def save_results(self, results: Dict[str, Any], base_name: str, model_name: str, step_number = None, output_dir = None):
         """Save parsing results using unified output file generation."""
         if not WRITE_FILES:
@@ -8,16 +8,19 @@ import os
 import json
 import datetime
 import pathlib
-import tiktoken
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import Callable, Dict, Any, Optional
 from utils_config_constants import (
     PERSONA_LUCIM_PLANTUML_DIAGRAM_GENERATOR, OUTPUT_DIR,
     get_reasoning_config, DEFAULT_MODEL, RULES_LUCIM_PLANTUML_DIAGRAM)
 from utils_path import sanitize_agent_name
+from utils_prompt_layout import PromptLayout, build_prompt_layout
+from utils_rules_registry import read_prompt_text
+from utils_tokenizer import get_tokenizer_service
 
 from google.adk.agents import LlmAgent
 from openai import OpenAI
-from utils_openai_client import create_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens, format_prompt_for_responses_api
+from utils_openai_client import create_and_wait, acreate_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens
 from utils_response_dump import serialize_response_to_dict, write_all_output_files, write_input_instructions_before_api
 from utils_schema_loader import get_template_for_agent, validate_data_against_template
 
@@ -34,6 +37,7 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
     name: str = "NetLogo PlantUML Writer"
     
     client: OpenAI = None
+    async_client: Any = None
     reasoning_effort: str = "medium"
     reasoning_summary: str = "auto"  # Add client field
     text_verbosity: str = "medium"
@@ -61,7 +65,7 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
         # Initialize persona and rules from defaults; orchestrator can override
         try:
             self.persona_path = str(PERSONA_FILE)
-            self.persona_text = pathlib.Path(self.persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(self.persona_path)
         except Exception:
             self.persona_text = ""
         
@@ -99,14 +103,17 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
             return
         self.persona_path = persona_path
         try:
-            self.persona_text = pathlib.Path(persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(persona_path)
         except Exception as e:
             print(f"[WARNING] Failed to load persona file: {persona_path} ({e})")
             self.persona_text = ""
     
     def count_input_tokens(self, instructions: str, input_text: str) -> int:
         """
-        Count input tokens exactly using tiktoken for the given model.
+        Count input tokens exactly using the native tokenizer of the model.
+        
+        The instructions (persona, rules, task) are a static segment: their count is
+        memoized by content, so only input_text is tokenized on each call.
         
         Args:
             instructions: The persona/instructions text
@@ -116,55 +123,46 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
             Exact token count for the input
         """
         try:
-            # Get the appropriate encoding for the model
-            try:
-                encoding = tiktoken.encoding_for_model(self.model)
-            except Exception:
-                encoding = tiktoken.get_encoding("cl100k_base")
-            
-            # Combine instructions and input text (this is what gets sent to the model)
-            full_input = f"{instructions}\n\n{input_text}"
-            
-            # Count tokens
-            token_count = len(encoding.encode(full_input))
-            return token_count
-            
+            return get_tokenizer_service().count_prompt(instructions, input_text, self.model)
         except Exception as e:
-            print(f"[WARNING] Failed to count input tokens with tiktoken: {e}")
+            print(f"[WARNING] Failed to count input tokens: {e}")
             # Fallback to character-based estimation
             full_input = f"{instructions}\n\n{input_text}"
             estimated_tokens = len(full_input) // 4  # Rough estimate: 4 chars per token
             return estimated_tokens
         
-    def generate_plantuml_diagrams(self, lucim_scenario: Dict[str, Any], audit_report: Any, previous_diagram: Dict[str, Any] | str | None = None, output_dir: Optional[pathlib.Path] = None) -> Dict[str, Any]:
+    def _get_async_client(self) -> Any:
+        """Lazily create the async client used by the awaitable agent variant."""
+        if self.async_client is None:
+            from utils_openai_client import get_async_openai_client_for_model
+            self.async_client = get_async_openai_client_for_model(self.model)
+        return self.async_client
+
+    def _prepare_request(self, lucim_scenario: Dict[str, Any], audit_report: Any, previous_diagram: Dict[str, Any] | str | None = None, output_dir: Optional[pathlib.Path] = None) -> Dict[str, Any]:
         """
-        Generate PlantUML sequence diagrams from scenario JSON data using the PlantUML Writer persona.
-        
-        Args:
-            lucim_scenario (Dict[str, Any]): Scenario JSON data containing one typical scenario.
-            audit_report (Any): Full compliance report from the previous audit (dict preferred; list of non-compliant rules also accepted).
-            output_dir (Optional[pathlib.Path], optional): Optional output directory for file outputs. Defaults to None.
+        Build the prompt and persist input-instructions.md.
         
         Returns:
-            Dict[str, Any]: Dictionary containing reasoning, PlantUML diagrams, and any errors.
+            {"result": <early result>} when the persona is missing, otherwise
+            {"system_prompt": ..., "layout": PromptLayout, "exact_input_tokens": ...}
         """
         # Resolve base output directory (use provided output_dir or fall back to OUTPUT_DIR)
         base_output_dir = output_dir if output_dir is not None else OUTPUT_DIR
         
         # Ensure persona is present
         if not self.persona_text or self.persona_text.strip() == "":
-            return {
+            return {"result": {
                 "reasoning_summary": "Missing mandatory input: Persona for PlantUML Diagram Generator",
                 "data": None,
                 "errors": ["Persona PSN_LUCIM_PlantUML_Diagram_Generator.md is required but not provided"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
 
         # Build canonical instructions: persona + PlantUML Diagram rules
         try:
-            diagram_rules_text = RULES_LUCIM_PLANTUML_DIAGRAM.read_text(encoding="utf-8")
+            diagram_rules_text = read_prompt_text(RULES_LUCIM_PLANTUML_DIAGRAM)
         except Exception:
             diagram_rules_text = ""
         instructions = f"{self.persona_text}\n\n{diagram_rules_text}".strip()
@@ -227,145 +225,192 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
                 pass
 
         # Create single system_prompt variable for both API call and file generation
-        system_prompt = f"{instructions}\n\n{input_text}"
+        # Static prefix (instructions) first, per-call input second: each is sent once
+        layout = build_prompt_layout("lucim_plantuml_diagram_generator", instructions, input_text)
+        system_prompt = layout.system_prompt
         
         # Write input-instructions.md BEFORE API call for debugging
         write_input_instructions_before_api(base_output_dir, system_prompt)
         
         # Count input tokens exactly
-        exact_input_tokens = self.count_input_tokens(instructions, input_text)
-        
-        try:
-            # Create response using OpenAI Responses API
-            api_config = get_reasoning_config("lucim_plantuml_diagram_generator")
-            # Force the run-selected model (overrides DEFAULT_MODEL from configs)
-            api_config["model"] = self.model
-            # Update reasoning configuration with agent's settings
-            if "reasoning" in api_config:
-                api_config["reasoning"]["effort"] = self.reasoning_effort
-                api_config["reasoning"]["summary"] = self.reasoning_summary
-            api_config.update({
-                "instructions": format_prompt_for_responses_api(system_prompt),
-                "input": [{"role": "user", "content": system_prompt}]
-            })
-            
-            from utils_config_constants import AGENT_TIMEOUTS
-            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_generator")
-            response = create_and_wait(self.client, api_config, timeout_seconds=timeout)
-            
-            # Extract content and reasoning via helpers
-            content = get_output_text(response)
-            reasoning_summary = get_reasoning_summary(response)
-            raw_response_serialized = serialize_response_to_dict(response)
-            
-            # Check if response is empty
-            if not content or content.strip() == "":
-                return {
-                    "reasoning_summary": "Received empty response from API",
-                    "data": None,
-                    "errors": ["Empty response from API - this may indicate a model issue or timeout"],
-                    "tokens_used": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "raw_response": raw_response_serialized
-                }
-            
-            # Parse JSON response and extract data or errors following the new format
-            # Expected format: {"data": {"plantuml-diagram": "..."}, "errors": null}
-            # Or error format: {"data": null, "errors": ["error1", "error2"]}
-            parsed_data = None
-            extracted_data = None
-            extracted_errors = None
-            
-            try:
-                from utils_openai_client import parse_json_response
-                parsed_data = parse_json_response(content)
-            except (ValueError, json.JSONDecodeError) as e:
-                # If JSON parsing fails, try to extract PlantUML directly from text
-                if "@startuml" in content and "@enduml" in content:
-                    # Found PlantUML in raw text, wrap it in the new format
-                    extracted_data = {
-                        "plantuml-diagram": content
-                    }
-                else:
-                    # No valid JSON and no PlantUML found, treat as error
-                    extracted_errors = [f"Failed to parse JSON response: {e}", "Response content may be malformed"]
-            
-            # Extract data or errors from parsed JSON
-            if parsed_data is not None:
-                if isinstance(parsed_data, dict):
-                    # Check for new format: {"data": {"plantuml-diagram": "..."}, "errors": null}
-                    if "data" in parsed_data and parsed_data.get("data") is not None:
-                        data_node = parsed_data.get("data")
-                        if isinstance(data_node, dict):
-                            # Extract plantuml-diagram from data node
-                            if "plantuml-diagram" in data_node:
-                                extracted_data = {"plantuml-diagram": data_node["plantuml-diagram"]}
-                            # Fallback: check for legacy format with nested diagram
-                            elif "diagram" in data_node and isinstance(data_node["diagram"], dict):
-                                diagram_node = data_node["diagram"]
-                                if "plantuml" in diagram_node:
-                                    extracted_data = {"plantuml-diagram": diagram_node["plantuml"]}
-                            # Fallback: check if data_node itself is a string (legacy format)
-                            elif isinstance(data_node, str) and "@startuml" in data_node:
-                                extracted_data = {"plantuml-diagram": data_node}
-                    
-                    # Check for errors if data is null or not found
-                    if extracted_data is None:
-                        if "errors" in parsed_data:
-                            errors_value = parsed_data.get("errors")
-                            if errors_value is not None:
-                                if isinstance(errors_value, list):
-                                    extracted_errors = errors_value
-                                else:
-                                    extracted_errors = [str(errors_value)]
-                            else:
-                                # data is null and errors is null - treat as error
-                                extracted_errors = ["Response contains null data and null errors"]
-                        else:
-                            # No data and no errors field - treat as error
-                            extracted_errors = ["Response does not contain 'data' or 'errors' field"]
-            
-            # Extract token usage from response (centralized helper)
-            usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
-            tokens_used = usage.get("total_tokens", 0)
-            input_tokens = usage.get("input_tokens", 0)
-            api_output_tokens = usage.get("output_tokens", 0)
-            reasoning_tokens = usage.get("reasoning_tokens", 0)
-            total_output_tokens = api_output_tokens if api_output_tokens is not None else max((tokens_used or 0) - (input_tokens or 0), 0)
-            visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
-            usage_dict = usage
+        return {
+            "system_prompt": system_prompt,
+            "layout": layout,
+            # Counted lazily, only when the response carries no input token count
+            "exact_input_tokens": partial(self.count_input_tokens, instructions, input_text),
+        }
 
-            # Return standardized format: data contains the extracted structure, errors is None or list
-            return {
-                "reasoning_summary": reasoning_summary,
-                "data": extracted_data,  # Dict with "plantuml-diagram" key, or None
-                "errors": extracted_errors,  # List of errors, or None
-                "tokens_used": tokens_used,
-                "input_tokens": input_tokens,
-                "visible_output_tokens": visible_output_tokens,
-                "raw_usage": usage_dict,
-                "reasoning_tokens": reasoning_tokens,
-                "total_output_tokens": total_output_tokens,
-                "raw_response": raw_response_serialized
-            }
-                
-        except Exception as e:
-            from utils_openai_client import build_error_raw_payload
+    def _build_api_config(self, layout: PromptLayout) -> Dict[str, Any]:
+        # Create response using OpenAI Responses API
+        api_config = get_reasoning_config("lucim_plantuml_diagram_generator")
+        # Force the run-selected model (overrides DEFAULT_MODEL from configs)
+        api_config["model"] = self.model
+        # Update reasoning configuration with agent's settings
+        if "reasoning" in api_config:
+            api_config["reasoning"]["effort"] = self.reasoning_effort
+            api_config["reasoning"]["summary"] = self.reasoning_summary
+        # Text verbosity of this agent (the sweep's verbosity axis), not the global default
+        api_config["text"] = {"verbosity": self.text_verbosity}
+        return layout.apply(api_config)
+
+    def _build_result(self, response: Any, exact_input_tokens: Callable[[], int]) -> Dict[str, Any]:
+        # Extract content and reasoning via helpers
+        content = get_output_text(response)
+        reasoning_summary = get_reasoning_summary(response)
+        raw_response_serialized = serialize_response_to_dict(response)
+        
+        # Check if response is empty
+        if not content or content.strip() == "":
             return {
-                "reasoning_summary": f"Error during model inference: {e}",
+                "reasoning_summary": "Received empty response from API",
                 "data": None,
-                "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+                "errors": ["Empty response from API - this may indicate a model issue or timeout"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
-                "raw_response": build_error_raw_payload(e)
+                "raw_response": raw_response_serialized
             }
-    
+        
+        # Parse JSON response and extract data or errors following the new format
+        # Expected format: {"data": {"plantuml-diagram": "..."}, "errors": null}
+        # Or error format: {"data": null, "errors": ["error1", "error2"]}
+        parsed_data = None
+        extracted_data = None
+        extracted_errors = None
+        
+        try:
+            from utils_openai_client import parse_json_response
+            parsed_data = parse_json_response(content)
+        except (ValueError, json.JSONDecodeError) as e:
+            # If JSON parsing fails, try to extract PlantUML directly from text
+            if "@startuml" in content and "@enduml" in content:
+                # Found PlantUML in raw text, wrap it in the new format
+                extracted_data = {
+                    "plantuml-diagram": content
+                }
+            else:
+                # No valid JSON and no PlantUML found, treat as error
+                extracted_errors = [f"Failed to parse JSON response: {e}", "Response content may be malformed"]
+                # Streams cancelled on a certain LDR0 violation only carry a partial output
+                stream_metrics = getattr(response, "stream_metrics", None) or {}
+                if stream_metrics.get("aborted_rule"):
+                    extracted_errors.insert(0, f"Generation cancelled: {stream_metrics['aborted_rule']} ({stream_metrics.get('abort_reason')})")
+        
+        # Extract data or errors from parsed JSON
+        if parsed_data is not None:
+            if isinstance(parsed_data, dict):
+                # Check for new format: {"data": {"plantuml-diagram": "..."}, "errors": null}
+                if "data" in parsed_data and parsed_data.get("data") is not None:
+                    data_node = parsed_data.get("data")
+                    if isinstance(data_node, dict):
+                        # Extract plantuml-diagram from data node
+                        if "plantuml-diagram" in data_node:
+                            extracted_data = {"plantuml-diagram": data_node["plantuml-diagram"]}
+                        # Fallback: check for legacy format with nested diagram
+                        elif "diagram" in data_node and isinstance(data_node["diagram"], dict):
+                            diagram_node = data_node["diagram"]
+                            if "plantuml" in diagram_node:
+                                extracted_data = {"plantuml-diagram": diagram_node["plantuml"]}
+                        # Fallback: check if data_node itself is a string (legacy format)
+                        elif isinstance(data_node, str) and "@startuml" in data_node:
+                            extracted_data = {"plantuml-diagram": data_node}
+                
+                # Check for errors if data is null or not found
+                if extracted_data is None:
+                    if "errors" in parsed_data:
+                        errors_value = parsed_data.get("errors")
+                        if errors_value is not None:
+                            if isinstance(errors_value, list):
+                                extracted_errors = errors_value
+                            else:
+                                extracted_errors = [str(errors_value)]
+                        else:
+                            # data is null and errors is null - treat as error
+                            extracted_errors = ["Response contains null data and null errors"]
+                    else:
+                        # No data and no errors field - treat as error
+                        extracted_errors = ["Response does not contain 'data' or 'errors' field"]
+        
+        # Extract token usage from response (centralized helper)
+        usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
+        tokens_used = usage.get("total_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        api_output_tokens = usage.get("output_tokens", 0)
+        reasoning_tokens = usage.get("reasoning_tokens", 0)
+        total_output_tokens = api_output_tokens if api_output_tokens is not None else max((tokens_used or 0) - (input_tokens or 0), 0)
+        visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
+        usage_dict = usage
 
-    
-    def save_results(self, results: Dict[str, Any], base_name: str, model_name: str, step_number = None, output_dir = None):
-        """Save parsing results using unified output file generation."""
+        # Return standardized format: data contains the extracted structure, errors is None or list
+        return {
+            "reasoning_summary": reasoning_summary,
+            "data": extracted_data,  # Dict with "plantuml-diagram" key, or None
+            "errors": extracted_errors,  # List of errors, or None
+            "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "visible_output_tokens": visible_output_tokens,
+            "raw_usage": usage_dict,
+            "reasoning_tokens": reasoning_tokens,
+            "total_output_tokens": total_output_tokens,
+            "raw_response": raw_response_serialized
+        }
+
+    def _build_error_result(self, e: Exception) -> Dict[str, Any]:
+        from utils_openai_client import build_error_raw_payload
+        return {
+            "reasoning_summary": f"Error during model inference: {e}",
+            "data": None,
+            "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+            "tokens_used": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "raw_response": build_error_raw_payload(e)
+        }
+
+    def generate_plantuml_diagrams(self, lucim_scenario: Dict[str, Any], audit_report: Any, previous_diagram: Dict[str, Any] | str | None = None, output_dir: Optional[pathlib.Path] = None) -> Dict[str, Any]:
+        """
+        Generate PlantUML sequence diagrams from scenario JSON data using the PlantUML Writer persona.
+        
+        Args:
+            lucim_scenario (Dict[str, Any]): Scenario JSON data containing one typical scenario.
+            audit_report (Any): Full compliance report from the previous audit (dict preferred; list of non-compliant rules also accepted).
+            output_dir (Optional[pathlib.Path], optional): Optional output directory for file outputs. Defaults to None.
+        
+        Returns:
+            Dict[str, Any]: Dictionary containing reasoning, PlantUML diagrams, and any errors.
+        """
+        request = self._prepare_request(lucim_scenario, audit_report, previous_diagram, output_dir)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_generator")
+            response = create_and_wait(self.client, api_config, timeout_seconds=timeout, stream_stage="diagram")
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
+
+    async def agenerate_plantuml_diagrams(self, lucim_scenario: Dict[str, Any], audit_report: Any, previous_diagram: Dict[str, Any] | str | None = None, output_dir: Optional[pathlib.Path] = None) -> Dict[str, Any]:
+        """Awaitable variant of generate_plantuml_diagrams (non-blocking model call)."""
+        request = self._prepare_request(lucim_scenario, audit_report, previous_diagram, output_dir)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_plantuml_diagram_generator")
+            response = await acreate_and_wait(self._get_async_client(), api_config, timeout_seconds=timeout, stream_stage="diagram")
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
+
+    def save_results(self, results: Dict[str, Any], base_name: str, model_name: str, step_number = None, output_dir = None, render_svg: bool = True):
+        """Save parsing results using unified output file generation.
+
+        With render_svg=False the .puml file is written but its SVG is left to the caller
+        (e.g. the orchestrator submitting it to the persistent renderer).
+        """
         if not WRITE_FILES:
             return
             
@@ -428,7 +473,8 @@ class LUCIMPlantUMLDiagramGeneratorAgent(LlmAgent):
         special_files = None
         if diagram_text and "@startuml" in diagram_text and "@enduml" in diagram_text:
             special_files = {
-                "plantuml_diagram": diagram_text
+                "plantuml_diagram": diagram_text,
+                "render_svg": render_svg,
             }
             # Surface the path for orchestrator logging/downstream use
             results["puml_file"] = str(base_output_dir / "diagram.puml")
@@ -7,11 +7,11 @@ Generates LUCIM scenarios from NetLogo source using OpenAI models.
 import json
 import datetime
 import pathlib
-import tiktoken
-from typing import Dict, Any
+from functools import partial
+from typing import Callable, Dict, Any
 from google.adk.agents import LlmAgent
 from openai import OpenAI
-from utils_openai_client import create_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens, format_prompt_for_responses_api
+from utils_openai_client import create_and_wait, acreate_and_wait, get_output_text, get_reasoning_summary, get_usage_tokens
 from utils_response_dump import serialize_response_to_dict,write_all_output_files, write_input_instructions_before_api
 from utils_schema_loader import get_template_for_agent, validate_data_against_template
 
@@ -19,6 +19,9 @@ from utils_config_constants import (
     PERSONA_LUCIM_SCENARIO_GENERATOR, OUTPUT_DIR,
     get_reasoning_config, DEFAULT_MODEL, RULES_LUCIM_SCENARIO)
 from utils_path import sanitize_agent_name
+from utils_prompt_layout import PromptLayout, build_prompt_layout
+from utils_rules_registry import read_prompt_text
+from utils_tokenizer import get_tokenizer_service
 
 # Configuration
 PERSONA_FILE = PERSONA_LUCIM_SCENARIO_GENERATOR
@@ -34,6 +37,7 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
     name: str = "NetLogo LUCIM Scenario Generator"
     
     client: OpenAI = None
+    async_client: Any = None
     reasoning_effort: str = "medium"
     reasoning_summary: str = "auto"  # Add client field
     text_verbosity: str = "medium"
@@ -62,13 +66,13 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
         # Initialize persona from default; orchestrator may override
         try:
             self.persona_path = str(PERSONA_FILE)
-            self.persona_text = pathlib.Path(self.persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(self.persona_path)
         except Exception:
             self.persona_text = ""
         # Load scenario rules from centralized constant (fallback used if caller does not pass them)
         try:
             self.lucim_rules_path = str(RULES_LUCIM_SCENARIO)
-            self.lucim_rules_text = pathlib.Path(self.lucim_rules_path).read_text(encoding="utf-8")
+            self.lucim_rules_text = read_prompt_text(self.lucim_rules_path)
         except Exception:
             self.lucim_rules_text = ""
     
@@ -92,7 +96,7 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
             return
         self.persona_path = persona_path
         try:
-            self.persona_text = pathlib.Path(persona_path).read_text(encoding="utf-8")
+            self.persona_text = read_prompt_text(persona_path)
         except Exception as e:
             print(f"[WARNING] Failed to load persona file: {persona_path} ({e})")
             self.persona_text = ""
@@ -112,7 +116,10 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
     
     def count_input_tokens(self, instructions: str, input_text: str) -> int:
         """
-        Count input tokens exactly using tiktoken for the given model.
+        Count input tokens exactly using the native tokenizer of the model.
+        
+        The instructions (persona, rules, task) are a static segment: their count is
+        memoized by content, so only input_text is tokenized on each call.
         
         Args:
             instructions: The persona/instructions text
@@ -122,38 +129,28 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
             Exact token count for the input
         """
         try:
-            # Get the appropriate encoding for the model
-            try:
-                encoding = tiktoken.encoding_for_model(self.model)
-            except Exception:
-                encoding = tiktoken.get_encoding("cl100k_base")
-            
-            # Combine instructions and input text (this is what gets sent to the model)
-            full_input = f"{instructions}\n\n{input_text}"
-            
-            # Count tokens
-            token_count = len(encoding.encode(full_input))
-            return token_count
-            
+            return get_tokenizer_service().count_prompt(instructions, input_text, self.model)
         except Exception as e:
-            print(f"[WARNING] Failed to count input tokens with tiktoken: {e}")
+            print(f"[WARNING] Failed to count input tokens: {e}")
             # Fallback to character-based estimation
             full_input = f"{instructions}\n\n{input_text}"
             estimated_tokens = len(full_input) // 4  # Rough estimate: 4 chars per token
             return estimated_tokens
         
-    def generate_scenarios(self, lucim_operation_model: Dict[str, Any], scenario_rules_text: str, scenario_auditor_feedback: Dict[str, Any], previous_scenario: Dict[str, Any] | list | None, output_dir: str = None) -> Dict[str, Any]:
+    def _get_async_client(self) -> Any:
+        """Lazily create the async client used by the awaitable agent variant."""
+        if self.async_client is None:
+            from utils_openai_client import get_async_openai_client_for_model
+            self.async_client = get_async_openai_client_for_model(self.model)
+        return self.async_client
+
+    def _prepare_request(self, lucim_operation_model: Dict[str, Any], scenario_rules_text: str, scenario_auditor_feedback: Dict[str, Any], previous_scenario: Dict[str, Any] | list | None, output_dir: str = None) -> Dict[str, Any]:
         """
-        Generate LUCIM scenarios from mandatory inputs using the LUCIM Scenario Generator persona.
+        Build the prompt, persist input-instructions.md and validate mandatory inputs.
         
-        Args:
-            lucim_operation_model: Step 03 LUCIM operation model (required)
-            scenario_rules_text: Scenario rules content (RULES_LUCIM_Scenario.md). If empty, agent uses its internal fallback copy.
-            scenario_auditor_feedback: Audit report from Scenario Auditor (required parameter but may be empty on first run)
-            previous_scenario: Last LUCIM Scenario produced by Scenario Generator (required parameter but may be empty on first run)
-            
         Returns:
-            Dictionary containing reasoning, scenarios, and any errors
+            {"result": <early result>} when a mandatory input is missing, otherwise
+            {"system_prompt": ..., "layout": PromptLayout, "exact_input_tokens": ...}
         """
         # Resolve base output directory (per-agent if provided)
         base_output_dir = output_dir if output_dir is not None else OUTPUT_DIR
@@ -257,109 +254,149 @@ class LUCIMScenarioGeneratorAgent(LlmAgent):
         input_text += f"\n<PREVIOUS-LUCIM-SCENARIOS>\n{prev_scenario_text}\n</PREVIOUS-LUCIM-SCENARIOS>\n"
 
         # Build system_prompt with required tagged blocks and inputs
-        system_prompt = f"{instructions}\n\n{input_text}" if instructions else input_text
+        # Static prefix (instructions) first, per-call input second: each is sent once
+        layout = build_prompt_layout("lucim_scenario_generator", instructions, input_text)
+        system_prompt = layout.system_prompt
         
         # Write input-instructions.md BEFORE API call for debugging (even if validation fails)
         write_input_instructions_before_api(base_output_dir, system_prompt)
         
         # Now validate mandatory inputs and return early if missing
         if not lucim_operation_model:
-            return {
+            return {"result": {
                 "reasoning_summary": "Missing mandatory input: LUCIM operation model",
                 "data": None,
                 "errors": ["LUCIM operation model is required but not provided"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
         if not self.persona_text or self.persona_text.strip() == "":
-            return {
+            return {"result": {
                 "reasoning_summary": "Missing mandatory input: Persona for Scenario Generator",
                 "data": None,
                 "errors": ["Persona PSN_LUCIM_Scenario_Generator.md is required but not provided"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0
-            }
+            }}
         
         # Count input tokens exactly
-        exact_input_tokens = self.count_input_tokens(instructions, input_text)
-        
-        try:
-            # Create response using OpenAI Responses API
-            api_config = get_reasoning_config("lucim_scenario_generator")
-            # Force the run-selected model (overrides DEFAULT_MODEL from configs)
-            api_config["model"] = self.model
-            # Update reasoning configuration with agent's settings
-            if "reasoning" in api_config:
-                api_config["reasoning"]["effort"] = self.reasoning_effort
-                api_config["reasoning"]["summary"] = self.reasoning_summary
-            api_config.update({
-                "instructions": format_prompt_for_responses_api(system_prompt),
-                "input": [{"role": "user", "content": system_prompt}]
-            })
-            
-            from utils_config_constants import AGENT_TIMEOUTS
-            timeout = AGENT_TIMEOUTS.get("lucim_scenario_generator")
-            response = create_and_wait(self.client, api_config, timeout_seconds=timeout)
-            
-            # Extract content and reasoning via helpers
-            content = get_output_text(response)
-            reasoning_summary = get_reasoning_summary(response)
-            raw_response_serialized = serialize_response_to_dict(response)
-            
-            # Check if response is empty
-            if not content or content.strip() == "":
-                return {
-                    "reasoning_summary": "Received empty response from API",
-                    "data": None,
-                    "errors": ["Empty response from API - this may indicate a model issue or timeout"],
-                    "tokens_used": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "raw_response": raw_response_serialized
-                }
-            
-            # Store raw text content directly (no JSON parsing)
-            # The raw text will be written to output-data.json and passed to the auditor
-            scenario_raw_text = content
+        return {
+            "system_prompt": system_prompt,
+            "layout": layout,
+            # Counted lazily, only when the response carries no input token count
+            "exact_input_tokens": partial(self.count_input_tokens, instructions, input_text),
+        }
 
-            # Extract token usage from response (centralized helper)
-            usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
-            tokens_used = usage.get("total_tokens", 0)
-            input_tokens = usage.get("input_tokens", 0)
-            api_output_tokens = usage.get("output_tokens", 0)
-            reasoning_tokens = usage.get("reasoning_tokens", 0)
-            total_output_tokens = api_output_tokens if api_output_tokens is not None else max((tokens_used or 0) - (input_tokens or 0), 0)
-            visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
-            usage_dict = usage
+    def _build_api_config(self, layout: PromptLayout) -> Dict[str, Any]:
+        # Create response using OpenAI Responses API
+        api_config = get_reasoning_config("lucim_scenario_generator")
+        # Force the run-selected model (overrides DEFAULT_MODEL from configs)
+        api_config["model"] = self.model
+        # Update reasoning configuration with agent's settings
+        if "reasoning" in api_config:
+            api_config["reasoning"]["effort"] = self.reasoning_effort
+            api_config["reasoning"]["summary"] = self.reasoning_summary
+        # Text verbosity of this agent (the sweep's verbosity axis), not the global default
+        api_config["text"] = {"verbosity": self.text_verbosity}
+        return layout.apply(api_config)
 
+    def _build_result(self, response: Any, exact_input_tokens: Callable[[], int]) -> Dict[str, Any]:
+        # Extract content and reasoning via helpers
+        content = get_output_text(response)
+        reasoning_summary = get_reasoning_summary(response)
+        raw_response_serialized = serialize_response_to_dict(response)
+        
+        # Check if response is empty
+        if not content or content.strip() == "":
             return {
-                "reasoning_summary": reasoning_summary,
-                "data": scenario_raw_text,  # Store raw text content (no JSON parsing)
-                "errors": None,
-                "tokens_used": tokens_used,
-                "input_tokens": input_tokens,
-                "visible_output_tokens": visible_output_tokens,
-                "raw_usage": usage_dict,
-                "reasoning_tokens": reasoning_tokens,
-                "total_output_tokens": total_output_tokens,
-                "raw_response": raw_response_serialized
-            }
-                
-        except Exception as e:
-            from utils_openai_client import build_error_raw_payload
-            return {
-                "reasoning_summary": f"Error during model inference: {e}",
+                "reasoning_summary": "Received empty response from API",
                 "data": None,
-                "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+                "errors": ["Empty response from API - this may indicate a model issue or timeout"],
                 "tokens_used": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
-                "raw_response": build_error_raw_payload(e)
+                "raw_response": raw_response_serialized
             }
-    
+        
+        # Store raw text content directly (no JSON parsing)
+        # The raw text will be written to output-data.json and passed to the auditor
+        scenario_raw_text = content
+
+        # Extract token usage from response (centralized helper)
+        usage = get_usage_tokens(response, exact_input_tokens=exact_input_tokens)
+        tokens_used = usage.get("total_tokens", 0)
+        input_tokens = usage.get("input_tokens", 0)
+        api_output_tokens = usage.get("output_tokens", 0)
+        reasoning_tokens = usage.get("reasoning_tokens", 0)
+        total_output_tokens = api_output_tokens if api_output_tokens is not None else max((tokens_used or 0) - (input_tokens or 0), 0)
+        visible_output_tokens = max((total_output_tokens or 0) - (reasoning_tokens or 0), 0)
+        usage_dict = usage
+
+        return {
+            "reasoning_summary": reasoning_summary,
+            "data": scenario_raw_text,  # Store raw text content (no JSON parsing)
+            "errors": None,
+            "tokens_used": tokens_used,
+            "input_tokens": input_tokens,
+            "visible_output_tokens": visible_output_tokens,
+            "raw_usage": usage_dict,
+            "reasoning_tokens": reasoning_tokens,
+            "total_output_tokens": total_output_tokens,
+            "raw_response": raw_response_serialized
+        }
 
+    def _build_error_result(self, e: Exception) -> Dict[str, Any]:
+        from utils_openai_client import build_error_raw_payload
+        return {
+            "reasoning_summary": f"Error during model inference: {e}",
+            "data": None,
+            "errors": [f"Model inference error: {e}", f"Model used: {self.model}"],
+            "tokens_used": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "raw_response": build_error_raw_payload(e)
+        }
+
+    def generate_scenarios(self, lucim_operation_model: Dict[str, Any], scenario_rules_text: str, scenario_auditor_feedback: Dict[str, Any], previous_scenario: Dict[str, Any] | list | None, output_dir: str = None) -> Dict[str, Any]:
+        """
+        Generate LUCIM scenarios from mandatory inputs using the LUCIM Scenario Generator persona.
+        
+        Args:
+            lucim_operation_model: Step 03 LUCIM operation model (required)
+            scenario_rules_text: Scenario rules content (RULES_LUCIM_Scenario.md). If empty, agent uses its internal fallback copy.
+            scenario_auditor_feedback: Audit report from Scenario Auditor (required parameter but may be empty on first run)
+            previous_scenario: Last LUCIM Scenario produced by Scenario Generator (required parameter but may be empty on first run)
+            
+        Returns:
+            Dictionary containing reasoning, scenarios, and any errors
+        """
+        request = self._prepare_request(lucim_operation_model, scenario_rules_text, scenario_auditor_feedback, previous_scenario, output_dir)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_scenario_generator")
+            response = create_and_wait(self.client, api_config, timeout_seconds=timeout, stream_stage="scenario")
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
+
+    async def agenerate_scenarios(self, lucim_operation_model: Dict[str, Any], scenario_rules_text: str, scenario_auditor_feedback: Dict[str, Any], previous_scenario: Dict[str, Any] | list | None, output_dir: str = None) -> Dict[str, Any]:
+        """Awaitable variant of generate_scenarios (non-blocking model call)."""
+        request = self._prepare_request(lucim_operation_model, scenario_rules_text, scenario_auditor_feedback, previous_scenario, output_dir)
+        if "result" in request:
+            return request["result"]
+        try:
+            api_config = self._build_api_config(request["layout"])
+            from utils_config_constants import AGENT_TIMEOUTS
+            timeout = AGENT_TIMEOUTS.get("lucim_scenario_generator")
+            response = await acreate_and_wait(self._get_async_client(), api_config, timeout_seconds=timeout, stream_stage="scenario")
+            return self._build_result(response, request["exact_input_tokens"])
+        except Exception as e:
+            return self._build_error_result(e)
     
     def save_results(self, results: Dict[str, Any], base_name: str, model_name: str, step_number = None, output_dir = None):
         """Save parsing results using unified output file generation."""
@@ -4,18 +4,19 @@ Audit all runs in a specific directory using the three Python auditors:
 - utils_audit_operation_model.py
 - utils_audit_scenario.py
 - utils_audit_diagram.py
+
+Runs are audited in parallel and incrementally by utils_batch_reaudit: iterations whose
+artifact and rules are unchanged since the last audit are taken from the JSONL table.
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
 from typing import Dict, List, Any
 import traceback
 
-# Import the audit functions
-from utils_audit_operation_model import audit_operation_model
-from utils_audit_scenario import audit_scenario
-from utils_audit_diagram import audit_diagram
+from utils_batch_reaudit import reaudit_tree, rows_to_run_results
 
 
 def find_all_runs(base_dir: Path) -> List[Path]:
@@ -32,179 +33,6 @@ def find_all_runs(base_dir: Path) -> List[Path]:
     return sorted(runs)
 
 
-def extract_scenario_text(scenario_data: Any) -> str:
-    """Extract scenario text from scenario data structure."""
-    if not isinstance(scenario_data, (list, dict)):
-        return ""
-    
-    lines = []
-    if isinstance(scenario_data, list):
-        for item in scenario_data:
-            if isinstance(item, dict):
-                msgs = (item.get("scenario", {}) or {}).get("messages", [])
-                if isinstance(msgs, list):
-                    for m in msgs:
-                        if isinstance(m, dict):
-                            src = m.get("source", "")
-                            tgt = m.get("target", "")
-                            name = m.get("event_name", m.get("name", ""))
-                            params = m.get("parameters", "")
-                            params_str = str(params).strip()
-                            if params_str and not params_str.startswith("("):
-                                params_str = f"({params_str})"
-                            elif not params_str:
-                                params_str = "()"
-                            # Determine arrow type based on event type
-                            event_type = m.get("event_type", "")
-                            arrow = "-->" if event_type == "input_event" or name.startswith("ie") else "->"
-                            lines.append(f"{src} {arrow} {tgt} : {name}{params_str}")
-    
-    return "\n".join(lines)
-
-
-def audit_run(run_dir: Path) -> Dict[str, Any]:
-    """Audit a single run directory."""
-    results = {
-        "run_name": run_dir.name,
-        "operation_model": [],
-        "scenario": [],
-        "diagram": [],
-        "errors": []
-    }
-    
-    print(f"\n{'='*80}")
-    print(f"Auditing run: {run_dir.name}")
-    print(f"{'='*80}")
-    
-    # 1. Audit Operation Models
-    op_model_dir = run_dir / "1_lucim_operation_model"
-    if op_model_dir.exists():
-        print(f"\n[Operation Model] Scanning {op_model_dir}...")
-        for iter_dir in sorted(op_model_dir.glob("iter-*")):
-            generator_dir = iter_dir / "1-generator"
-            output_data = generator_dir / "output-data.json"
-            if output_data.exists():
-                try:
-                    # Read as text (new format: output-data.json contains EITHER data string OR errors string)
-                    content = output_data.read_text(encoding='utf-8')
-                    if not content.strip():
-                        continue
-                    # Try to parse as JSON
-                    try:
-                        data = json.loads(content)
-                    except (json.JSONDecodeError, ValueError):
-                        # Not valid JSON, skip this file
-                        print(f"  {iter_dir.name}: ⚠️  output-data.json is not valid JSON (may contain errors string)")
-                        continue
-                    
-                    # Handle standardized structure: extract from "data" if present
-                    op_model_data = None
-                    if isinstance(data, dict):
-                        # Check if it's standardized structure {"data": {...}, "errors": null}
-                        if "data" in data and data.get("data") is not None:
-                            op_model_data = data.get("data")
-                        # Old format: direct structure
-                        elif "actors" in data or "system" in data:
-                            op_model_data = data
-                    
-                    if op_model_data and isinstance(op_model_data, dict):
-                        audit_result = audit_operation_model(op_model_data)
-                        results["operation_model"].append({
-                            "iteration": iter_dir.name,
-                            "file": str(output_data.relative_to(run_dir)),
-                            "audit": audit_result
-                        })
-                        verdict = "✅ COMPLIANT" if audit_result.get("verdict") else "❌ NON-COMPLIANT"
-                        violations_count = len(audit_result.get("violations", []))
-                        print(f"  {iter_dir.name}: {verdict} ({violations_count} violations)")
-                    else:
-                        print(f"  {iter_dir.name}: ⚠️  No operation model data found in output-data.json")
-                except Exception as e:
-                    error_msg = f"Error auditing {output_data}: {str(e)}"
-                    results["errors"].append(error_msg)
-                    print(f"  ❌ ERROR: {error_msg}")
-    
-    # 2. Audit Scenarios
-    scenario_dir = run_dir / "2_lucim_scenario"
-    if scenario_dir.exists():
-        print(f"\n[Scenario] Scanning {scenario_dir}...")
-        for iter_dir in sorted(scenario_dir.glob("iter-*")):
-            generator_dir = iter_dir / "1-generator"
-            output_data = generator_dir / "output-data.json"
-            if output_data.exists():
-                try:
-                    # Read as text (new format: output-data.json contains EITHER data string OR errors string)
-                    content = output_data.read_text(encoding='utf-8')
-                    if not content.strip():
-                        continue
-                    # Try to parse as JSON
-                    try:
-                        data = json.loads(content)
-                    except (json.JSONDecodeError, ValueError):
-                        # Not valid JSON, skip this file
-                        print(f"  {iter_dir.name}: ⚠️  output-data.json is not valid JSON (may contain errors string)")
-                        continue
-                    
-                    # Handle standardized structure: extract from "data" if present
-                    scenario_data = None
-                    if isinstance(data, dict):
-                        # Check if it's standardized structure {"data": {...}, "errors": null}
-                        if "data" in data and data.get("data") is not None:
-                            scenario_data = data.get("data")
-                        # Old format: direct structure
-                        elif isinstance(data, list):
-                            scenario_data = data
-                    elif isinstance(data, list):
-                        scenario_data = data
-                    
-                    if scenario_data:
-                        scenario_text = extract_scenario_text(scenario_data)
-                        if scenario_text:
-                            audit_result = audit_scenario(scenario_text)
-                            results["scenario"].append({
-                                "iteration": iter_dir.name,
-                                "file": str(output_data.relative_to(run_dir)),
-                                "audit": audit_result
-                            })
-                            verdict = "✅ COMPLIANT" if audit_result.get("verdict") else "❌ NON-COMPLIANT"
-                            violations_count = len(audit_result.get("violations", []))
-                            print(f"  {iter_dir.name}: {verdict} ({violations_count} violations)")
-                    else:
-                        print(f"  {iter_dir.name}: ⚠️  No scenario data found in output-data.json")
-                except Exception as e:
-                    error_msg = f"Error auditing {output_data}: {str(e)}"
-                    results["errors"].append(error_msg)
-                    print(f"  ❌ ERROR: {error_msg}")
-    
-    # 3. Audit Diagrams
-    diagram_dir = run_dir / "3_lucim_plantuml_diagram"
-    if diagram_dir.exists():
-        print(f"\n[Diagram] Scanning {diagram_dir}...")
-        for iter_dir in sorted(diagram_dir.glob("iter-*")):
-            generator_dir = iter_dir / "1-generator"
-            puml_file = generator_dir / "diagram.puml"
-            if puml_file.exists():
-                try:
-                    with open(puml_file, 'r', encoding='utf-8') as f:
-                        puml_text = f.read()
-                    if puml_text:
-                        audit_result = audit_diagram(puml_text)
-                        results["diagram"].append({
-                            "iteration": iter_dir.name,
-                            "file": str(puml_file.relative_to(run_dir)),
-                            "audit": audit_result
-                        })
-                        verdict = "✅ COMPLIANT" if audit_result.get("verdict") else "❌ NON-COMPLIANT"
-                        violations_count = len(audit_result.get("violations", []))
-                        print(f"  {iter_dir.name}: {verdict} ({violations_count} violations)")
-                except Exception as e:
-                    error_msg = f"Error auditing {puml_file}: {str(e)}"
-                    results["errors"].append(error_msg)
-                    print(f"  ❌ ERROR: {error_msg}")
-    
-    return results
-
-
 def print_detailed_violations(results: Dict[str, Any]):
     """Print detailed violation information."""
     print(f"\n{'='*80}")
@@ -356,11 +184,15 @@ def summarize_all_results(all_results: List[Dict[str, Any]]):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python audit_all_runs.py <runs_directory>")
-        sys.exit(1)
-    
-    runs_dir = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Re-audit all runs with the deterministic Python auditors")
+    parser.add_argument("runs_directory", type=Path, help="Directory containing the my-ecosys-* run directories")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--table", type=Path, default=None,
+                        help="Incremental JSONL audit table (default: <runs_directory>/audit_all_runs_results.jsonl)")
+    parser.add_argument("--force", action="store_true", help="Re-audit iterations whose artifact and rules are unchanged")
+    args = parser.parse_args()
+
+    runs_dir = args.runs_directory
     if not runs_dir.exists():
         print(f"ERROR: Directory does not exist: {runs_dir}")
         sys.exit(1)
@@ -373,16 +205,30 @@ def main():
         sys.exit(1)
     
     print(f"Found {len(all_runs)} run directories")
-    
-    all_results = []
-    for run_dir in all_runs:
-        try:
-            result = audit_run(run_dir)
-            all_results.append(result)
-            print_detailed_violations(result)
-        except Exception as e:
-            print(f"\n❌ ERROR processing {run_dir.name}: {str(e)}")
-            traceback.print_exc()
+
+    def _report(run: str, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            if row["status"] == "error":
+                print(f"  [{run}] {row['stage']} {row['iteration']}: ❌ ERROR: {row['error']}")
+            elif row["status"] == "audited":
+                verdict = "✅ COMPLIANT" if row["verdict"] else "❌ NON-COMPLIANT"
+                print(f"  [{run}] {row['stage']} {row['iteration']}: {verdict} ({row['violation_count']} violations)")
+
+    try:
+        batch = reaudit_tree(runs_dir, table_path=args.table, workers=args.workers, force=args.force,
+                             run_dirs=all_runs, on_run_done=_report)
+    except Exception as e:
+        print(f"\n❌ ERROR re-auditing {runs_dir}: {str(e)}")
+        traceback.print_exc()
+        sys.exit(1)
+
+    stats = batch["stats"]
+    print(f"\n[REAUDIT] {stats['audited']} audited, {stats['skipped']} unchanged (skipped), "
+          f"{stats['no_data']} without data, {stats['errors']} errors")
+
+    all_results = rows_to_run_results(batch["rows"])
+    for result in all_results:
+        print_detailed_violations(result)
     
     # Generate summary
     summary = summarize_all_results(all_results)
@@ -396,6 +242,7 @@ def main():
         }, f, indent=2, ensure_ascii=False)
     
     print(f"\n✅ Results saved to: {output_file}")
+    print(f"✅ Audit table: {batch['table']}")
 
 
 if __name__ == "__main__":
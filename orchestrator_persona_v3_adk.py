@@ -43,6 +43,7 @@ from utils_orchestrator_v3_agent_config import update_agent_configs
 from utils_orchestrator_v3_run import run_orchestrator_v3
 from utils_orchestrator_v3_process import process_netlogo_file_v3_adk as _process_file
 from utils_adk_step_agent import ADKStepAgent
+from utils_budget import create_budget_controller
 
 # Ensure all directories exist
 ensure_directories()
@@ -76,6 +77,8 @@ class NetLogoOrchestratorPersonaV3ADK:
             self.max_audit = int(os.environ.get("MAX_AUDIT") or 2)
         except Exception:
             self.max_audit = 2
+        # Token / deadline budget of this combination (utils_budget), sharing the sweep budget
+        self.budget = create_budget_controller()
     
     
     
@@ -89,6 +92,5 @@ class NetLogoOrchestratorPersonaV3ADK:
 
 
 if __name__ == "__main__":
-    import asyncio
-    from utils_orchestrator_v3_main import main
-    asyncio.run(main())
+    from utils_orchestrator_v3_main import run_cli
+    run_cli()
@@ -15,7 +15,8 @@ sys.path.insert(0, str(project_root))
 
 from dotenv import load_dotenv
 from utils_api_key import get_gemini_api_key, get_provider_for_model
-from utils_openai_client import get_openai_client_for_model, GEMINI_AVAILABLE
+from utils_gemini_adapter import GEMINI_AVAILABLE
+from utils_openai_client import get_openai_client_for_model
 
 # Load environment variables
 load_dotenv()
@@ -0,0 +1,41 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_artifact_memo import ArtifactMemo, artifact_digest, reused_audit
+
+
+def test_normalized_artifacts_share_a_digest_but_raw_format_still_counts():
+    assert artifact_digest("operation_model", '{"b": 1, "a": [1, 2]}') == artifact_digest(
+        "operation_model", '{\n  "a": [1, 2],\n  "b": 1\n}\n')
+    # A fenced answer breaks LOM0: it must not reuse the audit of the bare JSON
+    assert artifact_digest("operation_model", '```json\n{"a": 1}\n```') != artifact_digest("operation_model", '{"a": 1}')
+    assert artifact_digest("plantuml_diagram", "@startuml\r\nparticipant System as system  \r\n\r\n@enduml") == artifact_digest(
+        "plantuml_diagram", "@startuml\nparticipant System as system\n@enduml\n")
+    assert artifact_digest("plantuml_diagram", "participant  System as system") != artifact_digest(
+        "plantuml_diagram", "participant System as system")
+
+
+def test_repeated_artifacts_reuse_audits_and_oscillation_is_flagged():
+    memo = ArtifactMemo()
+    audits = {}
+    observations = []
+    for iteration, artifact in enumerate(["A", "B", "B", "A"], start=1):
+        observation = memo.observe("plantuml_diagram", iteration, f"@startuml\n{artifact}\n@enduml")
+        observations.append(observation)
+        audit = reused_audit(observation) if observation.entry else {"verdict": "non-compliant", "tokens_used": 900}
+        audits[iteration] = audit
+        memo.record(observation, audit, {"verdict": False}, svg_file=f"iter-{iteration}.svg")
+
+    assert [o.repeat_of for o in observations] == [None, None, 2, 1]
+    assert [o.oscillation for o in observations] == [False, False, False, True]
+    assert audits[3]["tokens_used"] == 0 and audits[3]["verdict"] == "non-compliant"
+    assert observations[3].entry.svg_file == "iter-1.svg"
+    assert len(set(memo.history("plantuml_diagram"))) == 2
+
+    disabled = ArtifactMemo(enabled=False)
+    for iteration in (1, 2, 3):
+        observation = disabled.observe("scenario", iteration, "{}")
+        disabled.record(observation, {"verdict": "compliant"})
+        assert observation.entry is None and not observation.oscillation
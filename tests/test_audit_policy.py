@@ -0,0 +1,52 @@
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_audit_core import extract_audit_core
+from utils_audit_policy import AuditPolicy, python_audit_report
+
+SCENARIO_AUDIT = {
+    "verdict": False,
+    "violations": [
+        {"id": "LSC0-JSON-BLOCK-ONLY", "message": "Markdown code fences found", "line": 1},
+        {"id": "LSC7-SYSTEM-NO-SELF-LOOP", "message": "System sends to itself", "line": 4},
+    ],
+}
+DIAGRAM_AUDIT = {
+    "data": {
+        "verdict": "non-compliant",
+        "non-compliant-rules": [{"rule": "LDR12-SYSTEM-COLOR", "line": "3", "msg": "Wrong color"}],
+        "coverage": {"evaluated": ["LDR12-SYSTEM-COLOR"], "not_applicable": [], "missing_evaluation": []},
+    },
+    "errors": None,
+}
+
+
+def test_python_gate_skips_llm_only_on_hard_violations():
+    policy = AuditPolicy("python-gate")
+
+    assert policy.skip_reason(SCENARIO_AUDIT) == "audit policy python-gate: LSC0-JSON-BLOCK-ONLY"
+    assert policy.skip_reason(DIAGRAM_AUDIT) is None
+    assert policy.skip_reason(None) is None
+    assert policy.stats == {"llm_audits": 2, "gated": 1, "python_only": 0}
+    assert AuditPolicy("llm-always").skip_reason(SCENARIO_AUDIT) is None
+    assert AuditPolicy("python-only").skip_reason({"verdict": True, "violations": []}) == "audit policy python-only"
+    with pytest.raises(ValueError):
+        AuditPolicy("llm-sometimes")
+
+
+def test_python_report_reads_like_an_llm_audit():
+    report = python_audit_report(DIAGRAM_AUDIT, "audit policy python-only")
+    core = extract_audit_core(report)
+
+    assert core["verdict"] == "non-compliant"
+    assert core["non_compliant_rules"] == [{"rule": "LDR12-SYSTEM-COLOR", "line": "3", "msg": "Wrong color"}]
+    assert core["coverage"]["evaluated"] == ["LDR12-SYSTEM-COLOR"]
+    assert report["data"]["audit_source"] == "python" and report["tokens_used"] == 0
+
+    scenario_core = extract_audit_core(python_audit_report(SCENARIO_AUDIT, "gate"))
+    assert [r["rule"] for r in scenario_core["non_compliant_rules"]] == ["LSC0-JSON-BLOCK-ONLY", "LSC7-SYSTEM-NO-SELF-LOOP"]
+    assert extract_audit_core(python_audit_report({"verdict": True, "violations": []}, "gate"))["verdict"] == "compliant"
@@ -0,0 +1,95 @@
+import sys
+import asyncio
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_batch_api import BatchCollector, BatchRequestError, LocalBatchServer, parse_batch_output
+
+
+def _responder(body):
+    content = body["input"][0]["content"]
+    if "broken" in content:
+        raise ValueError("invalid request")
+    return {
+        "id": "resp-1", "status": "completed", "model": body["model"],
+        "output": [{"type": "message", "content": [{"type": "output_text", "text": f"echo:{content}"}]}],
+        "usage": {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+    }
+
+
+def _request(model, content):
+    return {"model": model, "instructions": "persona", "input": [{"role": "user", "content": content}]}
+
+
+def test_iterations_of_all_combinations_are_sent_in_one_batch_per_wave_and_model(tmp_path):
+    server = LocalBatchServer(tmp_path / "server", _responder, polls_until_done=2)
+    collector = BatchCollector(lambda model: server, tmp_path / "batches", window_seconds=5, poll_seconds=0.01)
+
+    async def combination(model, name, iterations):
+        with collector.participant():
+            texts = []
+            for k in range(1, iterations + 1):
+                response = await collector.submit(_request(model, f"{name}-iter-{k}"))
+                texts.append(response.output[0].content[0].text)
+            return texts
+
+    async def sweep():
+        collector.expect(3)
+        return await asyncio.gather(
+            combination("gpt-5-nano", "a", 2),
+            combination("gpt-5-nano", "b", 1),
+            combination("gpt-5-mini", "c", 2),
+        )
+
+    results = asyncio.run(sweep())
+
+    assert results == [["echo:a-iter-1", "echo:a-iter-2"], ["echo:b-iter-1"], ["echo:c-iter-1", "echo:c-iter-2"]]
+    # Wave 1 holds the three iter-1 calls (two models → two batches), wave 2 the two iter-2 calls
+    assert collector.stats == {"waves": 2, "batches": 4, "requests": 5, "succeeded": 5, "failed": 0}
+    session = tmp_path / "batches" / collector.session
+    wave_1 = parse_batch_output((session / "wave-001-gpt-5-nano.results.jsonl").read_text(encoding="utf-8"))
+    assert len(wave_1) == 2 and (session / "wave-001-gpt-5-nano.requests.jsonl").exists()
+    assert (session / "wave-002-gpt-5-mini.results.jsonl").exists()
+
+
+def test_failed_requests_raise_only_for_their_caller(tmp_path):
+    server = LocalBatchServer(tmp_path / "server", _responder)
+    collector = BatchCollector(lambda model: server, tmp_path / "batches", window_seconds=0.05, poll_seconds=0.01)
+
+    async def sweep():
+        return await asyncio.gather(
+            collector.submit(_request("gpt-5-nano", "ok")),
+            collector.submit(_request("gpt-5-nano", "broken")),
+            return_exceptions=True,
+        )
+
+    ok, broken = asyncio.run(sweep())
+
+    assert ok.output[0].content[0].text == "echo:ok"
+    assert isinstance(broken, BatchRequestError) and "invalid request" in str(broken)
+    assert len(server.created) == 1
+
+
+def test_barrier_counts_participants_not_requests(tmp_path):
+    server = LocalBatchServer(tmp_path / "server", _responder)
+    collector = BatchCollector(lambda model: server, tmp_path / "batches", window_seconds=5, poll_seconds=0.01)
+
+    async def busy():
+        with collector.participant():
+            # Three requests in flight at once (e.g. pipelined files) from one combination
+            return await asyncio.gather(*(collector.submit(_request("gpt-5-nano", f"busy-{i}")) for i in range(3)))
+
+    async def slow():
+        with collector.participant():
+            await asyncio.sleep(0.05)
+            return await collector.submit(_request("gpt-5-nano", "slow"))
+
+    async def sweep():
+        collector.expect(3)
+        return await asyncio.gather(busy(), slow(), slow())
+
+    asyncio.run(sweep())
+
+    # The busy combination alone does not trip the barrier: a single wave holds all five requests
+    assert collector.stats["waves"] == 1 and collector.stats["requests"] == 5
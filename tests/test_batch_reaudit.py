@@ -0,0 +1,77 @@
+import json
+import shutil
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_batch_reaudit import discover_audit_tasks, load_audit_table, reaudit_tree
+
+FIXTURES = pathlib.Path(__file__).resolve().parent / "fixtures"
+
+
+def _make_run(root: pathlib.Path, name: str, puml_fixtures) -> pathlib.Path:
+    run_dir = root / name
+    op_gen = run_dir / "1_lucim_operation_model" / "iter-1" / "1-generator"
+    op_gen.mkdir(parents=True)
+    op_model = json.loads((FIXTURES / "operation" / "valid.json").read_text(encoding="utf-8"))
+    (op_gen / "output-data.json").write_text(json.dumps({"data": op_model, "errors": None}), encoding="utf-8")
+    for i, fixture in enumerate(puml_fixtures, start=1):
+        gen = run_dir / "3_lucim_plantuml_diagram" / f"iter-{i}" / "1-generator"
+        gen.mkdir(parents=True)
+        shutil.copy(FIXTURES / "diagram" / fixture, gen / "diagram.puml")
+    return run_dir
+
+
+def _rules(tmp_path):
+    rules = {}
+    for stage in ("operation_model", "scenario", "diagram"):
+        rules[stage] = tmp_path / f"RULES_{stage}.md"
+        rules[stage].write_text(f"# {stage} rules\n", encoding="utf-8")
+    return rules
+
+
+def test_discovers_nested_runs_in_iteration_order(tmp_path):
+    root = tmp_path / "runs"
+    _make_run(root / "2025-11-01" / "1200", "my-ecosys-a", ["valid.puml"] * 2)
+    (root / "2025-11-01" / "1200" / "my-ecosys-a" / "3_lucim_plantuml_diagram" / "iter-10" / "1-generator").mkdir(parents=True)
+    _make_run(root, "my-ecosys-b", ["valid.puml"])
+
+    tasks = discover_audit_tasks(root)
+
+    assert [(t.run, t.stage, t.iteration) for t in tasks] == [
+        ("2025-11-01/1200/my-ecosys-a", "operation_model", "iter-1"),
+        ("2025-11-01/1200/my-ecosys-a", "diagram", "iter-1"),
+        ("2025-11-01/1200/my-ecosys-a", "diagram", "iter-2"),
+        ("my-ecosys-b", "operation_model", "iter-1"),
+        ("my-ecosys-b", "diagram", "iter-1"),
+    ]
+
+
+def test_unchanged_iterations_are_skipped_until_artifact_or_rules_change(tmp_path):
+    root = tmp_path / "runs"
+    rules = _rules(tmp_path)
+    run_a = _make_run(root, "my-ecosys-a", ["valid.puml", "missing_system.puml"])
+    _make_run(root, "my-ecosys-b", ["valid.puml"])
+
+    first = reaudit_tree(root, workers=2, rules_files=rules)
+    assert first["stats"] == {"audited": 5, "skipped": 0, "no_data": 0, "errors": 0}
+    table = load_audit_table(pathlib.Path(first["table"]))
+    iter_1 = table["my-ecosys-a/3_lucim_plantuml_diagram/iter-1/1-generator/diagram.puml"]
+    iter_2 = table["my-ecosys-a/3_lucim_plantuml_diagram/iter-2/1-generator/diagram.puml"]
+    assert "LDR1-SYS-UNIQUE" in iter_2["rule_ids"] and "LDR1-SYS-UNIQUE" not in iter_1["rule_ids"]
+
+    second = reaudit_tree(root, workers=2, rules_files=rules)
+    assert second["stats"]["audited"] == 0 and second["stats"]["skipped"] == 5
+    assert second["rows"] == first["rows"]
+
+    shutil.copy(FIXTURES / "diagram" / "valid.puml", run_a / "3_lucim_plantuml_diagram" / "iter-2" / "1-generator" / "diagram.puml")
+    third = reaudit_tree(root, workers=1, rules_files=rules)
+    assert third["stats"]["audited"] == 1 and third["stats"]["skipped"] == 4
+    rows = {r["file"]: r for r in third["rows"]}
+    assert rows["my-ecosys-a/3_lucim_plantuml_diagram/iter-2/1-generator/diagram.puml"]["rule_ids"] == iter_1["rule_ids"]
+
+    rules["diagram"].write_text("# diagram rules v2\n", encoding="utf-8")
+    fourth = reaudit_tree(root, workers=1, rules_files=rules)
+    assert fourth["stats"]["audited"] == 3 and fourth["stats"]["skipped"] == 2
+    assert len(pathlib.Path(fourth["table"]).read_text(encoding="utf-8").splitlines()) == 5
@@ -0,0 +1,68 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_budget import BudgetController, BudgetLedger, budget_of, charge_current_budget
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Orchestrator:
+    def __init__(self):
+        self.reasoning_effort = "high"
+        self.reasoning_summary = "auto"
+        self.agent_configs = {"lucim_operation_model_generator": {"reasoning_effort": "high"}}
+
+
+def test_budget_degrades_step_by_step_as_tokens_drain():
+    budget = BudgetController(token_budget=1000)
+    budget.begin()
+    orchestrator = _Orchestrator()
+    assert budget.lower_reasoning_effort(orchestrator, "scenario", 1) is None
+
+    charge_current_budget({"total_tokens": 600})
+    decision = budget.lower_reasoning_effort(orchestrator, "scenario", 1)
+    assert decision.action == "lower-effort" and orchestrator.reasoning_effort == "medium"
+    assert orchestrator.agent_configs["lucim_operation_model_generator"]["reasoning_effort"] == "medium"
+    assert budget.cap_iterations("scenario", 1, 3) is None and budget.skip_llm_audit("scenario", 1) is None
+
+    charge_current_budget({"total_tokens": 200})
+    budget.lower_reasoning_effort(orchestrator, "scenario", 2)
+    assert orchestrator.reasoning_effort == "low"
+    # At iteration 2 of 5, one of the 3 remaining iterations is kept; at iteration 3 of 4, none
+    assert budget.cap_iterations("scenario", 2, 5) is None
+    assert budget.cap_iterations("scenario", 3, 4).reason == "budget: iteration cap 4 → 3"
+
+    charge_current_budget({"total_tokens": 250})
+    assert budget.cap_iterations("plantuml_diagram", 1, 5) is not None
+    assert budget.skip_llm_audit("plantuml_diagram", 1).action == "python-audits"
+    assert [d.action for d in budget.decisions] == [
+        "lower-effort", "lower-effort", "shrink-iterations", "shrink-iterations", "python-audits"
+    ]
+
+    unlimited = budget_of(object())
+    unlimited.charge({"total_tokens": 10 ** 9})
+    assert not unlimited.enabled and unlimited.skip_llm_audit("scenario", 1) is None
+
+
+def test_shared_sweep_deadline_degrades_every_combination():
+    clock = _Clock()
+    sweep = BudgetLedger("sweep", deadline_seconds=100, clock=clock)
+    first = BudgetController(sweep=sweep, clock=clock)
+    second = BudgetController(token_budget=10 ** 6, sweep=sweep, clock=clock)
+    first.begin()
+    clock.now = 40
+    second.begin()
+    assert first.level() == second.level() == 0
+
+    clock.now = 95
+    assert first.level() == second.level() == 3
+    assert second.skip_llm_audit("operation_model", 1) is not None
+    assert "sweep 0 tokens, 95/100s" in second.describe()
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import pathlib
+import threading
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import utils_client_registry
+from utils_client_registry import ClientRegistry, api_key_fingerprint
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_registry_creates_one_client_per_key_and_closes_them():
+    registry = ClientRegistry()
+    key = ("openai", api_key_fingerprint("sk-test-1"), None)
+
+    first = registry.get(key, FakeClient)
+    assert registry.get(key, FakeClient) is first
+    other = registry.get(("openai", api_key_fingerprint("sk-test-2"), None), FakeClient)
+    assert other is not first
+    assert registry.stats == {"created": 2, "reused": 1}
+    assert "sk-test-1" not in repr(key)
+
+    registry.close()
+    assert first.closed and other.closed
+    assert registry.get(key, FakeClient) is not first
+
+
+def test_async_clients_are_shared_within_an_event_loop_only():
+    async def _registry():
+        a = utils_client_registry._current_async_registry()
+        b = utils_client_registry._current_async_registry()
+        assert a is b
+        return a
+
+    assert utils_client_registry._current_async_registry() is None
+    assert asyncio.run(_registry()) is not asyncio.run(_registry())
+
+
+def _within(seconds, function):
+    """Run function in a thread; fail instead of hanging when it deadlocks."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", function()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "registry deadlocked"
+    return result["value"]
+
+
+def test_factory_may_get_other_clients_from_the_same_registry():
+    registry = ClientRegistry()
+    http = FakeClient()
+
+    def create_client():
+        client = FakeClient()
+        client.http_client = registry.get(("http",), lambda: http)
+        return client
+
+    client = _within(5, lambda: registry.get(("openai", "key", None), create_client))
+    assert client.http_client is http
+    assert registry.get(("openai", "key", None), create_client) is client
+    assert registry.stats == {"created": 2, "reused": 1}
+
+
+def test_real_openai_factories_share_the_http_client(monkeypatch):
+    pytest.importorskip("openai")
+    import httpx
+    monkeypatch.setattr(utils_client_registry, "_http_limits", lambda: httpx.Limits())
+
+    client = _within(20, lambda: utils_client_registry.get_shared_openai_client("sk-test"))
+    assert _within(20, lambda: utils_client_registry.get_shared_openai_client("sk-test")) is client
+    assert client._client is utils_client_registry.get_shared_http_client()
+
+    async def _async_clients():
+        first = utils_client_registry.get_shared_async_openai_client("sk-test")
+        second = utils_client_registry.get_shared_async_openai_client("sk-test")
+        return first, second
+
+    first, second = _within(20, lambda: asyncio.run(_async_clients()))
+    assert first is second
+    assert first._client is not client._client
@@ -0,0 +1,57 @@
+import sys
+import asyncio
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_gemini_adapter import GeminiClientWrapper
+
+
+class _FakeModels:
+    async def generate_content(self, model, contents):
+        await asyncio.sleep(0.05 if "slow" in contents else 0.01)
+        if "boom" in contents:
+            raise RuntimeError("400 INVALID_ARGUMENT")
+        usage = SimpleNamespace(prompt_token_count=12, candidates_token_count=3, thoughts_token_count=5,
+                                cached_content_token_count=8)
+        return SimpleNamespace(text=f"echo {contents}", usage_metadata=usage)
+
+
+def _wrapper():
+    return GeminiClientWrapper("key", "gemini-2.5-flash", client=SimpleNamespace(aio=SimpleNamespace(models=_FakeModels())))
+
+
+def _request(text):
+    return {"model": "gemini-2.5-flash", "input": [{"role": "user", "content": text}]}
+
+
+def test_concurrent_calls_on_one_wrapper_keep_their_own_responses():
+    wrapper = _wrapper()
+
+    async def run():
+        return await asyncio.gather(*(wrapper.responses.acreate(**_request(text)) for text in ("slow a", "b", "slow c")))
+
+    responses = asyncio.run(run())
+
+    assert len({r.id for r in responses}) == 3
+    for response, text in zip(responses, ("slow a", "b", "slow c")):
+        retrieved = wrapper.responses.retrieve(response.id)
+        assert retrieved is response and retrieved.output[0]["content"][0]["text"] == f"echo {text}"
+    assert responses[0].usage.input_tokens == 12 and responses[0].usage.output_tokens == 8
+    assert responses[0].usage.input_tokens_details.cached_tokens == 8
+    assert wrapper.response_table.in_flight == 0
+
+
+def test_failed_and_unknown_ids_are_not_answered_with_another_response():
+    wrapper = _wrapper()
+    ok = asyncio.run(wrapper.responses.acreate(**_request("fine")))
+    with pytest.raises(Exception, match="Gemini API error"):
+        asyncio.run(wrapper.responses.acreate(**_request("boom")))
+
+    with pytest.raises(KeyError):
+        wrapper.responses.retrieve("gemini_1700000000000")
+    assert wrapper.responses.retrieve(ok.id).status == "completed"
+    assert [e.status for e in wrapper.response_table._entries.values()] == ["completed", "failed"]
@@ -0,0 +1,91 @@
+import sys
+import asyncio
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_hedging import LatencyStore, RequestHedger
+
+
+def test_latency_histograms_persist_across_runs(tmp_path):
+    path = tmp_path / "latency.json"
+    store = LatencyStore(path)
+    for seconds in [1.0] * 18 + [30.0, 60.0]:
+        store.record("mistral-medium", seconds)
+    # Recorded calls stay in memory until save_every calls or a flush
+    assert not path.exists()
+    store.flush()
+
+    reloaded = LatencyStore(path)
+    assert reloaded.percentile("mistral-medium", 50) == store.percentile("mistral-medium", 50)
+    assert 1.0 <= reloaded.percentile("mistral-medium", 50) < 1.25
+    assert reloaded.percentile("mistral-medium", 99) >= 30.0
+    assert reloaded.percentile("mistral-medium", 50, min_samples=21) is None
+    assert reloaded.snapshot()["mistral-medium"]["samples"] == 20
+
+
+def test_slow_call_is_hedged_to_the_fallback_and_the_straggler_cancelled(tmp_path):
+    store = LatencyStore(tmp_path / "latency.json")
+    for _ in range(5):
+        store.record("slow-model", 0.01)
+    hedger = RequestHedger(store, percentile=95, min_samples=5, min_delay_seconds=0.05,
+                           fallbacks={"slow-model": "fast-model"})
+    cancelled = []
+
+    async def call(model):
+        try:
+            await asyncio.sleep(10 if model == "slow-model" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return f"answer from {model}"
+
+    result, used_model = asyncio.run(hedger.run("slow-model", call))
+
+    assert (result, used_model) == ("answer from fast-model", "fast-model")
+    assert cancelled == ["slow-model"]
+    assert hedger.stats == {"calls": 1, "hedged": 1, "hedge_wins": 1, "primary_wins": 0}
+    assert store.snapshot()["fast-model"]["samples"] == 1
+
+
+def test_unknown_model_is_not_hedged_and_errors_propagate(tmp_path):
+    hedger = RequestHedger(LatencyStore(None), min_samples=1, min_delay_seconds=0)
+
+    async def call(model):
+        raise TimeoutError(model)
+
+    with pytest.raises(TimeoutError, match="new-model"):
+        asyncio.run(hedger.run("new-model", call))
+    assert hedger.stats["hedged"] == 0
+
+
+def test_fallback_response_records_the_model_that_answered(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    # utils_config_constants resolves the default model's API key at import
+    monkeypatch.setenv("OPENROUTER_API_KEY", "sk-test")
+    # litellm would otherwise fetch its model cost map over the network at import
+    monkeypatch.setenv("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    import utils_openai_client
+    from utils_response_dump import serialize_response_to_dict
+
+    store = LatencyStore(None)
+    for _ in range(5):
+        store.record("slow-model", 0.01)
+    hedger = RequestHedger(store, percentile=95, min_samples=5, min_delay_seconds=0.05,
+                           fallbacks={"slow-model": "fast-model"})
+
+    async def uncached(client, api_config, *args):
+        await asyncio.sleep(10 if api_config["model"] == "slow-model" else 0.01)
+        return SimpleNamespace(id="resp", output_text="answer")
+
+    monkeypatch.setattr(utils_openai_client, "get_request_hedger", lambda: hedger)
+    monkeypatch.setattr(utils_openai_client, "_acreate_and_wait_uncached", uncached)
+    monkeypatch.setattr(utils_openai_client, "_record_usage", lambda api_config, response: None)
+    monkeypatch.setattr(utils_openai_client, "LLM_BATCH", False)
+
+    response = asyncio.run(utils_openai_client.acreate_and_wait(None, {"model": "slow-model", "input": "hi"}))
+
+    assert serialize_response_to_dict(response)["used_model"] == "fast-model"
@@ -0,0 +1,72 @@
+import sys
+import json
+import asyncio
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_mock_provider import MockProvider
+from utils_openai_error import RateLimitError, is_rate_limit_error
+from utils_prompt_layout import build_prompt_layout
+
+
+def _record(run_dir, stage, role, iteration, text, usage=None):
+    folder = run_dir / stage / f"iter-{iteration}" / role
+    folder.mkdir(parents=True)
+    payload = {"id": f"resp-{stage}-{iteration}", "status": "completed", "model": "gpt-5-nano-2025-08-07",
+               "output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+    if usage:
+        payload["usage"] = usage
+    (folder / "output-response-raw.json").write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _request(agent, model="mock/baseline", code="to setup end"):
+    return build_prompt_layout(agent, "persona", code).apply({"model": model})
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    run_dir = tmp_path / "baseline" / "2025-11-12" / "1030-PSv3" / "3d-solids-gpt-5-nano"
+    _record(run_dir, "1_lucim_operation_model", "1-generator", 1, '{"actors": []}',
+            usage={"input_tokens": 900, "output_tokens": 300, "total_tokens": 1200})
+    _record(run_dir, "1_lucim_operation_model", "2-auditor", 1, '{"verdict": "compliant"}')
+    return tmp_path
+
+
+def test_mock_models_replay_the_recorded_payload_of_their_agent(recordings):
+    provider = MockProvider(recordings, latency="uniform:0,0.01", seed=7)
+
+    generator = asyncio.run(provider.arespond(_request("lucim_operation_model_generator")))
+    auditor = provider.respond(_request("lucim_operation_model_auditor"))
+
+    assert generator.output[0].content[0].text == '{"actors": []}'
+    assert generator.model == "mock/baseline" and generator.usage.total_tokens == 1200
+    assert auditor.output[0].content[0].text == '{"verdict": "compliant"}'
+    assert auditor.usage.input_tokens > 0  # no recorded usage: estimated
+    with pytest.raises(FileNotFoundError):
+        provider.respond(_request("lucim_scenario_generator"))
+    with pytest.raises(FileNotFoundError):
+        provider.respond(_request("lucim_scenario_generator", model="mock/unknown"))
+
+
+def test_injected_errors_follow_the_configured_rates(recordings):
+    provider = MockProvider(recordings, error_rates={"429": 1.0}, seed=1)
+    with pytest.raises(RateLimitError) as excinfo:
+        provider.respond(_request("lucim_operation_model_generator"))
+    assert is_rate_limit_error(excinfo.value)
+
+    provider = MockProvider(recordings, latency="fixed:0", error_rates={"503": 0.25, "timeout": 0.25},
+                            timeout_seconds=0, seed=3)
+    outcomes = []
+    for i in range(200):
+        try:
+            provider.respond(_request("lucim_operation_model_generator", code=f"to go-{i} end"))
+            outcomes.append("ok")
+        except Exception as e:
+            outcomes.append(type(e).__name__)
+    assert provider.stats["calls"] == 200
+    assert provider.stats["unavailable"] == outcomes.count("APIError")
+    assert provider.stats["timeouts"] == outcomes.count("APIConnectionError")
+    assert 60 < outcomes.count("ok") < 140
@@ -0,0 +1,50 @@
+import sys
+import copy
+import types
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import utils_config_constants as cfg
+from agent_lucim_operation_auditor import _build_operation_model_audit_api_config
+from agent_lucim_scenario_auditor import _build_scenario_audit_api_config
+from utils_orchestrator_v3_agent_config import update_agent_configs
+from utils_orchestrator_v3_init import initialize_v3_orchestrator_components
+from utils_orchestrator_v3_process import _run_reasoning_settings
+from utils_prompt_layout import build_prompt_layout
+
+GENERATOR_AGENTS = (
+    "lucim_operation_model_generator_agent",
+    "lucim_scenario_generator_agent",
+    "lucim_plantuml_diagram_generator_agent",
+    "lucim_plantuml_diagram_auditor_agent",
+)
+
+
+def _orchestrator(model, effort, verbosity):
+    orchestrator = types.SimpleNamespace()
+    initialize_v3_orchestrator_components(orchestrator, model)
+    update_agent_configs(orchestrator, reasoning_effort=effort, reasoning_summary="auto", text_verbosity=verbosity)
+    return orchestrator
+
+
+def _settings(api_config):
+    return api_config["model"], api_config["reasoning"]["effort"], api_config["text"]["verbosity"]
+
+
+def test_each_orchestrator_sends_its_own_reasoning_and_verbosity():
+    global_configs = copy.deepcopy(cfg.AGENT_CONFIGS)
+    high = _orchestrator("mock/high", "high", "low")
+    low = _orchestrator("mock/low", "low", "high")
+    layout = build_prompt_layout("lucim_scenario_generator", "persona", "input")
+
+    for orchestrator, expected in ((high, ("mock/high", "high", "low")), (low, ("mock/low", "low", "high"))):
+        for agent_attr in GENERATOR_AGENTS:
+            agent = getattr(orchestrator, agent_attr)
+            assert _settings(agent._build_api_config(layout)) == expected, agent_attr
+        run_settings = _run_reasoning_settings(orchestrator)
+        assert _settings(_build_operation_model_audit_api_config(layout, orchestrator.model, **run_settings)) == expected
+        assert _settings(_build_scenario_audit_api_config(layout, orchestrator.model, **run_settings)) == expected
+
+    # Updates stay on the orchestrators: the global defaults are untouched
+    assert cfg.AGENT_CONFIGS == global_configs
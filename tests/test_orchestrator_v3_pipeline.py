@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_orchestrator_v3_pipeline import FileRunState, StagePipeline
+
+
+def _states(n: int):
+    return [FileRunState({"base_name": f"case-{i}"}) for i in range(n)]
+
+
+def test_stages_overlap_across_files_and_keep_order():
+    events = []
+
+    def stage(name):
+        async def run(state):
+            events.append(("start", name, state.base_name))
+            await asyncio.sleep(0.01)
+            state.processed_results.setdefault("stages", []).append(name)
+            events.append(("end", name, state.base_name))
+        return run
+
+    pipeline = StagePipeline([(n, stage(n)) for n in ("operation_model", "scenario", "plantuml_diagram")])
+    states = asyncio.run(pipeline.run(_states(3)))
+
+    assert [s.base_name for s in states] == ["case-0", "case-1", "case-2"]
+    assert all(s.processed_results["stages"] == ["operation_model", "scenario", "plantuml_diagram"] for s in states)
+    # case-1 starts its Operation Model stage while case-0 is in its Scenario stage
+    assert events.index(("start", "operation_model", "case-1")) < events.index(("end", "scenario", "case-0"))
+
+
+def test_worker_counts_bound_each_stage():
+    running = {"a": 0, "b": 0}
+    peaks = {"a": 0, "b": 0}
+
+    def stage(name):
+        async def run(state):
+            running[name] += 1
+            peaks[name] = max(peaks[name], running[name])
+            await asyncio.sleep(0.01)
+            running[name] -= 1
+        return run
+
+    pipeline = StagePipeline([("a", stage("a")), ("b", stage("b"))], workers={"a": 3, "b": 1})
+    asyncio.run(pipeline.run(_states(6)))
+
+    assert peaks == {"a": 3, "b": 1}
+
+
+def test_failed_or_raising_items_skip_remaining_stages():
+    seen = []
+
+    async def first(state):
+        if state.base_name == "case-0":
+            state.fail("operation_model")
+        if state.base_name == "case-1":
+            raise RuntimeError("boom")
+
+    async def second(state):
+        seen.append(state.base_name)
+
+    errors = []
+    pipeline = StagePipeline(
+        [("operation_model", first), ("scenario", second)],
+        should_skip=lambda s: s.failed,
+        on_error=lambda s, stage, e: errors.append((s.base_name, stage, str(e))),
+    )
+    states = asyncio.run(pipeline.run(_states(3)))
+
+    assert seen == ["case-2"]
+    assert states[0].result["stage"] == "operation_model"
+    assert errors == [("case-1", "operation_model", "boom")]
@@ -0,0 +1,72 @@
+import json
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_orchestrator_v3_resume import (
+    apply_stage_resume, detect_resume_point, read_run_manifest, write_run_manifest,
+)
+
+
+def _write_response(folder: pathlib.Path, data, **extra) -> None:
+    folder.mkdir(parents=True, exist_ok=True)
+    payload = {"base_name": "boiling", "model": "gpt-5-nano", "timestamp": "20251016_0930",
+               "reasoning_summary": "", "data": data, "errors": None, "tokens_used": 30,
+               "input_tokens": 20, "total_output_tokens": 10, "reasoning_tokens": 4,
+               "visible_output_tokens": 6, "raw_response": {}}
+    payload.update(extra)
+    (folder / "output-response-full.json").write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _iteration(stage_root: pathlib.Path, k: int, artifact, verdict=None) -> None:
+    _write_response(stage_root / f"iter-{k}" / "1-generator", artifact)
+    if verdict is not None:
+        _write_response(stage_root / f"iter-{k}" / "2-auditor",
+                        {"verdict": verdict, "non-compliant-rules": [] if verdict == "compliant" else [{"id": "LSC1"}]})
+
+
+def test_detect_resume_point_continues_after_last_completed_iteration(tmp_path):
+    _iteration(tmp_path / "1_lucim_operation_model", 1, {"data": {"actors": []}}, "compliant")
+    _iteration(tmp_path / "2_lucim_scenario", 1, "scenario v1", "non-compliant")
+    _iteration(tmp_path / "2_lucim_scenario", 2, "scenario v2")  # generator only: re-run
+
+    states = detect_resume_point(tmp_path, max_audit=3)
+
+    assert states["operation_model"]["done"] and states["operation_model"]["compliant"]
+    assert states["scenario"]["completed_iterations"] == 1 and not states["scenario"]["done"]
+    assert states["plantuml_diagram"]["completed_iterations"] == 0
+
+    processed = {}
+    om = apply_stage_resume(processed, states["operation_model"])
+    scen = apply_stage_resume(processed, states["scenario"])
+    puml = apply_stage_resume(processed, states["plantuml_diagram"])
+    assert om["done"] and json.loads(processed["lucim_operation_model_generator"]["data"]) == {"data": {"actors": []}}
+    assert scen == {"attempt": 1, "prev_artifact": "scenario v1", "prev_audit": scen["prev_audit"], "done": False}
+    assert scen["prev_audit"]["verdict"] == "non-compliant"
+    assert scen["prev_audit"]["non-compliant-rules"] == [{"id": "LSC1"}]
+    assert scen["prev_audit"]["raw_usage"]["output_tokens"] == 10
+    assert puml == {"attempt": 0, "prev_artifact": None, "prev_audit": None, "done": False}
+
+
+def test_stage_at_cap_or_followed_by_later_stage_is_done(tmp_path):
+    _iteration(tmp_path / "1_lucim_operation_model", 1, "om", "non-compliant")
+    _iteration(tmp_path / "2_lucim_scenario", 1, "scen", "non-compliant")
+    _iteration(tmp_path / "2_lucim_scenario", 2, "scen 2", "non-compliant")
+
+    states = detect_resume_point(tmp_path, max_audit=2)
+
+    assert states["operation_model"]["done"]  # a later stage already started
+    assert states["scenario"]["done"]  # MAX_AUDIT reached
+    assert not states["plantuml_diagram"]["done"]
+
+
+def test_read_run_manifest_prefers_manifest_and_falls_back_to_layout(tmp_path):
+    legacy = tmp_path / "boiling-gpt-5-nano-RLO-VHI"
+    _write_response(legacy / "1_lucim_operation_model" / "iter-1" / "1-generator", "om")
+    params = read_run_manifest(legacy)
+    assert params["base_name"] == "boiling" and params["model"] == "gpt-5-nano"
+    assert params["reasoning_effort"] == "low" and params["text_verbosity"] == "high"
+
+    write_run_manifest(legacy, base_name="boiling", model="gpt-5-mini", timestamp="20251016_1000")
+    assert read_run_manifest(legacy)["model"] == "gpt-5-mini"
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_orchestrator_v3_scheduler import CombinationScheduler, build_combinations
+
+
+def _provider(model: str) -> str:
+    return "openai" if model.startswith("gpt-") else "router"
+
+
+def test_build_combinations_order_and_keys():
+    combos = build_combinations(
+        ["gpt-5-nano", "mistral"], ["boiling"],
+        [{"effort": "low", "summary": "auto"}], ["low", "high"],
+    )
+    assert [c["index"] for c in combos] == [1, 2, 3, 4]
+    assert combos[0]["result_key"] == "boiling_gpt-5-nano_low-auto_low"
+    assert combos[-1]["result_key"] == "boiling_mistral_low-auto_high"
+
+
+def test_scheduler_respects_global_and_provider_limits():
+    combos = build_combinations(
+        ["gpt-5-nano", "gpt-5-mini", "mistral", "llama"], ["a", "b"],
+        [{"effort": "low", "summary": "auto"}], ["low"],
+    )
+    running = {"total": 0, "openai": 0, "router": 0}
+    peaks = {"total": 0, "openai": 0, "router": 0}
+
+    async def runner(combo):
+        provider = _provider(combo["model"])
+        running["total"] += 1
+        running[provider] += 1
+        peaks["total"] = max(peaks["total"], running["total"])
+        peaks[provider] = max(peaks[provider], running[provider])
+        await asyncio.sleep(0.01)
+        running["total"] -= 1
+        running[provider] -= 1
+        return {"results": {combo["base_name"]: {}}}
+
+    scheduler = CombinationScheduler(
+        max_concurrency=3, provider_limits={"openai": 1, "router": 2}, provider_resolver=_provider
+    )
+    results = asyncio.run(scheduler.run(combos, runner))
+
+    assert list(results.keys()) == [c["result_key"] for c in combos]
+    assert peaks["total"] == 3
+    assert peaks["openai"] == 1
+    assert peaks["router"] == 2
+    assert scheduler.completed == len(combos)
+    assert scheduler.throughput_per_hour() > 0
+
+
+def test_scheduler_isolates_failures():
+    combos = build_combinations(["gpt-5-nano"], ["a", "b"], [{"effort": "low", "summary": "auto"}], ["low"])
+
+    async def runner(combo):
+        if combo["base_name"] == "a":
+            raise RuntimeError("boom")
+        return {"results": {}}
+
+    scheduler = CombinationScheduler(max_concurrency=2, provider_limits={}, provider_resolver=_provider)
+    results = asyncio.run(scheduler.run(combos, runner))
+
+    assert "RuntimeError" in results["a_gpt-5-nano_low-auto_low"]["error"]
+    assert results["b_gpt-5-nano_low-auto_low"] == {"results": {}}
+    assert scheduler.failed == 1
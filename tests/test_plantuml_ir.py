@@ -0,0 +1,51 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_plantuml_ir import Activation, Message, Participant, parse_plantuml
+from utils_audit_diagram import RuleVisitor, TEXTUAL_RULE_VISITORS, _RuleContext, run_rule_visitors
+
+DIAGRAM = """@startuml
+participant System as system
+participant "bill:ActAdministrator" as bill
+// comment
+
+bill -> system : oeLogin(a, b)
+' another comment
+activate bill
+deactivate bill
+@enduml"""
+
+
+def test_parse_builds_typed_nodes_and_line_map():
+    ir = parse_plantuml(DIAGRAM)
+
+    assert [type(n) for n in ir.nodes] == [Participant, Participant, Message, Activation, Activation]
+    assert ir.participants[0].simple_system and ir.participants[1].alias == "bill"
+    msg = ir.messages[0]
+    assert (msg.line, msg.lhs, msg.arrow, msg.name, msg.params) == (6, "bill", "->", "oeLogin", "a, b")
+    assert msg.rhs_is_system and not msg.lhs_is_system
+    # Blank lines and comments (LDR19) are skipped by the line map
+    assert ir.next_significant_line(4) == 6 and ir.next_significant_line(7) == 8
+    assert ir.next_significant_line(11) is None
+
+
+def test_rule_visitors_run_in_one_walk_and_keep_phase_order():
+    ir = parse_plantuml(DIAGRAM.replace("activate bill\ndeactivate bill\n", "activate system\n"))
+    seen = []
+
+    class Recorder(RuleVisitor):
+        phase = 0
+
+        def visit_message(self, node):
+            seen.append(node.name)
+            self.emit("TEST", "recorded", node.line)
+
+    context = _RuleContext(ir)
+    violations = run_rule_visitors(ir, [cls(context) for cls in TEXTUAL_RULE_VISITORS] + [Recorder(context)])
+
+    assert seen == ["oeLogin"]
+    ids = [v["id"] for v in violations]
+    assert ids[0] == "TEST"  # phase 0 first, whatever the registration order
+    assert ids.index("LDR10-ACTIVATION-BAR-ON-SYSTEM-FORBIDDEN") < ids.index("LDR7-ACTIVATION-BAR-SEQUENCE")
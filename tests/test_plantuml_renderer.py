@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import utils_plantuml_renderer
+from utils_plantuml_renderer import (
+    PIPE_DELIMITER, PlantUMLRenderer, PlantUMLRenderError, PlantUMLSyntaxError, extract_uml_block,
+)
+
+# Stand-in for `java -jar plantuml.jar -pipe`: answers every @startuml block with an SVG
+# tagged with the process id, followed by the delimiter.
+FAKE_PIPE = f"""
+import os, sys
+block = []
+for line in sys.stdin:
+    block.append(line)
+    if line.strip() == "@enduml":
+        text = "".join(block)
+        block = []
+        body = "Syntax Error?" if "broken" in text else str(os.getpid())
+        sys.stdout.write("<svg>" + body + "</svg>\\n{PIPE_DELIMITER}\\n")
+        sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def renderer(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils_plantuml_renderer, "build_pipe_command", lambda jar: [sys.executable, "-c", FAKE_PIPE])
+    r = PlantUMLRenderer(workers=2, timeout=10, jar_path=tmp_path / "plantuml.jar")
+    yield r
+    r.close()
+
+
+def test_extract_uml_block_keeps_first_diagram_only():
+    text = 'noise {"x": 1}\n@startuml\nA -> B\n@enduml\n@startuml\nC -> D\n@enduml'
+    assert extract_uml_block(text) == "@startuml\nA -> B\n@enduml"
+    with pytest.raises(PlantUMLRenderError):
+        extract_uml_block("no diagram here")
+
+
+def test_pipe_worker_is_reused_across_diagrams(renderer, tmp_path):
+    svgs = [renderer.render_svg(f"@startuml\nA -> B : m{i}\n@enduml") for i in range(3)]
+    assert len(set(svgs)) == 1  # same JVM answered every request
+    assert renderer._created == 1 and renderer.stats["rendered"] == 3
+
+    puml = tmp_path / "diagram.puml"
+    puml.write_text("@startuml\nA -> B\n@enduml\n", encoding="utf-8")
+    svg_path = renderer.render_file(puml, tmp_path / "out")
+    assert svg_path == tmp_path / "out" / "diagram.svg" and svg_path.read_text().startswith("<svg>")
+
+    with pytest.raises(PlantUMLSyntaxError):
+        renderer.render_svg("@startuml\nbroken\n@enduml")
+
+
+def test_async_renders_share_a_bounded_pool(renderer):
+    async def render_all():
+        return await asyncio.gather(*(renderer.arender_svg(f"@startuml\nA -> B : m{i}\n@enduml") for i in range(6)))
+
+    svgs = asyncio.run(render_all())
+    assert len(svgs) == 6 and len(set(svgs)) <= 2
+    assert renderer._created <= 2
+
+
+def test_batch_render_does_not_report_stale_svgs(renderer, monkeypatch, tmp_path):
+    # Stand-in for the batch JVM: writes an SVG next to every source except the broken ones
+    fake_batch = (
+        "import pathlib, sys\n"
+        "for arg in sys.argv[1:]:\n"
+        "    p = pathlib.Path(arg)\n"
+        "    if 'broken' not in p.read_text():\n"
+        "        p.with_suffix('.svg').write_text('<svg>ok</svg>')\n"
+    )
+    monkeypatch.setattr(utils_plantuml_renderer, "build_batch_command",
+                        lambda jar, files: [sys.executable, "-c", fake_batch, *map(str, files)])
+    good, bad = tmp_path / "good.puml", tmp_path / "bad.puml"
+    good.write_text("@startuml\nA -> B\n@enduml\n", encoding="utf-8")
+    bad.write_text("@startuml\nbroken\n@enduml\n", encoding="utf-8")
+    bad.with_suffix(".svg").write_text("<svg>previous run</svg>", encoding="utf-8")
+
+    assert renderer.render_batch([good, bad]) == {good: good.with_suffix(".svg"), bad: None}
@@ -0,0 +1,48 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_prompt_layout import (
+    begin_prompt_cache_run_stats, build_prompt_layout, format_prompt_cache_stats,
+    get_prompt_cache_run_stats, record_prompt_cache_usage,
+)
+from utils_response_cache import compute_cache_key
+
+PERSONA = "# Persona\r\nYou audit LUCIM operation models.\r\n"
+RULES = "<LOM1-ACTOR-TYPES>\nActor types are prefixed with Act.\n</LOM1-ACTOR-TYPES>\n"
+
+
+def _layout(persona, iteration):
+    instructions = f"{persona}\n\n{RULES}"
+    input_text = f"\n<AUDIT-REPORT>\niteration {iteration}\n</AUDIT-REPORT>\n"
+    return build_prompt_layout("lucim_operation_model_auditor", instructions, input_text)
+
+
+def test_static_prefix_is_sent_once_and_stays_byte_stable():
+    first = _layout(PERSONA, 1)
+    second = _layout(PERSONA.replace("\r\n", "\n"), 2)
+
+    api_config = first.apply({"model": "gpt-5-nano"})
+    assert api_config["instructions"] == first.instructions
+    assert api_config["input"] == [{"role": "user", "content": first.input_text}]
+    assert first.system_prompt == f"{first.instructions}\n\n{first.input_text}"
+    assert first.system_prompt.count("Actor types are prefixed") == 1
+
+    # Line endings of the prompt files do not change the prefix; only the input differs
+    assert first.instructions.encode("utf-8") == second.instructions.encode("utf-8")
+    assert first.prompt_cache_key == second.prompt_cache_key
+    assert first.prompt_cache_key.startswith("lucim_operation_model_auditor-")
+    assert compute_cache_key(api_config) == compute_cache_key({k: v for k, v in api_config.items() if k != "prompt_cache_key"})
+
+
+def test_cached_tokens_are_counted_per_agent_and_run():
+    api_config = _layout(PERSONA, 1).apply({"model": "gpt-5-nano"})
+    begin_prompt_cache_run_stats()
+    record_prompt_cache_usage(api_config, {"input_tokens": 1000, "cached_tokens": 0})
+    record_prompt_cache_usage(api_config, {"input_tokens": 1000, "cached_tokens": 768})
+    record_prompt_cache_usage({"model": "gpt-5-nano"}, {"input_tokens": 500, "cached_tokens": 500})
+
+    stats = get_prompt_cache_run_stats()
+    assert stats == {"lucim_operation_model_auditor": {"calls": 2, "input_tokens": 2000, "cached_tokens": 768}}
+    assert "lucim_operation_model_auditor=38.4%" in format_prompt_cache_stats(stats)
@@ -0,0 +1,66 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_openai_error import extract_retry_after, with_retries
+from utils_rate_limiter import RateLimiter
+
+
+class FakeRateLimitError(Exception):
+    """Stands in for an SDK 429 (matched by class name, like openai.RateLimitError)."""
+
+
+def test_token_bucket_reserves_and_reconciles_with_actual_usage():
+    limiter = RateLimiter("openai/gpt-5-nano", rpm=100, tpm=600)  # 10 tokens/s
+
+    assert limiter._try_reserve(600) == 0.0
+    wait = limiter._try_reserve(100)
+    assert 9.0 < wait <= 10.0
+
+    # The call only used half of its estimate: the difference is available again
+    limiter.reconcile(600, 300)
+    assert limiter._try_reserve(100) == 0.0
+    assert limiter.stats["requests"] == 2
+
+
+def test_rate_limited_call_is_paced_by_the_limiter_and_limits_adapt():
+    limiter = RateLimiter("gemini/gemini-2.5-flash", rpm=100, tpm=10000)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FakeRateLimitError("429 Too Many Requests, retry-after: 0.05")
+        return "ok"
+
+    assert extract_retry_after(FakeRateLimitError("retry-after: 0.05")) == 0.05
+    assert with_retries(call, rate_limiter=limiter, rate_tokens=50) == "ok"
+
+    assert len(calls) == 2
+    assert limiter.stats["throttled"] == 1 and limiter.stats["requests"] == 2
+    assert limiter.limits() == {"rpm": 70.0, "tpm": 7000.0}
+    limiter.reconcile(50, 50)
+    assert limiter.limits() == {"rpm": 72.0, "tpm": 7200.0}
+
+
+def test_failed_attempts_give_back_their_token_reservation():
+    limiter = RateLimiter("openai/gpt-5-nano", rpm=100, tpm=600)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FakeRateLimitError("429 Too Many Requests, retry-after: 0.01")
+        return "ok"
+
+    def no_wait(wait):
+        # Short holds come from the retry-after block, not from the token bucket
+        assert wait < 1.0, f"attempt waited {wait:.1f}s for tokens held by failed attempts"
+
+    limiter._log_wait = no_wait
+    assert with_retries(call, rate_limiter=limiter, rate_tokens=400) == "ok"
+    assert len(calls) == 3 and limiter.stats["requests"] == 3
+    # Only the successful attempt still holds its 400 tokens (limit lowered twice to 294)
+    tpm = limiter._buckets["tpm"]
+    assert tpm.limit == 294.0 and tpm.level >= tpm.limit - 400
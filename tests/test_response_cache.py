@@ -0,0 +1,89 @@
+import os
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_response_cache import (
+    ResponseCache, ResponseCacheMiss, begin_run_stats, compute_cache_key, get_run_stats,
+)
+
+
+def _config(prompt: str = "persona + rules", **extra):
+    config = {
+        "model": "gpt-5-nano",
+        "reasoning": {"effort": "low", "summary": "auto"},
+        "text": {"verbosity": "low"},
+        "instructions": prompt,
+        "input": [{"role": "user", "content": prompt}],
+    }
+    config.update(extra)
+    return config
+
+
+def _response(text: str):
+    return {
+        "choices": [{"message": {"content": text}}],
+        "usage": {"total_tokens": 12, "input_tokens": 10, "output_tokens": 2},
+    }
+
+
+def test_cache_key_is_order_independent_and_ignores_volatile_keys():
+    a = _config()
+    b = dict(reversed(list(_config().items())), stream=False)
+    assert compute_cache_key(a) == compute_cache_key(b)
+    assert compute_cache_key(a) != compute_cache_key(_config(text={"verbosity": "high"}))
+
+
+def test_miss_store_then_hit_returns_attribute_view(tmp_path):
+    cache = ResponseCache(tmp_path, mode="on")
+    stats = begin_run_stats()
+    assert cache.lookup(_config()) is None
+    cache.store(_config(), _response("hello"))
+    hit = cache.lookup(_config())
+    assert hit.choices[0].message.content == "hello"
+    assert hit.usage.total_tokens == 12
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1 and cache.stats["stores"] == 1
+    assert get_run_stats() == stats
+
+
+def test_replay_miss_raises_and_refresh_skips_reads(tmp_path):
+    with pytest.raises(ResponseCacheMiss):
+        ResponseCache(tmp_path, mode="replay").lookup(_config())
+    refresh = ResponseCache(tmp_path, mode="refresh")
+    refresh.store(_config(), _response("v1"))
+    assert refresh.lookup(_config()) is None
+    assert ResponseCache(tmp_path, mode="replay").lookup(_config()).choices[0].message.content == "v1"
+    bypass = ResponseCache(tmp_path, mode="bypass")
+    bypass.store(_config("other"), _response("x"))
+    assert bypass.lookup(_config()) is None
+    assert not bypass.enabled
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = ResponseCache(tmp_path, mode="on", max_entries=2)
+    for i, name in enumerate(("a", "b")):
+        cache.store(_config(name), _response(name))
+        path = cache._path_for(compute_cache_key(_config(name)))
+        os.utime(path, (1000 + i, 1000 + i))
+    assert cache.lookup(_config("a")) is not None  # touches "a": "b" becomes least recent
+    cache.store(_config("c"), _response("c"))
+    assert cache.stats["evictions"] == 1
+    assert cache.lookup(_config("b")) is None
+    assert cache.lookup(_config("a")) is not None
+    assert cache.lookup(_config("c")) is not None
+
+
+def test_stores_below_the_limits_do_not_rescan_the_cache(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, mode="on", max_entries=3)
+    cache.store(_config("a"), _response("a"))
+    scans = []
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or 0)
+    cache.store(_config("b"), _response("b"))
+    cache.store(_config("b"), _response("b2"))  # overwrite: still two entries
+    cache.store(_config("c"), _response("c"))
+    assert scans == []
+    cache.store(_config("d"), _response("d"))
+    assert scans == [1]
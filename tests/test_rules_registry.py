@@ -0,0 +1,55 @@
+import os
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import utils_rules_registry
+from utils_rules_registry import compile_rule_file, get_registry_stats, read_prompt_text
+from utils_rules_parser import parse_rule_ids
+
+RULES_MD = """# LUCIM Diagram rules
+<LDR1-SYS-UNIQUE>
+Exactly one System participant.
+</LDR1-SYS-UNIQUE>
+<LDR19-COMMENTS>
+Comments are ignored.
+</LDR19-COMMENTS>
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    utils_rules_registry.clear_rules_registry()
+    yield
+    utils_rules_registry.clear_rules_registry()
+
+
+def test_rule_file_is_compiled_once_until_its_content_changes(tmp_path):
+    rules = tmp_path / "RULES_LUCIM_PlantUML_Diagram.md"
+    rules.write_text(RULES_MD, encoding="utf-8")
+
+    compiled = compile_rule_file(rules)
+    assert list(compiled.rules) == ["LDR1-SYS-UNIQUE", "LDR19-COMMENTS"]
+    assert compiled.rules["LDR1-SYS-UNIQUE"] == "Exactly one System participant."
+    assert parse_rule_ids(rules) == {"LDR1-SYS-UNIQUE", "LDR19-COMMENTS"}
+    assert read_prompt_text(str(rules)) == RULES_MD
+    assert compile_rule_file(rules) is compiled
+    assert get_registry_stats()["compiles"] == 1 and get_registry_stats()["hits"] == 3
+
+    # Touched without changes: revalidated by hash, not re-parsed
+    os.utime(rules, ns=(compiled.mtime_ns + 10**9, compiled.mtime_ns + 10**9))
+    assert compile_rule_file(rules) is compiled
+    assert get_registry_stats()["revalidations"] == 1
+
+    rules.write_text(RULES_MD.replace("LDR19-COMMENTS", "LDR20-ACTIVATION"), encoding="utf-8")
+    os.utime(rules, ns=(compiled.mtime_ns + 2 * 10**9, compiled.mtime_ns + 2 * 10**9))
+    assert compile_rule_file(rules).rule_ids == {"LDR1-SYS-UNIQUE", "LDR20-ACTIVATION"}
+    assert get_registry_stats()["compiles"] == 2
+
+
+def test_missing_file_raises_like_read_text(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_prompt_text(tmp_path / "PSN_missing.md")
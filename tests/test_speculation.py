@@ -0,0 +1,55 @@
+import sys
+import asyncio
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_speculation import SpeculationTracker, cancel_speculations, take_speculation
+
+
+async def _generate(text, delay, started):
+    started.append(text)
+    await asyncio.sleep(delay)
+    return {"data": f"scenario of {text}", "tokens_used": 120}
+
+
+def test_matching_speculation_is_committed_and_stale_one_discarded():
+    tracker = SpeculationTracker(enabled=True)
+
+    async def run():
+        started = []
+        speculations = {"scenario": tracker.start("scenario", "om v1", _generate("om v1", 0.01, started))}
+        await asyncio.sleep(0.03)
+        # Upstream regenerated: the finished speculation is dropped, its tokens are wasted
+        assert await take_speculation(speculations, "scenario", "om v2") is None
+        speculations["scenario"] = tracker.start("scenario", "om v2", _generate("om v2", 0.01, started))
+        speculation = await take_speculation(speculations, "scenario", "om v2")
+        return started, await speculation.commit(), speculations
+
+    started, result, speculations = asyncio.run(run())
+
+    assert started == ["om v1", "om v2"] and result["data"] == "scenario of om v2"
+    assert speculations == {}
+    assert tracker.stats["launched"] == 2 and tracker.stats["committed"] == 1
+    assert tracker.stats["discarded"] == 1 and tracker.stats["wasted_tokens"] == 120
+
+
+def test_pending_speculations_are_cancelled():
+    tracker = SpeculationTracker(enabled=True)
+
+    async def run():
+        speculations = {
+            "scenario": tracker.start("scenario", "om", _generate("om", 5, [])),
+            "plantuml_diagram": tracker.start("plantuml_diagram", "scen", _generate("scen", 5, [])),
+        }
+        await asyncio.sleep(0)
+        pending = [s.task for s in speculations.values()]
+        await take_speculation(speculations, "scenario", "other om")
+        cancel_speculations(speculations)
+        await asyncio.sleep(0)
+        return pending, speculations
+
+    pending, speculations = asyncio.run(run())
+
+    assert all(task.cancelled() for task in pending) and speculations == {}
+    assert tracker.stats["cancelled"] == 2 and tracker.stats["committed"] == 0
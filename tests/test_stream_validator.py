@@ -0,0 +1,58 @@
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_audit_operation_model import _check_lom0_json_block_only
+from utils_stream_validator import AbortedStreamResponse, StreamAbort, StreamSession, StreamValidator
+
+
+def _feed(stage, chunks):
+    validator = StreamValidator(stage)
+    for chunk in chunks:
+        validator.feed(chunk)
+    return validator
+
+
+@pytest.mark.parametrize("stage, chunks, rule", [
+    ("operation_model", ["Here is the operation", " model:\n{"], "LOM0-JSON-BLOCK-ONLY"),
+    ("operation_model", ['{"a": "}"}', "\nHope this helps"], "LOM0-JSON-BLOCK-ONLY"),
+    ("operation_model", ['```json\n{"a": 1}\n``', "`\nHope this helps"], "LOM0-JSON-BLOCK-ONLY"),
+    ("scenario", ["```json\nSure! {"], "LSC0-JSON-BLOCK-ONLY"),
+    ("scenario", ["Sure! {"], "LSC0-JSON-BLOCK-ONLY"),
+    ("diagram", ['{"data": {"plantuml-diagram": "```plant', 'uml\\n@startuml'], "LDR0-PLANTUML-BLOCK-ONLY"),
+    ("diagram", ["@end", "uml"], "LDR0-PLANTUML-BLOCK-ONLY"),
+])
+def test_certain_block_only_violations_abort_the_stream(stage, chunks, rule):
+    with pytest.raises(StreamAbort) as excinfo:
+        _feed(stage, chunks)
+    assert excinfo.value.rule_id == rule
+
+
+def test_compliant_or_undecided_outputs_are_streamed_to_the_end():
+    _feed("operation_model", ["```json\n{"])
+    _feed("operation_model", ['{"a":1}\n```'])  # write_all_output_files strips the closing fence
+    _feed("operation_model", ["<raw_json", "_output>\n``", "`json\n", '{"a": 1}\n```', "\n</raw_json_output>\n"])
+    _feed("scenario", ["``", "`\n", '{"steps": []}\n```'])
+    _feed("operation_model", ["  {\"actors\": [{\"name\": \"Act", "User\"}], \"note\": \"a \\\"}\\\" b\"}", "\n"])
+    _feed("scenario", ['{"steps": []}', " trailing"])  # LSC0 tolerates it when the text holds braces
+    _feed("diagram", ['{"data": {"plantuml-diagram": "\\n\\u0040start', 'uml\\nA -> B\\n@enduml"}}'])
+    _feed("diagram", ["Here is the diagram:\n", '{"data": {}}'])  # the generator still extracts the object
+    _feed("diagram", ["@start", "uml\n", "@enduml"])
+
+
+def test_aborted_response_keeps_the_partial_text_for_the_auditor():
+    session = StreamSession("operation_model")
+    with pytest.raises(StreamAbort) as excinfo:
+        for delta in ["Sure, here", " it is: {"]:
+            session.feed(delta)
+    response = AbortedStreamResponse(session, excinfo.value)
+
+    assert response.status == "incomplete" and response.output_text == "Sure, here"
+    assert response.stream_metrics["aborted_rule"] == "LOM0-JSON-BLOCK-ONLY"
+    assert response.stream_metrics["ttft_ms"] is not None
+    assert response.usage.output_tokens > 0
+    assert response.usage.total_tokens == response.usage.input_tokens + response.usage.output_tokens
+    assert [v["id"] for v in _check_lom0_json_block_only(response.output_text)] == ["LOM0-JSON-BLOCK-ONLY"]
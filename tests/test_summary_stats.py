@@ -0,0 +1,21 @@
+import sys
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_summary_stats import get_summary_stats_lines, register_summary_stats
+
+
+def test_summary_lists_features_with_counters_in_registration_order():
+    def broken():
+        raise RuntimeError("counter unavailable")
+
+    register_summary_stats("Test feature on", lambda: {"calls": 2}, lambda stats: f"calls={stats['calls']}")
+    register_summary_stats("Test feature off", lambda: None, lambda stats: "never shown")
+    register_summary_stats("Test feature broken", broken, str)
+    register_summary_stats("Test feature late", lambda: {"calls": 1}, lambda stats: "first")
+    # Registering a label again replaces its entry
+    register_summary_stats("Test feature late", lambda: {"calls": 1}, lambda stats: "replaced")
+
+    lines = [line for line in get_summary_stats_lines() if line[0].startswith("Test feature")]
+    assert lines == [("Test feature on", "calls=2"), ("Test feature late", "replaced")]
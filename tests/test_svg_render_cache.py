@@ -0,0 +1,62 @@
+import os
+import sys
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import utils_plantuml
+from utils_plantuml import SvgRenderCache, compute_svg_cache_key, generate_svg_from_puml
+
+
+@pytest.fixture(autouse=True)
+def jar(monkeypatch, tmp_path):
+    jar_path = tmp_path / "plantuml.jar"
+    jar_path.write_bytes(b"release 1")
+    monkeypatch.setattr(utils_plantuml, "_find_plantuml_jar", lambda: jar_path)
+    return jar_path
+
+
+def test_cache_key_normalizes_escapes_and_includes_the_rendering_jar(jar):
+    escaped = '@startuml\nparticipant \\"sys:System\\" as S\n@enduml'
+    clean = '@startuml\nparticipant "sys:System" as S\n@enduml'
+    assert compute_svg_cache_key(escaped) == compute_svg_cache_key(clean)
+
+    key = compute_svg_cache_key(clean)
+    # Another PlantUML release behind the same path
+    jar.write_bytes(b"release 2, larger")
+    assert compute_svg_cache_key(clean) != key
+
+
+def test_cached_svg_is_linked_into_output_dir_without_rendering(monkeypatch, tmp_path):
+    cache = SvgRenderCache(tmp_path / "cache")
+    monkeypatch.setattr(utils_plantuml, "_svg_cache", cache)
+    puml = tmp_path / "iter-1" / "diagram.puml"
+    puml.parent.mkdir()
+    puml.write_text("@startuml\nA -> B\n@enduml\n", encoding="utf-8")
+    rendered = tmp_path / "rendered.svg"
+    rendered.write_text("<svg>A-B</svg>", encoding="utf-8")
+    cache.store(compute_svg_cache_key(puml.read_text(encoding="utf-8")), rendered)
+
+    svg = generate_svg_from_puml(puml, tmp_path / "iter-2")
+
+    assert svg == tmp_path / "iter-2" / "diagram.svg"
+    assert svg.read_text(encoding="utf-8") == "<svg>A-B</svg>"
+    assert cache.stats["hits"] == 1 and cache.stats["stores"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SvgRenderCache(tmp_path / "cache", max_entries=2)
+    source = tmp_path / "d.svg"
+    source.write_text("<svg/>", encoding="utf-8")
+    for i, key in enumerate(("aa" * 32, "bb" * 32)):
+        cache.store(key, source)
+        os.utime(cache._path_for(key), (1000 + i, 1000 + i))
+    assert cache.fetch("aa" * 32, tmp_path / "out" / "a.svg")  # refreshes "aa"
+
+    cache.store("cc" * 32, source)
+
+    assert not cache._path_for("bb" * 32).exists()
+    assert cache._path_for("aa" * 32).exists() and cache._path_for("cc" * 32).exists()
+    assert cache.stats["evictions"] == 1
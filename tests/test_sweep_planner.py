@@ -0,0 +1,80 @@
+import sys
+import json
+import pathlib
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_orchestrator_v3_scheduler import build_combinations
+from utils_sweep_planner import AGENT_PROMPT_FILES, RunHistory, SweepPlanner, drop_combinations, simulate_makespan
+from utils_mock_provider import AGENT_ARTIFACTS
+from utils_tokenizer import TokenizerService
+
+
+def _record_run(runs_dir, name, model, iterations, seconds=20):
+    for agent, (stage, role) in AGENT_ARTIFACTS.items():
+        for k in range(1, iterations.get(stage, 1) + 1):
+            folder = runs_dir / name / stage / f"iter-{k}" / role
+            folder.mkdir(parents=True)
+            payload = {"model": model, "input_tokens": 10000, "total_output_tokens": 4000, "visible_output_tokens": 1000,
+                       "raw_response": {"created_at": 1000, "completed_at": 1000 + seconds}}
+            (folder / "output-response-full.json").write_text(json.dumps(payload), encoding="utf-8")
+
+
+def _planner(tmp_path, history):
+    persona_dir = tmp_path / "persona"
+    persona_dir.mkdir()
+    for file_name in {f for files in AGENT_PROMPT_FILES.values() for f in files}:
+        (persona_dir / file_name).write_text("rule text " * 400, encoding="utf-8")
+    return SweepPlanner(history, persona_dir, max_iterations=3,
+                        provider_resolver=lambda model: "gemini" if "gemini" in model else "openai",
+                        code_loader=lambda base_name: "to setup clear-all end " * 100,
+                        tokenizer=TokenizerService(resolver=lambda model: ("fake", len)),
+                        pricing={"gpt-5-mini-2025-08-07": (0.25, 2.0)})
+
+
+def test_history_drives_the_prediction_and_unknown_models_fall_back(tmp_path):
+    runs = tmp_path / "runs"
+    _record_run(runs, "a", "gpt-5-mini-2025-08-07", {"1_lucim_operation_model": 3})
+    _record_run(runs, "b", "gpt-5-mini-2025-08-07", {"1_lucim_operation_model": 1})
+    history = RunHistory.mine(runs)
+    assert history.runs == 2
+    assert history.iterations_per_stage("gpt-5-mini-2025-08-07", "1_lucim_operation_model", 3) == 2.0
+    assert history.iterations_per_stage("gpt-5-mini-2025-08-07", "2_lucim_scenario", 3) == 1.0
+
+    combinations = build_combinations(["gpt-5-mini-2025-08-07", "my-local-model"], ["3d-solids"],
+                                      [{"effort": "low", "summary": "auto"}], ["low"])
+    plan = _planner(tmp_path, history).plan(combinations, max_concurrency=2)
+
+    mini, local = plan.estimates
+    # 2 + 1 + 1 iterations of 2 calls, 4000 output tokens and 20 s each
+    assert mini.output_tokens == 8 * 4000 and mini.seconds == pytest.approx(8 * 20)
+    assert mini.cost_usd == pytest.approx((mini.input_tokens * 0.25 + mini.output_tokens * 2.0) / 1e6)
+    assert local.cost_usd is None and plan.unpriced_models == ["my-local-model"]
+    assert plan.sequential_seconds == pytest.approx(mini.seconds + local.seconds)
+    assert plan.parallel_seconds == pytest.approx(max(mini.seconds, local.seconds))
+
+
+def test_makespan_respects_provider_caps_and_trimming_renumbers():
+    jobs = [("openai", 10), ("openai", 10), ("openai", 10), ("gemini", 5)]
+    assert simulate_makespan(jobs, max_concurrency=4, provider_limits={"openai": 2}) == 20
+    assert simulate_makespan(jobs, max_concurrency=1) == 35
+
+    combinations = build_combinations(["m1", "m2"], ["a", "b", "c"], [{"effort": "low", "summary": "auto"}], ["low"])
+    kept = drop_combinations(combinations, "2, 4-5")
+    assert [(c["index"], c["model"], c["base_name"]) for c in kept] == [(1, "m1", "a"), (2, "m1", "c"), (3, "m2", "c")]
+    with pytest.raises(ValueError):
+        drop_combinations(combinations, "two")
+
+
+def test_unresolvable_encoder_falls_back_to_character_estimates(tmp_path):
+    def offline(model):
+        raise OSError("tiktoken encoding download failed")
+
+    planner = _planner(tmp_path, RunHistory.mine(tmp_path / "no-runs"))
+    planner.tokenizer = TokenizerService(resolver=offline)
+    code_tokens = len("to setup clear-all end " * 100) // 4
+    static_tokens = len(planner._static_text("lucim_operation_model_generator")) // 4
+    assert planner.first_iteration_input_tokens("gpt-5-mini-2025-08-07", "3d-solids", "lucim_operation_model_generator") == (
+        static_tokens + code_tokens)
@@ -0,0 +1,47 @@
+import sys
+import asyncio
+import pathlib
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils_tokenizer import MIN_STATIC_CHARS, TokenizerService
+
+
+def _word_service():
+    loads, encoded = [], []
+
+    def resolver(model_name):
+        loads.append(model_name)
+
+        def count(text):
+            encoded.append(len(text))
+            return len(text.split())
+        return "words", count
+
+    return TokenizerService(resolver=resolver), loads, encoded
+
+
+def test_static_segments_are_tokenized_once_and_only_the_dynamic_suffix_per_call():
+    service, loads, encoded = _word_service()
+    persona = "rule " * MIN_STATIC_CHARS
+
+    first = service.count_prompt(persona, "to setup end", "gpt-5-nano")
+    encoded.clear()
+    second = service.count_prompt(persona, "to go forward 1 end", "gpt-5-nano")
+    service.count_prompt(persona, "to go end", "gpt-5-mini")
+
+    assert first == MIN_STATIC_CHARS + 3 and second == MIN_STATIC_CHARS + 5
+    assert max(encoded) < len(persona)  # the persona was never re-tokenized
+    assert loads == ["gpt-5-nano", "gpt-5-mini"]
+    assert service.stats["static_misses"] == 1 and service.stats["static_hits"] == 2
+
+
+def test_messages_are_counted_in_the_thread_pool():
+    service, _, _ = _word_service()
+    messages = [{"role": "system", "content": "be brief " * MIN_STATIC_CHARS},
+                {"role": "user", "content": [{"type": "input_text", "text": "hello world"}]}]
+
+    total = asyncio.run(service.acount_messages(messages, "gemini-2.5-flash"))
+
+    assert total == service.count_messages(messages, "gemini-2.5-flash") == 2 * MIN_STATIC_CHARS + 2 + 2 + 2 * 4
+    assert service.stats["static_hits"] == 1
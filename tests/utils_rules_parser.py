@@ -1,17 +1,16 @@
-import re
+import sys
 from pathlib import Path
 from typing import Set
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-_RULE_ID_PATTERN = re.compile(r"<(?P<id>[A-Z]{3}\d+-[A-Z0-9\-]+)>.*?</(?P=id)>", re.DOTALL)
+from utils_rules_registry import get_rule_ids
 
 
 def parse_rule_ids(rules_md_path: str | Path) -> Set[str]:
     """Parse RULE IDs enclosed in <RULE-ID>...</RULE-ID> blocks from a RULES_LUCIM md file.
 
     Returns a set of IDs like LOM1-..., LDR8-..., LSC3-...
+    The file is compiled once by the rules registry and reused until it changes.
     """
-    p = Path(rules_md_path)
-    text = p.read_text(encoding="utf-8")
-    ids: Set[str] = set(m.group("id").strip() for m in _RULE_ID_PATTERN.finditer(text))
-    return ids
+    return set(get_rule_ids(rules_md_path))
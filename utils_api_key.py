@@ -9,7 +9,7 @@ Responsibilities:
 
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
 
@@ -24,20 +24,42 @@ def _env_locations() -> List[Path]:
     ]
 
 
-def load_env_files() -> None:
-    """Load .env files from common locations in order (workspace root first, override system env)."""
+# (path, mtime_ns) of the .env files applied by the last load_env_files call
+_loaded_env_signature: Optional[Tuple[Tuple[str, int], ...]] = None
+
+
+def _env_files() -> List[Tuple[int, Path]]:
+    """Return (priority index, path) of the distinct existing .env files."""
     seen: set[str] = set()
-    locations = _env_locations()
-    for i, base in enumerate(locations):
+    files = []
+    for i, base in enumerate(_env_locations()):
         env_path = (base / ".env").resolve()
         if str(env_path) in seen:
             continue
         seen.add(str(env_path))
         if env_path.exists():
-            # First file (workspace root): override=True to override system environment variables
-            # Subsequent files: override=False so workspace root wins
-            override = (i == 0)
-            load_dotenv(env_path, override=override)
+            files.append((i, env_path))
+    return files
+
+
+def load_env_files(force: bool = False) -> None:
+    """Load .env files from common locations in order (workspace root first, override system env).
+
+    The files are parsed once per process and again only when one of them is added,
+    removed or modified (or when force is True), so calling this on every API key
+    lookup is cheap.
+    """
+    global _loaded_env_signature
+    files = _env_files()
+    signature = tuple((str(p), p.stat().st_mtime_ns) for _, p in files)
+    if not force and signature == _loaded_env_signature:
+        return
+    for i, env_path in files:
+        # First file (workspace root): override=True to override system environment variables
+        # Subsequent files: override=False so workspace root wins
+        override = (i == 0)
+        load_dotenv(env_path, override=override)
+    _loaded_env_signature = signature
 
 
 def clean_api_key(raw_key: str) -> str:
@@ -150,8 +172,11 @@ def get_gemini_api_key() -> str:
 
 
 def get_provider_for_model(model_name: str) -> str:
-    """Infer provider from model name: "openai" | "gemini" | "router"."""
+    """Infer provider from model name: "openai" | "gemini" | "router" | "mock"."""
     name = (model_name or "").lower()
+    # Offline replay of recorded runs (utils_mock_provider)
+    if name.startswith("mock/"):
+        return "mock"
     if name.startswith("gpt-5") or name.startswith("gpt-"):
         return "openai"
     if "gemini" in name:
@@ -164,6 +189,9 @@ def get_api_key_for_model(model_name: str) -> str:
     """Return API key for the inferred provider (no validation)."""
     load_env_files()
     provider = get_provider_for_model(model_name)
+    if provider == "mock":
+        # The mock provider makes no network calls
+        return "mock"
     if provider == "openai":
         key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY") or os.getenv("API_KEY")
         if key:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Artifact Memo Utility
+Content hashes of the artifacts generated at every stage iteration, and a per-run memo of
+the audit each hash received. A corrective iteration that produces an artifact identical to
+an earlier one (byte-identical, or identical once JSON / PlantUML is normalized) reuses that
+audit instead of paying again for the LLM audit, the Python audit and the SVG render. An
+artifact identical to an iteration other than the previous one means the generator
+oscillates (A→B→A); the stage loop can then stop before exhausting MAX_AUDIT.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from utils_summary_stats import register_summary_stats
+
+# Stages whose artifact is JSON (others are PlantUML text)
+JSON_STAGES = ("operation_model", "scenario")
+
+_STAT_KEYS = ("artifacts", "reused", "oscillations")
+_memo_stats = {k: 0 for k in _STAT_KEYS}
+_memo_stats_lock = threading.Lock()
+
+
+def normalize_artifact(stage: str, text: Optional[str]) -> str:
+    """
+    Canonical form of a generated artifact, used for hashing.
+
+    JSON stages: the raw text is kept as-is unless it parses as JSON on its own, in which case
+    it is re-serialized with sorted keys (a fenced or wrapped answer stays distinct, since
+    LOM0/LSC0 judge the raw format). PlantUML: line endings and trailing whitespace are
+    normalized and blank lines dropped.
+    """
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    if stage in JSON_STAGES:
+        try:
+            return json.dumps(json.loads(text), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        except (json.JSONDecodeError, ValueError):
+            return text.strip()
+    return "\n".join(line.rstrip() for line in text.split("\n") if line.strip())
+
+
+def artifact_digest(stage: str, text: Optional[str]) -> str:
+    """SHA-256 of the normalized artifact of a stage."""
+    return hashlib.sha256(f"{stage}\0{normalize_artifact(stage, text)}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class MemoEntry:
+    """Audit results of the first iteration that produced an artifact."""
+    iteration: int
+    audit: Dict[str, Any]
+    py_audit: Optional[Dict[str, Any]] = None
+    svg_file: Optional[str] = None
+
+
+@dataclass
+class ArtifactObservation:
+    """What the memo knows about the artifact of one iteration."""
+    stage: str
+    iteration: int
+    digest: str
+    # Earlier iteration that produced the same artifact (None for a new artifact)
+    repeat_of: Optional[int] = None
+    entry: Optional[MemoEntry] = None
+
+    @property
+    def oscillation(self) -> bool:
+        """True when the artifact reverts to one older than the previous iteration (A→B→A)."""
+        return self.repeat_of is not None and self.repeat_of < self.iteration - 1
+
+    def describe(self) -> str:
+        return f"artifact {self.digest[:12]} identical to iteration {self.repeat_of}"
+
+
+class ArtifactMemo:
+    """Per-run table: stage → artifact hash → audit of the iteration that produced it first."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize an empty memo.
+
+        Args:
+            enabled: When False, artifacts are still hashed but never reused nor flagged
+        """
+        self.enabled = enabled
+        self._entries: Dict[str, Dict[str, MemoEntry]] = {}
+        self._history: Dict[str, List[str]] = {}
+
+    def observe(self, stage: str, iteration: int, text: Optional[str]) -> ArtifactObservation:
+        """Hash the artifact of a stage iteration and look up an earlier audit of the same artifact."""
+        digest = artifact_digest(stage, text)
+        history = self._history.setdefault(stage, [])
+        entry = self._entries.get(stage, {}).get(digest) if self.enabled else None
+        repeat_of = entry.iteration if entry is not None else None
+        history.append(digest)
+        observation = ArtifactObservation(stage, iteration, digest, repeat_of, entry)
+        with _memo_stats_lock:
+            _memo_stats["artifacts"] += 1
+            _memo_stats["reused"] += entry is not None
+            _memo_stats["oscillations"] += observation.oscillation
+        return observation
+
+    def record(self, observation: ArtifactObservation, audit: Dict[str, Any],
+               py_audit: Optional[Dict[str, Any]] = None, svg_file: Optional[str] = None) -> None:
+        """Remember the audit of a new artifact (a reused one keeps its first entry)."""
+        if observation.entry is None:
+            self._entries.setdefault(observation.stage, {})[observation.digest] = MemoEntry(
+                observation.iteration, audit, py_audit, svg_file
+            )
+
+    def history(self, stage: str) -> List[str]:
+        """Artifact digests of a stage, in iteration order."""
+        return list(self._history.get(stage, []))
+
+
+def reused_audit(observation: ArtifactObservation) -> Dict[str, Any]:
+    """Copy of the memoized audit for an iteration that did not call any auditor (no tokens spent)."""
+    audit = dict(observation.entry.audit)
+    audit.update({
+        "reasoning_summary": f"Audit reused: {observation.describe()}. {audit.get('reasoning_summary', '')}".strip(),
+        "tokens_used": 0,
+        "input_tokens": 0,
+        "visible_output_tokens": 0,
+        "reasoning_tokens": 0,
+        "total_output_tokens": 0,
+        "raw_usage": {},
+        "raw_response": {},
+    })
+    return audit
+
+
+def get_artifact_memo_stats() -> Dict[str, int]:
+    """Return process-wide counters (artifacts hashed, audits reused, oscillations detected)."""
+    with _memo_stats_lock:
+        return dict(_memo_stats)
+
+
+def format_artifact_memo_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of artifact memo counters for run logs."""
+    return (
+        f"artifacts={stats.get('artifacts', 0)} audits reused={stats.get('reused', 0)} "
+        f"oscillations={stats.get('oscillations', 0)}"
+    )
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    from utils_config_constants import ARTIFACT_MEMO
+    return get_artifact_memo_stats() if ARTIFACT_MEMO else None
+
+
+register_summary_stats("Artifact memo", _summary_stats, format_artifact_memo_stats)
@@ -23,6 +23,9 @@ Output: {
   "errors": null
 }
 
+The diagram is parsed once into a typed IR (utils_plantuml_ir.parse_plantuml); every textual
+rule is a RuleVisitor over that IR, run by run_rule_visitors in a single walk.
+
 Rules implemented (complete coverage of all validation rules):
 
 Textual Rules (fully implemented):
@@ -63,12 +66,19 @@ Permissive Rules (no validation required):
 """
 from __future__ import annotations
 
+import bisect
+import functools
 import json
 import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 
+from utils_plantuml_ir import (
+    Activation, DiagramIR, Message, Participant, parse_plantuml,
+    is_system_token as _is_system_token,
+)
+
 # All LDR rules defined in RULES_LUCIM_PlantUML_Diagram.md (LDR0 through LDR28)
 ALL_LDR_RULES: Set[str] = {
     "LDR0-PLANTUML-BLOCK-ONLY",
@@ -109,64 +119,10 @@ PERMISSIVE_RULES: Set[str] = {
     "LDR22-EVENT-PARAMETER-FLEX-QUOTING",  # Allows flexible quoting (permissive)
 }
 
-_PARTICIPANT_RE = re.compile(r"^participant\s+\"?(?P<label>[^\"]+)\"?\s+as\s+(?P<alias>\w+)(\s+#[0-9A-Fa-f]{6})?\s*$")
-_SYSTEM_SIMPLE_RE = re.compile(r"^participant\s+System\s+as\s+system(\s+#[0-9A-Fa-f]{6})?\s*$")
-_MSG_RE = re.compile(r"^(?P<lhs>\S+)\s*(?P<arrow>--?>)\s*(?P<rhs>\S+)\s*:\s*(?P<name>\w+)\s*\((?P<params>[^)]*)\)\s*$")
-_ACTIVATE_RE = re.compile(r"^activate\s+(?P<who>\w+)\b")
-_DEACTIVATE_RE = re.compile(r"^deactivate\s+(?P<who>\w+)\b")
 _ACTOR_TYPE_RE = re.compile(r"^Act[A-Z][A-Za-z0-9]*$")
 _CAMEL_CASE_ALIAS_RE = re.compile(r"^[a-z][a-zA-Z0-9]*$")
 
 
-def _is_system_token(tok: str) -> bool:
-    t = tok.strip()
-    return t == "system" or t == "System"
-
-
-def _is_comment_line(line: str) -> bool:
-    """
-    Check if a line is a PlantUML comment (LDR19 compliance).
-    
-    PlantUML supports multiple comment syntaxes:
-    - // comment (single-line comment)
-    - ' comment (alternative single-line comment)
-    - /note right/ or /note left/ (note blocks)
-    - note right: text or note left: text (note syntax)
-    - note over participant (notes over participants)
-    
-    Args:
-        line: Line to check (should be stripped)
-        
-    Returns:
-        True if the line is a comment, False otherwise
-    """
-    if not line:
-        return False
-    
-    stripped = line.strip()
-    
-    # // comment (most common)
-    if stripped.startswith("//"):
-        return True
-    
-    # ' comment (alternative syntax)
-    if stripped.startswith("'"):
-        return True
-    
-    # /note right/ or /note left/ (note blocks - start and end markers)
-    if stripped.startswith("/note ") and stripped.endswith("/"):
-        return True
-    
-    # note right: or note left: (note syntax with text)
-    if stripped.startswith("note ") and ":" in stripped:
-        return True
-    
-    # note over participant (notes over participants)
-    if stripped.startswith("note over "):
-        return True
-    
-    return False
-
 
 def _check_ldr0_plantuml_block_only(raw_content: str) -> List[Dict[str, Any]]:
     """
@@ -308,6 +264,49 @@ def _extract_plantuml_from_text(content: str) -> str | None:
     return plantuml_text
 
 
+def _plantuml_from_json(content: str) -> Any:
+    """
+    Return the diagram field of a JSON payload, or None when content is not such JSON.
+
+    Supports {"data": {"plantuml-diagram": "..."}}, the legacy {"data": {"diagram": {"plantuml": "..."}}}
+    and the unwrapped {"plantuml-diagram": "..."} formats.
+    """
+    try:
+        parsed_json = json.loads(content)
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return None
+    if not isinstance(parsed_json, dict):
+        return None
+    if "data" in parsed_json and isinstance(parsed_json.get("data"), dict):
+        data_node = parsed_json["data"]
+        if "plantuml-diagram" in data_node:
+            return data_node["plantuml-diagram"]
+        if "diagram" in data_node and isinstance(data_node["diagram"], dict):
+            return data_node["diagram"].get("plantuml")
+        return None
+    return parsed_json.get("plantuml-diagram")
+
+
+def _resolve_plantuml_text(text: str | None, raw_content: str | None) -> str:
+    """
+    Find the PlantUML diagram in text, falling back to raw_content.
+
+    Each source is tried as JSON first, then by @startuml/@enduml markers. raw_content is
+    skipped when it is the same string as text (it would yield the same result). When no
+    diagram is found, the input itself is returned (LDR1 then reports the missing System).
+    """
+    plantuml_text = None
+    for position, source in enumerate((text, raw_content)):
+        if not source or (position == 1 and raw_content == text):
+            continue
+        plantuml_text = _plantuml_from_json(source)
+        if not plantuml_text or not isinstance(plantuml_text, str) or "@startuml" not in plantuml_text:
+            plantuml_text = _extract_plantuml_from_text(source)
+        if plantuml_text:
+            break
+    return plantuml_text or text or raw_content or ""
+
+
 def _validate_ldr11_ldr16_graphical_rules(svg_path: Path | str) -> List[Dict[str, Any]]:
     """
     Wrapper function to validate graphical rules LDR11-LDR16 using validate_diagram_graphics.py.
@@ -465,101 +464,520 @@ def _extract_actor_types_and_instances_from_scenario(scenario: Dict[str, Any] |
     return result
 
 
-def _validate_ldr28_actor_instance_consistency(
-    plantuml_text: str,
-    operation_model: Dict[str, Any] | None = None,
-    scenario: Dict[str, Any] | None = None
-) -> List[Dict[str, Any]]:
+class _RuleContext:
+    """Inputs shared by the rule visitors of one audit (IR, scenario, operation model)."""
+
+    def __init__(self, ir: DiagramIR, scenario: Dict[str, Any] | None = None,
+                 operation_model: Dict[str, Any] | None = None):
+        self.ir = ir
+        self.scenario = scenario
+        self.operation_model = operation_model
+        self.scenario_actors = _extract_actor_types_and_instances_from_scenario(scenario)
+        # First line declaring the System (exact syntax or any participant aliased 'system')
+        self.system_decl_line: int | None = next((p.line for p in ir.participants if p.alias == "system"), None)
+
+    def system_declared_before(self, line: int) -> bool:
+        return self.system_decl_line is not None and self.system_decl_line < line
+
+
+class RuleVisitor:
     """
-    Validate LDR28: Actor instance names must be consistent with actor type names defined
-    in Operation Model and Scenario.
-    
-    This rule requires BOTH operation_model AND scenario to be provided. Actor instance names
-    in the PlantUML diagram must match the actor type definitions from both the Operation Model
-    and the Scenario.
-    
-    Args:
-        plantuml_text: PlantUML diagram text
-        operation_model: Operation Model dictionary (required for LDR28)
-        scenario: Scenario dictionary (required for LDR28)
-        
-    Returns:
-        List of violations in the standard format
+    Base class of the LDR rule visitors.
+
+    run_rule_visitors() walks the IR nodes once and calls visit_participant / visit_message /
+    visit_activation on every visitor, then finish(). Violations are collected per phase
+    (1: declarations, 2: events and activations, 3: activation sequences, 4: cross-artifact
+    consistency) so that the report keeps the order of the original multi-pass auditor.
     """
-    violations: List[Dict[str, Any]] = []
-    
-    # Extract actor instances from PlantUML first (needed to check if scenario is required)
-    lines = plantuml_text.splitlines()
-    actor_instances: Dict[str, Dict[str, str]] = {}  # alias -> {"type": actor_type, "name": actor_name, "line": line_number}
-    
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if not line or _is_comment_line(line):
+
+    rule_ids: tuple[str, ...] = ()
+    phase = 1
+
+    def __init__(self, context: _RuleContext):
+        self.context = context
+        self.ir = context.ir
+        self.violations: List[Dict[str, Any]] = []
+
+    def emit(self, rule_id: str, message: str, line: int, **extracted_values: Any) -> None:
+        self.violations.append({"id": rule_id, "message": message, "line": line, "extracted_values": extracted_values})
+
+    def visit_participant(self, node: Participant) -> None:
+        pass
+
+    def visit_message(self, node: Message) -> None:
+        pass
+
+    def visit_activation(self, node: Activation) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def _overridden_visits(cls: type) -> tuple:
+    """(node type, method name) pairs a visitor class actually implements."""
+    return tuple(
+        (node_type, name)
+        for node_type, name in ((Participant, "visit_participant"), (Message, "visit_message"), (Activation, "visit_activation"))
+        if getattr(cls, name) is not getattr(RuleVisitor, name)
+    )
+
+
+def run_rule_visitors(ir: DiagramIR, visitors: List[RuleVisitor]) -> List[Dict[str, Any]]:
+    """Run visitors over the IR in a single walk and return their violations in phase order."""
+    phases: Dict[int, List[Dict[str, Any]]] = {}
+    for visitor in visitors:
+        visitor.violations = phases.setdefault(visitor.phase, [])
+    dispatch: Dict[type, List[Any]] = {Participant: [], Message: [], Activation: []}
+    for visitor in visitors:
+        for node_type, method_name in _overridden_visits(type(visitor)):
+            dispatch[node_type].append(getattr(visitor, method_name))
+    for node in ir.nodes:
+        for visit in dispatch[type(node)]:
+            visit(node)
+    for visitor in visitors:
+        visitor.finish()
+    return [v for phase in sorted(phases) for v in phases[phase]]
+
+
+# --- Phase 1: declarations -------------------------------------------------------------
+
+class SystemUniqueRule(RuleVisitor):
+    """LDR1-SYS-UNIQUE: exactly one System lifeline per diagram."""
+    rule_ids = ("LDR1-SYS-UNIQUE",)
+
+    def visit_participant(self, node: Participant) -> None:
+        if node.simple_system and self.context.system_declared_before(node.line):
+            self.emit("LDR1-SYS-UNIQUE", "There must be exactly one System lifeline per diagram.", node.line,
+                      line_content=node.raw)
+
+    def finish(self) -> None:
+        if self.context.system_decl_line is None:
+            self.emit("LDR1-SYS-UNIQUE", "System participant not declared (expected: participant System as system).", 1,
+                      line_content=self.ir.first_significant_content() or "(empty file)")
+
+
+class SystemDeclarationRule(RuleVisitor):
+    """LDR24-SYSTEM-DECLARATION: the System uses the exact declaration syntax."""
+    rule_ids = ("LDR24-SYSTEM-DECLARATION",)
+
+    def visit_participant(self, node: Participant) -> None:
+        if node.alias == "system" and not node.simple_system:
+            self.emit("LDR24-SYSTEM-DECLARATION",
+                      "Declare the System participant using the exact syntax: participant System as system",
+                      node.line, line_content=node.raw)
+
+
+class ActorDeclarationRule(RuleVisitor):
+    """LDR17-ACTOR-DECLARATION-SYNTAX: actor declarations, validated against the scenario."""
+    rule_ids = ("LDR17-ACTOR-DECLARATION-SYNTAX",)
+
+    def visit_participant(self, node: Participant) -> None:
+        if node.alias == "system":
+            return
+        idx, alias, label, raw = node.line, node.alias, node.label, node.raw
+        scenario = self.context.scenario
+        scenario_actor_types = self.context.scenario_actors.get("actor_types", set())
+        scenario_actor_instances = self.context.scenario_actors.get("actor_instances", set())
+        scenario_instance_to_type = self.context.scenario_actors.get("actor_instance_to_type", {})
+
+        # Expect label formatted as "actorName:ActActorType" and alias == actorName.
+        # ActActorType and actorInstanceName must be defined in the <LUCIM-SCENARIO>.
+        if ":" not in label:
+            self.emit("LDR17-ACTOR-DECLARATION-SYNTAX",
+                      'Each actor must be declared using: participant "anActorName:ActActorType" as anActorName',
+                      idx, line_content=raw, label=label, alias=alias)
+        else:
+            actor_name, actor_type = label.split(":", 1)
+            # alias must equal actor_name
+            if actor_name != alias:
+                self.emit("LDR17-ACTOR-DECLARATION-SYNTAX",
+                          "Alias must match the actor instance name before ':' in the label.",
+                          idx, line_content=raw, label=label, alias=alias, expected_alias=actor_name)
+            # type must match Act[A-Z][A-Za-z0-9]*
+            if not _ACTOR_TYPE_RE.match(actor_type):
+                self.emit("LDR17-ACTOR-DECLARATION-SYNTAX", 'Actor type must match pattern Act[A-Z][A-Za-z0-9]*.',
+                          idx, line_content=raw, actor_type=actor_type)
+
+            # ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>
+            # If scenario is not present, this rule is non-compliant
+            if not scenario:
+                self.emit(
+                    "LDR17-ACTOR-DECLARATION-SYNTAX",
+                    f"LUCIM Scenario is required for LDR17 validation. ActActorType '{actor_type}' and actorInstanceName '{actor_name}' must be valid as defined in the <LUCIM-SCENARIO>, but the scenario is not provided.",
+                    idx, line_content=raw, actor_type=actor_type, actor_instance_name=actor_name, source="Scenario Missing",
+                )
+            elif not scenario_actor_types:
+                self.emit(
+                    "LDR17-ACTOR-DECLARATION-SYNTAX",
+                    f"Actor type '{actor_type}' is not defined in the LUCIM Scenario. The scenario is provided but contains no actor types. ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>.",
+                    idx, line_content=raw, actor_type=actor_type, expected_actor_types=[], source="Scenario Empty",
+                )
+            elif actor_type not in scenario_actor_types:
+                self.emit(
+                    "LDR17-ACTOR-DECLARATION-SYNTAX",
+                    f"Actor type '{actor_type}' is not defined in the LUCIM Scenario. ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>.",
+                    idx, line_content=raw, actor_type=actor_type, expected_actor_types=list(scenario_actor_types), source="Scenario",
+                )
+
+            # actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>
+            if not scenario:
+                pass  # Already reported above
+            elif not scenario_actor_instances:
+                self.emit(
+                    "LDR17-ACTOR-DECLARATION-SYNTAX",
+                    f"Actor instance name '{actor_name}' is not defined in the LUCIM Scenario. The scenario is provided but contains no actor instances. actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>.",
+                    idx, line_content=raw, actor_instance_name=actor_name, expected_actor_instances=[], source="Scenario Empty",
+                )
+            elif actor_name not in scenario_actor_instances:
+                self.emit(
+                    "LDR17-ACTOR-DECLARATION-SYNTAX",
+                    f"Actor instance name '{actor_name}' is not defined in the LUCIM Scenario. actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>.",
+                    idx, line_content=raw, actor_instance_name=actor_name, expected_actor_instances=list(scenario_actor_instances), source="Scenario",
+                )
+            elif actor_name in scenario_instance_to_type:
+                # The instance name must also match the type declared for it in the scenario
+                expected_type_for_instance = scenario_instance_to_type[actor_name]
+                if actor_type != expected_type_for_instance:
+                    self.emit(
+                        "LDR17-ACTOR-DECLARATION-SYNTAX",
+                        f"Actor instance name '{actor_name}' is associated with type '{expected_type_for_instance}' in the LUCIM Scenario, but the diagram declares it as '{actor_type}'. Actor instance names must be consistent with their type definition in the <LUCIM-SCENARIO>.",
+                        idx, line_content=raw, actor_instance_name=actor_name, actor_type=actor_type,
+                        expected_type_for_instance=expected_type_for_instance, source="Scenario",
+                    )
+
+        # Prefer quoted label (soft LDR17)
+        if not node.quoted:
+            self.emit("LDR17-ACTOR-DECLARATION-SYNTAX",
+                      'Actor label should be quoted: participant "anActorName:ActActorType" as anActorName',
+                      idx, line_content=raw)
+
+
+class ActorInstanceFormatRule(RuleVisitor):
+    """LDR27-ACTOR-INSTANCE-FORMAT: actor instance names (aliases) are camelCase."""
+    rule_ids = ("LDR27-ACTOR-INSTANCE-FORMAT",)
+
+    def visit_participant(self, node: Participant) -> None:
+        if node.alias != "system" and not _CAMEL_CASE_ALIAS_RE.match(node.alias):
+            self.emit("LDR27-ACTOR-INSTANCE-FORMAT", "All actor instance names must be human-readable in camelCase.",
+                      node.line, line_content=node.raw, alias=node.alias)
+
+
+class SystemDeclaredFirstRule(RuleVisitor):
+    """LDR3-SYSTEM-DECLARED-FIRST: the System is declared before all actors."""
+    rule_ids = ("LDR3-SYSTEM-DECLARED-FIRST",)
+
+    def visit_participant(self, node: Participant) -> None:
+        if node.alias != "system" and not self.context.system_declared_before(node.line):
+            self.emit("LDR3-SYSTEM-DECLARED-FIRST", "The System must be declared first before all actors.",
+                      node.line, line_content=node.raw, participant_label=node.label, participant_alias=node.alias)
+
+
+class ActorDeclaredAfterSystemRule(RuleVisitor):
+    """LDR2-ACTOR-DECLARED-AFTER-SYSTEM: no actor is declared before the System."""
+    rule_ids = ("LDR2-ACTOR-DECLARED-AFTER-SYSTEM",)
+
+    def finish(self) -> None:
+        if self.context.system_decl_line is None:
+            return
+        first = self.ir.participants[0]
+        if first.alias != "system":
+            self.emit("LDR2-ACTOR-DECLARED-AFTER-SYSTEM", "The actors must be declared after the System.",
+                      first.line, line_content=first.raw, actor_alias=first.alias,
+                      system_decl_line=self.context.system_decl_line)
+
+
+# --- Phase 2: events and activations ---------------------------------------------------
+
+class ActivationOnSystemRule(RuleVisitor):
+    """LDR10-ACTIVATION-BAR-ON-SYSTEM-FORBIDDEN: never activate the System."""
+    rule_ids = ("LDR10-ACTIVATION-BAR-ON-SYSTEM-FORBIDDEN",)
+    phase = 2
+
+    def visit_activation(self, node: Activation) -> None:
+        if node.activate and node.on_system:
+            self.emit("LDR10-ACTIVATION-BAR-ON-SYSTEM-FORBIDDEN",
+                      "There must be NO activation bar in the System lifeline. Never activate System.",
+                      node.line, line_content=node.raw, lifeline=node.who)
+
+
+class ActivationNestingRule(RuleVisitor):
+    """LDR8-ACTIVATION-BAR-NESTING-FORBIDDEN: no activation while the lifeline is active."""
+    rule_ids = ("LDR8-ACTIVATION-BAR-NESTING-FORBIDDEN",)
+    phase = 2
+
+    def __init__(self, context: _RuleContext):
+        super().__init__(context)
+        self.depth: Dict[str, int] = {}
+
+    def visit_activation(self, node: Activation) -> None:
+        if node.on_system:
+            return
+        depth = self.depth.get(node.who, 0)
+        if not node.activate:
+            if depth > 0:
+                self.depth[node.who] = depth - 1
+            return
+        if depth > 0:
+            self.emit("LDR8-ACTIVATION-BAR-NESTING-FORBIDDEN", "Activation bars must never be nested.",
+                      node.line, line_content=node.raw, lifeline=node.who)
+        self.depth[node.who] = depth + 1
+
+
+class ActivationOverlapRule(RuleVisitor):
+    """LDR9-ACTIVATION-BAR-OVERLAPPING-FORBIDDEN: no new activation before the previous one ends."""
+    rule_ids = ("LDR9-ACTIVATION-BAR-OVERLAPPING-FORBIDDEN",)
+    phase = 2
+
+    def __init__(self, context: _RuleContext):
+        super().__init__(context)
+        self.open: Dict[str, List[int]] = {}
+        self.last_deactivation: Dict[str, int] = {}
+
+    def visit_activation(self, node: Activation) -> None:
+        who = node.who
+        if not node.activate:
+            self.last_deactivation[who] = node.line
+            if self.open.get(who):
+                self.open[who].pop()
+            return
+        if node.on_system:
+            return
+        stack = self.open.setdefault(who, [])
+        # Overlap: the lifeline is still active and was not deactivated since its last activation
+        if stack and self.last_deactivation.get(who, 0) <= stack[-1]:
+            self.emit("LDR9-ACTIVATION-BAR-OVERLAPPING-FORBIDDEN",
+                      "Activation bars must never overlap. Following sequence is forbidden: an event, start of activation bar of this event, another event before the end of the activation bar.",
+                      node.line, line_content=node.raw, lifeline=who)
+        stack.append(node.line)
+
+
+class SystemNoSelfLoopRule(RuleVisitor):
+    """LDR5-SYSTEM-NO-SELF-LOOP: no System → System event."""
+    rule_ids = ("LDR5-SYSTEM-NO-SELF-LOOP",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        if node.lhs_is_system and node.rhs_is_system:
+            self.emit("LDR5-SYSTEM-NO-SELF-LOOP", "Events must never be from System to System. System → System",
+                      node.line, line_content=node.raw, sender=node.lhs, receiver=node.rhs, event_name=node.name)
+
+
+class ActorNoActorLoopRule(RuleVisitor):
+    """LDR6-ACTOR-NO-ACTOR-LOOP: no Actor → Actor event."""
+    rule_ids = ("LDR6-ACTOR-NO-ACTOR-LOOP",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        if not node.lhs_is_system and not node.rhs_is_system:
+            self.emit("LDR6-ACTOR-NO-ACTOR-LOOP", "Events must never be from Actor to Actor. Actor → Actor",
+                      node.line, line_content=node.raw, sender=node.lhs, receiver=node.rhs, event_name=node.name)
+
+
+class EventDirectionalityRule(RuleVisitor):
+    """LDR4-EVENT-DIRECTIONALITY: every event connects exactly one Actor and the System."""
+    rule_ids = ("LDR4-EVENT-DIRECTIONALITY",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        if node.lhs_is_system == node.rhs_is_system:
+            self.emit("LDR4-EVENT-DIRECTIONALITY",
+                      "Every message in a LUCIM interaction must connect exactly one Actor lifeline and the System lifeline.",
+                      node.line, line_content=node.raw, sender=node.lhs, receiver=node.rhs, event_name=node.name)
+
+
+class InputEventSyntaxRule(RuleVisitor):
+    """LDR25-INPUT-EVENT-SYNTAX: ie* events go System --> Actor."""
+    rule_ids = ("LDR25-INPUT-EVENT-SYNTAX",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        if not node.name.startswith("ie"):
+            return
+        values = dict(line_content=node.raw, sender=node.lhs, receiver=node.rhs, event_name=node.name, arrow=node.arrow)
+        if not (node.lhs_is_system and not node.rhs_is_system):
+            self.emit("LDR25-INPUT-EVENT-SYNTAX",
+                      "ie events must be modeled using dashed arrows and following this declaration syntax: system --> theParticipant : ieMessageName(EP)",
+                      node.line, **values)
+        elif not node.arrow.startswith("--"):
+            self.emit("LDR25-INPUT-EVENT-SYNTAX", "ie events must be modeled using dashed arrows (-->).", node.line, **values)
+
+
+class OutputEventSyntaxRule(RuleVisitor):
+    """LDR26-OUTPUT-EVENT-SYNTAX: oe* events go Actor -> System."""
+    rule_ids = ("LDR26-OUTPUT-EVENT-SYNTAX",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        if not node.name.startswith("oe"):
+            return
+        values = dict(line_content=node.raw, sender=node.lhs, receiver=node.rhs, event_name=node.name, arrow=node.arrow)
+        if not (not node.lhs_is_system and node.rhs_is_system):
+            self.emit("LDR26-OUTPUT-EVENT-SYNTAX",
+                      "oe events must be modeled using continuous arrows and following this declaration syntax: theParticipant -> system : oeMessage(EP)",
+                      node.line, **values)
+        elif node.arrow != "->":
+            self.emit("LDR26-OUTPUT-EVENT-SYNTAX", "oe events must be modeled using continuous arrows (->).", node.line, **values)
+
+
+def _split_event_params(p: str) -> list:
+    """Split event parameters on commas, respecting single and double quotes."""
+    parts = []
+    buf = []
+    in_single = False
+    in_double = False
+    for ch in p:
+        if ch == "'" and not in_double:
+            in_single = not in_single
+            buf.append(ch)
             continue
-        
-        mp = _PARTICIPANT_RE.match(line)
-        if mp:
-            alias = mp.group("alias")
-            label = mp.group("label")
-            
-            # Skip System
-            if alias == "system" or _is_system_token(alias):
+        if ch == '"' and not in_single:
+            in_double = not in_double
+            buf.append(ch)
+            continue
+        if ch == "," and not in_single and not in_double:
+            parts.append("".join(buf).strip())
+            buf = []
+            continue
+        buf.append(ch)
+    parts.append("".join(buf).strip())
+    return parts if not (len(parts) == 1 and parts[0] == "") else []
+
+
+class EventParameterCommaRule(RuleVisitor):
+    """LDR23-EVENT-PARAMETER-COMMA-SEPARATED: parameters are comma-separated, without empty items."""
+    rule_ids = ("LDR23-EVENT-PARAMETER-COMMA-SEPARATED",)
+    phase = 2
+
+    def visit_message(self, node: Message) -> None:
+        params_raw = node.params
+        if params_raw is None:
+            return
+        # Quick disallow common wrong separators
+        if ";" in params_raw or "|" in params_raw:
+            self.emit("LDR23-EVENT-PARAMETER-COMMA-SEPARATED", "Multiple parameters must be comma-separated.",
+                      node.line, line_content=node.raw, params=params_raw)
+        params_list = _split_event_params(params_raw.strip())
+        if len(params_list) > 1 and any(p == "" for p in params_list):
+            self.emit("LDR23-EVENT-PARAMETER-COMMA-SEPARATED",
+                      "Multiple parameters must be valid comma-separated values without empty items.",
+                      node.line, line_content=node.raw, params=params_raw)
+
+
+# --- Phase 3: activation sequences -----------------------------------------------------
+
+class ActivationSequenceRule(RuleVisitor):
+    """
+    LDR7-ACTIVATION-BAR-SEQUENCE and LDR20-ACTIVATION-BAR-SEQUENCE (one visitor: both rules
+    share the event → activation → deactivation pairing).
+
+    Events of a participant are paired from the last one backwards with the closest unused
+    activation after them, so that with "oeEvent1(), oeEvent2(), activate" the activation
+    belongs to oeEvent2 and oeEvent1 is reported as missing its activation. "Immediately
+    after" is checked on the next significant line (LDR19: blank lines and comments are ignored).
+    """
+    rule_ids = ("LDR7-ACTIVATION-BAR-SEQUENCE", "LDR20-ACTIVATION-BAR-SEQUENCE")
+    phase = 3
+
+    _LDR7_MESSAGE = "For each event, an activation must be used, it must occur on the Actor lifeline immediately after the event occurrence."
+    _LDR20_MESSAGE = "Strictly follow this sequence: (1) event declaration, (2) activate the participant, (3) deactivate the participant."
+
+    def __init__(self, context: _RuleContext):
+        super().__init__(context)
+        self.events: Dict[str, List[int]] = {}  # participant -> event line numbers (actors only)
+        self.activations: Dict[str, List[int]] = {}
+        self.deactivations: Dict[str, List[int]] = {}
+
+    def visit_message(self, node: Message) -> None:
+        if not node.lhs_is_system:
+            self.events.setdefault(node.lhs, []).append(node.line)
+        if not node.rhs_is_system:
+            self.events.setdefault(node.rhs, []).append(node.line)
+
+    def visit_activation(self, node: Activation) -> None:
+        if node.on_system:
+            return
+        target = self.activations if node.activate else self.deactivations
+        target.setdefault(node.who, []).append(node.line)
+
+    def finish(self) -> None:
+        ir = self.ir
+        for participant, event_lines in self.events.items():
+            unused_activations = list(self.activations.get(participant, []))  # ascending line order
+            unused_deactivations = list(self.deactivations.get(participant, []))
+            if not unused_activations:
+                for event_line in event_lines:
+                    self.emit("LDR7-ACTIVATION-BAR-SEQUENCE", self._LDR7_MESSAGE, event_line,
+                              line_content=ir.line_content(event_line), lifeline=participant)
                 continue
-            
-            # Extract actor type and name from label (format: "actorName:ActActorType")
-            if ":" in label:
-                actor_name, actor_type = label.split(":", 1)
-                actor_instances[alias] = {
-                    "type": actor_type,
-                    "name": actor_name,
-                    "line": idx
-                }
-    
-    # LDR28 requires BOTH operation_model AND scenario
-    # If scenario is missing and there are actors, mark as non-compliant
-    if not scenario:
-        if actor_instances:
-            # Scenario is required for LDR28, but it's missing
-            for alias, actor_data in actor_instances.items():
-                violations.append({
-                    "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                    "message": f"LUCIM Scenario is required for LDR28 validation. Actor instance '{alias}' (name: '{actor_data['name']}', type: '{actor_data['type']}') must be consistent with actor type names defined in the Operation Model and Scenario, but the scenario is not provided.",
-                    "line": actor_data["line"],
-                    "extracted_values": {
-                        "actor_instance": alias,
-                        "actor_instance_name": actor_data["name"],
-                        "actor_type": actor_data["type"],
-                        "source": "Scenario Missing"
-                    }
-                })
-        return violations
-    
-    # If operation_model is missing but scenario is present, also mark as non-compliant
-    if not operation_model:
-        if actor_instances:
+            for event_line in sorted(event_lines, reverse=True):
+                pos = bisect.bisect_right(unused_activations, event_line)
+                if pos == len(unused_activations):
+                    self.emit("LDR7-ACTIVATION-BAR-SEQUENCE", self._LDR7_MESSAGE, event_line,
+                              line_content=ir.line_content(event_line), lifeline=participant)
+                    continue
+                act_line = unused_activations.pop(pos)
+                next_after_event = ir.next_significant_line(event_line + 1)
+                if next_after_event != act_line:
+                    self.emit("LDR20-ACTIVATION-BAR-SEQUENCE", self._LDR20_MESSAGE, event_line,
+                              line_content=ir.line_content(event_line), lifeline=participant,
+                              activation_line=act_line, next_non_empty_line=next_after_event)
+                pos = bisect.bisect_right(unused_deactivations, act_line)
+                if pos == len(unused_deactivations):
+                    self.emit("LDR20-ACTIVATION-BAR-SEQUENCE", self._LDR20_MESSAGE, act_line,
+                              line_content=ir.line_content(act_line), lifeline=participant, missing_deactivation=True)
+                    continue
+                deact_line = unused_deactivations.pop(pos)
+                next_after_activation = ir.next_significant_line(act_line + 1)
+                if next_after_activation != deact_line:
+                    self.emit("LDR20-ACTIVATION-BAR-SEQUENCE", self._LDR20_MESSAGE, act_line,
+                              line_content=ir.line_content(act_line), lifeline=participant,
+                              deactivation_line=deact_line, next_non_empty_line=next_after_activation)
+
+
+# --- Phase 4: consistency with the Operation Model and the Scenario --------------------
+
+class ActorInstanceConsistencyRule(RuleVisitor):
+    """
+    LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY: actor instance names must be consistent with the
+    actor types defined in the Operation Model and the Scenario (both are required).
+    """
+    rule_ids = ("LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",)
+    phase = 4
+
+    def finish(self) -> None:
+        scenario = self.context.scenario
+        operation_model = self.context.operation_model
+
+        # alias -> {"type": actor_type, "name": actor_name, "line": line_number} (last declaration wins)
+        actor_instances: Dict[str, Dict[str, Any]] = {}
+        for node in self.ir.participants:
+            if node.alias == "system" or _is_system_token(node.alias):
+                continue
+            if ":" in node.label:
+                actor_name, actor_type = node.label.split(":", 1)
+                actor_instances[node.alias] = {"type": actor_type, "name": actor_name, "line": node.line}
+
+        if not scenario or not operation_model:
+            missing, source = ("LUCIM Scenario", "Scenario Missing") if not scenario else ("LUCIM Operation Model", "Operation Model Missing")
+            what = "scenario" if not scenario else "operation model"
             for alias, actor_data in actor_instances.items():
-                violations.append({
-                    "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                    "message": f"LUCIM Operation Model is required for LDR28 validation. Actor instance '{alias}' (name: '{actor_data['name']}', type: '{actor_data['type']}') must be consistent with actor type names defined in the Operation Model and Scenario, but the operation model is not provided.",
-                    "line": actor_data["line"],
-                    "extracted_values": {
-                        "actor_instance": alias,
-                        "actor_instance_name": actor_data["name"],
-                        "actor_type": actor_data["type"],
-                        "source": "Operation Model Missing"
-                    }
-                })
-        return violations
-    
-    # Build expected actor types and instance names from Operation Model
-    expected_types_from_om: set[str] = set()
-    expected_instances_from_om: Dict[str, str] = {}  # type -> instance_name (if specified)
-    if operation_model:
+                self.emit(
+                    "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                    f"{missing} is required for LDR28 validation. Actor instance '{alias}' (name: '{actor_data['name']}', type: '{actor_data['type']}') must be consistent with actor type names defined in the Operation Model and Scenario, but the {what} is not provided.",
+                    actor_data["line"], actor_instance=alias, actor_instance_name=actor_data["name"],
+                    actor_type=actor_data["type"], source=source,
+                )
+            return
+
+        # Expected actor types and instance names from the Operation Model
+        expected_types_from_om: set[str] = set()
+        expected_instances_from_om: Dict[str, str] = {}  # type -> instance_name (if specified)
         actors_node = operation_model.get("actors") or []
         if isinstance(actors_node, dict):
             # Dict format: {"ActMsrCreator": {...}}
             expected_types_from_om.update(actors_node.keys())
-            # Extract instance names if provided in actor objects
             for actor_type, actor_obj in actors_node.items():
                 if isinstance(actor_obj, dict):
                     instance_name = actor_obj.get("name", "").strip()
@@ -575,113 +993,80 @@ def _validate_ldr28_actor_instance_consistency(
                         instance_name = actor.get("name", "").strip()
                         if instance_name:
                             expected_instances_from_om[actor_type] = instance_name
-    
-    # Build expected actor types from Scenario using helper function
-    scenario_actor_data = _extract_actor_types_and_instances_from_scenario(scenario)
-    expected_types_from_scenario = scenario_actor_data.get("actor_types", set())
-    
-    # Validate each actor instance against both Operation Model and Scenario
-    # LDR28 requires consistency with type definitions from both sources
-    # This includes: (1) type must be defined, (2) instance name must be consistent with type
-    for alias, actor_data in actor_instances.items():
-        actor_type = actor_data["type"]
-        actor_name = actor_data["name"]
-        line_num = actor_data["line"]
-        
-        # Check 1: Type must be defined in Operation Model
-        if actor_type not in expected_types_from_om:
-            violations.append({
-                "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                "message": f"Actor instance '{alias}' has type '{actor_type}' which is not defined in the Operation Model. Actor instance names must be consistent with their type definition.",
-                "line": line_num,
-                "extracted_values": {
-                    "actor_instance": alias,
-                    "actor_instance_name": actor_name,
-                    "actor_type": actor_type,
-                    "expected_types_from_om": list(expected_types_from_om),
-                    "source": "Operation Model"
-                }
-            })
-            continue  # Skip further checks if type is invalid
-        
-        # Check 2: Instance name consistency with type (if instance name is specified in Operation Model)
-        # Note: According to LDR28 examples, multiple instance names can be valid for the same type
-        # (e.g., "chris" or "anEcologist" for "ActEcologist"). If the Operation Model specifies
-        # an instance name, we check if the diagram uses that name OR if it's a valid custom name.
-        # Custom names are accepted as long as they follow camelCase (per LDR27) and the type is correct.
-        if actor_type in expected_instances_from_om:
-            expected_instance_name = expected_instances_from_om[actor_type]
-            # Accept if name matches expected OR if it's a valid custom name (camelCase)
-            # Custom names like "chris" for "ActEcologist" are valid per LDR28 examples
-            if actor_name != expected_instance_name and alias != expected_instance_name:
-                # Check if it's a valid camelCase name (per LDR27) - if so, accept it as a custom name
-                if not _CAMEL_CASE_ALIAS_RE.match(actor_name) and not _CAMEL_CASE_ALIAS_RE.match(alias):
-                    # Not camelCase - this is a violation
-                    violations.append({
-                        "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                        "message": f"Actor instance '{alias}' (name: '{actor_name}') is not consistent with the expected instance name '{expected_instance_name}' for type '{actor_type}' in the Operation Model, and does not follow camelCase naming convention. Actor instance names must be consistent with their type definition.",
-                        "line": line_num,
-                        "extracted_values": {
-                            "actor_instance": alias,
-                            "actor_instance_name": actor_name,
-                            "actor_type": actor_type,
-                            "expected_instance_name": expected_instance_name,
-                            "source": "Operation Model"
-                        }
-                    })
-                # If it's valid camelCase, accept it as a custom name (e.g., "chris" for "ActEcologist")
-                # This is compliant per LDR28 examples
-        
-        # Check 3: Instance name should follow camelCase convention (LDR27)
-        # Examples: "actAdministrator" for "ActAdministrator", "chris" for "ActEcologist"
-        # According to LDR28, custom names like "chris" are valid even if they don't match
-        # the camelCase of the type. The important thing is that they are camelCase and the type is correct.
-        # We validate camelCase format here, but accept custom names as long as they're valid camelCase.
-        if not _CAMEL_CASE_ALIAS_RE.match(actor_name) and not _CAMEL_CASE_ALIAS_RE.match(alias):
-            violations.append({
-                "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                "message": f"Actor instance '{alias}' (name: '{actor_name}') does not follow camelCase naming convention (LDR27). Actor instance names must be consistent with their type definition and follow camelCase format.",
-                "line": line_num,
-                "extracted_values": {
-                    "actor_instance": alias,
-                    "actor_instance_name": actor_name,
-                    "actor_type": actor_type,
-                    "source": "Naming Convention"
-                }
-            })
-        
-        # Check 4: Against Scenario (required)
-        # Scenario is required for LDR28 - validate even if empty
-        if not expected_types_from_scenario:
-            # Scenario is present but contains no actor types
-            violations.append({
-                "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                "message": f"Actor instance '{alias}' (name: '{actor_name}') has type '{actor_type}' which is not consistent with the Scenario. The scenario is provided but contains no actor types. Actor instance names must be consistent with their type definition.",
-                "line": line_num,
-                "extracted_values": {
-                    "actor_instance": alias,
-                    "actor_instance_name": actor_name,
-                    "actor_type": actor_type,
-                    "expected_types_from_scenario": [],
-                    "source": "Scenario Empty"
-                }
-            })
-        elif actor_type not in expected_types_from_scenario:
-            violations.append({
-                "id": "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
-                "message": f"Actor instance '{alias}' (name: '{actor_name}') has type '{actor_type}' which is not consistent with the Scenario. Actor instance names must be consistent with their type definition.",
-                "line": line_num,
-                "extracted_values": {
-                    "actor_instance": alias,
-                    "actor_instance_name": actor_name,
-                    "actor_type": actor_type,
-                    "expected_types_from_scenario": list(expected_types_from_scenario),
-                    "source": "Scenario"
-                }
-            })
-    
-    return violations
 
+        expected_types_from_scenario = self.context.scenario_actors.get("actor_types", set())
+
+        for alias, actor_data in actor_instances.items():
+            actor_type = actor_data["type"]
+            actor_name = actor_data["name"]
+            line_num = actor_data["line"]
+            base = dict(actor_instance=alias, actor_instance_name=actor_name, actor_type=actor_type)
+
+            # Check 1: Type must be defined in Operation Model
+            if actor_type not in expected_types_from_om:
+                self.emit(
+                    "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                    f"Actor instance '{alias}' has type '{actor_type}' which is not defined in the Operation Model. Actor instance names must be consistent with their type definition.",
+                    line_num, **base, expected_types_from_om=list(expected_types_from_om), source="Operation Model",
+                )
+                continue
+
+            not_camel_case = not _CAMEL_CASE_ALIAS_RE.match(actor_name) and not _CAMEL_CASE_ALIAS_RE.match(alias)
+
+            # Check 2: Instance name consistency with type. Custom camelCase names (e.g. "chris"
+            # for "ActEcologist") are accepted per the LDR28 examples.
+            if actor_type in expected_instances_from_om:
+                expected_instance_name = expected_instances_from_om[actor_type]
+                if actor_name != expected_instance_name and alias != expected_instance_name and not_camel_case:
+                    self.emit(
+                        "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                        f"Actor instance '{alias}' (name: '{actor_name}') is not consistent with the expected instance name '{expected_instance_name}' for type '{actor_type}' in the Operation Model, and does not follow camelCase naming convention. Actor instance names must be consistent with their type definition.",
+                        line_num, **base, expected_instance_name=expected_instance_name, source="Operation Model",
+                    )
+
+            # Check 3: Instance name should follow camelCase convention (LDR27)
+            if not_camel_case:
+                self.emit(
+                    "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                    f"Actor instance '{alias}' (name: '{actor_name}') does not follow camelCase naming convention (LDR27). Actor instance names must be consistent with their type definition and follow camelCase format.",
+                    line_num, **base, source="Naming Convention",
+                )
+
+            # Check 4: Against Scenario (required, validated even if empty)
+            if not expected_types_from_scenario:
+                self.emit(
+                    "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                    f"Actor instance '{alias}' (name: '{actor_name}') has type '{actor_type}' which is not consistent with the Scenario. The scenario is provided but contains no actor types. Actor instance names must be consistent with their type definition.",
+                    line_num, **base, expected_types_from_scenario=[], source="Scenario Empty",
+                )
+            elif actor_type not in expected_types_from_scenario:
+                self.emit(
+                    "LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY",
+                    f"Actor instance '{alias}' (name: '{actor_name}') has type '{actor_type}' which is not consistent with the Scenario. Actor instance names must be consistent with their type definition.",
+                    line_num, **base, expected_types_from_scenario=list(expected_types_from_scenario), source="Scenario",
+                )
+
+
+# Textual rule visitors, in report order (LDR28 runs only when PlantUML text was found)
+TEXTUAL_RULE_VISITORS: List[type] = [
+    SystemUniqueRule,
+    SystemDeclarationRule,
+    ActorDeclarationRule,
+    ActorInstanceFormatRule,
+    SystemDeclaredFirstRule,
+    ActorDeclaredAfterSystemRule,
+    ActivationOnSystemRule,
+    ActivationNestingRule,
+    ActivationOverlapRule,
+    SystemNoSelfLoopRule,
+    ActorNoActorLoopRule,
+    EventDirectionalityRule,
+    InputEventSyntaxRule,
+    OutputEventSyntaxRule,
+    EventParameterCommaRule,
+    ActivationSequenceRule,
+    ActorInstanceConsistencyRule,
+]
 
 def _generate_missing_svg_violations() -> List[Dict[str, Any]]:
     """
@@ -909,76 +1294,11 @@ def audit_diagram(
         violations.extend(ldr0_violations)
         evaluated_rules.add("LDR0-PLANTUML-BLOCK-ONLY")
 
-    # Extract PlantUML from text or raw_content
-    # First, try to parse as JSON and extract from new format
-    plantuml_text = None
-    
-    # Try to parse text as JSON and extract plantuml-diagram
-    if text:
-        try:
-            import json
-            parsed_json = json.loads(text)
-            if isinstance(parsed_json, dict):
-                # Check for new format: {"data": {"plantuml-diagram": "..."}, "errors": null}
-                if "data" in parsed_json and isinstance(parsed_json.get("data"), dict):
-                    data_node = parsed_json["data"]
-                    if "plantuml-diagram" in data_node:
-                        plantuml_text = data_node["plantuml-diagram"]
-                    # Fallback: check for legacy format with nested diagram
-                    elif "diagram" in data_node and isinstance(data_node["diagram"], dict):
-                        diagram_node = data_node["diagram"]
-                        if "plantuml" in diagram_node:
-                            plantuml_text = diagram_node["plantuml"]
-                # Check for direct "plantuml-diagram" key (unwrapped format)
-                elif "plantuml-diagram" in parsed_json:
-                    plantuml_text = parsed_json["plantuml-diagram"]
-        except (json.JSONDecodeError, TypeError, AttributeError):
-            # Not JSON, continue with text extraction
-            pass
-    
-    # If JSON parsing didn't yield PlantUML, try text extraction
-    if not plantuml_text or not isinstance(plantuml_text, str) or "@startuml" not in plantuml_text:
-        if text:
-            plantuml_text = _extract_plantuml_from_text(text)
-    
-    if not plantuml_text and raw_content:
-        # Try to parse raw_content as JSON first
-        try:
-            import json
-            parsed_json = json.loads(raw_content)
-            if isinstance(parsed_json, dict):
-                if "data" in parsed_json and isinstance(parsed_json.get("data"), dict):
-                    data_node = parsed_json["data"]
-                    if "plantuml-diagram" in data_node:
-                        plantuml_text = data_node["plantuml-diagram"]
-                    elif "diagram" in data_node and isinstance(data_node["diagram"], dict):
-                        diagram_node = data_node["diagram"]
-                        if "plantuml" in diagram_node:
-                            plantuml_text = diagram_node["plantuml"]
-                elif "plantuml-diagram" in parsed_json:
-                    plantuml_text = parsed_json["plantuml-diagram"]
-        except (json.JSONDecodeError, TypeError, AttributeError):
-            pass
-        
-        # If JSON parsing didn't yield PlantUML, try text extraction
-        if not plantuml_text or not isinstance(plantuml_text, str) or "@startuml" not in plantuml_text:
-            plantuml_text = _extract_plantuml_from_text(raw_content)
-    
-    # If no PlantUML found, this will be caught by LDR1 check below
-    if not plantuml_text:
-        plantuml_text = text or raw_content or ""
+    # Extract PlantUML from text, then from raw_content (JSON formats first, then markers)
+    plantuml_text = _resolve_plantuml_text(text, raw_content)
     
-    # Split into lines for rule checking
-    lines = plantuml_text.splitlines()
-    participants_order: List[str] = []  # aliases encountered order
-    has_system_decl = False
-    system_decl_line = -1
-    
-    # Extract actor types and instances from scenario for LDR17 validation
-    scenario_actor_data = _extract_actor_types_and_instances_from_scenario(scenario)
-    scenario_actor_types = scenario_actor_data.get("actor_types", set())
-    scenario_actor_instances = scenario_actor_data.get("actor_instances", set())
-    scenario_instance_to_type = scenario_actor_data.get("actor_instance_to_type", {})
+    # Parse once into the IR; every textual LDR rule is a visitor over it
+    ir = parse_plantuml(plantuml_text)
     
     # Mark rules that are always checked when we have PlantUML content
     if plantuml_text:
@@ -1003,601 +1323,13 @@ def audit_diagram(
             "LDR27-ACTOR-INSTANCE-FORMAT",
         ])
 
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if not line or _is_comment_line(line):
-            continue
-
-        # System declaration specific
-        if _SYSTEM_SIMPLE_RE.match(line):
-            if has_system_decl:
-                violations.append({
-                    "id": "LDR1-SYS-UNIQUE",
-                    "message": "There must be exactly one System lifeline per diagram.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip()}
-                })
-            has_system_decl = True
-            system_decl_line = idx
-            participants_order.append("system")
-            continue
-
-        # Generic participant parsing (actors)
-        mp = _PARTICIPANT_RE.match(line)
-        if mp:
-            alias = mp.group("alias")
-            label = mp.group("label")
-            participants_order.append(alias)
-            # LDR24 — explicit system declaration syntax
-            if alias == "system":
-                if not _SYSTEM_SIMPLE_RE.match(line):
-                    violations.append({
-                        "id": "LDR24-SYSTEM-DECLARATION",
-                        "message": "Declare the System participant using the exact syntax: participant System as system",
-                        "line": idx,
-                        "extracted_values": {"line_content": raw.rstrip()}
-                    })
-                if not has_system_decl:
-                    has_system_decl = True
-                    system_decl_line = idx
-                continue
-
-            # LDR17 — actor declaration strict syntax
-            # Expect label formatted as "actorName:ActActorType" and alias == actorName
-            # Also prefer quoted label per examples
-            # Per updated rule: ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>,
-            # and actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>.
-            if ":" not in label:
-                violations.append({
-                    "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                    "message": 'Each actor must be declared using: participant "anActorName:ActActorType" as anActorName',
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "label": label, "alias": alias}
-                })
-            else:
-                actor_name, actor_type = label.split(":", 1)
-                # alias must equal actor_name
-                if actor_name != alias:
-                    violations.append({
-                        "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                        "message": "Alias must match the actor instance name before ':' in the label.",
-                        "line": idx,
-                        "extracted_values": {"line_content": raw.rstrip(), "label": label, "alias": alias, "expected_alias": actor_name}
-                    })
-                # type must match Act[A-Z][A-Za-z0-9]*
-                if not _ACTOR_TYPE_RE.match(actor_type):
-                    violations.append({
-                        "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                        "message": 'Actor type must match pattern Act[A-Z][A-Za-z0-9]*.',
-                        "line": idx,
-                        "extracted_values": {"line_content": raw.rstrip(), "actor_type": actor_type}
-                    })
-                
-                # LDR17 updated: Validate against scenario
-                # ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>
-                # If scenario is not present, this rule is non-compliant
-                if not scenario:
-                    violations.append({
-                        "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                        "message": f"LUCIM Scenario is required for LDR17 validation. ActActorType '{actor_type}' and actorInstanceName '{actor_name}' must be valid as defined in the <LUCIM-SCENARIO>, but the scenario is not provided.",
-                        "line": idx,
-                        "extracted_values": {
-                            "line_content": raw.rstrip(),
-                            "actor_type": actor_type,
-                            "actor_instance_name": actor_name,
-                            "source": "Scenario Missing"
-                        }
-                    })
-                else:
-                    # Scenario is present - always validate (even if empty, it should be a violation)
-                    if not scenario_actor_types:
-                        # Scenario is present but contains no actor types
-                        violations.append({
-                            "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                            "message": f"Actor type '{actor_type}' is not defined in the LUCIM Scenario. The scenario is provided but contains no actor types. ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>.",
-                            "line": idx,
-                            "extracted_values": {
-                                "line_content": raw.rstrip(),
-                                "actor_type": actor_type,
-                                "expected_actor_types": [],
-                                "source": "Scenario Empty"
-                            }
-                        })
-                    elif actor_type not in scenario_actor_types:
-                        violations.append({
-                            "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                            "message": f"Actor type '{actor_type}' is not defined in the LUCIM Scenario. ActActorType must be a valid actor type as defined in the <LUCIM-SCENARIO>.",
-                            "line": idx,
-                            "extracted_values": {
-                                "line_content": raw.rstrip(),
-                                "actor_type": actor_type,
-                                "expected_actor_types": list(scenario_actor_types),
-                                "source": "Scenario"
-                            }
-                        })
-                
-                # LDR17 updated: actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>
-                if not scenario:
-                    # Already handled above, skip
-                    pass
-                elif not scenario_actor_instances:
-                    # Scenario is present but contains no actor instances
-                    violations.append({
-                        "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                        "message": f"Actor instance name '{actor_name}' is not defined in the LUCIM Scenario. The scenario is provided but contains no actor instances. actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>.",
-                        "line": idx,
-                        "extracted_values": {
-                            "line_content": raw.rstrip(),
-                            "actor_instance_name": actor_name,
-                            "expected_actor_instances": [],
-                            "source": "Scenario Empty"
-                        }
-                    })
-                elif actor_name not in scenario_actor_instances:
-                    violations.append({
-                        "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                        "message": f"Actor instance name '{actor_name}' is not defined in the LUCIM Scenario. actorInstanceName must be a valid actor instance name as defined in the <LUCIM-SCENARIO>.",
-                        "line": idx,
-                        "extracted_values": {
-                            "line_content": raw.rstrip(),
-                            "actor_instance_name": actor_name,
-                            "expected_actor_instances": list(scenario_actor_instances),
-                            "source": "Scenario"
-                        }
-                    })
-                elif actor_name in scenario_instance_to_type:
-                    # Also validate that the instance name matches the expected type for that instance
-                    expected_type_for_instance = scenario_instance_to_type[actor_name]
-                    if actor_type != expected_type_for_instance:
-                        violations.append({
-                            "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                            "message": f"Actor instance name '{actor_name}' is associated with type '{expected_type_for_instance}' in the LUCIM Scenario, but the diagram declares it as '{actor_type}'. Actor instance names must be consistent with their type definition in the <LUCIM-SCENARIO>.",
-                            "line": idx,
-                            "extracted_values": {
-                                "line_content": raw.rstrip(),
-                                "actor_instance_name": actor_name,
-                                "actor_type": actor_type,
-                                "expected_type_for_instance": expected_type_for_instance,
-                                "source": "Scenario"
-                            }
-                        })
-            
-            # Prefer quoted label — if not quoted in original line, flag (soft) LDR17
-            # Heuristic: there should be a quoted segment before " as "
-            if ' as ' in line and '"' not in line.split(' as ')[0]:
-                violations.append({
-                    "id": "LDR17-ACTOR-DECLARATION-SYNTAX",
-                    "message": 'Actor label should be quoted: participant "anActorName:ActActorType" as anActorName',
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip()}
-                })
-
-            # LDR27 — camelCase for actor instance (alias)
-            if not _CAMEL_CASE_ALIAS_RE.match(alias):
-                violations.append({
-                    "id": "LDR27-ACTOR-INSTANCE-FORMAT",
-                    "message": "All actor instance names must be human-readable in camelCase.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "alias": alias}
-                })
-            if alias != "system" and not has_system_decl:
-                violations.append({
-                    "id": "LDR3-SYSTEM-DECLARED-FIRST",
-                    "message": "The System must be declared first before all actors.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "participant_label": label, "participant_alias": alias}
-                })
-            if alias == "system" and not has_system_decl:
-                # This matches system declared with quotes label; mark presence
-                has_system_decl = True
-                system_decl_line = idx
-            continue
-
-    # After scanning participants, ensure actors declared after system
-    if has_system_decl:
-        try:
-            sys_index = participants_order.index("system")
-            for pos, alias in enumerate(participants_order):
-                if alias != "system" and pos < sys_index:
-                    # Find the line where this actor was declared
-                    actor_line = 1
-                    actor_line_content = ""
-                    for line_idx, raw_line in enumerate(lines, start=1):
-                        stripped = raw_line.strip()
-                        mp_match = _PARTICIPANT_RE.match(stripped)
-                        if mp_match and mp_match.group("alias") == alias:
-                            actor_line = line_idx
-                            actor_line_content = raw_line.rstrip()
-                            break
-                    violations.append({
-                        "id": "LDR2-ACTOR-DECLARED-AFTER-SYSTEM",
-                        "message": "The actors must be declared after the System.",
-                        "line": actor_line,
-                        "extracted_values": {"line_content": actor_line_content, "actor_alias": alias, "system_decl_line": system_decl_line}
-                    })
-                    break
-        except ValueError:
-            pass
-    else:
-        # Find first non-empty line for context
-        first_line_content = ""
-        for raw_line in lines:
-            stripped = raw_line.strip()
-            if stripped and not _is_comment_line(stripped):
-                first_line_content = raw_line.rstrip()
-                break
-        violations.append({
-            "id": "LDR1-SYS-UNIQUE",
-            "message": "System participant not declared (expected: participant System as system).",
-            "line": 1,
-            "extracted_values": {"line_content": first_line_content if first_line_content else "(empty file)"}
-        })
-
-    # Pass 2: scan messages and activations
-    # Track structure for LDR8, LDR9, LDR10
-    activation_stack: Dict[str, List[int]] = {}  # Track active activations per lifeline for nesting/overlap
-    last_activation_line: Dict[str, int] = {}  # Track last activation per lifeline
-    
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if not line or _is_comment_line(line):
-            continue
-
-        # forbid activating system
-        ma = _ACTIVATE_RE.match(line)
-        if ma:
-            who = ma.group("who")
-            if _is_system_token(who):
-                violations.append({
-                    "id": "LDR10-ACTIVATION-BAR-ON-SYSTEM-FORBIDDEN",
-                    "message": "There must be NO activation bar in the System lifeline. Never activate System.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "lifeline": who}
-                })
-                continue
-            
-            # LDR8: Check for nesting (activation while already active)
-            if who in activation_stack and len(activation_stack[who]) > 0:
-                violations.append({
-                    "id": "LDR8-ACTIVATION-BAR-NESTING-FORBIDDEN",
-                    "message": "Activation bars must never be nested.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "lifeline": who}
-                })
-            
-            # LDR9: Check for overlapping (new activation before previous deactivation)
-            # Overlap occurs if there's an active activation and no deactivation between last activation and this one
-            if who in activation_stack and len(activation_stack[who]) > 0:
-                # There's already an active activation - check if it was deactivated
-                last_activation = activation_stack[who][-1]
-                deactivated_after = False
-                for check_idx in range(last_activation + 1, idx):
-                    check_line = lines[check_idx - 1].strip()
-                    deactivate_match = _DEACTIVATE_RE.match(check_line)
-                    if deactivate_match and deactivate_match.group("who") == who:
-                        deactivated_after = True
-                        break
-                if not deactivated_after:
-                    violations.append({
-                        "id": "LDR9-ACTIVATION-BAR-OVERLAPPING-FORBIDDEN",
-                        "message": "Activation bars must never overlap. Following sequence is forbidden: an event, start of activation bar of this event, another event before the end of the activation bar.",
-                        "line": idx,
-                        "extracted_values": {"line_content": raw.rstrip(), "lifeline": who}
-                    })
-            
-            # Track activation
-            if who not in activation_stack:
-                activation_stack[who] = []
-            activation_stack[who].append(idx)
-            last_activation_line[who] = idx
-            continue
-
-        md = _DEACTIVATE_RE.match(line)
-        if md:
-            who = md.group("who")
-            # Remove from activation stack
-            if who in activation_stack and len(activation_stack[who]) > 0:
-                activation_stack[who].pop()
-            continue
-
-        mm = _MSG_RE.match(line)
-        if not mm:
-            continue
-        lhs = mm.group("lhs")
-        rhs = mm.group("rhs")
-        name = mm.group("name")
-        arrow = mm.group("arrow")
-        params_raw = mm.group("params")
-        lhs_is_system = _is_system_token(lhs)
-        rhs_is_system = _is_system_token(rhs)
-        lhs_is_actor = not lhs_is_system
-        rhs_is_actor = not rhs_is_system
-
-        # Track messages for later activation verification (Pass 3)
-
-        # LDR5 — no System→System
-        if lhs_is_system and rhs_is_system:
-            violations.append({
-                "id": "LDR5-SYSTEM-NO-SELF-LOOP",
-                "message": "Events must never be from System to System. System → System",
-                "line": idx,
-                "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name}
-            })
-
-        # LDR6 — no Actor→Actor
-        if lhs_is_actor and rhs_is_actor:
-            violations.append({
-                "id": "LDR6-ACTOR-NO-ACTOR-LOOP",
-                "message": "Events must never be from Actor to Actor. Actor → Actor",
-                "line": idx,
-                "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name}
-            })
-
-        # LDR4 — must connect exactly one Actor and the System
-        if not ((lhs_is_system and rhs_is_actor) or (lhs_is_actor and rhs_is_system)):
-            violations.append({
-                "id": "LDR4-EVENT-DIRECTIONALITY",
-                "message": "Every message in a LUCIM interaction must connect exactly one Actor lifeline and the System lifeline.",
-                "line": idx,
-                "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name}
-            })
-
-        # LDR25 — ie* events must use dashed arrows (-->)
-        if name.startswith("ie"):
-            if not (lhs_is_system and rhs_is_actor):
-                violations.append({
-                    "id": "LDR25-INPUT-EVENT-SYNTAX",
-                    "message": "ie events must be modeled using dashed arrows and following this declaration syntax: system --> theParticipant : ieMessageName(EP)",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name, "arrow": arrow}
-                })
-            elif not arrow.startswith("--"):
-                violations.append({
-                    "id": "LDR25-INPUT-EVENT-SYNTAX",
-                    "message": "ie events must be modeled using dashed arrows (-->).",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name, "arrow": arrow}
-                })
-        
-        # LDR26 — oe* events must use continuous arrows (->)
-        if name.startswith("oe"):
-            if not (lhs_is_actor and rhs_is_system):
-                violations.append({
-                    "id": "LDR26-OUTPUT-EVENT-SYNTAX",
-                    "message": "oe events must be modeled using continuous arrows and following this declaration syntax: theParticipant -> system : oeMessage(EP)",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name, "arrow": arrow}
-                })
-            elif arrow != "->":
-                violations.append({
-                    "id": "LDR26-OUTPUT-EVENT-SYNTAX",
-                    "message": "oe events must be modeled using continuous arrows (->).",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "sender": lhs, "receiver": rhs, "event_name": name, "arrow": arrow}
-                })
-
-        # LDR23 — parameters must be comma-separated (basic validation)
-        if params_raw is not None:
-            # Quick disallow common wrong separators
-            if ";" in params_raw or "|" in params_raw:
-                violations.append({
-                    "id": "LDR23-EVENT-PARAMETER-COMMA-SEPARATED",
-                    "message": "Multiple parameters must be comma-separated.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "params": params_raw}
-                })
-            # Split by commas while respecting simple quotes
-            def _split_params(p: str) -> list:
-                parts = []
-                buf = []
-                in_single = False
-                in_double = False
-                for ch in p:
-                    if ch == "'" and not in_double:
-                        in_single = not in_single
-                        buf.append(ch)
-                        continue
-                    if ch == '"' and not in_single:
-                        in_double = not in_double
-                        buf.append(ch)
-                        continue
-                    if ch == "," and not in_single and not in_double:
-                        parts.append("".join(buf).strip())
-                        buf = []
-                        continue
-                    buf.append(ch)
-                if buf is not None:
-                    parts.append("".join(buf).strip())
-                return parts if not (len(parts) == 1 and parts[0] == "") else []
-
-            params_list = _split_params(params_raw.strip())
-            # If there is any empty parameter between commas -> violation
-            if any(p == "" for p in params_list if len(params_list) > 1):
-                violations.append({
-                    "id": "LDR23-EVENT-PARAMETER-COMMA-SEPARATED",
-                    "message": "Multiple parameters must be valid comma-separated values without empty items.",
-                    "line": idx,
-                    "extracted_values": {"line_content": raw.rstrip(), "params": params_raw}
-                })
-
-    # Helper function to find the next non-empty, non-comment line after a given line number
-    # This respects LDR19: blank lines and comments are allowed and must be ignored
-    def _find_next_non_empty_line(start_line: int, max_line: int) -> int | None:
-        """Find the next non-empty, non-comment line after start_line (inclusive)."""
-        for idx in range(start_line, max_line + 1):
-            if idx > len(lines):
-                return None
-            line = lines[idx - 1].strip()
-            if line and not _is_comment_line(line):
-                return idx
-        return None
-    
-    # Pass 3: Verify that each event has a corresponding activation (LDR7) and deactivation (LDR20)
-    # Track events that need activations
-    events_needing_activation: Dict[str, List[int]] = {}  # participant -> list of event line numbers
-    activations_by_participant: Dict[str, List[int]] = {}  # participant -> list of activation line numbers
-    deactivations_by_participant: Dict[str, List[int]] = {}  # participant -> list of deactivation line numbers
-    
-    for idx, raw in enumerate(lines, start=1):
-        line = raw.strip()
-        if not line or _is_comment_line(line):
-            continue
-        
-        mm = _MSG_RE.match(line)
-        if mm:
-            lhs = mm.group("lhs")
-            rhs = mm.group("rhs")
-            lhs_is_system = _is_system_token(lhs)
-            rhs_is_system = _is_system_token(rhs)
-            
-            # Only actors need activations (LDR7, LDR10)
-            if not lhs_is_system:
-                if lhs not in events_needing_activation:
-                    events_needing_activation[lhs] = []
-                events_needing_activation[lhs].append(idx)
-            if not rhs_is_system:
-                if rhs not in events_needing_activation:
-                    events_needing_activation[rhs] = []
-                events_needing_activation[rhs].append(idx)
-        
-        ma = _ACTIVATE_RE.match(line)
-        if ma:
-            who = ma.group("who")
-            if not _is_system_token(who):
-                if who not in activations_by_participant:
-                    activations_by_participant[who] = []
-                activations_by_participant[who].append(idx)
-        
-        md = _DEACTIVATE_RE.match(line)
-        if md:
-            who = md.group("who")
-            if not _is_system_token(who):
-                if who not in deactivations_by_participant:
-                    deactivations_by_participant[who] = []
-                deactivations_by_participant[who].append(idx)
-    
-    # Check if each event has a corresponding activation and deactivation (LDR7, LDR20)
-    # 
-    # LDR20 Implementation Notes:
-    # 1. Multiple events for same participant: Events are processed in reverse order (most recent first)
-    #    to correctly associate activations with the last event. Earlier events without activations
-    #    are flagged as violations. Example: oeEvent1(), oeEvent2(), activate -> activation belongs
-    #    to oeEvent2, oeEvent1 is flagged as missing activation.
-    # 
-    # 2. Blank lines and comments: Per LDR19, blank lines and comments are ignored. The
-    #    _find_next_non_empty_line() helper function ensures that gaps with only blank lines or
-    #    comments between events and activations are not flagged as violations.
-    # 
-    # 3. Activation tracking: The logic tracks which activations and deactivations have been used
-    #    to avoid double-counting and ensure each activation is only paired with one event.
-    # 
-    # 4. Sequence validation: The sequence check uses next_non_empty_line to respect LDR19, ensuring
-    #    that blank lines and comments between event -> activate -> deactivate are allowed.
-    
-    for participant, event_lines in events_needing_activation.items():
-        activation_lines = sorted(activations_by_participant.get(participant, []))
-        deactivation_lines = sorted(deactivations_by_participant.get(participant, []))
-        
-        if not activation_lines:
-            # No activations at all for this participant
-            for event_line in event_lines:
-                violations.append({
-                    "id": "LDR7-ACTIVATION-BAR-SEQUENCE",
-                    "message": "For each event, an activation must be used, it must occur on the Actor lifeline immediately after the event occurrence.",
-                    "line": event_line,
-                    "extracted_values": {"line_content": lines[event_line - 1].rstrip() if event_line <= len(lines) else "", "lifeline": participant}
-                })
-        else:
-            # Track which activations and deactivations have been used to avoid double-counting
-            used_activations: set[int] = set()
-            used_deactivations: set[int] = set()
-            
-            # Check if each event has an activation that follows it
-            # Strategy: Process events in reverse order to associate activations with the last (most recent) event
-            # This ensures that if multiple events exist without activations between them, the activation
-            # is correctly associated with the last event, and earlier events are flagged as missing activations
-            for event_line in sorted(event_lines, reverse=True):
-                # Find the first unused activation after this event (closest to the event)
-                found_activation = False
-                # Sort activations to find the closest one after this event
-                closest_activation = None
-                for act_line in sorted(activation_lines):
-                    if act_line > event_line and act_line not in used_activations:
-                        closest_activation = act_line
-                        break  # Take the first (closest) activation after this event
-                
-                if closest_activation is not None:
-                    act_line = closest_activation
-                    # Check if activation immediately follows (LDR20)
-                    # Per LDR19, blank lines and comments are ignored, so we check the next non-empty line
-                    next_non_empty_after_event = _find_next_non_empty_line(event_line + 1, len(lines))
-                    if next_non_empty_after_event != act_line:
-                        violations.append({
-                            "id": "LDR20-ACTIVATION-BAR-SEQUENCE",
-                            "message": "Strictly follow this sequence: (1) event declaration, (2) activate the participant, (3) deactivate the participant.",
-                            "line": event_line,
-                            "extracted_values": {
-                                "line_content": lines[event_line - 1].rstrip() if event_line <= len(lines) else "",
-                                "lifeline": participant,
-                                "activation_line": act_line,
-                                "next_non_empty_line": next_non_empty_after_event
-                            }
-                        })
-                    
-                    # Check if there's a deactivation after this activation (LDR20)
-                    found_deactivation = False
-                    for deact_line in deactivation_lines:
-                        if deact_line > act_line and deact_line not in used_deactivations:
-                            # Check if deactivation immediately follows activation (ignoring blank lines/comments per LDR19)
-                            next_non_empty_after_activation = _find_next_non_empty_line(act_line + 1, len(lines))
-                            if next_non_empty_after_activation != deact_line:
-                                violations.append({
-                                    "id": "LDR20-ACTIVATION-BAR-SEQUENCE",
-                                    "message": "Strictly follow this sequence: (1) event declaration, (2) activate the participant, (3) deactivate the participant.",
-                                    "line": act_line,
-                                    "extracted_values": {
-                                        "line_content": lines[act_line - 1].rstrip() if act_line <= len(lines) else "",
-                                        "lifeline": participant,
-                                        "deactivation_line": deact_line,
-                                        "next_non_empty_line": next_non_empty_after_activation
-                                    }
-                                })
-                            found_deactivation = True
-                            used_deactivations.add(deact_line)
-                            break
-                    
-                    if not found_deactivation:
-                        violations.append({
-                            "id": "LDR20-ACTIVATION-BAR-SEQUENCE",
-                            "message": "Strictly follow this sequence: (1) event declaration, (2) activate the participant, (3) deactivate the participant.",
-                            "line": act_line,
-                            "extracted_values": {
-                                "line_content": lines[act_line - 1].rstrip() if act_line <= len(lines) else "",
-                                "lifeline": participant,
-                                "missing_deactivation": True
-                            }
-                        })
-                    
-                    found_activation = True
-                    used_activations.add(act_line)
-                
-                if not found_activation:
-                    violations.append({
-                        "id": "LDR7-ACTIVATION-BAR-SEQUENCE",
-                        "message": "For each event, an activation must be used, it must occur on the Actor lifeline immediately after the event occurrence.",
-                        "line": event_line,
-                        "extracted_values": {"line_content": lines[event_line - 1].rstrip() if event_line <= len(lines) else "", "lifeline": participant}
-                    })
-
-    # LDR28: Actor instance name consistency (requires BOTH operation_model AND scenario)
-    # Always evaluate LDR28 - the function will handle missing scenario/operation_model by returning violations
+    # LDR28 requires BOTH operation_model AND scenario; it reports their absence itself
+    context = _RuleContext(ir, scenario=scenario, operation_model=operation_model)
+    visitor_classes = TEXTUAL_RULE_VISITORS if plantuml_text else [
+        cls for cls in TEXTUAL_RULE_VISITORS if cls is not ActorInstanceConsistencyRule
+    ]
+    violations.extend(run_rule_visitors(ir, [cls(context) for cls in visitor_classes]))
     if plantuml_text:
-        ldr28_violations = _validate_ldr28_actor_instance_consistency(
-            plantuml_text,
-            operation_model,
-            scenario
-        )
-        violations.extend(ldr28_violations)
         evaluated_rules.add("LDR28-ACTOR-INSTANCE-NAME-CONSISTENCY")
 
     # Graphical rules validation (LDR11-LDR16)
@@ -1697,7 +1429,6 @@ bill -> system : oeLogin()
 system --> bill : ieWelcome()
 @enduml
 """
-    import json
     print(json.dumps(audit_diagram(sample), indent=2))
 
 
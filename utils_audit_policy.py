@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Audit Policy Utility
+Decides, at each stage iteration, whether the LLM auditor runs. The deterministic Python
+auditors (utils_audit_operation_model / _scenario / _diagram) take milliseconds:
+
+- llm-always: the LLM auditor always runs and decides compliance (Python audit for comparison only)
+- python-gate: the Python audit runs first; the LLM auditor is skipped when it finds a hard
+  violation (block format, unparseable JSON, missing System), otherwise the LLM auditor decides
+- python-only: the LLM auditor never runs; the Python audit decides compliance
+
+A skipped LLM audit is replaced by an auditor-shaped report built from the Python findings,
+so extract_audit_core, the compliance decision and the corrective generator iteration use it
+unchanged.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from utils_summary_stats import register_summary_stats
+
+AUDIT_POLICIES = ("llm-always", "python-gate", "python-only")
+
+# Violations that make an LLM audit pointless: the artifact is not even well-formed
+DEFAULT_HARD_RULES = frozenset({
+    "LOM0-JSON-BLOCK-ONLY",          # also reported when the Operation Model JSON does not parse
+    "LSC0-JSON-BLOCK-ONLY",          # also reported when the Scenario JSON does not parse
+    "LDR0-PLANTUML-BLOCK-ONLY",
+    "LDR3-SYSTEM-DECLARED-FIRST",    # System missing or declared after actors
+    "LDR24-SYSTEM-DECLARATION",
+})
+
+_STAT_KEYS = ("llm_audits", "gated", "python_only")
+
+_EMPTY_COVERAGE = {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []}
+
+
+def python_findings(py_audit: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Normalize a Python audit result to {"verdict": bool | None, "non-compliant-rules": [...]}.
+
+    Accepts the operation model / scenario shape ({"verdict": bool, "violations": [{"id", "message",
+    "line"}]}) and the diagram shape ({"data": {"verdict": "compliant", "non-compliant-rules":
+    [{"rule", "line", "msg"}]}}). Rules use the LLM auditor entry shape {"rule", "line", "msg"}.
+    """
+    py_audit = py_audit if isinstance(py_audit, dict) else {}
+    node = py_audit.get("data") if isinstance(py_audit.get("data"), dict) else py_audit
+    verdict = node.get("verdict")
+    if isinstance(verdict, str):
+        verdict = {"compliant": True, "non-compliant": False}.get(verdict.strip().lower())
+    elif not isinstance(verdict, bool):
+        verdict = None
+
+    rules: List[Dict[str, str]] = []
+    for entry in node.get("non-compliant-rules") or node.get("violations") or []:
+        if not isinstance(entry, dict):
+            continue
+        rule_id = entry.get("rule") or entry.get("id")
+        if not rule_id:
+            continue
+        line = entry.get("line", entry.get("location", "0"))
+        rules.append({
+            "rule": str(rule_id),
+            "line": str(line if line not in (None, "") else "0"),
+            "msg": str(entry.get("msg") or entry.get("message") or ""),
+        })
+    coverage = node.get("coverage") if isinstance(node.get("coverage"), dict) else None
+    return {"verdict": verdict, "non-compliant-rules": rules, "coverage": coverage}
+
+
+def python_audit_report(py_audit: Optional[Dict[str, Any]], reason: str) -> Dict[str, Any]:
+    """
+    Build an LLM-auditor-shaped result (same keys as aaudit_operation_model) from a Python audit.
+
+    Args:
+        py_audit: Result of a deterministic Python auditor
+        reason: Why the LLM auditor did not run (kept in reasoning_summary)
+    """
+    findings = python_findings(py_audit)
+    verdict = "compliant" if findings["verdict"] and not findings["non-compliant-rules"] else "non-compliant"
+    coverage = {**_EMPTY_COVERAGE, **(findings["coverage"] or {})}
+    data = {
+        "verdict": verdict,
+        "non-compliant-rules": findings["non-compliant-rules"],
+        "coverage": coverage,
+        "audit_source": "python",
+    }
+    return {
+        "reasoning_summary": f"LLM auditor not run ({reason}); verdict and findings from the deterministic Python auditor.",
+        "data": data,
+        "verdict": verdict,
+        "non-compliant-rules": data["non-compliant-rules"],
+        "coverage": coverage,
+        "errors": None,
+        "tokens_used": 0,
+        "input_tokens": 0,
+        "visible_output_tokens": 0,
+        "raw_usage": {},
+        "reasoning_tokens": 0,
+        "total_output_tokens": 0,
+        "raw_response": {},
+    }
+
+
+class AuditPolicy:
+    """Decides whether the LLM auditor runs, from the Python audit of the same artifact."""
+
+    def __init__(self, mode: str = "llm-always", hard_rules: Iterable[str] = DEFAULT_HARD_RULES):
+        """
+        Initialize the policy.
+
+        Args:
+            mode: One of AUDIT_POLICIES
+            hard_rules: Rule IDs that skip the LLM auditor under python-gate
+
+        Raises:
+            ValueError: If mode is not one of AUDIT_POLICIES
+        """
+        mode = (mode or "llm-always").strip().lower()
+        if mode not in AUDIT_POLICIES:
+            raise ValueError(f"Unknown audit policy {mode!r}; expected one of {', '.join(AUDIT_POLICIES)}")
+        self.mode = mode
+        self.hard_rules: FrozenSet[str] = frozenset(hard_rules)
+        self.stats = {k: 0 for k in _STAT_KEYS}
+        self._lock = threading.Lock()
+
+    @property
+    def python_first(self) -> bool:
+        """True when the Python audit must run before the LLM auditor can be scheduled."""
+        return self.mode != "llm-always"
+
+    def hard_violations(self, py_audit: Optional[Dict[str, Any]]) -> List[str]:
+        """Return the hard rule IDs violated in a Python audit result (sorted, unique)."""
+        return sorted({r["rule"] for r in python_findings(py_audit)["non-compliant-rules"] if r["rule"] in self.hard_rules})
+
+    def skip_reason(self, py_audit: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Decide whether the LLM auditor runs for one artifact.
+
+        Args:
+            py_audit: Python audit of the artifact (None when it has not run yet)
+
+        Returns:
+            None when the LLM auditor must run, otherwise the reason it is skipped
+        """
+        reason = None
+        if self.mode == "python-only":
+            reason = "audit policy python-only"
+        elif self.mode == "python-gate" and py_audit is not None:
+            hard = self.hard_violations(py_audit)
+            if hard:
+                reason = f"audit policy python-gate: {', '.join(hard)}"
+        key = "llm_audits" if reason is None else ("python_only" if self.mode == "python-only" else "gated")
+        with self._lock:
+            self.stats[key] += 1
+        return reason
+
+
+def format_audit_policy_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of audit policy counters for run logs."""
+    return (
+        f"LLM audits={stats.get('llm_audits', 0)} | skipped: hard violations={stats.get('gated', 0)} "
+        f"python-only={stats.get('python_only', 0)}"
+    )
+
+
+_audit_policy: Optional[AuditPolicy] = None
+_audit_policy_lock = threading.Lock()
+
+
+def get_audit_policy() -> AuditPolicy:
+    """Return the process-wide audit policy configured from utils_config_constants (AUDIT_POLICY*)."""
+    global _audit_policy
+    with _audit_policy_lock:
+        if _audit_policy is None:
+            from utils_config_constants import AUDIT_POLICY, AUDIT_POLICY_HARD_RULES
+            _audit_policy = AuditPolicy(AUDIT_POLICY, AUDIT_POLICY_HARD_RULES or DEFAULT_HARD_RULES)
+        return _audit_policy
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    policy = get_audit_policy()
+    return policy.stats if policy.python_first else None
+
+
+register_summary_stats("Audit policy", _summary_stats, format_audit_policy_stats)
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Batch API Utility
+Offline execution of OpenAI calls through the provider Batch API (LLM_BATCH=on).
+
+Concurrent sweep combinations hand their requests to one process-wide BatchCollector.
+Requests pending at the same time form a wave (e.g. the iter-1 generator calls of every
+combination, then their audits, then the iter-2 corrections, ...). Each wave is written
+as one JSONL file per model, submitted as one batch, and all outstanding batches are
+polled by a single loop. Results are fanned back to the awaiting callers, which persist
+the usual iter-<k>/{1-generator, 2-auditor} artifacts.
+
+LocalBatchServer is an in-process stand-in for the Files + Batches endpoints (tests, dry runs).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import re
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from utils_response_dump import to_attr_namespace
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/responses"
+BATCH_COMPLETION_WINDOW = "24h"
+# OpenAI limit on the number of requests of one batch file
+MAX_BATCH_REQUESTS = 50000
+
+_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Participant (sweep combination) of the current context; requests made outside participant() share None
+_participant_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("batch_participant", default=None)
+_participant_ids = itertools.count(1)
+_STAT_KEYS = ("waves", "batches", "requests", "succeeded", "failed")
+
+
+class BatchRequestError(RuntimeError):
+    """Raised to the caller of one request that failed inside a batch (or whose batch failed)."""
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", value or "model").strip("-") or "model"
+
+
+def build_batch_line(custom_id: str, api_config: Dict[str, Any]) -> str:
+    """Return the JSONL line of one Responses API request in a batch input file."""
+    return json.dumps(
+        {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": api_config},
+        ensure_ascii=False, default=str,
+    )
+
+
+def parse_batch_output(text: str) -> Dict[str, Dict[str, Any]]:
+    """Index the lines of a batch output (or error) file by custom_id; unreadable lines are skipped."""
+    lines: Dict[str, Dict[str, Any]] = {}
+    for raw in (text or "").splitlines():
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"[BATCH] Skipping unreadable output line: {raw[:120]}")
+            continue
+        if isinstance(line, dict) and line.get("custom_id"):
+            lines[line["custom_id"]] = line
+    return lines
+
+
+def _line_error(line: Dict[str, Any]) -> Optional[str]:
+    """Return the error message of an output line, or None when it holds a successful response."""
+    if line.get("error"):
+        error = line["error"]
+        return error.get("message") if isinstance(error, dict) else str(error)
+    response = line.get("response") or {}
+    if response.get("status_code") != 200:
+        body = response.get("body") or {}
+        message = (body.get("error") or {}).get("message") if isinstance(body, dict) else None
+        return f"HTTP {response.get('status_code')}: {message or body}"
+    return None
+
+
+def _file_text(content: Any) -> str:
+    """Text of a files.content() result (SDK binary response, bytes or str)."""
+    text = getattr(content, "text", content)
+    if callable(text):
+        text = text()
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    return text or ""
+
+
+class LocalBatchServer:
+    """
+    In-process stand-in for the OpenAI Files + Batches endpoints.
+
+    Exposes the subset used by BatchCollector (client.files.create / content,
+    client.batches.create / retrieve / cancel). Files live under root; a batch is
+    answered by calling responder(body) for each request once it has been
+    retrieved polls_until_done times. Exceptions raised by responder end up in
+    the error file as HTTP 500 lines.
+    """
+
+    def __init__(self, root: Path | str, responder: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 polls_until_done: int = 1):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+        self.polls_until_done = max(0, int(polls_until_done))
+        self.created: List[str] = []
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch,
+                                       cancel=self._cancel_batch)
+
+    def _write(self, data: bytes) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        (self.root / file_id).write_bytes(data)
+        return file_id
+
+    def _create_file(self, file: Any, purpose: str = "batch") -> Any:
+        data = file.read() if hasattr(file, "read") else Path(file).read_bytes()
+        return SimpleNamespace(id=self._write(data if isinstance(data, bytes) else data.encode("utf-8")), purpose=purpose)
+
+    def _file_content(self, file_id: str) -> Any:
+        return SimpleNamespace(text=(self.root / file_id).read_text(encoding="utf-8"))
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str,
+                      metadata: Optional[Dict[str, str]] = None) -> Any:
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = {
+            "id": batch_id, "status": "validating", "input_file_id": input_file_id, "endpoint": endpoint,
+            "completion_window": completion_window, "metadata": metadata or {}, "polls": 0,
+            "output_file_id": None, "error_file_id": None, "request_counts": None,
+        }
+        self.created.append(batch_id)
+        return self._retrieve_batch(batch_id, count=False)
+
+    def _cancel_batch(self, batch_id: str) -> Any:
+        batch = self._batches[batch_id]
+        if batch["status"] not in _TERMINAL_STATUSES:
+            batch["status"] = "cancelled"
+        return self._retrieve_batch(batch_id, count=False)
+
+    def _retrieve_batch(self, batch_id: str, count: bool = True) -> Any:
+        batch = self._batches[batch_id]
+        if count and batch["status"] not in _TERMINAL_STATUSES:
+            batch["polls"] += 1
+            batch["status"] = "in_progress"
+            if batch["polls"] >= self.polls_until_done:
+                self._complete(batch)
+        return SimpleNamespace(**{k: v for k, v in batch.items() if k != "polls"})
+
+    def _complete(self, batch: Dict[str, Any]) -> None:
+        outputs, errors = [], []
+        for raw in (self.root / batch["input_file_id"]).read_text(encoding="utf-8").splitlines():
+            if not raw.strip():
+                continue
+            request = json.loads(raw)
+            try:
+                body = self.responder(request["body"])
+                outputs.append({"id": f"req-{uuid.uuid4().hex[:8]}", "custom_id": request["custom_id"],
+                                "response": {"status_code": 200, "body": body}, "error": None})
+            except Exception as e:
+                errors.append({"id": f"req-{uuid.uuid4().hex[:8]}", "custom_id": request["custom_id"],
+                               "response": {"status_code": 500, "body": {"error": {"message": str(e)}}}, "error": None})
+        if outputs:
+            batch["output_file_id"] = self._write("\n".join(json.dumps(o) for o in outputs).encode("utf-8"))
+        if errors:
+            batch["error_file_id"] = self._write("\n".join(json.dumps(e) for e in errors).encode("utf-8"))
+        batch["request_counts"] = SimpleNamespace(total=len(outputs) + len(errors), completed=len(outputs),
+                                                  failed=len(errors))
+        batch["status"] = "completed"
+
+
+class _PendingRequest:
+    """One queued request and the future of its caller."""
+
+    def __init__(self, api_config: Dict[str, Any], future: asyncio.Future):
+        self.api_config = api_config
+        self.model = str(api_config.get("model") or "")
+        self.future = future
+        self.custom_id = ""
+        self.participant = _participant_id.get()
+
+
+class BatchCollector:
+    """
+    Groups concurrent requests into waves and runs each wave through the Batch API.
+
+    A wave is submitted as soon as every expected participant (sweep combination,
+    see expect() and participant()) has a request pending, or when no new request
+    arrived for window_seconds. Participants are counted, not requests: a combination
+    with several requests in flight (pipelined files, concurrent audits, speculation)
+    does not trip the barrier alone, and a participant whose previous batch is still
+    running holds it back, so the next wave starts from the same iteration everywhere.
+    One poll loop serves all outstanding batches.
+    """
+
+    def __init__(self, client_factory: Callable[[str], Any], batch_dir: Path | str,
+                 window_seconds: float = 30.0, poll_seconds: float = 30.0,
+                 timeout_seconds: Optional[float] = None, max_requests: int = MAX_BATCH_REQUESTS,
+                 external_logger: Optional[logging.Logger] = None):
+        """
+        Initialize the collector.
+
+        Args:
+            client_factory: Callable mapping a model name to an OpenAI-compatible client
+                            exposing files and batches (e.g. a LocalBatchServer)
+            batch_dir: Root directory of the batch input / output files
+            window_seconds: Idle delay after which pending requests are submitted anyway
+            poll_seconds: Delay between two polls of the outstanding batches
+            timeout_seconds: Optional limit on the time a batch may take (None = completion window)
+            max_requests: Maximum requests per wave
+            external_logger: Optional logger (defaults to module logger)
+        """
+        self.client_factory = client_factory
+        self.batch_dir = Path(batch_dir)
+        self.window_seconds = max(0.0, float(window_seconds))
+        self.poll_seconds = max(0.0, float(poll_seconds))
+        self.timeout_seconds = timeout_seconds
+        self.max_requests = max(1, min(int(max_requests), MAX_BATCH_REQUESTS))
+        self.logger = external_logger or logger
+        self.session = time.strftime("%Y%m%d_%H%M%S")
+        self.participants = 0
+        self.stats = {k: 0 for k in _STAT_KEYS}
+        self._pending: List[_PendingRequest] = []
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self._outstanding: Dict[str, Dict[str, Any]] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+        self._submit_tasks: set = set()
+
+    def expect(self, participants: int) -> None:
+        """Announce the number of concurrent callers (sweep combinations) before any of them starts."""
+        self.participants = max(0, int(participants))
+
+    @contextlib.contextmanager
+    def participant(self):
+        """Run one expected caller; its requests (including those of tasks it starts) count as one participant.
+
+        On exit the wave barrier stops waiting for it.
+        """
+        token = _participant_id.set(next(_participant_ids))
+        try:
+            yield self
+        finally:
+            _participant_id.reset(token)
+            self.participants = max(0, self.participants - 1)
+            self._maybe_flush()
+
+    async def submit(self, api_config: Dict[str, Any]) -> Any:
+        """Queue one Responses API request and wait for its batch result (an attribute-access response)."""
+        loop = asyncio.get_running_loop()
+        request = _PendingRequest(api_config, loop.create_future())
+        self._pending.append(request)
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        self._idle_handle = loop.call_later(self.window_seconds, self._maybe_flush, True)
+        self._maybe_flush()
+        return await request.future
+
+    def _maybe_flush(self, idle: bool = False) -> None:
+        """Submit the pending requests as a wave when the barrier (or the idle window) is reached."""
+        pending = [r for r in self._pending if not r.future.done()]
+        self._pending = pending
+        if not pending:
+            return
+        waiting = len({r.participant for r in pending})
+        barrier = self.participants > 0 and waiting >= self.participants
+        if not (idle or barrier or len(pending) >= self.max_requests):
+            return
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        wave, self._pending = pending[:self.max_requests], pending[self.max_requests:]
+        self.stats["waves"] += 1
+        task = asyncio.get_running_loop().create_task(self._submit_wave(self.stats["waves"], wave))
+        self._submit_tasks.add(task)
+        task.add_done_callback(self._submit_tasks.discard)
+        if self._pending:
+            self._maybe_flush()
+
+    async def _submit_wave(self, wave: int, requests: List[_PendingRequest]) -> None:
+        """Write one JSONL input file per model and create its batch."""
+        by_model: Dict[str, List[_PendingRequest]] = {}
+        for request in requests:
+            by_model.setdefault(request.model, []).append(request)
+        self.logger.info(f"[BATCH] Wave {wave}: {len(requests)} request(s) over {len(by_model)} model(s)")
+        for model, group in by_model.items():
+            prefix = self.batch_dir / self.session / f"wave-{wave:03d}-{_slug(model)}"
+            for index, request in enumerate(group, start=1):
+                request.custom_id = f"w{wave:03d}-{index:05d}"
+            try:
+                prefix.parent.mkdir(parents=True, exist_ok=True)
+                input_path = prefix.with_name(prefix.name + ".requests.jsonl")
+                input_path.write_text("\n".join(build_batch_line(r.custom_id, r.api_config) for r in group) + "\n",
+                                      encoding="utf-8")
+                client = self.client_factory(model)
+                batch = await asyncio.to_thread(self._create_batch, client, input_path, wave, model)
+            except Exception as e:
+                self.logger.error(f"[BATCH] Wave {wave} ({model}): submission failed: {e}")
+                self._resolve(group, {}, f"batch submission failed: {type(e).__name__}: {e}")
+                continue
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(group)
+            self.logger.info(f"[BATCH] Wave {wave} ({model}): batch {batch.id} submitted with {len(group)} request(s)")
+            self._outstanding[batch.id] = {"client": client, "requests": group, "prefix": prefix,
+                                           "status": getattr(batch, "status", None), "started": time.monotonic()}
+        if self._outstanding and (self._poll_task is None or self._poll_task.done()):
+            self._poll_task = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    @staticmethod
+    def _create_batch(client: Any, input_path: Path, wave: int, model: str) -> Any:
+        with open(input_path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        return client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window=BATCH_COMPLETION_WINDOW,
+            metadata={"wave": str(wave), "model": model},
+        )
+
+    async def _poll_loop(self) -> None:
+        """Single loop polling every outstanding batch until all of them are done."""
+        while self._outstanding:
+            await asyncio.sleep(self.poll_seconds)
+            for batch_id, entry in list(self._outstanding.items()):
+                try:
+                    batch = await asyncio.to_thread(entry["client"].batches.retrieve, batch_id)
+                except Exception as e:
+                    self.logger.warning(f"[BATCH] Poll of {batch_id} failed (will retry): {e}")
+                    continue
+                status = getattr(batch, "status", None)
+                if status != entry["status"]:
+                    counts = getattr(batch, "request_counts", None)
+                    progress = f" ({getattr(counts, 'completed', 0)}/{getattr(counts, 'total', 0)} done)" if counts else ""
+                    self.logger.info(f"[BATCH] {batch_id}: {status}{progress}")
+                    entry["status"] = status
+                if status in _TERMINAL_STATUSES:
+                    del self._outstanding[batch_id]
+                    await self._collect(batch_id, batch, entry)
+                elif self.timeout_seconds and time.monotonic() - entry["started"] > self.timeout_seconds:
+                    del self._outstanding[batch_id]
+                    with contextlib.suppress(Exception):
+                        await asyncio.to_thread(entry["client"].batches.cancel, batch_id)
+                    self._resolve(entry["requests"], {}, f"batch {batch_id} timed out after {self.timeout_seconds} seconds")
+
+    async def _collect(self, batch_id: str, batch: Any, entry: Dict[str, Any]) -> None:
+        """Download the output / error files of a finished batch and resolve its requests."""
+        lines: Dict[str, Dict[str, Any]] = {}
+        for suffix, attr in (("errors", "error_file_id"), ("results", "output_file_id")):
+            file_id = getattr(batch, attr, None)
+            if not file_id:
+                continue
+            try:
+                text = _file_text(await asyncio.to_thread(entry["client"].files.content, file_id))
+                entry["prefix"].with_name(f"{entry['prefix'].name}.{suffix}.jsonl").write_text(text, encoding="utf-8")
+                lines.update(parse_batch_output(text))
+            except Exception as e:
+                self.logger.error(f"[BATCH] Could not download {attr} of {batch_id}: {e}")
+        status = getattr(batch, "status", None)
+        self._resolve(entry["requests"], lines, f"no result in batch {batch_id} (status: {status})")
+
+    def _resolve(self, requests: List[_PendingRequest], lines: Dict[str, Dict[str, Any]], missing: str) -> None:
+        """Fan batch output lines back to the awaiting callers."""
+        for request in requests:
+            line = lines.get(request.custom_id)
+            error = _line_error(line) if line is not None else missing
+            if error is None:
+                self.stats["succeeded"] += 1
+                result: Any = to_attr_namespace(line["response"]["body"])
+            else:
+                self.stats["failed"] += 1
+                result = BatchRequestError(f"[{request.custom_id}] {error}")
+            if request.future.done():
+                continue
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+
+def format_batch_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of batch counters for run logs."""
+    return (
+        f"waves={stats.get('waves', 0)} batches={stats.get('batches', 0)} requests={stats.get('requests', 0)} | "
+        f"succeeded={stats.get('succeeded', 0)} failed={stats.get('failed', 0)}"
+    )
+
+
+_batch_collector: Optional[BatchCollector] = None
+
+
+def _default_client_factory(model_name: str) -> Any:
+    """Shared OpenAI client of a model, pointed at LLM_BATCH_BASE_URL when set (e.g. a local stand-in server)."""
+    from utils_api_key import get_api_key_for_model
+    from utils_client_registry import get_shared_openai_client
+    from utils_config_constants import LLM_BATCH_BASE_URL
+    return get_shared_openai_client(get_api_key_for_model(model_name), base_url=LLM_BATCH_BASE_URL)
+
+
+def get_batch_collector() -> BatchCollector:
+    """Return the process-wide collector configured from utils_config_constants (LLM_BATCH_*)."""
+    global _batch_collector
+    if _batch_collector is None:
+        from utils_config_constants import (
+            LLM_BATCH_DIR, LLM_BATCH_POLL_SECONDS, LLM_BATCH_TIMEOUT_SECONDS, LLM_BATCH_WINDOW_SECONDS,
+        )
+        _batch_collector = BatchCollector(
+            _default_client_factory, LLM_BATCH_DIR,
+            window_seconds=LLM_BATCH_WINDOW_SECONDS, poll_seconds=LLM_BATCH_POLL_SECONDS,
+            timeout_seconds=LLM_BATCH_TIMEOUT_SECONDS or None,
+        )
+    return _batch_collector
+
+
+def set_batch_collector(collector: Optional[BatchCollector]) -> Optional[BatchCollector]:
+    """Replace the process-wide collector (e.g. with one bound to a LocalBatchServer); None resets it."""
+    global _batch_collector
+    _batch_collector = collector
+    return collector
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    from utils_config_constants import LLM_BATCH
+    return get_batch_collector().stats if LLM_BATCH else None
+
+
+register_summary_stats("Batch API", _summary_stats, format_batch_stats)
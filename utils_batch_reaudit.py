@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Batch Re-Audit Utility
+Re-runs the deterministic Python auditors (operation model, scenario, diagram) over a
+whole output tree. Runs are fanned out to a process pool and every audited iteration is
+streamed as one row into a consolidated JSONL table as soon as its run finishes.
+
+The table doubles as the incremental index: an iteration is skipped when the SHA-256 of
+its artifact and the fingerprint of its stage rules (rules file + auditor sources) are
+unchanged since the row was written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils_audit_core import extract_audit_core
+from utils_audit_diagram import audit_diagram
+from utils_audit_operation_model import audit_operation_model
+from utils_audit_scenario import audit_scenario
+
+# (stage key, stage folder, artifact file in <iter>/1-generator, auditor source modules)
+AUDIT_STAGES = [
+    ("operation_model", "1_lucim_operation_model", "output-data.json", ("utils_audit_operation_model.py",)),
+    ("scenario", "2_lucim_scenario", "output-data.json", ("utils_audit_scenario.py",)),
+    ("diagram", "3_lucim_plantuml_diagram", "diagram.puml", ("utils_audit_diagram.py", "utils_plantuml_ir.py")),
+]
+_STAGE_FOLDERS = {folder: (stage, artifact) for stage, folder, artifact, _ in AUDIT_STAGES}
+_SKIP_DIRS = {"__audit__", "__pycache__"}
+
+DEFAULT_TABLE_NAME = "audit_all_runs_results.jsonl"
+
+
+@dataclass
+class AuditTask:
+    """One iteration artifact to (re-)audit."""
+    run: str
+    stage: str
+    iteration: str
+    file: str  # artifact path relative to the audited root (posix)
+    path: str  # absolute artifact path
+    artifact_sha256: str = ""
+    rules_sha256: str = ""
+
+
+def sha256_file(path: Path) -> str:
+    """Return the hex SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _default_rules_files() -> Dict[str, Path]:
+    from utils_config_constants import (
+        RULES_LUCIM_OPERATION_MODEL, RULES_LUCIM_PLANTUML_DIAGRAM, RULES_LUCIM_SCENARIO,
+    )
+    return {
+        "operation_model": RULES_LUCIM_OPERATION_MODEL,
+        "scenario": RULES_LUCIM_SCENARIO,
+        "diagram": RULES_LUCIM_PLANTUML_DIAGRAM,
+    }
+
+
+def compute_rules_fingerprints(rules_files: Optional[Dict[str, Path]] = None) -> Dict[str, str]:
+    """
+    Return the rules fingerprint of each stage.
+
+    The fingerprint hashes the stage rules file together with the auditor sources that
+    implement it, so editing either invalidates the previous audits of that stage.
+
+    Args:
+        rules_files: Stage key → rules file (defaults to the RULES_LUCIM_* constants)
+    """
+    rules_files = rules_files if rules_files is not None else _default_rules_files()
+    here = Path(__file__).resolve().parent
+    fingerprints: Dict[str, str] = {}
+    for stage, _folder, _artifact, modules in AUDIT_STAGES:
+        h = hashlib.sha256()
+        rules_file = rules_files.get(stage)
+        for path in ([Path(rules_file)] if rules_file else []) + [here / m for m in modules]:
+            h.update(path.name.encode("utf-8") + b"\0")
+            h.update(sha256_file(path).encode("ascii") if path.exists() else b"missing")
+        fingerprints[stage] = h.hexdigest()
+    return fingerprints
+
+
+def discover_audit_tasks(root: Path, run_dirs: Optional[Iterable[Path]] = None) -> List[AuditTask]:
+    """
+    Find every iteration artifact below root (or below the given run_dirs only).
+
+    A run is the parent of a stage folder (<N>_lucim_<stage>); its name is its path
+    relative to root, so nested output trees (output/runs/<date>/<time>/<case>) work.
+    """
+    root = Path(root).resolve()
+    tasks: List[AuditTask] = []
+    for start in (run_dirs if run_dirs is not None else [root]):
+        for dirpath, dirnames, _files in os.walk(Path(start).resolve()):
+            dirnames[:] = sorted(d for d in dirnames if d not in _SKIP_DIRS)
+            for folder in [d for d in dirnames if d in _STAGE_FOLDERS]:
+                dirnames.remove(folder)
+                stage, artifact = _STAGE_FOLDERS[folder]
+                run_dir = Path(dirpath)
+                run = run_dir.relative_to(root).as_posix() if run_dir != root else root.name
+                for iter_dir in sorted((run_dir / folder).glob("iter-*"), key=_iteration_order):
+                    path = iter_dir / "1-generator" / artifact
+                    if path.is_file():
+                        tasks.append(AuditTask(run, stage, iter_dir.name, path.relative_to(root).as_posix(), str(path)))
+    return tasks
+
+
+def _iteration_order(iter_dir: Path) -> tuple:
+    suffix = iter_dir.name.split("-", 1)[-1]
+    return (0, int(suffix), "") if suffix.isdigit() else (1, 0, iter_dir.name)
+
+
+def extract_scenario_text(scenario_data: Any) -> str:
+    """Extract scenario text (one "src -> tgt : event(params)" line per message) from scenario data."""
+    if not isinstance(scenario_data, list):
+        return ""
+
+    lines = []
+    for item in scenario_data:
+        if not isinstance(item, dict):
+            continue
+        msgs = (item.get("scenario", {}) or {}).get("messages", [])
+        if not isinstance(msgs, list):
+            continue
+        for m in msgs:
+            if not isinstance(m, dict):
+                continue
+            src = m.get("source", "")
+            tgt = m.get("target", "")
+            name = m.get("event_name", m.get("name", ""))
+            params_str = str(m.get("parameters", "")).strip()
+            if params_str and not params_str.startswith("("):
+                params_str = f"({params_str})"
+            elif not params_str:
+                params_str = "()"
+            # Determine arrow type based on event type
+            arrow = "-->" if m.get("event_type", "") == "input_event" or name.startswith("ie") else "->"
+            lines.append(f"{src} {arrow} {tgt} : {name}{params_str}")
+
+    return "\n".join(lines)
+
+
+def _load_output_data(path: Path) -> Any:
+    # output-data.json contains EITHER a JSON data string OR an errors string
+    content = path.read_text(encoding="utf-8")
+    if not content.strip():
+        return None
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def load_operation_model(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the operation model of a generator output-data.json, or None when it holds none."""
+    data = _load_output_data(path)
+    if not isinstance(data, dict):
+        return None
+    # Standardized structure {"data": {...}, "errors": null}, else old direct structure
+    if data.get("data") is not None:
+        data = data["data"]
+    elif not ("actors" in data or "system" in data):
+        return None
+    return data if isinstance(data, dict) and data else None
+
+
+def load_scenario_text(path: Path) -> str:
+    """Return the auditable scenario text of a generator output-data.json ("" when it holds none)."""
+    data = _load_output_data(path)
+    if isinstance(data, dict):
+        data = data.get("data")
+    return extract_scenario_text(data) if data else ""
+
+
+def audit_task(task: AuditTask) -> Dict[str, Any]:
+    """Audit one artifact and return its table row."""
+    row: Dict[str, Any] = {
+        "run": task.run,
+        "stage": task.stage,
+        "iteration": task.iteration,
+        "file": task.file,
+        "artifact_sha256": task.artifact_sha256,
+        "rules_sha256": task.rules_sha256,
+        "status": "audited",
+        "verdict": None,
+        "violation_count": 0,
+        "rule_ids": [],
+        "audit": None,
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        path = Path(task.path)
+        audit: Optional[Dict[str, Any]] = None
+        if task.stage == "operation_model":
+            op_model = load_operation_model(path)
+            audit = audit_operation_model(op_model) if op_model else None
+        elif task.stage == "scenario":
+            scenario_text = load_scenario_text(path)
+            audit = audit_scenario(scenario_text) if scenario_text else None
+        else:
+            puml_text = path.read_text(encoding="utf-8")
+            audit = audit_diagram(puml_text) if puml_text else None
+        if audit is None:
+            row["status"] = "no-data"
+        else:
+            # Operation model/scenario return {verdict: bool, violations}, diagram {data: {verdict, non-compliant-rules}}
+            core = extract_audit_core(audit)
+            violations = [v for v in core["non_compliant_rules"] if isinstance(v, dict)]
+            row["verdict"] = core["verdict"] == "compliant"
+            row["violation_count"] = len(violations)
+            row["rule_ids"] = sorted({_rule_id(v) for v in violations})
+            row["audit"] = audit
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = f"Error auditing {task.file}: {e}"
+    row["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return row
+
+
+def _rule_id(violation: Dict[str, Any]) -> str:
+    return str(violation.get("id") or violation.get("rule") or "UNKNOWN")
+
+
+def normalize_audit(audit: Dict[str, Any]) -> Dict[str, Any]:
+    """Return an auditor result in the { "verdict": bool, "violations": [{id, message, line}] } shape."""
+    if isinstance(audit.get("violations"), list):
+        return audit
+    core = extract_audit_core(audit)
+    return {
+        "verdict": core["verdict"] == "compliant",
+        "violations": [
+            {"id": _rule_id(v), "message": v.get("msg", v.get("message", "")), "line": v.get("line", "?")}
+            for v in core["non_compliant_rules"] if isinstance(v, dict)
+        ],
+    }
+
+
+def audit_tasks(tasks: List[AuditTask]) -> List[Dict[str, Any]]:
+    """Audit the pending tasks of one run (process-pool work unit)."""
+    return [audit_task(task) for task in tasks]
+
+
+def load_audit_table(table_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Load a JSONL audit table keyed by artifact file; later rows win.
+
+    Truncated or corrupt lines (e.g. from an interrupted batch) are ignored.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    try:
+        with open(table_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except (json.JSONDecodeError, ValueError):
+                    continue
+                if isinstance(row, dict) and row.get("file"):
+                    rows[row["file"]] = row
+    except FileNotFoundError:
+        pass
+    return rows
+
+
+def _write_table(table_path: Path, rows: List[Dict[str, Any]]) -> None:
+    tmp = table_path.with_name(f".{table_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp, table_path)
+
+
+def reaudit_tree(
+    root: Path,
+    table_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    run_dirs: Optional[Iterable[Path]] = None,
+    rules_files: Optional[Dict[str, Path]] = None,
+    on_run_done: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Incrementally re-audit every iteration artifact below root.
+
+    Runs with pending iterations are audited in a ProcessPoolExecutor (inline when
+    workers <= 1) and their rows are appended to table_path as each run completes, so an
+    interrupted batch resumes where it stopped. The table is finally compacted to one row
+    per artifact still present, sorted by file.
+
+    Args:
+        root: Output tree to audit (e.g. output/runs)
+        table_path: JSONL table (defaults to <root>/audit_all_runs_results.jsonl)
+        workers: Process count (defaults to os.cpu_count())
+        force: Re-audit everything, ignoring unchanged hashes
+        run_dirs: Restrict discovery to these run directories below root
+        rules_files: Stage key → rules file override (see compute_rules_fingerprints)
+        on_run_done: Called with (run, new rows) as each run completes
+
+    Returns:
+        { "rows": [...], "stats": { "audited", "skipped", "no_data", "errors" }, "table": str }
+    """
+    root = Path(root).resolve()
+    table_path = Path(table_path) if table_path else root / DEFAULT_TABLE_NAME
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    fingerprints = compute_rules_fingerprints(rules_files)
+    previous = {} if force else load_audit_table(table_path)
+    stats = {"audited": 0, "skipped": 0, "no_data": 0, "errors": 0}
+    rows: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, List[AuditTask]] = {}
+
+    for task in discover_audit_tasks(root, run_dirs):
+        task.artifact_sha256 = sha256_file(Path(task.path))
+        task.rules_sha256 = fingerprints[task.stage]
+        prev = previous.get(task.file)
+        if (prev and prev.get("artifact_sha256") == task.artifact_sha256
+                and prev.get("rules_sha256") == task.rules_sha256 and prev.get("status") != "error"):
+            rows[task.file] = prev
+            stats["skipped"] += 1
+        else:
+            pending.setdefault(task.run, []).append(task)
+
+    def _collect(run: str, new_rows: List[Dict[str, Any]], table) -> None:
+        for row in new_rows:
+            rows[row["file"]] = row
+            table.write(json.dumps(row, ensure_ascii=False) + "\n")
+            key = {"no-data": "no_data", "error": "errors"}.get(row["status"], "audited")
+            stats[key] += 1
+        table.flush()
+        if on_run_done:
+            on_run_done(run, new_rows)
+
+    with open(table_path, "a", encoding="utf-8") as table:
+        if workers <= 1 or len(pending) <= 1:
+            for run, tasks in pending.items():
+                _collect(run, audit_tasks(tasks), table)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                futures = {pool.submit(audit_tasks, tasks): run for run, tasks in pending.items()}
+                for future in as_completed(futures):
+                    _collect(futures[future], future.result(), table)
+
+    ordered = [rows[f] for f in sorted(rows)]
+    _write_table(table_path, ordered)
+    return {"rows": ordered, "stats": stats, "table": str(table_path)}
+
+
+def rows_to_run_results(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group audited rows per run in the audit_all_runs result shape ({run_name, operation_model, scenario, diagram, errors})."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        result = results.setdefault(row["run"], {
+            "run_name": row["run"], "operation_model": [], "scenario": [], "diagram": [], "errors": [],
+        })
+        if row.get("status") == "error":
+            result["errors"].append(row.get("error"))
+        elif row.get("audit") is not None:
+            result[row["stage"]].append({
+                "iteration": row["iteration"], "file": row["file"], "audit": normalize_audit(row["audit"]),
+            })
+    return [results[run] for run in sorted(results)]
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Budget Controller Utility
+Token spend and wall-clock deadline per combination and per sweep. Every provider response
+(cache hits excluded) is charged to the budget of the run it belongs to, found through a
+context variable set when the orchestrator run starts. As the remaining budget (the lowest
+of tokens and time, combination and sweep) falls below each BUDGET_DEGRADE_AT fraction, the
+run degrades one more step:
+
+1. lower-effort: generator reasoning effort drops one notch per step reached (never below "low")
+2. shrink-iterations: a stage keeps half of its remaining corrective iterations, rounded
+   down (none once the budget is exhausted)
+3. python-audits: the LLM auditor is skipped and the Python audit decides compliance
+
+Every decision is logged with a [BUDGET] prefix and returned to the stage, which records it
+in the file results, so that degraded runs remain interpretable.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+# Reasoning effort, from highest to lowest ("minimal" is not supported by every model)
+EFFORT_LADDER = ("high", "medium", "low")
+
+DEGRADATION_ACTIONS = ("lower-effort", "shrink-iterations", "python-audits")
+DEFAULT_DEGRADE_AT = (0.5, 0.25, 0.1)
+
+_STAT_KEYS = ("charged_tokens", "effort_lowered", "iterations_cut", "llm_audits_skipped")
+_budget_stats = {k: 0 for k in _STAT_KEYS}
+_budget_stats_lock = threading.Lock()
+
+_current_budget: contextvars.ContextVar[Optional["BudgetController"]] = contextvars.ContextVar(
+    "budget_controller", default=None
+)
+
+
+class BudgetLedger:
+    """Token spend and elapsed time against an optional token budget and deadline."""
+
+    def __init__(self, name: str, token_budget: int = 0, deadline_seconds: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the ledger.
+
+        Args:
+            name: Scope shown in logs ("combination" or "sweep")
+            token_budget: Maximum total tokens (0 = unlimited)
+            deadline_seconds: Maximum wall-clock seconds from start() (0 = unlimited)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.name = name
+        self.token_budget = max(0, int(token_budget or 0))
+        self.deadline_seconds = max(0.0, float(deadline_seconds or 0.0))
+        self.spent_tokens = 0
+        self.started_at: Optional[float] = None
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.token_budget or self.deadline_seconds)
+
+    def start(self) -> None:
+        """Start the deadline clock (no-op when already started)."""
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = self._clock()
+
+    def charge(self, tokens: int) -> None:
+        with self._lock:
+            self.spent_tokens += max(0, int(tokens or 0))
+
+    def elapsed(self) -> float:
+        return 0.0 if self.started_at is None else self._clock() - self.started_at
+
+    def remaining_fraction(self) -> float:
+        """Fraction of the budget left, the lowest of tokens and time (1.0 when unlimited)."""
+        fractions = [1.0]
+        if self.token_budget:
+            fractions.append(1.0 - self.spent_tokens / self.token_budget)
+        if self.deadline_seconds:
+            fractions.append(1.0 - self.elapsed() / self.deadline_seconds)
+        return max(0.0, min(fractions))
+
+    def describe(self) -> str:
+        tokens = f"{self.spent_tokens:,}/{self.token_budget:,} tokens" if self.token_budget else f"{self.spent_tokens:,} tokens"
+        seconds = f"{self.elapsed():.0f}/{self.deadline_seconds:.0f}s" if self.deadline_seconds else f"{self.elapsed():.0f}s"
+        return f"{self.name} {tokens}, {seconds}"
+
+
+@dataclass
+class BudgetDecision:
+    """One degradation applied to a stage iteration."""
+    action: str
+    stage: str
+    iteration: int
+    remaining: float
+    reason: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class BudgetController:
+    """
+    Per-combination budget, sharing the sweep ledger with the other combinations.
+
+    Without any token budget nor deadline every check is a no-op.
+    """
+
+    def __init__(self, token_budget: int = 0, deadline_seconds: float = 0.0,
+                 sweep: Optional[BudgetLedger] = None,
+                 degrade_at: Sequence[float] = DEFAULT_DEGRADE_AT,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the controller.
+
+        Args:
+            token_budget: Maximum tokens of the combination (0 = unlimited)
+            deadline_seconds: Maximum wall-clock seconds of the combination (0 = unlimited)
+            sweep: Ledger shared by all combinations of the sweep (None = unlimited)
+            degrade_at: Remaining-budget fractions that trigger each of DEGRADATION_ACTIONS
+            clock: Monotonic clock (injectable for tests)
+
+        Raises:
+            ValueError: If degrade_at does not hold one fraction per degradation action
+        """
+        if len(degrade_at) != len(DEGRADATION_ACTIONS):
+            raise ValueError(
+                f"Expected {len(DEGRADATION_ACTIONS)} degradation thresholds ({', '.join(DEGRADATION_ACTIONS)}), got {len(degrade_at)}"
+            )
+        self.combination = BudgetLedger("combination", token_budget, deadline_seconds, clock)
+        self.sweep = sweep or BudgetLedger("sweep", clock=clock)
+        self.degrade_at = tuple(float(f) for f in degrade_at)
+        self.decisions: List[BudgetDecision] = []
+        self.logger = logger
+        # Effort the combination started with, captured at the first lower-effort decision
+        self._initial_effort: Optional[str] = None
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.combination.limited or self.sweep.limited
+
+    def begin(self, external_logger: Optional[logging.Logger] = None) -> None:
+        """Start the clocks and attach this controller to the current context (call once per orchestrator run)."""
+        if external_logger is not None:
+            self.logger = external_logger
+        self.combination.start()
+        self.sweep.start()
+        _current_budget.set(self)
+        if self.enabled:
+            self.logger.info(f"[BUDGET] Budget controller on: {self.describe()} (degrade at {self.degrade_at})")
+
+    def charge(self, usage: Dict[str, Any]) -> None:
+        """Charge the total tokens of one provider response (get_usage_tokens) to the combination and the sweep."""
+        tokens = int((usage or {}).get("total_tokens", 0) or 0)
+        self.combination.charge(tokens)
+        self.sweep.charge(tokens)
+        with _budget_stats_lock:
+            _budget_stats["charged_tokens"] += tokens
+
+    def remaining(self) -> float:
+        return min(self.combination.remaining_fraction(), self.sweep.remaining_fraction())
+
+    def level(self) -> int:
+        """Number of degradation steps reached (0 = full budget behavior)."""
+        if not self.enabled:
+            return 0
+        remaining = self.remaining()
+        return sum(1 for fraction in self.degrade_at if remaining <= fraction)
+
+    def reached(self, action: str) -> bool:
+        """True when the remaining budget is at or below the threshold of a degradation action."""
+        return self.enabled and self.remaining() <= self.degrade_at[DEGRADATION_ACTIONS.index(action)]
+
+    def describe(self) -> str:
+        return "; ".join(ledger.describe() for ledger in (self.combination, self.sweep) if ledger.limited)
+
+    def _decide(self, action: str, stage: str, iteration: int, reason: str, stat: str) -> BudgetDecision:
+        decision = BudgetDecision(action, stage, iteration, round(self.remaining(), 3), f"budget: {reason}")
+        with self._lock:
+            self.decisions.append(decision)
+        with _budget_stats_lock:
+            _budget_stats[stat] += 1
+        self.logger.info(
+            f"[BUDGET] {stage} iteration {iteration}: {action} — {reason} "
+            f"({decision.remaining:.0%} left; {self.describe()})"
+        )
+        return decision
+
+    def lower_reasoning_effort(self, orchestrator_instance, stage: str, iteration: int) -> Optional[BudgetDecision]:
+        """
+        Lower the generators' reasoning effort one notch per degradation step reached.
+
+        Returns:
+            The decision when the effort was changed, otherwise None
+        """
+        level = self.level()
+        if not self.reached("lower-effort"):
+            return None
+        # Concurrent files of the combination must not lower the shared agents twice
+        with self._lock:
+            current = getattr(orchestrator_instance, "reasoning_effort", None)
+            if current not in EFFORT_LADDER:
+                return None
+            # Lower from the effort the combination started with, not from an already lowered one
+            self._initial_effort = self._initial_effort or current
+            target = EFFORT_LADDER[min(EFFORT_LADDER.index(self._initial_effort) + level, len(EFFORT_LADDER) - 1)]
+            if EFFORT_LADDER.index(target) <= EFFORT_LADDER.index(current):
+                return None
+            from utils_orchestrator_v3_agent_config import update_agent_configs
+            update_agent_configs(
+                orchestrator_instance,
+                reasoning_effort=target,
+                reasoning_summary=getattr(orchestrator_instance, "reasoning_summary", "auto"),
+            )
+        return self._decide("lower-effort", stage, iteration, f"reasoning effort {current} → {target}", "effort_lowered")
+
+    def cap_iterations(self, stage: str, iteration: int, max_audit: int) -> Optional[BudgetDecision]:
+        """
+        Decide whether a non-compliant stage stops before its next corrective iteration.
+
+        From the shrink-iterations step on, half of the remaining iterations are kept
+        (rounded down), none once the budget is exhausted.
+
+        Returns:
+            The decision when the stage must stop at this iteration, otherwise None
+        """
+        if not self.reached("shrink-iterations"):
+            return None
+        left = max(0, max_audit - iteration)
+        cap = iteration if self.remaining() <= 0 else iteration + left // 2
+        if iteration < cap:
+            return None
+        return self._decide("shrink-iterations", stage, iteration, f"iteration cap {max_audit} → {cap}", "iterations_cut")
+
+    def skip_llm_audit(self, stage: str, iteration: int) -> Optional[BudgetDecision]:
+        """
+        Decide whether the LLM auditor is replaced by the Python audit for this iteration.
+
+        Returns:
+            The decision (its reason goes into the Python audit report) or None
+        """
+        if not self.reached("python-audits"):
+            return None
+        return self._decide("python-audits", stage, iteration, "LLM auditor replaced by the Python audit", "llm_audits_skipped")
+
+
+def charge_current_budget(usage: Dict[str, Any]) -> None:
+    """Charge a provider response to the budget of the run in the current context, if any."""
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.charge(usage)
+
+
+def budget_of(orchestrator_instance) -> BudgetController:
+    """Return the orchestrator's budget controller (an unlimited one when it has none)."""
+    budget = getattr(orchestrator_instance, "budget", None)
+    return budget if budget is not None else BudgetController()
+
+
+def get_budget_stats() -> Dict[str, int]:
+    """Return process-wide counters (tokens charged and degradation decisions)."""
+    with _budget_stats_lock:
+        return dict(_budget_stats)
+
+
+def format_budget_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of budget counters for run logs."""
+    return (
+        f"tokens charged={stats.get('charged_tokens', 0):,} | effort lowered={stats.get('effort_lowered', 0)} "
+        f"iterations cut={stats.get('iterations_cut', 0)} LLM audits skipped={stats.get('llm_audits_skipped', 0)}"
+    )
+
+
+_sweep_ledger: Optional[BudgetLedger] = None
+_sweep_ledger_lock = threading.Lock()
+
+
+def get_sweep_ledger() -> BudgetLedger:
+    """Return the process-wide sweep ledger configured from utils_config_constants (SWEEP_*)."""
+    global _sweep_ledger
+    with _sweep_ledger_lock:
+        if _sweep_ledger is None:
+            from utils_config_constants import SWEEP_TOKEN_BUDGET, SWEEP_DEADLINE_SECONDS
+            _sweep_ledger = BudgetLedger("sweep", SWEEP_TOKEN_BUDGET, SWEEP_DEADLINE_SECONDS)
+        return _sweep_ledger
+
+
+def create_budget_controller() -> BudgetController:
+    """Build a combination budget controller from utils_config_constants, sharing the sweep ledger."""
+    from utils_config_constants import COMBINATION_TOKEN_BUDGET, COMBINATION_DEADLINE_SECONDS, BUDGET_DEGRADE_AT
+    return BudgetController(COMBINATION_TOKEN_BUDGET, COMBINATION_DEADLINE_SECONDS,
+                            sweep=get_sweep_ledger(), degrade_at=BUDGET_DEGRADE_AT)
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    from utils_config_constants import (
+        COMBINATION_DEADLINE_SECONDS, COMBINATION_TOKEN_BUDGET, SWEEP_DEADLINE_SECONDS, SWEEP_TOKEN_BUDGET,
+    )
+    limited = any((COMBINATION_TOKEN_BUDGET, COMBINATION_DEADLINE_SECONDS, SWEEP_TOKEN_BUDGET, SWEEP_DEADLINE_SECONDS))
+    return get_budget_stats() if limited else None
+
+
+register_summary_stats("Budget", _summary_stats, format_budget_stats)
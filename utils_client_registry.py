@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Client Registry Utility
+Process-wide registry of long-lived LLM SDK clients, one per provider + API key (+ base
+URL), reused across agents, iterations and combinations. OpenAI-compatible clients share
+one keep-alive HTTP connection pool (per event loop for async clients), so TLS handshakes
+happen once per host instead of once per agent call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Return a short, non-reversible identifier of an API key (keys are never used as registry keys)."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ClientRegistry:
+    """Thread-safe get-or-create store of shared clients."""
+
+    def __init__(self):
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0}
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the client registered under key, creating it with factory on first use.
+
+        The factory runs outside the lock, so it may itself get clients from the registry
+        (e.g. the shared HTTP client); when two threads race, the first client registered
+        wins and the other one is dropped (not closed: it may wrap a shared HTTP client).
+        """
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.stats["reused"] += 1
+                return client
+        created = factory()
+        with self._lock:
+            client = self._clients.setdefault(key, created)
+            if client is created:
+                self.stats["created"] += 1
+                return client
+            self.stats["reused"] += 1
+            return client
+
+    def close(self) -> None:
+        """Close every registered client that supports it and forget them."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            close = getattr(client, "close", None)
+            if callable(close) and not asyncio.iscoroutinefunction(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+_registry = ClientRegistry()
+# Async clients are bound to the event loop they were created on: one registry per loop
+_async_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ClientRegistry]" = weakref.WeakKeyDictionary()
+_async_registries_lock = threading.Lock()
+atexit.register(_registry.close)
+
+
+def _http_limits() -> Any:
+    import httpx
+    from utils_config_constants import LLM_HTTP_KEEPALIVE_EXPIRY, LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _current_async_registry() -> Optional[ClientRegistry]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    with _async_registries_lock:
+        registry = _async_registries.get(loop)
+        if registry is None:
+            registry = _async_registries[loop] = ClientRegistry()
+        return registry
+
+
+def get_shared_http_client() -> Any:
+    """Return the process-wide keep-alive httpx client used by synchronous OpenAI-compatible clients."""
+    from openai import DefaultHttpxClient
+    return _registry.get(("http",), lambda: DefaultHttpxClient(limits=_http_limits()))
+
+
+def get_shared_async_http_client() -> Any:
+    """Return the keep-alive httpx.AsyncClient of the running event loop (a private one outside a loop)."""
+    from openai import DefaultAsyncHttpxClient
+    registry = _current_async_registry()
+    if registry is None:
+        return DefaultAsyncHttpxClient(limits=_http_limits())
+    return registry.get(("http",), lambda: DefaultAsyncHttpxClient(limits=_http_limits()))
+
+
+def get_shared_openai_client(api_key: str, base_url: Optional[str] = None,
+                             headers: Optional[Dict[str, str]] = None) -> Any:
+    """
+    Return the shared OpenAI client of an API key and base URL.
+
+    Args:
+        api_key: Provider API key
+        base_url: Optional OpenAI-compatible endpoint (e.g. OpenRouter)
+        headers: Optional headers stored as client._openrouter_headers for per-call use
+    """
+    from openai import OpenAI
+
+    def _create() -> Any:
+        client = OpenAI(api_key=api_key, base_url=base_url, http_client=get_shared_http_client())
+        if headers:
+            client._openrouter_headers = dict(headers)
+        return client
+
+    return _registry.get(("openai", api_key_fingerprint(api_key), base_url), _create)
+
+
+def get_shared_async_openai_client(api_key: str, base_url: Optional[str] = None,
+                                   headers: Optional[Dict[str, str]] = None) -> Any:
+    """Async twin of get_shared_openai_client (shared per running event loop)."""
+    from openai import AsyncOpenAI
+
+    def _create() -> Any:
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_shared_async_http_client())
+        if headers:
+            client._openrouter_headers = dict(headers)
+        return client
+
+    registry = _current_async_registry()
+    if registry is None:
+        return _create()
+    return registry.get(("async-openai", api_key_fingerprint(api_key), base_url), _create)
+
+
+def get_shared_genai_client(api_key: str) -> Any:
+    """Return the shared google-genai client of an API key (its .aio side serves async calls)."""
+    from google import genai
+    return _registry.get(("gemini", api_key_fingerprint(api_key)), lambda: genai.Client(api_key=api_key))
+
+
+def get_client_registry_stats() -> Dict[str, int]:
+    """Return created/reused counters of the process-wide (synchronous) registry."""
+    return dict(_registry.stats)
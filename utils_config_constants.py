@@ -63,6 +63,19 @@ AVAILABLE_MODELS = [
     "mistralai/codestral-2508",
     "meta-llama/llama-4-scout-17b-16e-instruct"
 ]
+# List prices in USD per 1M (input, output) tokens of AVAILABLE_MODELS, used by the pre-flight sweep plan
+# (utils_sweep_planner); LLM_PRICING below overrides or extends them. Update them with the provider price pages.
+MODEL_PRICING = {
+    "gpt-5-nano-2025-08-07": (0.05, 0.40),
+    "gpt-5-mini-2025-08-07": (0.25, 2.00),
+    "gpt-5-2025-08-07": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "mistralai/codestral-2508": (0.30, 0.90),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.08, 0.30),
+}
+# Mock models replaying recorded runs offline (utils_mock_provider), e.g. LLM_MOCK_RECORDINGS="baseline,2025-11-12"
+AVAILABLE_MODELS += [f"mock/{name.strip()}" for name in os.environ.get("LLM_MOCK_RECORDINGS", "").split(",") if name.strip()]
 
 # Default model derived from AVAILABLE_MODELS
 DEFAULT_MODEL = AVAILABLE_MODELS[6]
@@ -179,6 +192,139 @@ AGENT_TIMEOUTS = {
 ORCHESTRATOR_PARALLEL_TIMEOUT = None
 HEARTBEAT_SECONDS = 30  # periodic log while waiting
 
+# Sweep scheduler (utils_orchestrator_v3_main): number of combinations run concurrently.
+# Global cap plus per-provider caps (keys match utils_api_key.get_provider_for_model).
+SWEEP_MAX_CONCURRENCY = int(os.environ.get("SWEEP_MAX_CONCURRENCY", "4"))
+SWEEP_PROVIDER_CONCURRENCY = {
+    "openai": int(os.environ.get("SWEEP_CONCURRENCY_OPENAI", "3")),
+    "gemini": int(os.environ.get("SWEEP_CONCURRENCY_GEMINI", "2")),
+    "router": int(os.environ.get("SWEEP_CONCURRENCY_ROUTER", "2")),
+}
+
+# Pre-flight sweep plan (utils_sweep_planner): tokens, cost and wall-clock estimate shown before launch.
+# History is mined from previous run directories; LLM_PRICING="model=<in>/<out>,..." (USD per 1M tokens)
+# overrides or extends MODEL_PRICING.
+SWEEP_PLAN = os.environ.get("SWEEP_PLAN", "on").strip().lower() not in ("0", "off", "false", "no")
+SWEEP_PLAN_HISTORY_DIR = Path(os.environ.get("SWEEP_PLAN_HISTORY_DIR", str(OUTPUT_DIR / "runs")))
+LLM_PRICING = {
+    **MODEL_PRICING,
+    **{
+        model.strip(): tuple(float(v) for v in prices.split("/", 1))
+        for model, _, prices in (item.partition("=") for item in os.environ.get("LLM_PRICING", "").split(","))
+        if model.strip() and "/" in prices
+    },
+}
+
+# Stage pipeline across NetLogo files of one run (utils_orchestrator_v3_pipeline): workers per stage.
+PIPELINE_STAGE_WORKERS = {
+    "prepare": 1,
+    "operation_model": int(os.environ.get("PIPELINE_WORKERS_OPERATION_MODEL", "1")),
+    "scenario": int(os.environ.get("PIPELINE_WORKERS_SCENARIO", "1")),
+    "plantuml_diagram": int(os.environ.get("PIPELINE_WORKERS_PLANTUML_DIAGRAM", "1")),
+}
+
+# Audit policy (utils_audit_policy): llm-always | python-gate | python-only. Under python-gate the LLM auditor
+# is skipped when the Python audit finds one of the hard rules (AUDIT_POLICY_HARD_RULES="LOM0-...,LDR0-..."
+# replaces the default set: block format / JSON parse failures and a missing System).
+AUDIT_POLICY = os.environ.get("AUDIT_POLICY", "llm-always").strip().lower()
+AUDIT_POLICY_HARD_RULES = frozenset(
+    rule.strip() for rule in os.environ.get("AUDIT_POLICY_HARD_RULES", "").split(",") if rule.strip()
+)
+
+# Speculative execution (utils_speculation): opt-in. The first Scenario / PlantUML generator call starts
+# while the upstream auditor runs; it is kept when the upstream stage advances and cancelled otherwise.
+SPECULATIVE_EXECUTION = os.environ.get("SPECULATIVE_EXECUTION", "off").strip().lower() in ("1", "on", "true", "yes")
+
+# Artifact memo (utils_artifact_memo): an iteration whose artifact is identical (after JSON / PlantUML
+# normalization) to an earlier one reuses its audit; a revert to an older artifact (A→B→A) ends the stage loop.
+ARTIFACT_MEMO = os.environ.get("ARTIFACT_MEMO", "on").strip().lower() not in ("0", "off", "false", "no")
+
+# Budget controller (utils_budget): token spend and wall-clock deadline per combination and per sweep, 0 = unlimited.
+# As the budget drains below each BUDGET_DEGRADE_AT fraction, the run lowers reasoning effort, then shrinks the
+# remaining corrective iterations, then replaces LLM audits with Python audits.
+COMBINATION_TOKEN_BUDGET = int(os.environ.get("COMBINATION_TOKEN_BUDGET", "0"))
+COMBINATION_DEADLINE_SECONDS = float(os.environ.get("COMBINATION_DEADLINE_SECONDS", "0"))
+SWEEP_TOKEN_BUDGET = int(os.environ.get("SWEEP_TOKEN_BUDGET", "0"))
+SWEEP_DEADLINE_SECONDS = float(os.environ.get("SWEEP_DEADLINE_SECONDS", "0"))
+BUDGET_DEGRADE_AT = tuple(
+    float(fraction) for fraction in os.environ.get("BUDGET_DEGRADE_AT", "0.5,0.25,0.1").split(",") if fraction.strip()
+)
+
+# LLM response cache (utils_response_cache): off | on | refresh | replay (bypass = off)
+LLM_CACHE_MODE = os.environ.get("LLM_CACHE_MODE", "off")
+LLM_CACHE_DIR = Path(os.environ.get("LLM_CACHE_DIR", str(OUTPUT_DIR / ".llm-cache")))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_MB = int(os.environ.get("LLM_CACHE_MAX_MB", "512"))
+
+# Shared LLM clients (utils_client_registry): keep-alive HTTP pool of OpenAI-compatible clients
+LLM_HTTP_MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Client-side rate limiting (utils_rate_limiter): opt-in, one token bucket per provider + model.
+# Values are (requests/minute, tokens/minute) of the account tier, 0 = unset (no bucket); limits adapt down on 429s.
+LLM_RATE_LIMIT = os.environ.get("LLM_RATE_LIMIT", "off").strip().lower() in ("1", "on", "true", "yes")
+LLM_RATE_LIMITS = {
+    "openai": (int(os.environ.get("LLM_RPM_OPENAI", "0")), int(os.environ.get("LLM_TPM_OPENAI", "0"))),
+    "gemini": (int(os.environ.get("LLM_RPM_GEMINI", "0")), int(os.environ.get("LLM_TPM_GEMINI", "0"))),
+    "router": (int(os.environ.get("LLM_RPM_ROUTER", "0")), int(os.environ.get("LLM_TPM_ROUTER", "0"))),
+    "mock": (int(os.environ.get("LLM_RPM_MOCK", "0")), int(os.environ.get("LLM_TPM_MOCK", "0"))),
+}
+
+# Streaming responses (utils_stream_validator): opt-in. With early abort, a stream is cancelled as soon
+# as its output is certain to break LOM0/LSC0-JSON-BLOCK-ONLY or LDR0-PLANTUML-BLOCK-ONLY.
+LLM_STREAM = os.environ.get("LLM_STREAM", "off").strip().lower() in ("1", "on", "true", "yes")
+LLM_STREAM_EARLY_ABORT = os.environ.get("LLM_STREAM_EARLY_ABORT", "on").strip().lower() not in ("0", "off", "false", "no")
+
+# Mock provider (utils_mock_provider): models named mock/<recording> replay the output-response-raw.json payloads
+# recorded under LLM_MOCK_DIR/<recording>. Latency: fixed:<s> | uniform:<min>,<max> | lognormal:<median>,<sigma>.
+# Error rates are per-call probabilities of an injected 429, 503 or timeout. Usage: recorded | estimate.
+LLM_MOCK_DIR = Path(os.environ.get("LLM_MOCK_DIR", str(OUTPUT_DIR / "runs")))
+LLM_MOCK_LATENCY = os.environ.get("LLM_MOCK_LATENCY", "lognormal:0.5,0.5")
+LLM_MOCK_ERROR_RATES = {
+    "429": float(os.environ.get("LLM_MOCK_ERROR_RATE_429", "0")),
+    "503": float(os.environ.get("LLM_MOCK_ERROR_RATE_503", "0")),
+    "timeout": float(os.environ.get("LLM_MOCK_ERROR_RATE_TIMEOUT", "0")),
+}
+LLM_MOCK_TIMEOUT_SECONDS = float(os.environ.get("LLM_MOCK_TIMEOUT_SECONDS", "5"))
+LLM_MOCK_USAGE = os.environ.get("LLM_MOCK_USAGE", "recorded").strip().lower()
+LLM_MOCK_SEED = int(os.environ["LLM_MOCK_SEED"]) if os.environ.get("LLM_MOCK_SEED") else None
+
+# Request hedging (utils_hedging): per-model latency histograms persist in LLM_LATENCY_FILE. With LLM_HEDGE on,
+# a call still running after the LLM_HEDGE_PERCENTILE latency of its model gets a duplicate (same model, or the
+# fallback of LLM_HEDGE_FALLBACKS="model=fallback,..."); the first response wins and the other call is cancelled.
+LLM_HEDGE = os.environ.get("LLM_HEDGE", "off").strip().lower() in ("1", "on", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("LLM_HEDGE_MIN_DELAY_SECONDS", "10"))
+LLM_HEDGE_FALLBACKS = {
+    model.strip(): fallback.strip()
+    for model, _, fallback in (item.partition("=") for item in os.environ.get("LLM_HEDGE_FALLBACKS", "").split(","))
+    if model.strip() and fallback.strip()
+}
+LLM_LATENCY_FILE = Path(os.environ.get("LLM_LATENCY_FILE", str(OUTPUT_DIR / ".llm-latency.json")))
+
+# Offline batch mode (utils_batch_api): opt-in. OpenAI calls of concurrent sweep combinations are grouped
+# in waves and sent through the Batch API; input/output JSONL files are kept under LLM_BATCH_DIR.
+# LLM_BATCH_BASE_URL points the Files/Batches calls at another endpoint (e.g. a local stand-in server).
+LLM_BATCH = os.environ.get("LLM_BATCH", "off").strip().lower() in ("1", "on", "true", "yes")
+LLM_BATCH_DIR = Path(os.environ.get("LLM_BATCH_DIR", str(OUTPUT_DIR / "batches")))
+LLM_BATCH_WINDOW_SECONDS = float(os.environ.get("LLM_BATCH_WINDOW_SECONDS", "30"))
+LLM_BATCH_POLL_SECONDS = float(os.environ.get("LLM_BATCH_POLL_SECONDS", "30"))
+LLM_BATCH_TIMEOUT_SECONDS = float(os.environ.get("LLM_BATCH_TIMEOUT_SECONDS", "86400"))
+LLM_BATCH_BASE_URL = os.environ.get("LLM_BATCH_BASE_URL") or None
+
+# PlantUML rendering (utils_plantuml_renderer): pipe = warm JVM pool, cli = one JVM per diagram
+PLANTUML_RENDER_MODE = os.environ.get("PLANTUML_RENDER_MODE", "pipe")
+PLANTUML_RENDER_WORKERS = int(os.environ.get("PLANTUML_RENDER_WORKERS", "2"))
+PLANTUML_RENDER_TIMEOUT = float(os.environ.get("PLANTUML_RENDER_TIMEOUT", "60"))
+
+# Content-addressed SVG cache (utils_plantuml.SvgRenderCache), shared by all runs
+PLANTUML_SVG_CACHE = os.environ.get("PLANTUML_SVG_CACHE", "on").strip().lower() not in ("0", "off", "false", "no")
+PLANTUML_SVG_CACHE_DIR = Path(os.environ.get("PLANTUML_SVG_CACHE_DIR", str(Path.home() / ".cache" / "plantuml" / "svg")))
+PLANTUML_SVG_CACHE_MAX_ENTRIES = int(os.environ.get("PLANTUML_SVG_CACHE_MAX_ENTRIES", "5000"))
+PLANTUML_SVG_CACHE_MAX_MB = int(os.environ.get("PLANTUML_SVG_CACHE_MAX_MB", "256"))
+
 
 def ensure_directories():
     """Ensure all required directories exist"""
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Disk LRU Cache Utility
+Base class of the content-addressed on-disk caches (LLM responses, rendered SVGs): entry
+paths, atomic writes, hit/miss counters (process-wide and per run) and LRU/size eviction.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import pathlib
+import threading
+from typing import Callable, Dict, Optional
+
+CACHE_STAT_KEYS = ("hits", "misses", "stores", "evictions", "errors")
+
+
+class DiskLRUCache:
+    """
+    Entries live under <cache_dir>/<key[:2]>/<key><suffix>. Recency is tracked with the file
+    mtime (touched on every hit), so least-recently-used entries are evicted first when
+    max_entries or max_bytes is exceeded. The entry count and total size are scanned once,
+    then kept up to date by each write, so the directory is only listed again when a limit
+    is crossed.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path | str, suffix: str, max_entries: int = 0, max_bytes: int = 0,
+                 run_stats: Optional[contextvars.ContextVar] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root directory of the cache
+            suffix: Entry file suffix (e.g. ".json")
+            max_entries: Maximum number of entries (<= 0 disables the limit)
+            max_bytes: Maximum total size in bytes (<= 0 disables the limit)
+            run_stats: Optional context variable holding the counters of the current run
+        """
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.suffix = suffix
+        self.max_entries = int(max_entries or 0)
+        self.max_bytes = int(max_bytes or 0)
+        self.stats = {k: 0 for k in CACHE_STAT_KEYS}
+        self._run_stats = run_stats
+        # Entries and bytes on disk, scanned at the first write (None until then)
+        self._entry_count: Optional[int] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path_for(self, key: str) -> pathlib.Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+            run = self._run_stats.get() if self._run_stats is not None else None
+            if run is not None:
+                run[stat] += 1
+
+    def _write_entry(self, key: str, write: Callable[[pathlib.Path], None]) -> pathlib.Path:
+        """
+        Atomically (re)place the entry of key with the file produced by write(tmp_path), then evict if needed.
+
+        Raises:
+            Whatever write raises, or OSError when the entry cannot be placed
+        """
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        write(tmp_path)
+        size = tmp_path.stat().st_size
+        try:
+            replaced_size: Optional[int] = path.stat().st_size
+        except FileNotFoundError:
+            replaced_size = None
+        os.replace(tmp_path, path)
+        self._count("stores")
+        if self._track_write(size, replaced_size):
+            self.evict()
+        return path
+
+    def _limits_exceeded(self, entries: int, total_bytes: int) -> bool:
+        return (self.max_entries > 0 and entries > self.max_entries) or (self.max_bytes > 0 and total_bytes > self.max_bytes)
+
+    def _track_write(self, size: int, replaced_size: Optional[int]) -> bool:
+        """Account for a written entry; True when a limit is now exceeded and evict() must run."""
+        if self.max_entries <= 0 and self.max_bytes <= 0:
+            return False
+        with self._lock:
+            if self._entry_count is None:
+                # First write of the process: the scan already includes the new entry
+                self._entry_count, self._total_bytes = 0, 0
+                for entry_path in self.cache_dir.glob(f"*/*{self.suffix}"):
+                    try:
+                        self._total_bytes += entry_path.stat().st_size
+                    except OSError:
+                        continue
+                    self._entry_count += 1
+            elif replaced_size is None:
+                self._entry_count += 1
+                self._total_bytes += size
+            else:
+                self._total_bytes += size - replaced_size
+            return self._limits_exceeded(self._entry_count, self._total_bytes)
+
+    def evict(self) -> int:
+        """Evict least-recently-used entries until both limits hold; returns the number evicted."""
+        if self.max_entries <= 0 and self.max_bytes <= 0:
+            return 0
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob(f"*/*{self.suffix}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            entries.sort(key=lambda e: e[0])
+            total_bytes = sum(e[1] for e in entries)
+            evicted = 0
+            while entries and self._limits_exceeded(len(entries), total_bytes):
+                _, size, path = entries.pop(0)
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total_bytes -= size
+                evicted += 1
+            self._entry_count, self._total_bytes = len(entries), total_bytes
+        for _ in range(evicted):
+            self._count("evictions")
+        return evicted
+
+
+def format_cache_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of cache counters for run logs."""
+    lookups = stats.get("hits", 0) + stats.get("misses", 0)
+    ratio = (stats.get("hits", 0) / lookups * 100) if lookups else 0.0
+    return (
+        f"hits={stats.get('hits', 0)} misses={stats.get('misses', 0)} ({ratio:.1f}% hit ratio) | "
+        f"stores={stats.get('stores', 0)} evictions={stats.get('evictions', 0)} errors={stats.get('errors', 0)}"
+    )
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Gemini Adapter Utility
+OpenAI-compatible adapter (client.responses.create / acreate / retrieve) over the
+google-genai SDK. Every call gets a unique response ID registered in an in-flight
+table before the request is sent, so concurrent calls sharing one wrapper (and the
+shared genai.Client) never see each other's responses. The async path uses the
+SDK's async client (client.aio) and never blocks the event loop.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+from utils_client_registry import get_shared_genai_client
+
+logger = logging.getLogger(__name__)
+
+
+def _genai_installed() -> bool:
+    """True when the google-genai SDK (optional, Gemini support only) can be imported."""
+    try:
+        return importlib.util.find_spec("google.genai") is not None
+    except ModuleNotFoundError:
+        # No "google" namespace package at all
+        return False
+
+
+GEMINI_AVAILABLE = _genai_installed()
+
+# Finished responses kept for retrieve() (in-flight entries are never evicted)
+DEFAULT_RETAINED_RESPONSES = 256
+
+
+class ResponseTable:
+    """
+    Thread-safe table of Gemini responses keyed by response ID.
+
+    begin() registers an in-progress placeholder, complete()/fail() replace it with the
+    terminal response; the oldest finished entries are dropped beyond max_retained.
+    """
+
+    def __init__(self, max_retained: int = DEFAULT_RETAINED_RESPONSES):
+        self.max_retained = max(1, int(max_retained))
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self) -> str:
+        """Register a new in-flight request and return its unique response ID."""
+        response_id = f"gemini_{uuid.uuid4().hex}"
+        with self._lock:
+            self._entries[response_id] = SimpleNamespace(id=response_id, status="in_progress", output=[], usage=None)
+        return response_id
+
+    def complete(self, response_id: str, response: Any) -> Any:
+        """Store the terminal response of a request and return it."""
+        with self._lock:
+            self._entries[response_id] = response
+            self._entries.move_to_end(response_id)
+            self._evict()
+        return response
+
+    def fail(self, response_id: str, error: Exception) -> None:
+        """Mark a request as failed (its caller receives the error itself)."""
+        with self._lock:
+            self._entries[response_id] = SimpleNamespace(id=response_id, status="failed", output=[], usage=None,
+                                                         error=f"{type(error).__name__}: {error}")
+            self._entries.move_to_end(response_id)
+            self._evict()
+
+    def get(self, response_id: str) -> Any:
+        """
+        Return the response (or in-flight placeholder) of an ID.
+
+        Raises:
+            KeyError: When the ID is unknown or was evicted
+        """
+        with self._lock:
+            return self._entries[response_id]
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if getattr(entry, "status", None) == "in_progress")
+
+    def _evict(self) -> None:
+        finished = [k for k, v in self._entries.items() if getattr(v, "status", None) != "in_progress"]
+        for response_id in finished[:max(0, len(finished) - self.max_retained)]:
+            del self._entries[response_id]
+
+
+class GeminiClientWrapper:
+    """Wrapper for Google Gemini client to provide OpenAI-compatible interface.
+
+    This wrapper adapts Google's genai SDK to work with the existing agent code
+    that expects OpenAI client interface. Responses are tracked per request ID
+    (ResponseTable), so one wrapper can serve concurrent calls.
+    """
+
+    def __init__(self, api_key: str, model_name: str, client: Any = None):
+        """Initialize Gemini client wrapper.
+
+        The underlying genai.Client is shared per API key (utils_client_registry).
+
+        Args:
+            api_key: Gemini API key
+            model_name: Model name (e.g., "gemini-2.5-flash")
+            client: Optional genai.Client-compatible object (defaults to the shared client)
+        """
+        if client is None and not GEMINI_AVAILABLE:
+            raise ImportError(
+                "google-genai package is required for Gemini support. "
+                "Install with: pip install google-genai"
+            )
+        self.client = client if client is not None else get_shared_genai_client(api_key)
+        self.model_name = model_name
+        self.provider = "gemini"
+        self.response_table = ResponseTable()
+
+    class Responses:
+        """Responses interface matching OpenAI client.responses."""
+
+        def __init__(self, parent: "GeminiClientWrapper"):
+            self.parent = parent
+
+        def _build_request(self, kwargs: Dict[str, Any]) -> tuple[str, str]:
+            """Resolve the Gemini model and flatten instructions + input into one prompt."""
+            # Enforce Gemini model: prefer wrapper's configured model_name
+            requested_model = kwargs.get("model")
+            model = self.parent.model_name
+            if isinstance(requested_model, str) and "gemini" in requested_model.lower():
+                model = requested_model
+            instructions = kwargs.get("instructions", "")
+            input_messages = kwargs.get("input", [])
+
+            # Build prompt from instructions and input
+            prompt_parts = []
+            if instructions:
+                prompt_parts.append(instructions)
+
+            # Extract content from input messages
+            for msg in input_messages:
+                if isinstance(msg, dict):
+                    content = msg.get("content", "")
+                    if isinstance(content, str):
+                        prompt_parts.append(content)
+                    elif isinstance(content, list):
+                        for item in content:
+                            if isinstance(item, dict) and "text" in item:
+                                prompt_parts.append(item["text"])
+
+            # Combine all parts
+            return model, "\n\n".join(prompt_parts)
+
+        def _wrap_response(self, response: Any, full_prompt: str,
+                           response_id: Optional[str] = None) -> "GeminiResponseWrapper":
+            """Convert a Gemini response to an OpenAI-like response stored under its request ID."""
+            table = self.parent.response_table
+            response_id = response_id or table.begin()
+            return table.complete(response_id, GeminiResponseWrapper(response, response_id, full_prompt))
+
+        @staticmethod
+        def _raise_mapped_error(e: Exception) -> None:
+            """Convert Gemini errors to retryable OpenAI exceptions (always raises)."""
+            # Import exceptions from utils_openai_error to use fallback versions
+            # that don't require 'request' argument (unlike OpenAI 2.x real exceptions)
+            from utils_openai_error import APIError, RateLimitError, APIConnectionError
+
+            error_str = str(e).lower()
+            error_repr = repr(e)
+
+            # Check for 503 Service Unavailable (overloaded model)
+            if "503" in error_str or "unavailable" in error_str or "overloaded" in error_str:
+                # The fallback APIError from utils_openai_error doesn't require 'request'
+                raise APIError(f"Gemini API error: 503 UNAVAILABLE. {error_repr}")
+
+            # Check for rate limit errors (429)
+            if "429" in error_str or "rate limit" in error_str or "quota" in error_str:
+                raise RateLimitError(f"Gemini API error: 429 RATE_LIMIT. {error_repr}")
+
+            # Check for connection errors
+            if "connection" in error_str or "timeout" in error_str or "network" in error_str:
+                raise APIConnectionError(f"Gemini API error: CONNECTION. {error_repr}")
+
+            # For other errors, raise as APIError (retryable) if they look like server errors
+            # Non-retryable errors (400, 401, 403) will be raised as generic Exception
+            if any(code in error_str for code in ["400", "401", "403", "404"]):
+                raise Exception(f"Gemini API error: {error_repr}")
+            else:
+                # Server errors (500, 502, 504, etc.) should be retryable
+                raise APIError(f"Gemini API error: {error_repr}")
+
+        def create(self, **kwargs) -> Any:
+            """Create a response using Gemini API (blocking; use acreate from async code).
+
+            Args:
+                model: Model name (required)
+                instructions: System instructions (optional)
+                input: Input messages (optional)
+                **kwargs: Other OpenAI API config (ignored for Gemini)
+
+            Returns:
+                Response object with OpenAI-like structure
+            """
+            model, full_prompt = self._build_request(kwargs)
+            table = self.parent.response_table
+            response_id = table.begin()
+            # Note: model name is used exactly as provided (e.g., "gemini-2.5-flash")
+            try:
+                response = self.parent.client.models.generate_content(model=model, contents=full_prompt)
+            except Exception as e:
+                table.fail(response_id, e)
+                self._raise_mapped_error(e)
+            return self._wrap_response(response, full_prompt, response_id)
+
+        async def acreate(self, **kwargs) -> Any:
+            """Async twin of create() using the google-genai async client (client.aio).
+
+            Args:
+                Same as create()
+
+            Returns:
+                Response object with OpenAI-like structure
+            """
+            model, full_prompt = self._build_request(kwargs)
+            table = self.parent.response_table
+            response_id = table.begin()
+            try:
+                response = await self.parent.client.aio.models.generate_content(model=model, contents=full_prompt)
+            except BaseException as e:
+                table.fail(response_id, e)
+                if not isinstance(e, Exception):
+                    raise
+                self._raise_mapped_error(e)
+            return self._wrap_response(response, full_prompt, response_id)
+
+        def retrieve(self, response_id: str) -> Any:
+            """Retrieve the response (or in-flight placeholder) of a request ID.
+
+            Args:
+                response_id: ID returned by create()/acreate()
+
+            Returns:
+                The response registered under that ID
+
+            Raises:
+                KeyError: For an unknown (or long evicted) response ID
+            """
+            try:
+                return self.parent.response_table.get(response_id)
+            except KeyError:
+                raise KeyError(f"Unknown Gemini response id: {response_id}") from None
+
+    @property
+    def responses(self):
+        """Access responses interface like OpenAI client.responses."""
+        return self.Responses(self)
+
+
+class GeminiResponseWrapper:
+    """Wrapper for Gemini response to match OpenAI response structure."""
+
+    def __init__(self, gemini_response: Any, response_id: str, prompt: str):
+        """Initialize Gemini response wrapper.
+
+        Args:
+            gemini_response: Original Gemini response object
+            response_id: Response ID of the request (ResponseTable)
+            prompt: Original prompt (for token counting estimation)
+        """
+        self._gemini_response = gemini_response
+        self.id = response_id
+        self.status = "completed"
+        self.prompt = prompt
+
+        # Extract text from Gemini response
+        # Gemini response structure: candidates[0].content.parts[0].text
+        self._text = ""
+        try:
+            # Try direct text attribute first (for compatibility)
+            if hasattr(gemini_response, 'text'):
+                self._text = gemini_response.text or ""
+            # Try candidates structure (standard Gemini format)
+            elif hasattr(gemini_response, 'candidates') and isinstance(gemini_response.candidates, list) and len(gemini_response.candidates) > 0:
+                candidate = gemini_response.candidates[0]
+                if hasattr(candidate, 'content'):
+                    content = candidate.content
+                    if hasattr(content, 'parts') and isinstance(content.parts, list):
+                        for part in content.parts:
+                            if hasattr(part, 'text') and isinstance(part.text, str):
+                                self._text += part.text
+                    elif hasattr(content, 'text'):
+                        self._text = content.text
+            # Fallback: try content attribute directly
+            elif hasattr(gemini_response, 'content'):
+                # Handle different response formats
+                if isinstance(gemini_response.content, str):
+                    self._text = gemini_response.content
+                elif isinstance(gemini_response.content, list):
+                    for item in gemini_response.content:
+                        if hasattr(item, 'text'):
+                            self._text += item.text
+        except Exception as e:
+            logger.warning(f"Failed to extract text from Gemini response: {e}")
+            self._text = ""
+
+        # Create OpenAI-like output structure
+        self.output = [{
+            "content": [{"text": self._text}],
+            "summary": []
+        }]
+
+        # Exact counts from usage_metadata when present, otherwise estimated from word counts
+        usage_metadata = getattr(gemini_response, "usage_metadata", None)
+        prompt_tokens = getattr(usage_metadata, "prompt_token_count", None) or len(prompt.split()) * 1.3
+        response_tokens = getattr(usage_metadata, "candidates_token_count", None) or len(self._text.split()) * 1.3
+        thoughts_tokens = getattr(usage_metadata, "thoughts_token_count", None) or 0
+        # Implicit context caching is reported exactly in usage_metadata
+        cached_content_tokens = getattr(usage_metadata, "cached_content_token_count", 0) or 0
+
+        self.usage = SimpleNamespace(
+            input_tokens=int(prompt_tokens),
+            output_tokens=int(response_tokens + thoughts_tokens),
+            total_tokens=int(prompt_tokens + response_tokens + thoughts_tokens),
+            output_tokens_details=SimpleNamespace(reasoning_tokens=int(thoughts_tokens)) if thoughts_tokens else None,
+            input_tokens_details=SimpleNamespace(cached_tokens=int(cached_content_tokens)),
+        )
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Request Hedging Utility
+Per-model latency histograms (persisted across runs) and hedged LLM calls: when a call
+is still running after the configured latency percentile of its model, a duplicate is
+sent (same model or a fallback model), the first response wins and the other call is
+cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_FORMAT_VERSION = 1
+# Geometric bucket upper bounds: 0.25 s × 1.25^k, up to ~2.5 h
+BUCKET_BOUNDS = tuple(round(0.25 * 1.25 ** k, 3) for k in range(42))
+# Counts are halved past this many samples, so recent latencies dominate
+DEFAULT_MAX_SAMPLES = 1000
+# Recorded calls between two writes of the latency file (flush() writes the rest)
+DEFAULT_SAVE_EVERY = 50
+
+_STAT_KEYS = ("calls", "hedged", "hedge_wins", "primary_wins")
+
+
+class LatencyHistogram:
+    """Bucketed latency distribution of one model."""
+
+    def __init__(self, counts: Optional[List[int]] = None, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.counts = list(counts or [])[:len(BUCKET_BOUNDS) + 1]
+        self.counts += [0] * (len(BUCKET_BOUNDS) + 1 - len(self.counts))
+        self.max_samples = max(2, int(max_samples))
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float) -> None:
+        """Add one observed latency (seconds)."""
+        index = next((i for i, bound in enumerate(BUCKET_BOUNDS) if seconds <= bound), len(BUCKET_BOUNDS))
+        self.counts[index] += 1
+        if self.total > self.max_samples:
+            self.counts = [c // 2 for c in self.counts]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound (seconds) of the bucket holding the p-th percentile (0-100), None when empty."""
+        total = self.total
+        if total == 0:
+            return None
+        threshold = total * min(max(p, 0.0), 100.0) / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class LatencyStore:
+    """
+    Per-model latency histograms, persisted as JSON.
+
+    The file is loaded lazily; recorded calls stay in memory and the file is rewritten
+    (atomically) every save_every calls and on flush() (end of the run summary and at
+    exit), so thresholds carry over from one run or sweep to the next without blocking
+    the event loop on every call.
+    """
+
+    def __init__(self, path: Optional[Path | str], max_samples: int = DEFAULT_MAX_SAMPLES,
+                 save_every: int = DEFAULT_SAVE_EVERY):
+        self.path = Path(path) if path else None
+        self.max_samples = max_samples
+        self.save_every = max(1, int(save_every))
+        self._histograms: Optional[Dict[str, LatencyHistogram]] = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, LatencyHistogram]:
+        if self._histograms is None:
+            self._histograms = {}
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8")) if self.path else {}
+                if data.get("version") == HISTOGRAM_FORMAT_VERSION and list(data.get("bounds", [])) == list(BUCKET_BOUNDS):
+                    for model, counts in (data.get("models") or {}).items():
+                        self._histograms[model] = LatencyHistogram(counts, self.max_samples)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"[HEDGE] Ignoring unreadable latency file {self.path}: {e}")
+        return self._histograms
+
+    def _save(self) -> None:
+        self._unsaved = 0
+        if self.path is None:
+            return
+        payload = {
+            "version": HISTOGRAM_FORMAT_VERSION,
+            "bounds": list(BUCKET_BOUNDS),
+            "models": {model: h.counts for model, h in sorted(self._histograms.items())},
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"[HEDGE] Could not save latency file {self.path}: {e}")
+
+    def record(self, model: str, seconds: float) -> None:
+        """Add one successful call latency for model (persisted every save_every calls)."""
+        with self._lock:
+            histograms = self._load()
+            histograms.setdefault(model, LatencyHistogram(max_samples=self.max_samples)).record(seconds)
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def flush(self) -> None:
+        """Write the histograms if calls were recorded since the last save."""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def percentile(self, model: str, p: float, min_samples: int = 1) -> Optional[float]:
+        """p-th percentile latency of model, None when fewer than min_samples calls were observed."""
+        with self._lock:
+            histogram = self._load().get(model)
+            if histogram is None or histogram.total < max(1, min_samples):
+                return None
+            return histogram.percentile(p)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Samples and p50/p95 per model (for summaries)."""
+        with self._lock:
+            return {
+                model: {"samples": h.total, "p50": h.percentile(50), "p95": h.percentile(95)}
+                for model, h in sorted(self._load().items())
+            }
+
+
+class RequestHedger:
+    """Runs a call and, past the hedge delay of its model, a duplicate; the first success wins."""
+
+    def __init__(self, store: LatencyStore, percentile: float = 95.0, min_samples: int = 20,
+                 min_delay_seconds: float = 10.0, fallbacks: Optional[Dict[str, str]] = None,
+                 enabled: bool = True):
+        """
+        Initialize the hedger.
+
+        Args:
+            store: Latency histograms used for the thresholds (and fed with every call)
+            percentile: Latency percentile of the model after which the duplicate is sent
+            min_samples: Calls to observe for a model before hedging it
+            min_delay_seconds: Lower bound of the hedge delay
+            fallbacks: Optional model → fallback model map for the duplicate (default: same model)
+            enabled: When False, calls only feed the histograms
+        """
+        self.store = store
+        self.percentile = float(percentile)
+        self.min_samples = int(min_samples)
+        self.min_delay_seconds = float(min_delay_seconds)
+        self.fallbacks = dict(fallbacks or {})
+        self.enabled = enabled
+        self.stats = {k: 0 for k in _STAT_KEYS}
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds after which a call of model gets a duplicate (None = not hedged yet)."""
+        if not self.enabled:
+            return None
+        threshold = self.store.percentile(model, self.percentile, self.min_samples)
+        if threshold is None:
+            return None
+        return max(threshold, self.min_delay_seconds)
+
+    async def _timed(self, model: str, call: Callable[[str], Awaitable[Any]]) -> Tuple[Any, float]:
+        started = time.monotonic()
+        result = await call(model)
+        return result, time.monotonic() - started
+
+    async def run(self, model: str, call: Callable[[str], Awaitable[Any]],
+                  record: Callable[[Any], bool] = lambda result: True) -> Tuple[Any, str]:
+        """
+        Await call(model), hedged with call(fallback model) when it is slow.
+
+        Args:
+            model: Model of the primary call
+            call: Coroutine function taking the model to use
+            record: Predicate telling whether a result's latency belongs in the histogram
+
+        Returns:
+            (result, model that produced it)
+
+        Raises:
+            The primary's exception when both calls fail (or when no duplicate was sent)
+        """
+        self.stats["calls"] += 1
+        primary = asyncio.ensure_future(self._timed(model, call))
+        delay = self.hedge_delay(model)
+        tasks = {primary: model}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                fallback = self.fallbacks.get(model, model)
+                self.stats["hedged"] += 1
+                logger.info(f"[HEDGE] {model} call still running after {delay:.1f}s, sending duplicate to {fallback}")
+                tasks[asyncio.ensure_future(self._timed(fallback, call))] = fallback
+            pending = set(tasks)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        if task is primary or first_error is None:
+                            first_error = task.exception()
+                        continue
+                    result, seconds = task.result()
+                    used_model = tasks[task]
+                    if record(result):
+                        self.store.record(used_model, seconds)
+                    if len(tasks) > 1:
+                        won = "primary_wins" if task is primary else "hedge_wins"
+                        self.stats[won] += 1
+                        logger.info(f"[HEDGE] {'Primary' if task is primary else 'Duplicate'} ({used_model}) won after {seconds:.1f}s")
+                    return result, used_model
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def format_hedge_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of hedging counters for run logs."""
+    return (
+        f"calls={stats.get('calls', 0)} hedged={stats.get('hedged', 0)} | "
+        f"duplicate won={stats.get('hedge_wins', 0)} primary won={stats.get('primary_wins', 0)}"
+    )
+
+
+_hedger: Optional[RequestHedger] = None
+
+
+def get_request_hedger() -> RequestHedger:
+    """Return the process-wide hedger configured from utils_config_constants (LLM_HEDGE_*, LLM_LATENCY_FILE)."""
+    global _hedger
+    if _hedger is None:
+        from utils_config_constants import (
+            LLM_HEDGE, LLM_HEDGE_FALLBACKS, LLM_HEDGE_MIN_DELAY_SECONDS, LLM_HEDGE_MIN_SAMPLES,
+            LLM_HEDGE_PERCENTILE, LLM_LATENCY_FILE,
+        )
+        _hedger = RequestHedger(
+            LatencyStore(LLM_LATENCY_FILE), percentile=LLM_HEDGE_PERCENTILE, min_samples=LLM_HEDGE_MIN_SAMPLES,
+            min_delay_seconds=LLM_HEDGE_MIN_DELAY_SECONDS, fallbacks=LLM_HEDGE_FALLBACKS, enabled=LLM_HEDGE,
+        )
+        atexit.register(_hedger.store.flush)
+    return _hedger
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    from utils_config_constants import LLM_HEDGE
+    return get_request_hedger().stats if LLM_HEDGE else None
+
+
+register_summary_stats("Request hedging", _summary_stats, format_hedge_stats)
@@ -9,6 +9,7 @@ import sys
 import io
 import pathlib
 import datetime
+import contextvars
 from typing import Optional
 from utils_config_constants import OUTPUT_DIR
 from utils_path import get_run_base_dir, sanitize_path_component
@@ -153,8 +154,10 @@ def setup_orchestration_logger(base_name: str, model_name: str, timestamp: str,
     Returns:
         Configured logger instance
     """
-    # Create logger
-    logger = logging.getLogger(f"orchestrator_{base_name}_{timestamp}")
+    # Create logger (unique per combination so concurrent sweep runs sharing a
+    # base name and timestamp never clear each other's handlers)
+    model_safe = sanitize_path_component(model_name)
+    logger = logging.getLogger(f"orchestrator_{base_name}_{timestamp}_{model_safe}_{reasoning_effort}_{text_verbosity}")
     logger.setLevel(logging.INFO)
     
     # Clear any existing handlers to avoid duplicates
@@ -171,8 +174,6 @@ def setup_orchestration_logger(base_name: str, model_name: str, timestamp: str,
     # Where PSvX is persona set short code (e.g., PSv3), RXX is reasoning short code (RMI/RLO/RME/RHI) and VXX is verbosity short code (VLO/VME/VHI)
     run_dir = get_run_base_dir(timestamp, base_name, model_name, reasoning_effort, text_verbosity, persona_set, version)
     run_dir.mkdir(parents=True, exist_ok=True)
-    # Sanitize model name for filesystem safety in filename
-    model_safe = sanitize_path_component(model_name)
     log_filename = f"{base_name}_{timestamp}_{model_safe}_orchestrator.log"
     log_file = run_dir / log_filename
     
@@ -191,6 +192,11 @@ def setup_orchestration_logger(base_name: str, model_name: str, timestamp: str,
     
     return logger
 
+# Logger receiving stdout/stderr for the current task/thread context.
+# Concurrent sweep combinations each bind their own orchestrator logger here.
+_stdio_logger: contextvars.ContextVar[Optional[logging.Logger]] = contextvars.ContextVar("_stdio_logger", default=None)
+
+
 class _StreamToLogger(io.TextIOBase):
     """Bridge a text stream (stdout/stderr) to a logger."""
     def __init__(self, logger: logging.Logger, level: int) -> None:
@@ -200,8 +206,9 @@ class _StreamToLogger(io.TextIOBase):
     def write(self, buf: str) -> int:
         if not buf:
             return 0
+        target = _stdio_logger.get() or self._logger
         for line in buf.rstrip().splitlines():
-            self._logger.log(self._level, line)
+            target.log(self._level, line)
         return len(buf)
 
     def flush(self) -> None:  # pragma: no cover
@@ -212,10 +219,35 @@ def attach_stdio_to_logger(logger: logging.Logger) -> None:
     Redirect sys.stdout and sys.stderr to the provided logger so that
     all terminal outputs (including print statements) are persisted in the
     orchestrator log file as well as the console.
+
+    The logger is bound to the current context (asyncio task or thread), so
+    concurrently running orchestrators keep their prints in their own log file.
+    Output produced outside any bound context goes to the last attached logger.
     """
+    _stdio_logger.set(logger)
     sys.stdout = _StreamToLogger(logger, logging.INFO)
     sys.stderr = _StreamToLogger(logger, logging.ERROR)
 
+
+def setup_sweep_logger(name: str = "orchestrator_sweep") -> logging.Logger:
+    """
+    Get a console-only logger for sweep-level progress (scheduler lines).
+
+    Bound to the original stdout so it is never captured by a combination log file.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    logger.propagate = False
+    console_handler = logging.StreamHandler(stream=sys.__stdout__)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    logger.addHandler(console_handler)
+    return logger
+
 def get_agent_logger(agent_name: str, base_name: str, model_name: str, timestamp: str) -> logging.Logger:
     """
     Get a logger for a specific agent.
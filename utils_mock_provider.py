@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Provider Utility
+Offline provider for models named `mock/<recording>`: every call replays one of the
+output-response-raw.json payloads recorded by the matching agent under a run directory
+tree (LLM_MOCK_DIR/<recording>), after a sampled latency and with optional injected
+errors (429 / 503 / timeout). Used to benchmark orchestrator overhead, concurrency and
+artifact I/O without network access or API costs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils_openai_error import APIConnectionError, APIError, RateLimitError
+from utils_prompt_layout import prompt_cache_agent
+from utils_response_dump import to_attr_namespace
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+MOCK_PREFIX = "mock/"
+
+# Agent → (stage folder, role folder) of its artifacts in a run directory
+AGENT_ARTIFACTS = {
+    "lucim_operation_model_generator": ("1_lucim_operation_model", "1-generator"),
+    "lucim_operation_model_auditor": ("1_lucim_operation_model", "2-auditor"),
+    "lucim_scenario_generator": ("2_lucim_scenario", "1-generator"),
+    "lucim_scenario_auditor": ("2_lucim_scenario", "2-auditor"),
+    "lucim_plantuml_diagram_generator": ("3_lucim_plantuml_diagram", "1-generator"),
+    "lucim_plantuml_diagram_auditor": ("3_lucim_plantuml_diagram", "2-auditor"),
+}
+_RECORDED_FILE = "output-response-raw.json"
+_STAT_KEYS = ("calls", "replayed", "rate_limited", "unavailable", "timeouts")
+
+
+def is_mock_model(model_name: str) -> bool:
+    """True for model names served by the mock provider (mock/<recording>)."""
+    return (model_name or "").startswith(MOCK_PREFIX)
+
+
+def parse_latency_spec(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    """
+    Parse a latency distribution: "fixed:<s>", "uniform:<min>,<max>" or "lognormal:<median>,<sigma>".
+
+    Raises:
+        ValueError: On an unknown distribution or missing parameters
+    """
+    kind, _, params = (spec or "fixed:0").partition(":")
+    kind = kind.strip().lower()
+    values = tuple(float(v) for v in params.split(",") if v.strip())
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise ValueError(f"Invalid mock latency '{spec}' (fixed:<s> | uniform:<min>,<max> | lognormal:<median>,<sigma>)")
+    return kind, values
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+class MockRecording:
+    """Recorded payloads of one run directory tree, indexed by agent."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.payloads: Dict[str, List[Path]] = {agent: [] for agent in AGENT_ARTIFACTS}
+        by_folders = {folders: agent for agent, folders in AGENT_ARTIFACTS.items()}
+        for path in sorted(self.root.rglob(_RECORDED_FILE)):
+            parts = path.parent.parts
+            if len(parts) >= 3:
+                agent = by_folders.get((parts[-3], parts[-1]))
+                if agent:
+                    self.payloads[agent].append(path)
+        self._loaded: Dict[Path, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return sum(len(paths) for paths in self.payloads.values())
+
+    def pick(self, agent: Optional[str], key: str) -> Dict[str, Any]:
+        """
+        Return a recorded payload of agent (any agent when None), chosen deterministically from key.
+
+        Raises:
+            FileNotFoundError: When the recording holds no payload for the agent
+        """
+        paths = self.payloads.get(agent) if agent else [p for ps in self.payloads.values() for p in ps]
+        if not paths:
+            raise FileNotFoundError(f"No recorded {_RECORDED_FILE} for agent '{agent}' under {self.root}")
+        path = paths[int(key[:8], 16) % len(paths)]
+        with self._lock:
+            if path not in self._loaded:
+                self._loaded[path] = json.loads(path.read_text(encoding="utf-8"))
+            return self._loaded[path]
+
+
+class MockProvider:
+    """
+    Replays recorded responses with sampled latency and injected errors.
+
+    Injected 429s raise RateLimitError (status_code 429), 503s raise APIError
+    (status_code 503) and timeouts raise APIConnectionError after timeout_seconds,
+    so they go through the usual retry / rate-limit paths of utils_openai_error.
+    """
+
+    def __init__(self, recordings_dir: Path | str, latency: str = "fixed:0",
+                 error_rates: Optional[Dict[str, float]] = None, timeout_seconds: float = 5.0,
+                 usage: str = "recorded", seed: Optional[int] = None):
+        """
+        Initialize the provider.
+
+        Args:
+            recordings_dir: Directory holding one run directory tree per recording name
+            latency: Latency distribution (see parse_latency_spec)
+            error_rates: Probability per call of each injected error ("429", "503", "timeout")
+            timeout_seconds: Time an injected timeout takes before failing
+            usage: "recorded" (replay the recorded usage) or "estimate" (~4 characters per token)
+            seed: Optional seed of the latency / error sampling
+        """
+        self.recordings_dir = Path(recordings_dir)
+        self.latency = parse_latency_spec(latency)
+        self.error_rates = {k: float(v) for k, v in (error_rates or {}).items() if float(v) > 0}
+        self.timeout_seconds = float(timeout_seconds)
+        self.usage = usage
+        self.stats = {k: 0 for k in _STAT_KEYS}
+        self._recordings: Dict[str, MockRecording] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def recording(self, model_name: str) -> MockRecording:
+        """Return the recording of a mock/<recording> model (a path relative to recordings_dir, or absolute)."""
+        name = model_name[len(MOCK_PREFIX):] if is_mock_model(model_name) else model_name
+        with self._lock:
+            if name not in self._recordings:
+                root = Path(name) if Path(name).is_absolute() else self.recordings_dir / name
+                if not root.is_dir():
+                    raise FileNotFoundError(f"Mock recording '{name}' not found ({root})")
+                self._recordings[name] = MockRecording(root)
+                logger.info(f"[MOCK] Loaded recording '{name}': {self._recordings[name].size} payload(s) from {root}")
+            return self._recordings[name]
+
+    def _sample_latency(self) -> float:
+        kind, values = self.latency
+        with self._lock:
+            if kind == "uniform":
+                return max(0.0, self._random.uniform(*values))
+            if kind == "lognormal":
+                median, sigma = values
+                return max(0.0, self._random.lognormvariate(math.log(max(median, 1e-6)), sigma))
+            return max(0.0, values[0])
+
+    def _sample_error(self) -> Optional[str]:
+        with self._lock:
+            draw = self._random.random()
+        for kind, rate in self.error_rates.items():
+            if draw < rate:
+                return kind
+            draw -= rate
+        return None
+
+    def _error(self, kind: str, model_name: str) -> Exception:
+        if kind == "429":
+            self.stats["rate_limited"] += 1
+            error: Exception = RateLimitError(f"429 Too Many Requests (injected by mock provider for {model_name})")
+            error.status_code = 429
+        elif kind == "503":
+            self.stats["unavailable"] += 1
+            error = APIError(f"503 Service Unavailable (injected by mock provider for {model_name})")
+            error.status_code = 503
+        else:
+            self.stats["timeouts"] += 1
+            error = APIConnectionError(f"Request timed out after {self.timeout_seconds}s (injected by mock provider for {model_name})")
+        return error
+
+    def _response(self, api_config: Dict[str, Any]) -> Any:
+        model_name = str(api_config.get("model"))
+        request = json.dumps({k: api_config.get(k) for k in ("instructions", "input")}, sort_keys=True, default=str)
+        key = hashlib.sha256(request.encode("utf-8")).hexdigest()
+        payload = json.loads(json.dumps(self.recording(model_name).pick(prompt_cache_agent(api_config), key)))
+        payload["model"] = model_name
+        if self.usage == "estimate" or not payload.get("usage"):
+            input_tokens = _estimate_tokens(request)
+            output_tokens = _estimate_tokens(json.dumps(payload.get("choices") or payload.get("output") or ""))
+            if "choices" in payload:
+                payload["usage"] = {"prompt_tokens": input_tokens, "completion_tokens": output_tokens,
+                                    "total_tokens": input_tokens + output_tokens}
+            else:
+                payload["usage"] = {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                                    "total_tokens": input_tokens + output_tokens}
+        self.stats["replayed"] += 1
+        return to_attr_namespace(payload)
+
+    def _plan(self, api_config: Dict[str, Any]) -> Tuple[float, Optional[Exception]]:
+        self.stats["calls"] += 1
+        kind = self._sample_error()
+        if kind is None:
+            return self._sample_latency(), None
+        delay = self.timeout_seconds if kind == "timeout" else self._sample_latency() / 4
+        return delay, self._error(kind, str(api_config.get("model")))
+
+    def respond(self, api_config: Dict[str, Any]) -> Any:
+        """Blocking call: wait for the sampled latency, then return a replayed response or raise an injected error."""
+        delay, error = self._plan(api_config)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return self._response(api_config)
+
+    async def arespond(self, api_config: Dict[str, Any]) -> Any:
+        """Async twin of respond (waits with asyncio.sleep)."""
+        delay, error = self._plan(api_config)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return self._response(api_config)
+
+
+def format_mock_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of mock provider counters for run logs."""
+    return (
+        f"calls={stats.get('calls', 0)} replayed={stats.get('replayed', 0)} | injected 429={stats.get('rate_limited', 0)} "
+        f"503={stats.get('unavailable', 0)} timeouts={stats.get('timeouts', 0)}"
+    )
+
+
+_mock_provider: Optional[MockProvider] = None
+
+
+def get_mock_provider() -> MockProvider:
+    """Return the process-wide mock provider configured from utils_config_constants (LLM_MOCK_*)."""
+    global _mock_provider
+    if _mock_provider is None:
+        from utils_config_constants import (
+            LLM_MOCK_DIR, LLM_MOCK_ERROR_RATES, LLM_MOCK_LATENCY, LLM_MOCK_SEED, LLM_MOCK_TIMEOUT_SECONDS, LLM_MOCK_USAGE,
+        )
+        _mock_provider = MockProvider(
+            LLM_MOCK_DIR, latency=LLM_MOCK_LATENCY, error_rates=LLM_MOCK_ERROR_RATES,
+            timeout_seconds=LLM_MOCK_TIMEOUT_SECONDS, usage=LLM_MOCK_USAGE, seed=LLM_MOCK_SEED,
+        )
+    return _mock_provider
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    # The provider only exists once a mock/<recording> model was called
+    return _mock_provider.stats if _mock_provider is not None else None
+
+
+register_summary_stats("Mock provider", _summary_stats, format_mock_stats)
@@ -6,20 +6,40 @@ handling both legacy chat completions and the new Responses API.
 Also supports Google Gemini and OpenRouter models.
 """
 
+import asyncio
+import inspect
 import json
 import logging
 import os
 import time
-from typing import Any, Dict, Optional, Union, List
-from openai import OpenAI
-import tiktoken
-from utils_openai_error import with_retries, classify_error
-from utils_config_constants import get_reasoning_config, DEFAULT_MAX_TOKENS_OPENROUTER, MAX_MAX_TOKENS_OPENROUTER
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Union, List
+from openai import OpenAI, AsyncOpenAI
+from utils_openai_error import with_retries, awith_retries, classify_error
+from utils_config_constants import (
+    get_reasoning_config, DEFAULT_MAX_TOKENS_OPENROUTER, MAX_MAX_TOKENS_OPENROUTER, LLM_STREAM, LLM_STREAM_EARLY_ABORT,
+    LLM_BATCH,
+)
 from utils_api_key import get_openai_api_key, get_api_key_for_model, get_provider_for_model
+from utils_response_cache import get_response_cache
+from utils_rate_limiter import get_rate_limiter
+from utils_prompt_layout import record_prompt_cache_usage
+from utils_budget import charge_current_budget
+from utils_batch_api import get_batch_collector
+from utils_hedging import get_request_hedger
+from utils_mock_provider import get_mock_provider
+from utils_tokenizer import get_tokenizer_service
+from utils_stream_validator import AbortedStreamResponse, StreamAbort, StreamSession, is_aborted_stream, record_stream
+from utils_client_registry import (
+    get_shared_async_openai_client, get_shared_openai_client,
+)
+from utils_gemini_adapter import GeminiClientWrapper
 
 # Logger for this module
 logger = logging.getLogger(__name__)
 
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+
 # Suppress transformers warnings about missing PyTorch/TensorFlow (we only need tokenizers)
 os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
 # Also suppress warnings at import time
@@ -29,85 +49,10 @@ warnings.filterwarnings("ignore", message=".*TensorFlow.*")
 warnings.filterwarnings("ignore", message=".*Flax.*")
 warnings.filterwarnings("ignore", message=".*Models won't be available.*")
 
-# Lazy imports for tokenizers (only load when needed)
-_transformers_available = None
-_sentencepiece_available = None
-# Cache for loaded tokenizers to avoid reloading
-_tokenizer_cache = {}
-
-def _check_transformers():
-    """Check if transformers library is available."""
-    global _transformers_available
-    if _transformers_available is None:
-        try:
-            import transformers
-            _transformers_available = True
-        except ImportError:
-            _transformers_available = False
-            logger.debug("transformers library not available. Install with: pip install transformers")
-    return _transformers_available
-
-def _check_sentencepiece():
-    """Check if sentencepiece library is available."""
-    global _sentencepiece_available
-    if _sentencepiece_available is None:
-        try:
-            import sentencepiece
-            _sentencepiece_available = True
-        except ImportError:
-            _sentencepiece_available = False
-            logger.debug("sentencepiece library not available. Install with: pip install sentencepiece")
-    return _sentencepiece_available
-
-def _get_cached_tokenizer(tokenizer_name: str):
-    """Get a cached tokenizer or load it if not cached.
-    
-    Args:
-        tokenizer_name: HuggingFace tokenizer model name (e.g., "mistralai/Mistral-7B-v0.1")
-    
-    Returns:
-        Tokenizer object or None if loading failed
-    """
-    global _tokenizer_cache
-    if tokenizer_name in _tokenizer_cache:
-        return _tokenizer_cache[tokenizer_name]
-    
-    if not _check_transformers():
-        return None
-    
-    try:
-        # Suppress transformers warnings about missing PyTorch/TensorFlow
-        # Set environment variable before importing to suppress the warning at import time
-        original_verbosity = os.environ.get("TRANSFORMERS_VERBOSITY", None)
-        os.environ["TRANSFORMERS_VERBOSITY"] = "error"
-        
-        import warnings
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", message=".*PyTorch.*")
-            warnings.filterwarnings("ignore", message=".*TensorFlow.*")
-            warnings.filterwarnings("ignore", message=".*Flax.*")
-            warnings.filterwarnings("ignore", message=".*Models won't be available.*")
-            
-            from transformers import AutoTokenizer
-            tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
-            _tokenizer_cache[tokenizer_name] = tokenizer
-            
-            # Restore original verbosity if it was set
-            if original_verbosity is not None:
-                os.environ["TRANSFORMERS_VERBOSITY"] = original_verbosity
-            elif "TRANSFORMERS_VERBOSITY" in os.environ:
-                del os.environ["TRANSFORMERS_VERBOSITY"]
-            
-            return tokenizer
-    except Exception as e:
-        logger.debug(f"Failed to load tokenizer {tokenizer_name}: {e}")
-        return None
-
-
 def count_tokens_with_native_tokenizer(text: str, model_name: str) -> int:
     """Count tokens using the native tokenizer for the model.
     
-    Uses appropriate tokenizers:
+    Uses appropriate tokenizers (loaded once per model, see utils_tokenizer):
     - OpenAI models: tiktoken
     - Gemini models: tiktoken (cl100k_base encoding)
     - Mistral models (including codestral): SentencePiece (via transformers)
@@ -120,89 +65,14 @@ def count_tokens_with_native_tokenizer(text: str, model_name: str) -> int:
     Returns:
         Number of tokens
     """
-    if not text:
-        return 0
-    
-    model_lower = model_name.lower()
-    
-    # OpenAI models - use tiktoken
-    if model_lower.startswith(('gpt-', 'o1-', 'o3-')):
-        try:
-            # Try to get encoding for the specific model
-            encoding = tiktoken.encoding_for_model(model_name)
-            return len(encoding.encode(text))
-        except (KeyError, ValueError):
-            # Fallback to cl100k_base for most OpenAI models
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-    
-    # Gemini models - use tiktoken with cl100k_base
-    if 'gemini' in model_lower:
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
-    
-    # Mistral models (including codestral) - use SentencePiece via transformers
-    if 'mistral' in model_lower or 'codestral' in model_lower:
-        if not _check_transformers():
-            logger.debug(f"transformers not available, using tiktoken fallback for {model_name} (token counts may differ)")
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        
-        # Try multiple Mistral tokenizers in order of preference
-        mistral_tokenizers = [
-            "mistralai/Mistral-7B-v0.1",  # Generic Mistral tokenizer (works for most Mistral models)
-            "mistralai/Mistral-7B-Instruct-v0.1",  # Instruction-tuned variant
-        ]
-        
-        for tokenizer_name in mistral_tokenizers:
-            tokenizer = _get_cached_tokenizer(tokenizer_name)
-            if tokenizer is not None:
-                try:
-                    return len(tokenizer.encode(text))
-                except Exception as e:
-                    logger.debug(f"Error encoding with {tokenizer_name}: {e}, trying next tokenizer")
-                    continue
-        
-        # If all tokenizers failed, fall back to tiktoken
-        logger.debug(f"All Mistral tokenizers failed, using tiktoken fallback for {model_name}")
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
-    
-    # Llama models - use Llama tokenizer via transformers
-    if 'llama' in model_lower:
-        if not _check_transformers():
-            logger.debug(f"transformers not available, using tiktoken fallback for {model_name} (token counts may differ)")
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        
-        # Try multiple Llama tokenizers in order of preference
-        llama_tokenizers = [
-            "meta-llama/Meta-Llama-3-8B",  # Llama 3 tokenizer (most compatible with llama-3.3)
-            "meta-llama/Llama-2-7b-hf",  # Llama 2 fallback
-        ]
-        
-        for tokenizer_name in llama_tokenizers:
-            tokenizer = _get_cached_tokenizer(tokenizer_name)
-            if tokenizer is not None:
-                try:
-                    return len(tokenizer.encode(text))
-                except Exception as e:
-                    logger.debug(f"Error encoding with {tokenizer_name}: {e}, trying next tokenizer")
-                    continue
-        
-        # If all tokenizers failed, fall back to tiktoken
-        logger.debug(f"All Llama tokenizers failed, using tiktoken fallback for {model_name}")
-        encoding = tiktoken.get_encoding("cl100k_base")
-        return len(encoding.encode(text))
-    
-    # Default fallback: tiktoken with cl100k_base
-    encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(text))
+    return get_tokenizer_service().count(text, model_name)
 
 
 def count_tokens_in_messages(messages: List[Dict[str, Any]], model_name: str) -> int:
     """Count tokens in a list of messages using the native tokenizer for the model.
     
+    System messages (static instructions) are counted once per content.
+    
     Args:
         messages: List of message dictionaries with 'role' and 'content' keys
         model_name: Model name
@@ -210,32 +80,7 @@ def count_tokens_in_messages(messages: List[Dict[str, Any]], model_name: str) ->
     Returns:
         Total number of tokens across all messages
     """
-    total_tokens = 0
-    
-    for message in messages:
-        role = message.get('role', '')
-        content = message.get('content', '')
-        
-        # Count tokens for role
-        total_tokens += count_tokens_with_native_tokenizer(role, model_name)
-        
-        # Count tokens for content
-        if isinstance(content, str):
-            total_tokens += count_tokens_with_native_tokenizer(content, model_name)
-        elif isinstance(content, list):
-            # Handle multimodal content (e.g., text + images)
-            for item in content:
-                if isinstance(item, dict):
-                    text = item.get('text', '')
-                    if text:
-                        total_tokens += count_tokens_with_native_tokenizer(text, model_name)
-                elif isinstance(item, str):
-                    total_tokens += count_tokens_with_native_tokenizer(item, model_name)
-        
-        # Add overhead for message formatting (approximate)
-        total_tokens += 4  # ~4 tokens per message for formatting
-    
-    return total_tokens
+    return get_tokenizer_service().count_messages(messages, model_name)
 
 
 def _mask_api_key(value: Any) -> Any:
@@ -418,9 +263,9 @@ def _log_openrouter_response(response: Any, error: Optional[Exception] = None) -
             if hasattr(usage, 'total_tokens'):
                 logger.info(f"    Total tokens (API): {usage.total_tokens}")
             
-            # Log native tokenizer counts if model name is available
+            # Log native tokenizer counts if model name is available (debug only: tokenizing is not free)
             model_name = getattr(response, 'model', None) or getattr(response, '_model', None)
-            if model_name:
+            if model_name and logger.isEnabledFor(logging.DEBUG):
                 try:
                     # Try to get messages from response or from choices
                     messages = None
@@ -435,7 +280,7 @@ def _log_openrouter_response(response: Any, error: Optional[Exception] = None) -
                     
                     if messages:
                         native_input_tokens = count_tokens_in_messages(messages, model_name)
-                        logger.info(f"    Input tokens (native tokenizer): {native_input_tokens}")
+                        logger.debug(f"    Input tokens (native tokenizer): {native_input_tokens}")
                     
                     # Also try to count output tokens if content is available
                     if hasattr(response, 'choices') and isinstance(response.choices, list) and response.choices:
@@ -443,7 +288,7 @@ def _log_openrouter_response(response: Any, error: Optional[Exception] = None) -
                         if hasattr(first_choice, 'message') and hasattr(first_choice.message, 'content'):
                             output_text = str(first_choice.message.content)
                             native_output_tokens = count_tokens_with_native_tokenizer(output_text, model_name)
-                            logger.info(f"    Output tokens (native tokenizer): {native_output_tokens}")
+                            logger.debug(f"    Output tokens (native tokenizer): {native_output_tokens}")
                 except Exception as e:
                     logger.debug(f"Could not count tokens with native tokenizer: {e}")
             
@@ -499,15 +344,6 @@ def _log_openrouter_response(response: Any, error: Optional[Exception] = None) -
     logger.info("=" * 80)
 
 
-# Try to import Google genai SDK (optional for Gemini support)
-try:
-    from google import genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    genai = None
-
-
 # Require LiteLLM for unified provider routing (no fallbacks)
 from litellm import completion as litellm_completion  # type: ignore
 import litellm  # type: ignore
@@ -541,227 +377,16 @@ def get_openai_client() -> OpenAI:
         ValueError: If API key is not found or invalid
     """
     api_key = get_openai_api_key()
-    return OpenAI(api_key=api_key)
-
+    return get_shared_openai_client(api_key)
 
-class GeminiClientWrapper:
-    """Wrapper for Google Gemini client to provide OpenAI-compatible interface.
-    
-    This wrapper adapts Google's genai SDK to work with the existing agent code
-    that expects OpenAI client interface.
-    """
-    
-    def __init__(self, api_key: str, model_name: str):
-        """Initialize Gemini client wrapper.
-        
-        Args:
-            api_key: Gemini API key
-            model_name: Model name (e.g., "gemini-2.5-flash")
-        """
-        if not GEMINI_AVAILABLE:
-            raise ImportError(
-                "google-genai package is required for Gemini support. "
-                "Install with: pip install google-genai"
-            )
-        self.client = genai.Client(api_key=api_key)
-        self.model_name = model_name
-        self.provider = "gemini"
-        
-        # Store the last response for retrieval
-        self._last_response = None
-        self._last_response_id = None
-    
-    class Responses:
-        """Mock responses object to match OpenAI client.responses interface."""
-        
-        def __init__(self, parent: "GeminiClientWrapper"):
-            self.parent = parent
-        
-        def create(self, **kwargs) -> Any:
-            """Create a response using Gemini API.
-            
-            Args:
-                model: Model name (required)
-                instructions: System instructions (optional)
-                input: Input messages (optional)
-                **kwargs: Other OpenAI API config (ignored for Gemini)
-            
-            Returns:
-                Response object with OpenAI-like structure
-            """
-            # Enforce Gemini model: prefer wrapper's configured model_name
-            requested_model = kwargs.get("model")
-            model = self.parent.model_name
-            try:
-                if isinstance(requested_model, str) and "gemini" in requested_model.lower():
-                    model = requested_model
-            except Exception:
-                pass
-            instructions = kwargs.get("instructions", "")
-            input_messages = kwargs.get("input", [])
-            
-            # Build prompt from instructions and input
-            prompt_parts = []
-            if instructions:
-                prompt_parts.append(instructions)
-            
-            # Extract content from input messages
-            for msg in input_messages:
-                if isinstance(msg, dict):
-                    content = msg.get("content", "")
-                    if isinstance(content, str):
-                        prompt_parts.append(content)
-                    elif isinstance(content, list):
-                        for item in content:
-                            if isinstance(item, dict) and "text" in item:
-                                prompt_parts.append(item["text"])
-            
-            # Combine all parts
-            full_prompt = "\n\n".join(prompt_parts)
-            
-            # Call Gemini API
-            # Note: model name is used exactly as provided (e.g., "gemini-2.5-flash")
-            # No transformation or sanitization is applied to the model name
-            try:
-                response = self.parent.client.models.generate_content(
-                    model=model,
-                    contents=full_prompt
-                )
-                
-                # Convert to OpenAI-like response structure
-                response_id = f"gemini_{int(time.time() * 1000)}"
-                self.parent._last_response_id = response_id
-                
-                # Create OpenAI-like response object
-                wrapped_response = GeminiResponseWrapper(response, response_id, full_prompt)
-                self.parent._last_response = wrapped_response
-                
-                return wrapped_response
-            except Exception as e:
-                # Convert Gemini errors to retryable OpenAI exceptions
-                # Import exceptions from utils_openai_error to use fallback versions
-                # that don't require 'request' argument (unlike OpenAI 2.x real exceptions)
-                from utils_openai_error import APIError, RateLimitError, APIConnectionError
-                
-                error_str = str(e).lower()
-                error_repr = repr(e)
-                
-                # Check for 503 Service Unavailable (overloaded model)
-                if "503" in error_str or "unavailable" in error_str or "overloaded" in error_str:
-                    # Use Exception with message to create APIError-like exception
-                    # The fallback APIError from utils_openai_error doesn't require 'request'
-                    raise APIError(f"Gemini API error: 503 UNAVAILABLE. {error_repr}")
-                
-                # Check for rate limit errors (429)
-                if "429" in error_str or "rate limit" in error_str or "quota" in error_str:
-                    raise RateLimitError(f"Gemini API error: 429 RATE_LIMIT. {error_repr}")
-                
-                # Check for connection errors
-                if "connection" in error_str or "timeout" in error_str or "network" in error_str:
-                    raise APIConnectionError(f"Gemini API error: CONNECTION. {error_repr}")
-                
-                # For other errors, raise as APIError (retryable) if they look like server errors
-                # Non-retryable errors (400, 401, 403) will be raised as generic Exception
-                if any(code in error_str for code in ["400", "401", "403", "404"]):
-                    raise Exception(f"Gemini API error: {error_repr}")
-                else:
-                    # Server errors (500, 502, 504, etc.) should be retryable
-                    raise APIError(f"Gemini API error: {error_repr}")
-        
-        def retrieve(self, response_id: str) -> Any:
-            """Retrieve a response (for Gemini, returns immediately as it's synchronous).
-            
-            Args:
-                response_id: Response ID (ignored for Gemini)
-            
-            Returns:
-                Same response object (Gemini is synchronous)
-            """
-            if self.parent._last_response:
-                return self.parent._last_response
-            
-            # Create a completed response wrapper
-            class CompletedResponse:
-                def __init__(self):
-                    self.status = "completed"
-                    self.id = response_id
-                    self.output = []
-                    self.usage = None
-            
-            return CompletedResponse()
-    
-    @property
-    def responses(self):
-        """Access responses interface like OpenAI client.responses."""
-        return self.Responses(self)
 
+def _openrouter_headers() -> Dict[str, str]:
+    """OpenRouter attribution headers, passed in each API call via extra_headers."""
+    return {
+        "HTTP-Referer": os.getenv("OPENROUTER_HTTP_REFERER", "https://github.com/research-publi-reverse-engineering"),
+        "X-Title": os.getenv("OPENROUTER_X_TITLE", "NetLogo to LUCIM Converter"),
+    }
 
-class GeminiResponseWrapper:
-    """Wrapper for Gemini response to match OpenAI response structure."""
-    
-    def __init__(self, gemini_response: Any, response_id: str, prompt: str):
-        """Initialize Gemini response wrapper.
-        
-        Args:
-            gemini_response: Original Gemini response object
-            response_id: Generated response ID
-            prompt: Original prompt (for token counting estimation)
-        """
-        self._gemini_response = gemini_response
-        self.id = response_id
-        self.status = "completed"
-        self.prompt = prompt
-        
-        # Extract text from Gemini response
-        # Gemini response structure: candidates[0].content.parts[0].text
-        self._text = ""
-        try:
-            # Try direct text attribute first (for compatibility)
-            if hasattr(gemini_response, 'text'):
-                self._text = gemini_response.text
-            # Try candidates structure (standard Gemini format)
-            elif hasattr(gemini_response, 'candidates') and isinstance(gemini_response.candidates, list) and len(gemini_response.candidates) > 0:
-                candidate = gemini_response.candidates[0]
-                if hasattr(candidate, 'content'):
-                    content = candidate.content
-                    if hasattr(content, 'parts') and isinstance(content.parts, list):
-                        for part in content.parts:
-                            if hasattr(part, 'text') and isinstance(part.text, str):
-                                self._text += part.text
-                    elif hasattr(content, 'text'):
-                        self._text = content.text
-            # Fallback: try content attribute directly
-            elif hasattr(gemini_response, 'content'):
-                # Handle different response formats
-                if isinstance(gemini_response.content, str):
-                    self._text = gemini_response.content
-                elif isinstance(gemini_response.content, list):
-                    for item in gemini_response.content:
-                        if hasattr(item, 'text'):
-                            self._text += item.text
-        except Exception as e:
-            logger.warning(f"Failed to extract text from Gemini response: {e}")
-            self._text = ""
-        
-        # Create OpenAI-like output structure
-        self.output = [{
-            "content": [{"text": self._text}],
-            "summary": []
-        }]
-        
-        # Estimate usage (Gemini doesn't provide detailed token counts in basic response)
-        # We'll estimate based on prompt and response length
-        prompt_tokens = len(prompt.split()) * 1.3  # Rough estimate
-        response_tokens = len(self._text.split()) * 1.3  # Rough estimate
-        
-        class Usage:
-            def __init__(self):
-                self.input_tokens = int(prompt_tokens)
-                self.output_tokens = int(response_tokens)
-                self.total_tokens = int(prompt_tokens + response_tokens)
-                self.output_tokens_details = None
-        
-        self.usage = Usage()
 
 def get_openai_client_for_model(model_name: str) -> OpenAI:
     """Get a configured client for a specific model with automatic provider detection.
@@ -771,6 +396,9 @@ def get_openai_client_for_model(model_name: str) -> OpenAI:
     
     For OpenRouter models (including Gemini, Mistral, Llama, etc.), it also sets up the required headers (HTTP-Referer and X-Title).
     
+    Clients come from the process-wide registry (utils_client_registry): one long-lived client
+    per provider + API key sharing a keep-alive connection pool, so repeated calls are cheap.
+    
     Args:
         model_name: The model name (e.g., "gpt-5-mini-2025-08-07", "gemini-2.5-flash", "mistral-reasoning-latest")
     
@@ -785,42 +413,50 @@ def get_openai_client_for_model(model_name: str) -> OpenAI:
     provider = get_provider_for_model(model_name)
     api_key = get_api_key_for_model(model_name)
     
-    # For Gemini models, return Gemini wrapper (direct SDK)
+    # Mock models need no SDK client: create_and_wait routes them to the mock provider
+    if provider == "mock":
+        return get_mock_provider()
+    
+    # For Gemini models, return Gemini wrapper (direct SDK, shared genai.Client)
     if provider == "gemini":
-        api_key = get_api_key_for_model(model_name)
         return GeminiClientWrapper(api_key=api_key, model_name=model_name)
     
-    # For OpenRouter models (Mistral, Llama, etc.), use OpenRouter's base URL and headers
+    # For OpenRouter models (Mistral, Llama, etc.), use OpenRouter's base URL
+    # Headers are stored on the client and passed in each API call (see create_and_wait function)
     if provider == "router":
-        # OpenRouter requires HTTP-Referer and X-Title headers
-        # Note: We'll pass these headers in each API call via extra_headers parameter
-        # Create client with OpenRouter base URL
-        import os
-        
-        # Create client with OpenRouter base URL
-        # Headers will be passed in each API call (see create_and_wait function)
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
-        )
-        
-        # Store headers as attributes for later use in API calls
-        http_referer = os.getenv("OPENROUTER_HTTP_REFERER", "https://github.com/research-publi-reverse-engineering")
-        x_title = os.getenv("OPENROUTER_X_TITLE", "NetLogo to LUCIM Converter")
-        client._openrouter_headers = {
-            "HTTP-Referer": http_referer,
-            "X-Title": x_title,
-        }
-        
-        return client
-    
-    # For OpenAI models, use default OpenAI client
-    elif provider == "openai":
-        return OpenAI(api_key=api_key)
+        return get_shared_openai_client(api_key, base_url=OPENROUTER_API_BASE, headers=_openrouter_headers())
     
-    # Fallback: treat as OpenAI (backward compatibility)
-    else:
-        return OpenAI(api_key=api_key)
+    # OpenAI models (and fallback for backward compatibility): default OpenAI client
+    return get_shared_openai_client(api_key)
+
+
+def get_async_openai_client_for_model(model_name: str) -> Any:
+    """Get an async-capable client for a specific model (counterpart of get_openai_client_for_model).
+
+    AsyncOpenAI clients are shared per API key within the running event loop.
+
+    Args:
+        model_name: The model name (e.g., "gpt-5-mini-2025-08-07", "gemini-2.5-flash")
+
+    Returns:
+        - AsyncOpenAI client for OpenAI models
+        - GeminiClientWrapper for Gemini models (async calls go through responses.acreate)
+        - AsyncOpenAI client with OpenRouter base_url and headers for OpenRouter models
+          (acreate_and_wait routes those through litellm.acompletion)
+    """
+    provider = get_provider_for_model(model_name)
+    api_key = get_api_key_for_model(model_name)
+
+    if provider == "mock":
+        return get_mock_provider()
+
+    if provider == "gemini":
+        return GeminiClientWrapper(api_key=api_key, model_name=model_name)
+
+    if provider == "router":
+        return get_shared_async_openai_client(api_key, base_url=OPENROUTER_API_BASE, headers=_openrouter_headers())
+
+    return get_shared_async_openai_client(api_key)
 
 
 def format_prompt_for_responses_api(prompt_text: str) -> str:
@@ -887,20 +523,12 @@ def normalize_openrouter_model_name(model_name: str) -> str:
     return trimmed
 
 
-def create_and_wait(
-    client: "OpenAI",
-    api_config: Dict[str, Any],
-    poll_interval_seconds: float = 1.0,
-    timeout_seconds: Optional[float] = None,
-) -> Any:
-    """Create a model response using SDKs for OpenAI, Gemini, and OpenRouter for others.
+def _build_chat_messages(api_config: Dict[str, Any]) -> tuple[str, List[Dict[str, str]]]:
+    """Build chat messages (instructions + first input content) from a Responses-style api_config.
 
-    Routing policy:
-    - OpenAI models (gpt-*, gpt-5*): OpenAI Responses API (SDK)
-    - Gemini: Google SDK via GeminiClientWrapper (OpenAI-like interface)
-    - All others (e.g., Mistral, Llama): OpenRouter via LiteLLM
+    Returns:
+        Tuple of (stripped model name, messages list)
     """
-    # Build messages from api_config (instructions + first input content)
     model_name = (api_config.get("model") or "").strip()
     system_text = api_config.get("instructions", "") or ""
     user_text = ""
@@ -923,47 +551,11 @@ def create_and_wait(
     if system_text:
         messages.append({"role": "system", "content": system_text})
     messages.append({"role": "user", "content": user_text})
+    return model_name, messages
 
-    # Decide provider
-    provider = get_provider_for_model(model_name)
 
-    # 1) OpenAI → Responses API (SDK)
-    if provider == "openai":
-        # Ensure we have a proper OpenAI client
-        if not hasattr(client, 'responses'):
-            client = get_openai_client()
-        # Log request payload
-        _log_responses_api_params(api_config)
-        # Create and poll until completion
-        response = with_retries(lambda: client.responses.create(**api_config), logger=logger, provider="openai")
-        start_time = time.time()
-        while getattr(response, "status", None) not in ("completed", "failed", "cancelled"):
-            if timeout_seconds and (time.time() - start_time) > timeout_seconds:
-                raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
-            time.sleep(poll_interval_seconds)
-            response = client.responses.retrieve(response.id)
-        if getattr(response, "status", None) != "completed":
-            raise RuntimeError(f"OpenAI response ended with status: {getattr(response, 'status', None)}")
-        return response
-    
-    # 1.b) Gemini → direct Google SDK via GeminiClientWrapper (OpenAI-like interface)
-    if provider == "gemini":
-        # Ensure we have a Gemini wrapper client bound to the model
-        if not hasattr(client, 'responses') or client.__class__.__name__ != "GeminiClientWrapper":
-            client = get_openai_client_for_model(model_name)
-        _log_responses_api_params(api_config)
-        response = with_retries(lambda: client.responses.create(**api_config), logger=logger, provider="gemini")
-        start_time = time.time()
-        while getattr(response, "status", None) not in ("completed", "failed", "cancelled"):
-            if timeout_seconds and (time.time() - start_time) > timeout_seconds:
-                raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
-            time.sleep(poll_interval_seconds)
-            response = client.responses.retrieve(getattr(response, "id", ""))
-        if getattr(response, "status", None) != "completed":
-            raise RuntimeError(f"Gemini response ended with status: {getattr(response, 'status', None)}")
-        return response
-
-    # 2) OpenRouter models (Mistral, Llama, etc.) → OpenRouter via LiteLLM
+def _build_openrouter_kwargs(model_name: str, api_config: Dict[str, Any], messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Build (and log) the LiteLLM kwargs for an OpenRouter chat completion call."""
     # Relax parameter strictness to avoid provider-specific UnsupportedParamsError
     litellm.drop_params = True
     # Disable automatic max_tokens calculation to prevent negative values with long prompts
@@ -1025,13 +617,11 @@ def create_and_wait(
     logger.info(f"  litellm.modify_params: {litellm.modify_params}")
     logger.info(f"  litellm.drop_params: {litellm.drop_params}")
     
-    # Log input token count using native tokenizer
-    model_name = litellm_kwargs.get('model', 'unknown')
-    messages = litellm_kwargs.get('messages', [])
-    if messages:
+    # Log input token count using native tokenizer (debug only: tokenizing is not free)
+    if messages and logger.isEnabledFor(logging.DEBUG):
         try:
-            native_input_tokens = count_tokens_in_messages(messages, model_name)
-            logger.info(f"  Input tokens (native tokenizer): {native_input_tokens}")
+            native_input_tokens = count_tokens_in_messages(messages, normalized_model_name)
+            logger.debug(f"  Input tokens (native tokenizer): {native_input_tokens}")
         except Exception as e:
             logger.debug(f"Could not count input tokens with native tokenizer: {e}")
     
@@ -1045,6 +635,231 @@ def create_and_wait(
     elif litellm_kwargs.get("max_tokens", 0) < 1:
         logger.warning(f"Invalid max_tokens value {litellm_kwargs.get('max_tokens')}, forcing to {DEFAULT_MAX_TOKENS_OPENROUTER}")
         litellm_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
+    return litellm_kwargs
+
+
+def _safe_openrouter_kwargs(litellm_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy LiteLLM kwargs and force max_tokens into the (0, MAX_MAX_TOKENS_OPENROUTER] range."""
+    # Create a copy of kwargs to prevent any modifications
+    safe_kwargs = litellm_kwargs.copy()
+    
+    # CRITICAL: Force max_tokens to be positive and reasonable
+    # This prevents any negative values from being sent to OpenRouter
+    # Default value from utils_config_constants.py (SSOT)
+    if "max_tokens" not in safe_kwargs or safe_kwargs.get("max_tokens") is None:
+        safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
+    elif safe_kwargs.get("max_tokens", 0) < 1:
+        logger.warning(f"Detected invalid max_tokens {safe_kwargs.get('max_tokens')}, forcing to {DEFAULT_MAX_TOKENS_OPENROUTER}")
+        safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
+    elif safe_kwargs.get("max_tokens", 0) > MAX_MAX_TOKENS_OPENROUTER:
+        logger.warning(f"Detected excessive max_tokens {safe_kwargs.get('max_tokens')}, capping to {DEFAULT_MAX_TOKENS_OPENROUTER}")
+        safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
+    
+    # FINAL CHECK: Log the actual max_tokens value right before the call
+    logger.info(f"[SAFE_CALL] Final max_tokens before litellm call: {safe_kwargs.get('max_tokens')}")
+    return safe_kwargs
+
+
+def _safe_get_modified_max_tokens(*args, **kwargs):
+    """Return the user's max_tokens value without modification to prevent negative values."""
+    # Return the user's original max_tokens value (from kwargs or args)
+    user_max_tokens = kwargs.get("user_max_tokens") or (args[3] if len(args) > 3 else None)
+    if user_max_tokens is not None and user_max_tokens > 0:
+        return user_max_tokens
+    # If no valid value, return None to skip modification
+    return None
+
+
+_litellm_async_guard_installed = False
+
+
+def _install_litellm_max_tokens_guard() -> None:
+    """Permanently replace litellm's get_modified_max_tokens (async path).
+
+    The sync path patches and restores around each call; interleaved coroutines
+    cannot do that safely, so the async path installs the guard once per process.
+    """
+    global _litellm_async_guard_installed
+    if _litellm_async_guard_installed:
+        return
+    try:
+        import litellm.litellm_core_utils.token_counter as token_counter_module
+        token_counter_module.get_modified_max_tokens = _safe_get_modified_max_tokens
+        _litellm_async_guard_installed = True
+    except Exception as e:
+        logger.warning(f"Could not monkey-patch get_modified_max_tokens: {e}")
+
+
+def create_and_wait(
+    client: "OpenAI",
+    api_config: Dict[str, Any],
+    poll_interval_seconds: float = 1.0,
+    timeout_seconds: Optional[float] = None,
+    stream_stage: Optional[str] = None,
+) -> Any:
+    """Create a model response using SDKs for OpenAI, Gemini, and OpenRouter for others.
+
+    Routing policy:
+    - OpenAI models (gpt-*, gpt-5*): OpenAI Responses API (SDK)
+    - Gemini: Google SDK via GeminiClientWrapper (OpenAI-like interface)
+    - mock/<recording>: offline replay of recorded responses (utils_mock_provider)
+    - All others (e.g., Mistral, Llama): OpenRouter via LiteLLM
+
+    Responses go through the content-addressed cache (LLM_CACHE_MODE, see
+    utils_response_cache); in replay mode a cache miss raises ResponseCacheMiss.
+
+    With LLM_STREAM on, the response is streamed instead; stream_stage ("operation_model",
+    "scenario" or "diagram") enables the early abort of outputs that break the stage's
+    block-only rule (see utils_stream_validator). Aborted responses are not cached.
+
+    The latency of every provider call feeds the per-model histograms of utils_hedging
+    (hedging itself needs acreate_and_wait). On the OpenRouter path, timeout_seconds
+    bounds each litellm attempt.
+
+    This call blocks; use acreate_and_wait from async code.
+    """
+    cache = get_response_cache()
+    cached = cache.lookup(api_config)
+    if cached is not None:
+        return cached
+    started = time.monotonic()
+    response = _create_and_wait_uncached(client, api_config, poll_interval_seconds, timeout_seconds, stream_stage)
+    if not is_aborted_stream(response):
+        get_request_hedger().store.record(str(api_config.get("model")), time.monotonic() - started)
+    _record_usage(api_config, response)
+    if not is_aborted_stream(response):
+        cache.store(api_config, response)
+    return response
+
+
+def _record_usage(api_config: Dict[str, Any], response: Any) -> None:
+    """Count the input / cached input tokens of a provider call for its agent (utils_prompt_layout)
+    and charge its total tokens to the budget of the current run (utils_budget)."""
+    try:
+        usage = get_usage_tokens(response)
+        record_prompt_cache_usage(api_config, usage)
+        charge_current_budget(usage)
+    except Exception:
+        pass
+
+
+def _rate_limit_estimate(api_config: Dict[str, Any], messages: List[Dict[str, Any]],
+                         input_tokens: Optional[int]) -> int:
+    """Input token count (character estimate when unknown) plus the requested output budget, if any."""
+    estimate = input_tokens if input_tokens is not None else sum(len(str(m.get("content", ""))) for m in messages) // 4
+    for key in ("max_output_tokens", "max_tokens"):
+        if isinstance(api_config.get(key), int):
+            estimate += api_config[key]
+            break
+    return estimate
+
+
+def _plan_rate_limit(provider: str, model_name: str, api_config: Dict[str, Any],
+                     messages: List[Dict[str, Any]]) -> tuple[Any, int]:
+    """Return (rate limiter, estimated request tokens) for a call; the limiter is None when rate limiting is off.
+
+    The estimate is the input token count plus the requested output budget, if any.
+    """
+    limiter = get_rate_limiter(provider, model_name)
+    if limiter is None:
+        return None, 0
+    try:
+        input_tokens = count_tokens_in_messages(messages, model_name)
+    except Exception:
+        input_tokens = None
+    return limiter, _rate_limit_estimate(api_config, messages, input_tokens)
+
+
+async def _aplan_rate_limit(provider: str, model_name: str, api_config: Dict[str, Any],
+                            messages: List[Dict[str, Any]]) -> tuple[Any, int]:
+    """Async _plan_rate_limit: the input is tokenized in the tokenizer thread pool, off the event loop."""
+    limiter = get_rate_limiter(provider, model_name)
+    if limiter is None:
+        return None, 0
+    try:
+        input_tokens = await get_tokenizer_service().acount_messages(messages, model_name)
+    except Exception:
+        input_tokens = None
+    return limiter, _rate_limit_estimate(api_config, messages, input_tokens)
+
+
+def _reconcile_rate_limit(limiter: Any, estimate: int, response: Any) -> Any:
+    """Correct the limiter with the actual usage of a completed response and return the response."""
+    if limiter is not None:
+        try:
+            limiter.reconcile(estimate, get_usage_tokens(response).get("total_tokens", 0))
+        except Exception:
+            pass
+    return response
+
+
+def _create_and_wait_uncached(
+    client: "OpenAI",
+    api_config: Dict[str, Any],
+    poll_interval_seconds: float,
+    timeout_seconds: Optional[float],
+    stream_stage: Optional[str] = None,
+) -> Any:
+    """Provider routing of create_and_wait (no cache)."""
+    # Build messages from api_config (instructions + first input content)
+    model_name, messages = _build_chat_messages(api_config)
+
+    # Decide provider
+    provider = get_provider_for_model(model_name)
+    limiter, estimate = _plan_rate_limit(provider, model_name, api_config, messages)
+
+    # 0) mock/<recording> → offline replay of recorded responses (utils_mock_provider)
+    if provider == "mock":
+        response = with_retries(lambda: get_mock_provider().respond(api_config), logger=logger, provider="mock",
+                                rate_limiter=limiter, rate_tokens=estimate)
+        return _reconcile_rate_limit(limiter, estimate, response)
+
+    if LLM_STREAM:
+        return _stream_and_wait(client, api_config, provider, model_name, messages,
+                                limiter, estimate, timeout_seconds, stream_stage)
+
+    # 1) OpenAI → Responses API (SDK)
+    if provider == "openai":
+        # Ensure we have a proper OpenAI client
+        if not hasattr(client, 'responses'):
+            client = get_openai_client()
+        # Log request payload
+        _log_responses_api_params(api_config)
+        # Create and poll until completion
+        response = with_retries(lambda: client.responses.create(**api_config), logger=logger, provider="openai",
+                                rate_limiter=limiter, rate_tokens=estimate)
+        start_time = time.time()
+        while getattr(response, "status", None) not in ("completed", "failed", "cancelled"):
+            if timeout_seconds and (time.time() - start_time) > timeout_seconds:
+                raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
+            time.sleep(poll_interval_seconds)
+            response = client.responses.retrieve(response.id)
+        if getattr(response, "status", None) != "completed":
+            raise RuntimeError(f"OpenAI response ended with status: {getattr(response, 'status', None)}")
+        return _reconcile_rate_limit(limiter, estimate, response)
+    
+    # 1.b) Gemini → direct Google SDK via GeminiClientWrapper (OpenAI-like interface)
+    if provider == "gemini":
+        # Ensure we have a Gemini wrapper client bound to the model
+        if not hasattr(client, 'responses') or client.__class__.__name__ != "GeminiClientWrapper":
+            client = get_openai_client_for_model(model_name)
+        _log_responses_api_params(api_config)
+        response = with_retries(lambda: client.responses.create(**api_config), logger=logger, provider="gemini",
+                                rate_limiter=limiter, rate_tokens=estimate)
+        start_time = time.time()
+        while getattr(response, "status", None) not in ("completed", "failed", "cancelled"):
+            if timeout_seconds and (time.time() - start_time) > timeout_seconds:
+                raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
+            time.sleep(poll_interval_seconds)
+            response = client.responses.retrieve(getattr(response, "id", ""))
+        if getattr(response, "status", None) != "completed":
+            raise RuntimeError(f"Gemini response ended with status: {getattr(response, 'status', None)}")
+        return _reconcile_rate_limit(limiter, estimate, response)
+
+    # 2) OpenRouter models (Mistral, Llama, etc.) → OpenRouter via LiteLLM
+    litellm_kwargs = _build_openrouter_kwargs(model_name, api_config, messages)
+    if timeout_seconds:
+        litellm_kwargs["timeout"] = timeout_seconds
     
     # Execute OpenRouter call with detailed error logging
     try:
@@ -1056,23 +871,7 @@ def create_and_wait(
             litellm.modify_params = False
             litellm.drop_params = True
             
-            # Create a copy of kwargs to prevent any modifications
-            safe_kwargs = litellm_kwargs.copy()
-            
-            # CRITICAL: Force max_tokens to be positive and reasonable
-            # This prevents any negative values from being sent to OpenRouter
-            # Default value from utils_config_constants.py (SSOT)
-            if "max_tokens" not in safe_kwargs or safe_kwargs.get("max_tokens") is None:
-                safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
-            elif safe_kwargs.get("max_tokens", 0) < 1:
-                logger.warning(f"Detected invalid max_tokens {safe_kwargs.get('max_tokens')}, forcing to {DEFAULT_MAX_TOKENS_OPENROUTER}")
-                safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
-            elif safe_kwargs.get("max_tokens", 0) > MAX_MAX_TOKENS_OPENROUTER:
-                logger.warning(f"Detected excessive max_tokens {safe_kwargs.get('max_tokens')}, capping to {DEFAULT_MAX_TOKENS_OPENROUTER}")
-                safe_kwargs["max_tokens"] = DEFAULT_MAX_TOKENS_OPENROUTER
-            
-            # FINAL CHECK: Log the actual max_tokens value right before the call
-            logger.info(f"[SAFE_CALL] Final max_tokens before litellm call: {safe_kwargs.get('max_tokens')}")
+            safe_kwargs = _safe_openrouter_kwargs(litellm_kwargs)
             
             # MONKEY PATCH: Temporarily disable get_modified_max_tokens to prevent any automatic calculation
             # This is a last-resort protection against litellm modifying max_tokens
@@ -1081,18 +880,9 @@ def create_and_wait(
                 from litellm.litellm_core_utils.token_counter import get_modified_max_tokens
                 original_get_modified_max_tokens = get_modified_max_tokens
                 
-                def safe_get_modified_max_tokens(*args, **kwargs):
-                    """Return the user's max_tokens value without modification to prevent negative values."""
-                    # Return the user's original max_tokens value (from kwargs or args)
-                    user_max_tokens = kwargs.get("user_max_tokens") or (args[3] if len(args) > 3 else None)
-                    if user_max_tokens is not None and user_max_tokens > 0:
-                        return user_max_tokens
-                    # If no valid value, return None to skip modification
-                    return None
-                
                 # Replace the function temporarily
                 import litellm.litellm_core_utils.token_counter as token_counter_module
-                token_counter_module.get_modified_max_tokens = safe_get_modified_max_tokens
+                token_counter_module.get_modified_max_tokens = _safe_get_modified_max_tokens
             except Exception as e:
                 logger.warning(f"Could not monkey-patch get_modified_max_tokens: {e}")
             
@@ -1121,17 +911,424 @@ def create_and_wait(
                 litellm.modify_params = original_modify_params
                 litellm.drop_params = original_drop_params
         
-        response = with_retries(lambda: safe_litellm_call(), logger=logger, provider="router")
+        response = with_retries(lambda: safe_litellm_call(), logger=logger, provider="router",
+                                rate_limiter=limiter, rate_tokens=estimate)
         # Log successful response details
         _log_openrouter_response(response)
-        return response
+        return _reconcile_rate_limit(limiter, estimate, response)
     except Exception as e:
         # Log detailed error information
         _log_openrouter_response(None, error=e)
         raise
 
 
-# Streaming helpers were removed as the project no longer persists streaming artifacts.
+async def _apoll_until_done(retrieve, response: Any, poll_interval_seconds: float,
+                            timeout_seconds: Optional[float], label: str) -> Any:
+    """Poll a Responses-style job with asyncio.sleep until it reaches a terminal status."""
+    start_time = time.monotonic()
+    while getattr(response, "status", None) not in ("completed", "failed", "cancelled"):
+        if timeout_seconds and (time.monotonic() - start_time) > timeout_seconds:
+            raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
+        await asyncio.sleep(poll_interval_seconds)
+        response = await retrieve(getattr(response, "id", ""))
+    if getattr(response, "status", None) != "completed":
+        raise RuntimeError(f"{label} response ended with status: {getattr(response, 'status', None)}")
+    return response
+
+
+async def acreate_and_wait(
+    client: Any,
+    api_config: Dict[str, Any],
+    poll_interval_seconds: float = 1.0,
+    timeout_seconds: Optional[float] = None,
+    stream_stage: Optional[str] = None,
+) -> Any:
+    """Async twin of create_and_wait (same routing, retries and return types).
+
+    - OpenAI: AsyncOpenAI Responses API, polled with asyncio.sleep
+    - Gemini: google-genai async client (client.aio) via GeminiClientWrapper.responses.acreate
+    - Others: OpenRouter via litellm.acompletion
+
+    Cancelling the awaiting task propagates asyncio.CancelledError; a pending
+    OpenAI response is cancelled server-side on a best-effort basis. The response
+    cache is consulted exactly as in create_and_wait.
+
+    With LLM_BATCH on, OpenAI requests are queued on the process-wide BatchCollector and
+    answered once their wave's batch completes (utils_batch_api); other providers are
+    called directly.
+
+    Direct calls are hedged (LLM_HEDGE, utils_hedging): past the latency percentile of the
+    model, a duplicate goes to the same or the fallback model and the first response wins.
+    A fallback response is cached under the fallback model's request and carries a used_model
+    attribute, serialized with the raw response into output-response-full.json.
+
+    Args:
+        client: AsyncOpenAI client or GeminiClientWrapper (resolved from the model when unsuitable)
+        api_config: Responses-style API configuration (model, instructions, input, ...)
+        poll_interval_seconds: Delay between status polls
+        timeout_seconds: Optional polling timeout (None = wait indefinitely)
+        stream_stage: Stage whose block-only rule is enforced while streaming (LLM_STREAM)
+    """
+    cache = get_response_cache()
+    cached = cache.lookup(api_config)
+    if cached is not None:
+        return cached
+    model_name = str(api_config.get("model"))
+    if LLM_BATCH and get_provider_for_model(model_name) == "openai":
+        response = await _acreate_and_wait_uncached(client, api_config, poll_interval_seconds, timeout_seconds, stream_stage)
+    else:
+        async def _call(model: str) -> Any:
+            if model == model_name:
+                return await _acreate_and_wait_uncached(client, api_config, poll_interval_seconds, timeout_seconds, stream_stage)
+            # Fallback model: its client is resolved from the model
+            return await _acreate_and_wait_uncached(None, dict(api_config, model=model), poll_interval_seconds,
+                                                    timeout_seconds, stream_stage)
+
+        response, used_model = await get_request_hedger().run(
+            model_name, _call, record=lambda result: not is_aborted_stream(result)
+        )
+        if used_model != model_name:
+            _record_used_model(response, model_name, used_model)
+            api_config = dict(api_config, model=used_model)
+    _record_usage(api_config, response)
+    if not is_aborted_stream(response):
+        cache.store(api_config, response)
+    return response
+
+
+def _record_used_model(response: Any, model_name: str, used_model: str) -> None:
+    """Tag a hedged response answered by the fallback model (artifacts are written under model_name)."""
+    logger.warning(f"[HEDGE] {model_name} request answered by fallback model {used_model}")
+    try:
+        response.used_model = used_model
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.warning(f"[HEDGE] Could not record used_model on {type(response).__name__}: {e}")
+
+
+async def _acreate_and_wait_uncached(
+    client: Any,
+    api_config: Dict[str, Any],
+    poll_interval_seconds: float,
+    timeout_seconds: Optional[float],
+    stream_stage: Optional[str] = None,
+) -> Any:
+    """Provider routing of acreate_and_wait (no cache)."""
+    model_name, messages = _build_chat_messages(api_config)
+    provider = get_provider_for_model(model_name)
+    if LLM_BATCH and provider == "openai":
+        # Batch queue limits apply instead of the per-minute rate limiter
+        return await get_batch_collector().submit(api_config)
+    limiter, estimate = await _aplan_rate_limit(provider, model_name, api_config, messages)
+
+    # 0) mock/<recording> → offline replay of recorded responses (utils_mock_provider)
+    if provider == "mock":
+        response = await awith_retries(lambda: get_mock_provider().arespond(api_config), logger=logger, provider="mock",
+                                       rate_limiter=limiter, rate_tokens=estimate)
+        return _reconcile_rate_limit(limiter, estimate, response)
+
+    if LLM_STREAM:
+        return await _astream_and_wait(client, api_config, provider, model_name, messages,
+                                       limiter, estimate, timeout_seconds, stream_stage)
+
+    # 1) OpenAI → Responses API (AsyncOpenAI)
+    if provider == "openai":
+        if not isinstance(client, AsyncOpenAI):
+            client = get_async_openai_client_for_model(model_name)
+        _log_responses_api_params(api_config)
+        response = await awith_retries(lambda: client.responses.create(**api_config), logger=logger, provider="openai",
+                                       rate_limiter=limiter, rate_tokens=estimate)
+        try:
+            response = await _apoll_until_done(client.responses.retrieve, response, poll_interval_seconds, timeout_seconds, "OpenAI")
+            return _reconcile_rate_limit(limiter, estimate, response)
+        except (asyncio.CancelledError, TimeoutError):
+            response_id = getattr(response, "id", None)
+            if response_id and getattr(response, "status", None) in ("queued", "in_progress"):
+                try:
+                    await asyncio.shield(client.responses.cancel(response_id))
+                except BaseException:
+                    pass
+            raise
+
+    # 1.b) Gemini → google-genai async client via GeminiClientWrapper
+    if provider == "gemini":
+        if client.__class__.__name__ != "GeminiClientWrapper":
+            client = get_openai_client_for_model(model_name)
+        _log_responses_api_params(api_config)
+        response = await awith_retries(lambda: client.responses.acreate(**api_config), logger=logger, provider="gemini",
+                                       rate_limiter=limiter, rate_tokens=estimate)
+
+        async def _retrieve(response_id: str) -> Any:
+            return client.responses.retrieve(response_id)
+
+        response = await _apoll_until_done(_retrieve, response, poll_interval_seconds, timeout_seconds, "Gemini")
+        return _reconcile_rate_limit(limiter, estimate, response)
+
+    # 2) OpenRouter models (Mistral, Llama, etc.) → litellm.acompletion
+    litellm_kwargs = _build_openrouter_kwargs(model_name, api_config, messages)
+    if timeout_seconds:
+        litellm_kwargs["timeout"] = timeout_seconds
+    _install_litellm_max_tokens_guard()
+    try:
+        async def safe_litellm_acall():
+            litellm.modify_params = False
+            litellm.drop_params = True
+            safe_kwargs = _safe_openrouter_kwargs(litellm_kwargs)
+            result = await litellm.acompletion(**safe_kwargs)
+            logger.info(f"[SAFE_CALL] litellm async call completed successfully")
+            return result
+
+        response = await awith_retries(safe_litellm_acall, logger=logger, provider="router",
+                                       rate_limiter=limiter, rate_tokens=estimate)
+        _log_openrouter_response(response)
+        return _reconcile_rate_limit(limiter, estimate, response)
+    except Exception as e:
+        _log_openrouter_response(None, error=e)
+        raise
+
+
+# Streaming (opt-in, LLM_STREAM): text deltas are fed to a StreamSession, which records
+# time-to-first-token and cancels the request once the output is certain to break its
+# block-only rule (utils_stream_validator). Aborted streams return an AbortedStreamResponse
+# holding the partial text and an estimated usage, which the budget and the rate limiter
+# charge like any other response.
+
+
+def _close_stream(stream: Any) -> None:
+    close = getattr(stream, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+async def _aclose_stream(stream: Any) -> None:
+    for name in ("aclose", "close"):
+        close = getattr(stream, name, None)
+        if callable(close):
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                pass
+            return
+
+
+def _check_stream_deadline(started: float, timeout_seconds: Optional[float]) -> None:
+    if timeout_seconds and (time.monotonic() - started) > timeout_seconds:
+        raise TimeoutError(f"Response timed out after {timeout_seconds} seconds")
+
+
+def _consume_stream(stream: Any, session: StreamSession, delta_of, timeout_seconds: Optional[float]) -> Optional[StreamAbort]:
+    """Feed every chunk of a stream to the session; close the stream and return the abort on a fatal violation."""
+    try:
+        for chunk in stream:
+            session.feed(delta_of(chunk))
+            _check_stream_deadline(session.started, timeout_seconds)
+    except StreamAbort as abort:
+        _close_stream(stream)
+        return abort
+    except BaseException:
+        _close_stream(stream)
+        raise
+    return None
+
+
+async def _aconsume_stream(stream: Any, session: StreamSession, delta_of, timeout_seconds: Optional[float]) -> Optional[StreamAbort]:
+    """Async twin of _consume_stream (cancelling the awaiting task closes the stream)."""
+    try:
+        async for chunk in stream:
+            session.feed(delta_of(chunk))
+            _check_stream_deadline(session.started, timeout_seconds)
+    except StreamAbort as abort:
+        await _aclose_stream(stream)
+        return abort
+    except BaseException:
+        await _aclose_stream(stream)
+        raise
+    return None
+
+
+def _responses_stream_reader() -> tuple[Any, Dict[str, Any]]:
+    """Return (delta extractor, holder of the final response) for a Responses API event stream."""
+    final: Dict[str, Any] = {}
+
+    def delta_of(event: Any) -> str:
+        event_type = getattr(event, "type", "")
+        if event_type == "response.output_text.delta":
+            return getattr(event, "delta", "") or ""
+        if event_type in ("response.completed", "response.incomplete", "response.failed"):
+            final["response"] = getattr(event, "response", None)
+        return ""
+
+    return delta_of, final
+
+
+def _chat_stream_reader() -> tuple[Any, List[Any]]:
+    """Return (delta extractor, received chunks) for a chat-completions (LiteLLM) stream."""
+    chunks: List[Any] = []
+
+    def delta_of(chunk: Any) -> str:
+        chunks.append(chunk)
+        choices = getattr(chunk, "choices", None) or []
+        if not choices:
+            return ""
+        delta = getattr(choices[0], "delta", None)
+        content = getattr(delta, "content", None)
+        return content if isinstance(content, str) else ""
+
+    return delta_of, chunks
+
+
+def _gemini_stream_reader() -> tuple[Any, Dict[str, Any]]:
+    """Return (delta extractor, holder of the last usage_metadata) for a Gemini content stream."""
+    final: Dict[str, Any] = {}
+
+    def delta_of(chunk: Any) -> str:
+        # Usage is cumulative: the last chunk carrying it holds the totals of the response
+        usage_metadata = getattr(chunk, "usage_metadata", None)
+        if usage_metadata is not None:
+            final["usage_metadata"] = usage_metadata
+        try:
+            return chunk.text or ""
+        except Exception:
+            return ""
+
+    return delta_of, final
+
+
+def _completed_responses_stream(final: Dict[str, Any]) -> Any:
+    response = final.get("response")
+    if response is None:
+        raise RuntimeError("OpenAI stream ended without a final response")
+    if getattr(response, "status", None) != "completed":
+        raise RuntimeError(f"OpenAI response ended with status: {getattr(response, 'status', None)}")
+    return response
+
+
+def _aborted_stream_usage(session: StreamSession, model_name: str, messages: List[Dict[str, str]]) -> Dict[str, int]:
+    """Estimated input/output tokens of a cancelled stream (providers report no usage for it)."""
+    service = get_tokenizer_service()
+    try:
+        return {"input_tokens": service.count_messages(messages, model_name),
+                "output_tokens": service.count(session.text, model_name)}
+    except Exception:
+        return {"input_tokens": sum(len(str(m.get("content", ""))) for m in messages) // 4}
+
+
+def _finish_stream(session: StreamSession, response: Any, abort: Optional[StreamAbort], label: str,
+                   model_name: str, messages: List[Dict[str, str]]) -> Any:
+    """Attach stream metrics to the response (or build the aborted one, with estimated usage) and record them."""
+    if abort is not None:
+        response = AbortedStreamResponse(session, abort, **_aborted_stream_usage(session, model_name, messages))
+        logger.warning(f"[STREAM] {label}: cancelled after {len(session.text)} chars ({abort})")
+    metrics = session.metrics(abort)
+    record_stream(metrics)
+    try:
+        response.stream_metrics = metrics
+    except Exception:
+        pass
+    logger.info(f"[STREAM] {label}: ttft={metrics['ttft_ms']}ms total={metrics['duration_ms']}ms")
+    return response
+
+
+def _stream_chat_kwargs(model_name: str, api_config: Dict[str, Any], messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    kwargs = _safe_openrouter_kwargs(_build_openrouter_kwargs(model_name, api_config, messages))
+    kwargs["stream"] = True
+    kwargs["stream_options"] = {"include_usage": True}
+    return kwargs
+
+
+def _stream_and_wait(client: Any, api_config: Dict[str, Any], provider: str, model_name: str,
+                     messages: List[Dict[str, str]], limiter: Any, estimate: int,
+                     timeout_seconds: Optional[float], stream_stage: Optional[str]) -> Any:
+    """Streaming variant of _create_and_wait_uncached (same routing, retries and rate limiting)."""
+    label = f"{provider}/{model_name}"
+    if provider == "openai" and not hasattr(client, 'responses'):
+        client = get_openai_client()
+    if provider == "gemini" and client.__class__.__name__ != "GeminiClientWrapper":
+        client = get_openai_client_for_model(model_name)
+
+    def _stream_once() -> Any:
+        session = StreamSession(stream_stage, validate=LLM_STREAM_EARLY_ABORT)
+        if provider == "openai":
+            _log_responses_api_params(api_config)
+            delta_of, final = _responses_stream_reader()
+            abort = _consume_stream(client.responses.create(**api_config, stream=True), session, delta_of, timeout_seconds)
+            response = None if abort else _completed_responses_stream(final)
+        elif provider == "gemini":
+            _log_responses_api_params(api_config)
+            model, prompt = client.responses._build_request(api_config)
+            delta_of, final = _gemini_stream_reader()
+            try:
+                stream = client.client.models.generate_content_stream(model=model, contents=prompt)
+                abort = _consume_stream(stream, session, delta_of, timeout_seconds)
+            except TimeoutError:
+                raise
+            except Exception as e:
+                client.responses._raise_mapped_error(e)
+            response = None if abort else client.responses._wrap_response(
+                SimpleNamespace(text=session.text, usage_metadata=final.get("usage_metadata")), prompt
+            )
+        else:
+            _install_litellm_max_tokens_guard()
+            litellm.modify_params = False
+            litellm.drop_params = True
+            delta_of, chunks = _chat_stream_reader()
+            abort = _consume_stream(litellm_completion(**_stream_chat_kwargs(model_name, api_config, messages)),
+                                    session, delta_of, timeout_seconds)
+            response = None if abort else litellm.stream_chunk_builder(chunks, messages=messages)
+        return _finish_stream(session, response, abort, label, model_name, messages)
+
+    response = with_retries(_stream_once, logger=logger, provider=provider, rate_limiter=limiter, rate_tokens=estimate)
+    return _reconcile_rate_limit(limiter, estimate, response)
+
+
+async def _astream_and_wait(client: Any, api_config: Dict[str, Any], provider: str, model_name: str,
+                            messages: List[Dict[str, str]], limiter: Any, estimate: int,
+                            timeout_seconds: Optional[float], stream_stage: Optional[str]) -> Any:
+    """Async twin of _stream_and_wait."""
+    label = f"{provider}/{model_name}"
+    if provider == "openai" and not isinstance(client, AsyncOpenAI):
+        client = get_async_openai_client_for_model(model_name)
+    if provider == "gemini" and client.__class__.__name__ != "GeminiClientWrapper":
+        client = get_openai_client_for_model(model_name)
+
+    async def _stream_once() -> Any:
+        session = StreamSession(stream_stage, validate=LLM_STREAM_EARLY_ABORT)
+        if provider == "openai":
+            _log_responses_api_params(api_config)
+            delta_of, final = _responses_stream_reader()
+            stream = await client.responses.create(**api_config, stream=True)
+            abort = await _aconsume_stream(stream, session, delta_of, timeout_seconds)
+            response = None if abort else _completed_responses_stream(final)
+        elif provider == "gemini":
+            _log_responses_api_params(api_config)
+            model, prompt = client.responses._build_request(api_config)
+            delta_of, final = _gemini_stream_reader()
+            try:
+                stream = await client.client.aio.models.generate_content_stream(model=model, contents=prompt)
+                abort = await _aconsume_stream(stream, session, delta_of, timeout_seconds)
+            except TimeoutError:
+                raise
+            except Exception as e:
+                client.responses._raise_mapped_error(e)
+            response = None if abort else client.responses._wrap_response(
+                SimpleNamespace(text=session.text, usage_metadata=final.get("usage_metadata")), prompt
+            )
+        else:
+            _install_litellm_max_tokens_guard()
+            litellm.modify_params = False
+            litellm.drop_params = True
+            delta_of, chunks = _chat_stream_reader()
+            stream = await litellm.acompletion(**_stream_chat_kwargs(model_name, api_config, messages))
+            abort = await _aconsume_stream(stream, session, delta_of, timeout_seconds)
+            response = None if abort else litellm.stream_chunk_builder(chunks, messages=messages)
+        return _finish_stream(session, response, abort, label, model_name, messages)
+
+    response = await awith_retries(_stream_once, logger=logger, provider=provider, rate_limiter=limiter, rate_tokens=estimate)
+    return _reconcile_rate_limit(limiter, estimate, response)
 
 
 def get_output_text(response: Any) -> str:
@@ -1253,7 +1450,7 @@ def build_error_raw_payload(exc: Exception) -> Dict[str, Any]:
         pass
     return payload
 
-def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) -> Dict[str, int]:
+def get_usage_tokens(response: Any, exact_input_tokens: Optional[Union[int, Callable[[], int]]] = None) -> Dict[str, int]:
     """Return usage tokens as a dict using the canonical OpenAI 2.x schema.
     
     Supports OpenAI, Gemini, and OpenRouter responses.
@@ -1263,10 +1460,14 @@ def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) ->
     - output_tokens: response.usage.output_tokens  ← standardized source of truth
     - total_tokens: response.usage.total_tokens
     - reasoning_tokens: response.usage.output_tokens_details.reasoning_tokens
+    - cached_tokens: input tokens served from the provider prompt cache
+      (usage.input_tokens_details.cached_tokens, or prompt_tokens_details for chat completions)
 
     Fallbacks (conservative):
     - If input_tokens is missing but an exact_input_tokens value is provided by caller,
       use exact_input_tokens and infer output_tokens = max(total_tokens - input_tokens, 0).
+      A callable exact_input_tokens is only invoked in that case, so prompts are only
+      tokenized when the API reports no input count.
     - reasoning_tokens defaults to 0 when output_tokens_details is missing.
     - For Gemini: uses estimated tokens from GeminiResponseWrapper
     """
@@ -1274,6 +1475,7 @@ def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) ->
     input_tokens = 0
     output_tokens = 0
     reasoning_tokens = 0
+    cached_tokens = 0
 
     usage = getattr(response, "usage", None)
     if usage is None:
@@ -1283,6 +1485,7 @@ def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) ->
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "reasoning_tokens": reasoning_tokens,
+            "cached_tokens": cached_tokens,
         }
 
     # Canonical fields (works for OpenAI, OpenRouter, and Gemini wrapper)
@@ -1297,11 +1500,23 @@ def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) ->
         if isinstance(rt, int) and rt >= 0:
             reasoning_tokens = rt
 
+    # Provider prompt cache (Responses API, then chat completions / LiteLLM)
+    for details_attr in ("input_tokens_details", "prompt_tokens_details"):
+        ct = getattr(getattr(usage, details_attr, None), "cached_tokens", 0)
+        if isinstance(ct, int) and ct > 0:
+            cached_tokens = ct
+            break
+
     if api_input_tokens > 0:
         input_tokens = api_input_tokens
         output_tokens = api_output_tokens
     else:
         # Use exact input tokens if provided by the caller; infer output tokens from total
+        if callable(exact_input_tokens):
+            try:
+                exact_input_tokens = exact_input_tokens()
+            except Exception:
+                exact_input_tokens = None
         if isinstance(exact_input_tokens, int) and exact_input_tokens >= 0:
             input_tokens = exact_input_tokens
             if tokens_used >= exact_input_tokens:
@@ -1317,6 +1532,7 @@ def get_usage_tokens(response: Any, exact_input_tokens: Optional[int] = None) ->
         "input_tokens": input_tokens,
         "output_tokens": output_tokens,
         "reasoning_tokens": reasoning_tokens,
+        "cached_tokens": cached_tokens,
     }
 
 
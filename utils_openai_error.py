@@ -5,7 +5,9 @@ Provides retry wrappers, error classification, and a create-and-wait helper
 for the OpenAI 2.x Responses API.
 """
 
-from typing import Callable, Optional, Dict, Any
+from typing import Awaitable, Callable, Optional, Dict, Any
+import asyncio
+import re
 import time
 import logging
 
@@ -59,9 +61,123 @@ def classify_error(error: Exception) -> str:
     return "unknown"
 
 
-def with_retries(function_call: Callable[[], Any], *, max_retries: int = 3, backoff_factor: float = 1.5, logger: Optional[logging.Logger] = None, provider: Optional[str] = None) -> Any:
+_RETRY_AFTER_PATTERNS = (
+    re.compile(r"retry[- ]after[\"':=\s]+(\d+(?:\.\d+)?)", re.IGNORECASE),
+    re.compile(r"(?:try|retry) again in (\d+(?:\.\d+)?)\s*(ms|s)", re.IGNORECASE),
+    re.compile(r"retryDelay[\"':=\s]+(\d+(?:\.\d+)?)s", re.IGNORECASE),
+)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for 429 / quota-exhausted errors of any provider SDK (OpenAI, google-genai, LiteLLM)."""
+    if isinstance(error, RateLimitError) or "RateLimit" in type(error).__name__:
+        return True
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    text = str(error).lower()
+    return bool(re.search(r"\b429\b", text)) or "resource_exhausted" in text or "rate limit" in text
+
+
+def extract_retry_after(error: Exception) -> Optional[float]:
+    """Return the Retry-After delay (seconds) carried by an error, when the provider sent one."""
+    value = getattr(error, "retry_after", None)
+    if isinstance(value, (int, float)) and value > 0:
+        return float(value)
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers.get("retry-after-ms")) / 1000.0
+            if headers.get("retry-after"):
+                return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    for pattern in _RETRY_AFTER_PATTERNS:
+        match = pattern.search(str(error))
+        if match:
+            seconds = float(match.group(1))
+            unit = match.group(2) if match.lastindex and match.lastindex >= 2 else "s"
+            return seconds / 1000.0 if unit == "ms" else seconds
+    return None
+
+
+def _next_rate_limit_delay(error: Exception, state: Dict[str, int], rate_limiter: Any, *, max_retries: int, logger: Optional[logging.Logger]) -> float:
+    """
+    Record a 429 on the rate limiter and decide whether to retry.
+
+    Returns 0 (the next acquire waits for the limiter) or a negative value when retries are exhausted.
+    """
+    state["attempt"] += 1
+    rate_limiter.on_rate_limited(extract_retry_after(error))
+    if state["attempt"] > max_retries:
+        if logger:
+            logger.error(f"[RATE] {rate_limiter.name}: rate limited, exhausted retries: error={error}")
+        return -1.0
+    return 0.0
+
+
+def _next_retry_delay(error: Exception, state: Dict[str, int], *, max_retries: int, backoff_factor: float, logger: Optional[logging.Logger], provider: Optional[str]) -> float:
+    """
+    Decide how long to wait before retrying a failed call (shared by sync and async retries).
+
+    Mutates ``state`` ("attempt", "special_attempts") and returns the delay in seconds.
+    Returns a negative value when retries are exhausted (caller must re-raise).
+    """
+    # Special policy: for LiteLLM transient errors we wait 60s and retry up to 2 times
+    max_special_retries = 2
+    state["attempt"] += 1
+    attempt = state["attempt"]
+    err_name = type(error).__name__
+    category = classify_error(error)
+    is_litellm_like_timeout = ("Timeout" in err_name)
+    is_litellm_like_apierr = ("APIError" in err_name)
+    is_litellm_like_badreq = ("BadRequestError" in err_name) or (category == "bad_request")
+
+    # Auto-detect provider from error message if not provided
+    detected_provider = provider
+    if not detected_provider:
+        error_msg = str(error).lower()
+        if "gemini api error" in error_msg or "gemini" in error_msg:
+            detected_provider = "gemini"
+        elif "litellm" in error_msg or "openrouter" in error_msg:
+            detected_provider = "router"
+        else:
+            detected_provider = "openai"  # Default assumption
+
+    if (is_litellm_like_timeout or is_litellm_like_apierr or is_litellm_like_badreq) and state["special_attempts"] < max_special_retries:
+        state["special_attempts"] += 1
+        # Write explicitly into logs for orchestrator visibility
+        if logger:
+            logger.info(f"[Retry] Model error detected ({err_name}). Waiting 60s before retry #{state['special_attempts']} with same setup.")
+        else:
+            logging.getLogger(__name__).info(f"[Retry] Model error detected ({err_name}). Waiting 60s before retry #{state['special_attempts']} with same setup.")
+        return 60.0
+
+    # Use provider-specific error message
+    if detected_provider == "gemini":
+        error_prefix = "Gemini API call failed"
+    elif detected_provider == "router":
+        error_prefix = "OpenRouter/LiteLLM call failed"
+    else:
+        error_prefix = "OpenAI API call failed"
+
+    if logger:
+        logger.warning(f"{error_prefix} (attempt {attempt}): category={category} error={error}")
+    if attempt > max_retries:
+        if logger:
+            logger.error(f"{error_prefix} exhausted retries: error={error}")
+        return -1.0
+    return backoff_factor ** attempt
+
+
+def with_retries(function_call: Callable[[], Any], *, max_retries: int = 3, backoff_factor: float = 1.5, logger: Optional[logging.Logger] = None, provider: Optional[str] = None, rate_limiter: Any = None, rate_tokens: int = 0) -> Any:
     """
     Execute a function with exponential backoff on retryable OpenAI errors.
+
+    With a rate_limiter (utils_rate_limiter.RateLimiter), every attempt first acquires
+    capacity for one request and rate_tokens tokens (given back when the attempt fails),
+    and 429s of any provider SDK are reported to the limiter, which then paces the retry
+    instead of a fixed backoff.
     
     Args:
         function_call: Function to execute with retries
@@ -69,59 +185,62 @@ def with_retries(function_call: Callable[[], Any], *, max_retries: int = 3, back
         backoff_factor: Exponential backoff multiplier
         logger: Optional logger instance
         provider: Optional provider name ("openai", "gemini", "router") for better error messages
+        rate_limiter: Optional limiter of the called provider + model
+        rate_tokens: Estimated tokens of the request (reserved on rate_limiter)
     """
-    attempt = 0
-    # Special policy: for LiteLLM transient errors we wait 60s and retry up to 2 times
-    max_special_retries = 2
-    special_attempts = 0
+    state = {"attempt": 0, "special_attempts": 0}
     while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire(rate_tokens)
         try:
             return function_call()
-        except RETRYABLE_EXCEPTIONS as error:
-            attempt += 1
-            err_name = type(error).__name__
-            category = classify_error(error)
-            is_litellm_like_timeout = ("Timeout" in err_name)
-            is_litellm_like_apierr = ("APIError" in err_name)
-            is_litellm_like_badreq = ("BadRequestError" in err_name) or (category == "bad_request")
-
-            # Auto-detect provider from error message if not provided
-            detected_provider = provider
-            if not detected_provider:
-                error_msg = str(error).lower()
-                if "gemini api error" in error_msg or "gemini" in error_msg:
-                    detected_provider = "gemini"
-                elif "litellm" in error_msg or "openrouter" in error_msg:
-                    detected_provider = "router"
-                else:
-                    detected_provider = "openai"  # Default assumption
-
-            if (is_litellm_like_timeout or is_litellm_like_apierr or is_litellm_like_badreq) and special_attempts < max_special_retries:
-                special_attempts += 1
-                # Write explicitly into logs for orchestrator visibility
-                if logger:
-                    logger.info(f"[Retry] Model error detected ({err_name}). Waiting 60s before retry #{special_attempts} with same setup.")
-                else:
-                    logging.getLogger(__name__).info(f"[Retry] Model error detected ({err_name}). Waiting 60s before retry #{special_attempts} with same setup.")
-                time.sleep(60)
-                continue
-
-            # Use provider-specific error message
-            if detected_provider == "gemini":
-                error_prefix = "Gemini API call failed"
-            elif detected_provider == "router":
-                error_prefix = "OpenRouter/LiteLLM call failed"
+        except Exception as error:
+            if rate_limiter is not None:
+                # A failed attempt consumed no tokens: the retry reserves its estimate again
+                rate_limiter.release(rate_tokens)
+            if rate_limiter is not None and is_rate_limit_error(error):
+                delay = _next_rate_limit_delay(error, state, rate_limiter, max_retries=max_retries, logger=logger)
+            elif isinstance(error, RETRYABLE_EXCEPTIONS):
+                delay = _next_retry_delay(error, state, max_retries=max_retries, backoff_factor=backoff_factor, logger=logger, provider=provider)
             else:
-                error_prefix = "OpenAI API call failed"
-            
-            if logger:
-                logger.warning(f"{error_prefix} (attempt {attempt}): category={category} error={error}")
-            if attempt > max_retries:
-                if logger:
-                    logger.error(f"{error_prefix} exhausted retries: error={error}")
                 raise
-            sleep_seconds = backoff_factor ** attempt
-            time.sleep(sleep_seconds)
+            if delay < 0:
+                raise
+            time.sleep(delay)
+
+
+async def awith_retries(coroutine_factory: Callable[[], Awaitable[Any]], *, max_retries: int = 3, backoff_factor: float = 1.5, logger: Optional[logging.Logger] = None, provider: Optional[str] = None, rate_limiter: Any = None, rate_tokens: int = 0) -> Any:
+    """
+    Async twin of with_retries: same retry policy, waiting with asyncio.sleep.
+
+    Args:
+        coroutine_factory: Callable returning a fresh awaitable for each attempt
+        max_retries: Maximum number of retry attempts
+        backoff_factor: Exponential backoff multiplier
+        logger: Optional logger instance
+        provider: Optional provider name ("openai", "gemini", "router") for better error messages
+        rate_limiter: Optional limiter of the called provider + model
+        rate_tokens: Estimated tokens of the request (reserved on rate_limiter)
+    """
+    state = {"attempt": 0, "special_attempts": 0}
+    while True:
+        if rate_limiter is not None:
+            await rate_limiter.aacquire(rate_tokens)
+        try:
+            return await coroutine_factory()
+        except Exception as error:
+            if rate_limiter is not None:
+                # A failed attempt consumed no tokens: the retry reserves its estimate again
+                rate_limiter.release(rate_tokens)
+            if rate_limiter is not None and is_rate_limit_error(error):
+                delay = _next_rate_limit_delay(error, state, rate_limiter, max_retries=max_retries, logger=logger)
+            elif isinstance(error, RETRYABLE_EXCEPTIONS):
+                delay = _next_retry_delay(error, state, max_retries=max_retries, backoff_factor=backoff_factor, logger=logger, provider=provider)
+            else:
+                raise
+            if delay < 0:
+                raise
+            await asyncio.sleep(delay)
 
 
 def create_and_wait(client, api_config: Dict[str, Any], *, poll_interval: float = 1.0, max_wait_seconds: int = 300, logger: Optional[logging.Logger] = None, provider: Optional[str] = None):
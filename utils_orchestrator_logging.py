@@ -9,7 +9,7 @@ with the LUCIM/UCI domain modeling approach.
 
 import logging
 import re
-from typing import Dict, Any, List, Set
+from typing import Dict, Any, List, Optional, Set
 from utils_format import FormatUtils
 
 
@@ -189,7 +189,7 @@ class OrchestratorLogger:
             f" [{_verdict_text('lucim_plantuml_diagram_auditor')}]"
         )
     
-    def log_audit_analysis(self, results: Dict[str, Any]) -> None:
+    def log_audit_analysis(self, results: Dict[str, Any], persona_set: Optional[str] = None) -> None:
         """Log a consolidated AUDIT ANALYSIS comparing agent vs python auditors with TP/TN/FP/FN.
 
         Notes:
@@ -199,6 +199,8 @@ class OrchestratorLogger:
           FP: agent=compliant,     python=non-compliant
           FN: agent=non-compliant, python=compliant
         - If a side is missing (agent or python), classification is shown as N/A.
+        - "Python non-compliant X/Y": Y is the set of rules implemented by the Python auditor;
+          the rule count of the persona_set rules file (default persona set when None) is shown alongside.
         """
         try:
             def _to_bool(verdict_value: Any) -> bool:
@@ -293,6 +295,14 @@ class OrchestratorLogger:
                     return set()
                 return rules
 
+            def _stage_rule_ids(py_key: str) -> Set[str]:
+                """Rule IDs declared in the stage RULES_LUCIM_*.md file of the run's persona set (rules registry)."""
+                try:
+                    from utils_rules_registry import get_stage_rule_ids
+                    return set(get_stage_rule_ids(py_key, persona_set))
+                except Exception:
+                    return set()
+
             for title, agent_key, py_key in stages:
                 agent_ok = _extract_agent_bool(agent_key)
                 py_ok = _extract_python_bool(py_key)
@@ -330,13 +340,16 @@ class OrchestratorLogger:
                         sorted_rules = [f"{rid} ({count})" for rid, count in sorted_pairs]
 
                     # Emit compact lines under each stage line
+                    # Rule count of the persona set's rules file, shown next to (not as) the denominator
+                    declared_rules = _stage_rule_ids(py_key)
+                    declared_text = f" ({len(declared_rules)} declared in the rules file)" if declared_rules else ""
                     if total_rules > 0:
                         self.logger.info(
-                            f"   • Python non-compliant: {non_compliant_rules}/{total_rules} rules"
+                            f"   • Python non-compliant: {non_compliant_rules}/{total_rules} rules{declared_text}"
                         )
                     else:
                         self.logger.info(
-                            f"   • Python non-compliant: {non_compliant_rules} rules"
+                            f"   • Python non-compliant: {non_compliant_rules} rules{declared_text}"
                         )
                     if sorted_rules:
                         # Grouping is implicit by stage title; list most violated first
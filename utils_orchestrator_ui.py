@@ -390,7 +390,8 @@ class OrchestratorUI:
     
     def print_final_summary(self, total_execution_time: float, total_files: int, 
                           total_agents: int, total_successful_agents: int, 
-                          overall_success_rate: float, all_results: dict = None) -> None:
+                          overall_success_rate: float, all_results: dict = None,
+                          throughput_per_hour: float = None) -> None:
         """
         Print final execution summary with enhanced audit metrics.
         
@@ -401,11 +402,20 @@ class OrchestratorUI:
             total_successful_agents: Total successful agents
             overall_success_rate: Overall success rate percentage
             all_results: All orchestration results for audit analysis
+            throughput_per_hour: Optional sweep throughput (combinations/hour)
+
+        Counters of optional features (caches, Batch API, hedging, budget, ...) are printed
+        from the utils_summary_stats registry, one line per feature that is on.
         """
         from utils_format import FormatUtils
+        from utils_summary_stats import get_summary_stats_lines
         
         print(f"\n⏱️  TOTAL EXECUTION TIME:")
         print(f"   Total time: {FormatUtils.format_duration(total_execution_time)}")
+        if throughput_per_hour is not None:
+            print(f"   Throughput: {throughput_per_hour:.1f} combinations/hour")
+        for label, line in get_summary_stats_lines():
+            print(f"   {label}: {line}")
         
         print(f"\n{'='*80}")
         print("OVERALL SUMMARY")
@@ -5,11 +5,6 @@ Manages agent configuration updates (reasoning, verbosity, etc.).
 """
 
 from typing import Dict, Any, Optional
-try:
-    # Late import to avoid circulars at module import time
-    import utils_config_constants as _cfg
-except Exception:  # pragma: no cover
-    _cfg = None  # Fallback when imported by linters/tests
 
 
 def update_agent_configs(orchestrator_instance,
@@ -25,16 +20,8 @@ def update_agent_configs(orchestrator_instance,
         reasoning_summary: Reasoning summary mode (auto/manual)
         text_verbosity: Text verbosity level (low/medium/high)
     """
-    # 0) Ensure global AGENT_CONFIGS uses the orchestrator-selected model
-    #    This is required because agents call get_reasoning_config(), which reads
-    #    from the module-level AGENT_CONFIGS in utils_config_constants.
-    if _cfg is not None and hasattr(orchestrator_instance, "model") and orchestrator_instance.model:
-        try:
-            for agent_name in _cfg.AGENT_CONFIGS.keys():
-                _cfg.AGENT_CONFIGS[agent_name]["model"] = orchestrator_instance.model
-        except Exception:
-            # Non-fatal: continue with local updates even if global sync fails
-            pass
+    # Only orchestrator-local state is updated: agents build their API config from their own
+    # settings, and concurrent combinations must not race on the global AGENT_CONFIGS.
 
     # 1) Update orchestrator-local agent_configs dictionary
     for agent_name in orchestrator_instance.agent_configs:
@@ -4,6 +4,7 @@ Orchestrator V3 Initialization Utility
 Initializes orchestrator components (agents, monitoring, tools, etc.).
 """
 
+import copy
 import datetime
 from typing import Dict
 
@@ -29,8 +30,10 @@ def initialize_v3_orchestrator_components(orchestrator_instance, model_name: str
     orchestrator_instance.persona_set = DEFAULT_PERSONA_SET
     orchestrator_instance.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
     orchestrator_instance.selected_persona_set = DEFAULT_PERSONA_SET
-    orchestrator_instance.agent_configs = AGENT_CONFIGS.copy()
+    # Deep copy: per-agent dicts must not be shared between concurrently running orchestrators
+    orchestrator_instance.agent_configs = copy.deepcopy(AGENT_CONFIGS)
     orchestrator_instance.processed_results = {}
+    orchestrator_instance.processed_results_by_file = {}
     
     # Initialize reasoning and verbosity attributes with defaults from agent_configs
     orchestrator_instance.reasoning_effort = orchestrator_instance.agent_configs.get(
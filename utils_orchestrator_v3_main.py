@@ -2,17 +2,32 @@
 """
 Orchestrator V3 Main Entry Point Utility
 Main execution function for the V3 ADK orchestrator.
+Sweep combinations run concurrently through CombinationScheduler
+(limits: SWEEP_MAX_CONCURRENCY and SWEEP_CONCURRENCY_<PROVIDER>).
+`--resume <run_dir>` continues an interrupted run from its last completed iteration.
+With LLM_BATCH on, all combinations run at once and their OpenAI calls go through
+the Batch API in waves (utils_batch_api).
+With SWEEP_PLAN on, a pre-flight plan (tokens, cost, wall-clock) is shown first and
+the sweep can be trimmed before launch (utils_sweep_planner).
 """
 
 import os
+import argparse
 import asyncio
 import pathlib
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from utils_orchestrator_ui import OrchestratorUI
 from orchestrator_persona_v3_adk import NetLogoOrchestratorPersonaV3ADK
 from utils_orchestrator_v3_agent_config import update_agent_configs
+from utils_orchestrator_v3_scheduler import CombinationScheduler, build_combinations
+from utils_config_constants import SWEEP_MAX_CONCURRENCY, SWEEP_PROVIDER_CONCURRENCY, SWEEP_PLAN, LLM_BATCH
+from utils_logging import setup_sweep_logger
+from utils_batch_api import get_batch_collector
+from utils_hedging import get_request_hedger
+from utils_orchestrator_v3_resume import read_run_manifest
+from utils_sweep_planner import build_sweep_planner, drop_combinations, format_sweep_plan
 
 
 async def main():
@@ -79,46 +94,48 @@ async def main():
     except Exception as e:
         print(f"[WARN] Invalid MAX_AUDIT input, using default 2 ({e})")
         os.environ["MAX_AUDIT"] = "2"
-    all_results = {}
-    total_combinations = (
-        len(selected_models) * len(selected_base_names) *
-        len(reasoning_levels) * len(selected_verbosity_levels)
+    combinations = build_combinations(
+        selected_models, selected_base_names, reasoning_levels, selected_verbosity_levels
     )
-    current_combination = 0
+    if SWEEP_PLAN:
+        combinations = review_sweep_plan(combinations)
+        if not combinations:
+            return
+    total_combinations = len(combinations)
     total_execution_start_time = time.time()
-    
-    for model in selected_models:
-        for base_name in selected_base_names:
-            for reasoning_config in reasoning_levels:
-                orchestrator = NetLogoOrchestratorPersonaV3ADK(model_name=model)
-                update_agent_configs(
-                    orchestrator,
-                    reasoning_effort=reasoning_config["effort"],
-                    reasoning_summary=reasoning_config["summary"],
-                    text_verbosity=None,
-                )
-                
-                for verbosity in selected_verbosity_levels:
-                    current_combination += 1
-                    ui.print_combination_header(current_combination, total_combinations)
-                    update_agent_configs(
-                        orchestrator,
-                        reasoning_effort=None,
-                        reasoning_summary=None,
-                        text_verbosity=verbosity,
-                    )
-                    ui.print_parameter_bundle(
-                        model=model, base_name=base_name,
-                        reasoning_effort=reasoning_config["effort"],
-                        reasoning_summary=reasoning_config["summary"],
-                        text_verbosity=verbosity,
-                    )
-                    
-                    results = await orchestrator.run(base_name)
-                    
-                    reasoning_suffix = f"{reasoning_config['effort']}-{reasoning_config['summary']}"
-                    result_key = f"{base_name}_{model}_{reasoning_suffix}_{verbosity}"
-                    all_results[result_key] = results
+
+    async def _run_combination(combination: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one combination with its own orchestrator instance, logger and run directory."""
+        orchestrator = NetLogoOrchestratorPersonaV3ADK(model_name=combination["model"])
+        update_agent_configs(
+            orchestrator,
+            reasoning_effort=combination["reasoning_effort"],
+            reasoning_summary=combination["reasoning_summary"],
+            text_verbosity=combination["text_verbosity"],
+        )
+        # Header and parameter bundle are printed by the run once stdout is bound to the combination log
+        orchestrator.combination_position = (combination["index"], total_combinations)
+        if LLM_BATCH:
+            # Each combination is one participant of the wave barrier
+            with get_batch_collector().participant():
+                return await orchestrator.run(combination["base_name"])
+        return await orchestrator.run(combination["base_name"])
+
+    if LLM_BATCH:
+        # Latency does not matter in batch mode: a wave should hold every combination
+        scheduler = CombinationScheduler(
+            max_concurrency=total_combinations, provider_limits={},
+            external_logger=setup_sweep_logger(),
+        )
+        get_batch_collector().logger = scheduler.logger
+        get_batch_collector().expect(total_combinations)
+    else:
+        scheduler = CombinationScheduler(
+            max_concurrency=SWEEP_MAX_CONCURRENCY,
+            provider_limits=SWEEP_PROVIDER_CONCURRENCY,
+            external_logger=setup_sweep_logger(),
+        )
+    all_results = await scheduler.run(combinations, _run_combination)
     
     total_execution_time = time.time() - total_execution_start_time
     total_files = len(all_results)
@@ -144,12 +161,96 @@ async def main():
     
     ui.print_final_summary(
         total_execution_time, total_files, total_agents,
-        total_successful_agents, overall_success_rate, all_results
+        total_successful_agents, overall_success_rate, all_results,
+        throughput_per_hour=scheduler.throughput_per_hour(),
     )
+    get_request_hedger().store.flush()
 
 
-if __name__ == "__main__":
+def review_sweep_plan(combinations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Print the pre-flight plan of a sweep and let the user trim it before launch.
+
+    Returns:
+        The combinations to run (empty when the sweep is aborted)
+    """
+    while combinations:
+        # The plan is advisory: a planning failure must not stop the sweep
+        try:
+            planner = build_sweep_planner(max_iterations=int(os.environ.get("MAX_AUDIT", "2") or 2))
+            if LLM_BATCH:
+                plan = planner.plan(combinations, max_concurrency=len(combinations), provider_limits={})
+            else:
+                plan = planner.plan(combinations, SWEEP_MAX_CONCURRENCY, SWEEP_PROVIDER_CONCURRENCY)
+        except Exception as e:
+            print(f"[WARN] Sweep plan unavailable ({type(e).__name__}: {e}); launching {len(combinations)} combination(s) untrimmed.")
+            return combinations
+        print("\n" + format_sweep_plan(plan))
+        choice = input("Launch sweep? [Enter = launch, q = abort, or combination numbers to drop, e.g. 2,4-6]: ").strip()
+        if not choice:
+            return combinations
+        if choice.lower() in ("q", "quit", "n", "no"):
+            print("[INFO] Sweep aborted before launch.")
+            return []
+        try:
+            combinations = drop_combinations(combinations, choice)
+        except ValueError:
+            print(f"[WARN] Invalid selection '{choice}' (expected numbers or ranges such as 2,4-6)")
+    print("[INFO] No combination left to run.")
+    return []
+
+
+async def resume(run_dir: str) -> Dict[str, Any]:
+    """
+    Resume an interrupted run from its on-disk artifacts (no interactive prompts).
+
+    Run parameters come from the run directory (run-manifest.json or, for older runs,
+    the first generator response and the combination folder name). MAX_AUDIT is read
+    from the environment as for a fresh run.
+
+    Args:
+        run_dir: Existing run directory (output/runs/<date>/<time>/<combination>)
+
+    Returns:
+        The orchestrator run result
+    """
+    run_path = pathlib.Path(run_dir).expanduser().resolve()
+    params = read_run_manifest(run_path)
+    print(f"\n🔁 Resuming run: {run_path}")
+    orchestrator = NetLogoOrchestratorPersonaV3ADK(model_name=params["model"])
+    if params.get("timestamp"):
+        orchestrator.timestamp = params["timestamp"]
+    if params.get("persona_set"):
+        orchestrator.selected_persona_set = params["persona_set"]
+    update_agent_configs(
+        orchestrator,
+        reasoning_effort=params.get("reasoning_effort", "medium"),
+        reasoning_summary=params.get("reasoning_summary", "auto"),
+        text_verbosity=params.get("text_verbosity", "medium"),
+    )
+    orchestrator.resume_run_dir = run_path
+    return await orchestrator.run(params["base_name"])
+
+
+def parse_cli_args(argv=None) -> argparse.Namespace:
+    """Parse the orchestrator command line (interactive sweep unless --resume is given)."""
+    parser = argparse.ArgumentParser(description="NetLogo → LUCIM orchestrator (persona v3, ADK)")
+    parser.add_argument("--resume", metavar="RUN_DIR", default=None,
+                        help="Continue an interrupted run directory from its last completed iteration")
+    return parser.parse_args(argv)
+
+
+def run_cli(argv=None) -> None:
+    """Command-line entry point shared by this module and orchestrator_persona_v3_adk."""
+    args = parse_cli_args(argv)
     try:
-        asyncio.run(main())
+        if args.resume:
+            asyncio.run(resume(args.resume))
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\n[INFO] Orchestrator interrupted by user.")
+
+
+if __name__ == "__main__":
+    run_cli()
@@ -16,6 +16,7 @@ from utils_config_constants import (
 
 
 from utils_config_constants import DEFAULT_PERSONA_SET
+from utils_rules_registry import load_persona_set, read_prompt_text
 
 def initialize_v3_persona_set(orchestrator_instance, persona_set: str = DEFAULT_PERSONA_SET) -> str:
     """
@@ -29,6 +30,8 @@ def initialize_v3_persona_set(orchestrator_instance, persona_set: str = DEFAULT_
         Selected persona set name
     """
     orchestrator_instance.selected_persona_set = persona_set
+    # Compile the persona/rules files once; agents then read them from the rules registry
+    load_persona_set(persona_set)
     update_agent_persona_paths(orchestrator_instance)
     
     if hasattr(orchestrator_instance, 'logger') and orchestrator_instance.logger:
@@ -101,5 +104,5 @@ def load_netlogo_lucim_mapping(orchestrator_instance) -> str:
             f"{orchestrator_instance.netlogo_lucim_mapping_path}"
         )
     
-    return orchestrator_instance.netlogo_lucim_mapping_path.read_text(encoding="utf-8")
+    return read_prompt_text(orchestrator_instance.netlogo_lucim_mapping_path)
 
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Orchestrator V3 Stage Pipeline Utility
+Per-file run state and a stage-pipelined executor: one asyncio queue per stage
+(prepare → operation model → scenario → PlantUML diagram) with a configurable
+worker count each, so that independent NetLogo files overlap across stages.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default workers per stage (overridable via utils_config_constants / env)
+DEFAULT_PIPELINE_STAGE_WORKERS = {
+    "prepare": 1,
+    "operation_model": 1,
+    "scenario": 1,
+    "plantuml_diagram": 1,
+}
+
+_DONE = object()
+
+
+class FileRunState:
+    """
+    Per-file result object threaded through the stages.
+
+    Replaces the shared orchestrator_instance.processed_results dict so that several
+    files can be in flight at the same time.
+    """
+
+    def __init__(self, file_info: Dict[str, Any]):
+        self.file_info = file_info
+        self.base_name: str = file_info["base_name"]
+        self.processed_results: Dict[str, Any] = {}
+        # Set when the file ends early (missing input, FAIL verdict, unexpected error)
+        self.result: Optional[Dict[str, Any]] = None
+        self.run_dir: Optional[Path] = None
+        self.stage_roots: Dict[str, Path] = {}
+        self.inputs: Dict[str, Any] = {}
+        self.resume_states: Dict[str, Dict[str, Any]] = {}
+        self.reasoning_effort = "medium"
+        self.text_verbosity = "medium"
+        self.max_audit = 3
+        # Raw Operation Model text handed from the Operation Model stage to the Scenario stage
+        self.operation_model_text: Optional[str] = None
+        # Downstream generator calls started ahead of their stage, by stage name (utils_speculation)
+        self.speculations: Dict[str, Any] = {}
+        # Artifact hashes and audits of this file's iterations (utils_artifact_memo.ArtifactMemo)
+        self.artifact_memo: Optional[Any] = None
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.result is not None
+
+    def fail(self, stage: str) -> Dict[str, Any]:
+        """Mark the file as failed at a stage and return the FAIL result."""
+        self.result = {"status": "FAIL", "stage": stage, "results": self.processed_results}
+        return self.result
+
+    def elapsed(self) -> float:
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.time()) - self.start_time
+
+
+class StagePipeline:
+    """
+    Stage-pipelined executor.
+
+    Items enter the first stage queue in order; every stage has its own worker pool
+    and forwards each item to the next stage queue as soon as it is done. Items for
+    which should_skip() returns True (e.g. a failed file) pass through remaining stages
+    untouched. A stage raising an exception is reported to on_error and the item is
+    skipped afterwards.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Awaitable[Any]]]],
+                 workers: Optional[Dict[str, int]] = None,
+                 should_skip: Optional[Callable[[Any], bool]] = None,
+                 on_error: Optional[Callable[[Any, str, Exception], None]] = None,
+                 external_logger: Optional[logging.Logger] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Ordered (stage name, coroutine function taking one item) pairs
+            workers: Worker count per stage name (missing stages get 1 worker)
+            should_skip: Predicate telling whether an item must bypass remaining stages
+            on_error: Callback (item, stage name, exception) for stage exceptions
+            external_logger: Optional logger (defaults to module logger)
+        """
+        if not stages:
+            raise ValueError("StagePipeline requires at least one stage")
+        self.stages = list(stages)
+        self.workers = {name: max(1, int((workers or {}).get(name, 1) or 1)) for name, _ in self.stages}
+        self.should_skip = should_skip or (lambda item: False)
+        self.on_error = on_error
+        self.logger = external_logger or logger
+        self._errored: set[int] = set()
+
+    async def _worker(self, stage_index: int, queues: List[asyncio.Queue]) -> None:
+        name, fn = self.stages[stage_index]
+        queue = queues[stage_index]
+        while True:
+            entry = await queue.get()
+            if entry is _DONE:
+                return
+            position, item = entry
+            if position not in self._errored and not self.should_skip(item):
+                try:
+                    await fn(item)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self._errored.add(position)
+                    self.logger.error(f"[PIPELINE] Stage '{name}' failed for item {position + 1}: {e}")
+                    if self.on_error is not None:
+                        self.on_error(item, name, e)
+            if stage_index + 1 < len(queues):
+                queues[stage_index + 1].put_nowait(entry)
+
+    async def _run_stage(self, stage_index: int, queues: List[asyncio.Queue]) -> None:
+        name, _ = self.stages[stage_index]
+        await asyncio.gather(*(self._worker(stage_index, queues) for _ in range(self.workers[name])))
+        # All items went through this stage: release the next stage's workers
+        if stage_index + 1 < len(queues):
+            next_name, _ = self.stages[stage_index + 1]
+            for _ in range(self.workers[next_name]):
+                queues[stage_index + 1].put_nowait(_DONE)
+
+    async def run(self, items: List[Any]) -> List[Any]:
+        """
+        Push all items through every stage.
+
+        Returns:
+            The items, in submission order
+        """
+        self._errored = set()
+        queues: List[asyncio.Queue] = [asyncio.Queue() for _ in self.stages]
+        for position, item in enumerate(items):
+            queues[0].put_nowait((position, item))
+        for _ in range(self.workers[self.stages[0][0]]):
+            queues[0].put_nowait(_DONE)
+        self.logger.info(
+            f"[PIPELINE] {len(items)} item(s) through stages "
+            + " → ".join(f"{name}×{self.workers[name]}" for name, _ in self.stages)
+        )
+        await asyncio.gather(*(self._run_stage(i, queues) for i in range(len(self.stages))))
+        return list(items)
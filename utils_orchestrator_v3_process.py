@@ -13,18 +13,39 @@ The Generator plays a dual role: initial artifact generation at iteration 1, and
 audit-driven corrective updates at iterations >1 using the previous artifact and
 previous audit report. The workflow stops early when compliant, or proceeds to
 the next stage / ends when reaching MAX_AUDIT.
+
+Under a token / deadline budget (utils_budget), an iteration may run with a lowered
+reasoning effort, end its stage before MAX_AUDIT, or get a Python audit instead of
+the LLM auditor; each decision is recorded under results["budget"].
+
+When orchestrator_instance.resume_run_dir is set, the existing run directory is
+reused and every stage continues after its last completed iteration
+(see utils_orchestrator_v3_resume).
+
+Model calls use the awaitable agent variants (acreate_and_wait) so that several
+sweep combinations can make progress concurrently on a single event loop. Within an
+iteration, the deterministic Python audit (and, for diagrams, the SVG render) runs in
+a worker thread while the LLM auditor call is in flight; verdicts are compared once
+both are done.
+
+Each stage is a separate coroutine over a per-file FileRunState (FILE_STAGES);
+process_netlogo_file_v3_adk chains them for one file, run_orchestrator_v3 pipelines
+them across files.
 """
 
+import asyncio
 import json
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 
 from utils_format import FormatUtils
 from utils_orchestrator_v3_persona_config import load_netlogo_lucim_mapping
-from agent_lucim_operation_auditor import audit_operation_model
-from agent_lucim_scenario_auditor import audit_scenario_text
+from agent_lucim_operation_auditor import aaudit_operation_model
+from agent_lucim_scenario_auditor import aaudit_scenario_text
+from utils_plantuml_renderer import arender_svg_file
 from utils_config_constants import (
+    ARTIFACT_MEMO,
     RULES_LUCIM_OPERATION_MODEL,
     RULES_LUCIM_SCENARIO,
 )
@@ -34,21 +55,217 @@ from utils_audit_scenario import audit_scenario as py_audit_scenario
 from utils_audit_diagram import audit_diagram as py_audit_diagram
 from utils_audit_compare import compare_verdicts, log_comparison
 from utils_audit_core import extract_audit_core
+from utils_audit_policy import get_audit_policy, python_audit_report
+from utils_artifact_memo import ArtifactMemo, reused_audit
+from utils_speculation import cancel_speculations, get_speculation_tracker, take_speculation
+from utils_budget import BudgetDecision, budget_of
+from utils_rules_registry import read_prompt_text
+from utils_orchestrator_v3_resume import (
+    apply_stage_resume,
+    describe_resume_point,
+    detect_resume_point,
+    write_run_manifest,
+)
+from utils_orchestrator_v3_pipeline import FileRunState
 
 
-async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str, Any]) -> Dict[str, Any]:
+# Local helper to ensure a directory exists and return its Path
+def _ensure_dir(path: Path) -> Path:
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# Lightweight writers for per-iteration artifacts
+def _dump_json(folder: Path, filename: str, obj: Any) -> None:
+    try:
+        (folder / filename).write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    except Exception:
+        pass
+
+
+def _dump_text(folder: Path, filename: str, text: str) -> None:
+    try:
+        (folder / filename).write_text(text or "", encoding="utf-8")
+    except Exception:
+        pass
+
+
+def _write_reasoning(folder: Path, title: str, verdict_value: Any, violations_list: Any) -> None:
+    try:
+        verdict_str = "compliant" if (verdict_value is True or verdict_value == "compliant") else "non-compliant"
+        vlist = violations_list if isinstance(violations_list, list) else []
+        lines = [
+            f"# {title}",
+            "",
+            f"- verdict: {verdict_str}",
+            f"- violations: {len(vlist)}",
+        ]
+        if vlist:
+            lines.append("")
+            lines.append("## Violations")
+            for v in vlist:
+                vid = (v or {}).get("id") or "unknown"
+                msg = (v or {}).get("message") or ""
+                loc = (v or {}).get("location") or (v or {}).get("line")
+                extra = f" (at {loc})" if loc is not None else ""
+                lines.append(f"- {vid}: {msg}{extra}")
+        _dump_text(folder, "output-reasoning.md", "\n".join(lines))
+    except Exception:
+        _dump_text(folder, "output-reasoning.md", title)
+
+
+
+def _speculate_scenario(orchestrator_instance, state: FileRunState, operation_model_result: Dict[str, Any]) -> None:
+    """Start Scenario iter-1 generation on this Operation Model while it is being audited (SPECULATIVE_EXECUTION)."""
+    tracker = get_speculation_tracker()
+    operation_model_text = (operation_model_result or {}).get("data")
+    # Resumed runs keep their recorded downstream iterations
+    if not tracker.enabled or not operation_model_text or state.resume_states:
+        return
+    if not isinstance(operation_model_text, str):
+        operation_model_text = str(operation_model_text)
+    scenario_generator_dir = _ensure_dir(state.stage_roots["scenario"] / "iter-1" / "1-generator")
+    state.speculations["scenario"] = tracker.start(
+        "scenario",
+        operation_model_text,
+        orchestrator_instance.lucim_scenario_generator_agent.agenerate_scenarios(
+            operation_model_text,
+            state.inputs["scenario_rules"],
+            scenario_auditor_feedback=None,
+            previous_scenario=None,
+            output_dir=scenario_generator_dir,
+        ),
+    )
+
+
+def _speculate_plantuml_diagram(orchestrator_instance, state: FileRunState, scen_result: Dict[str, Any]) -> None:
+    """Start PlantUML iter-1 generation on this Scenario while it is being audited (SPECULATIVE_EXECUTION)."""
+    tracker = get_speculation_tracker()
+    scen_data = (scen_result or {}).get("data")
+    if not tracker.enabled or scen_data is None or state.resume_states:
+        return
+    writer_base_dir = _ensure_dir(state.stage_roots["plantuml_diagram"] / "iter-1" / "1-generator")
+    state.speculations["plantuml_diagram"] = tracker.start(
+        "plantuml_diagram",
+        scen_data,
+        orchestrator_instance.lucim_plantuml_diagram_generator_agent.agenerate_plantuml_diagrams(
+            scen_data, None, None, output_dir=writer_base_dir,
+        ),
+    )
+
+
+async def _discard_speculation(state: FileRunState, stage: str) -> None:
+    """Drop the speculation of a stage whose upstream artifact is about to be regenerated."""
+    speculation = state.speculations.pop(stage, None)
+    if speculation is not None:
+        await speculation.discard()
+
+
+def _run_reasoning_settings(orchestrator_instance) -> Dict[str, Optional[str]]:
+    """Reasoning and verbosity settings of this orchestrator (sweep cell, possibly lowered by the budget) for the LLM auditors."""
+    return {
+        "reasoning_effort": getattr(orchestrator_instance, "reasoning_effort", None),
+        "reasoning_summary": getattr(orchestrator_instance, "reasoning_summary", None),
+        "text_verbosity": getattr(orchestrator_instance, "text_verbosity", None),
+    }
+
+
+def _budget_decision(state: FileRunState, decision: Optional[BudgetDecision]) -> Optional[BudgetDecision]:
+    """Record a budget degradation decision (utils_budget) in the file results and return it."""
+    if decision is not None:
+        state.processed_results.setdefault("budget", []).append(decision.as_dict())
+    return decision
+
+
+def _python_audit_operation_model(operation_model_data: Any, operation_model_raw_content: str) -> Dict[str, Any]:
     """
-    Process a single NetLogo file using ADK Sequential workflow.
-    
+    Python deterministic audit (no-LLM) of an Operation Model iteration.
+
+    Pure function (no shared state), so it can run in a worker thread next to the LLM auditor.
+    """
+    # Parse operation_model_data as JSON if it's a string (new standardized format)
+    # Handle standardized response structure: extract content from "data" if present
+    parsed_operation_model = {}
+    if isinstance(operation_model_data, dict):
+        # Check if it's the standardized structure {"data": {...}, "errors": null}
+        if "data" in operation_model_data and operation_model_data.get("data") is not None:
+            # Extract the actual operation model from the "data" field
+            parsed_operation_model = operation_model_data.get("data")
+        else:
+            # Direct operation model structure (no wrapping)
+            parsed_operation_model = operation_model_data
+    elif isinstance(operation_model_data, str) and operation_model_data.strip():
+        try:
+            parsed_json = json.loads(operation_model_data)
+            # Check if it's the standardized structure
+            if isinstance(parsed_json, dict) and "data" in parsed_json and parsed_json.get("data") is not None:
+                parsed_operation_model = parsed_json.get("data")
+            else:
+                parsed_operation_model = parsed_json
+        except (json.JSONDecodeError, ValueError):
+            # If parsing fails, use empty dict (raw_content will still be used for LOM0 validation)
+            parsed_operation_model = {}
+    # Pass raw_content for LOM0-JSON-BLOCK-ONLY validation
+    return py_audit_environment(
+        parsed_operation_model,
+        raw_content=operation_model_raw_content
+    )
+
+
+async def _apython_audit_diagram(orchestrator_instance, state: FileRunState, plantuml_file_path, svg_task: "asyncio.Task",
+                                 puml_write: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Python deterministic audit (no-LLM) of the .puml file of a diagram iteration.
+
+    Scheduled as a task next to the LLM auditor: waits for the SVG render (needed by the
+    graphical rules), audits in a worker thread and records the result under
+    processed_results["python_audits"]["diagram"].
+    """
+    # Read raw content - the auditor will automatically extract PlantUML by searching for @startuml/@enduml
+    # This is robust even if the file contains JSON or corrupted JSON
+    try:
+        puml_file_content = Path(str(plantuml_file_path)).read_text(encoding="utf-8")
+        # Pass raw content directly to auditor - it will extract PlantUML automatically
+        # raw_content is used for LDR0 validation (checking for text outside PlantUML block)
+        # text parameter will also be set to raw_content, and auditor extracts PlantUML from it
+        puml_raw_content = puml_file_content
+        puml_text = puml_file_content
+        orchestrator_instance.logger.info("[ADK] Reading diagram.puml for Python audit (auditor will extract PlantUML automatically)")
+    except Exception as e:
+        orchestrator_instance.logger.error(f"[ADK] Failed to read PlantUML file: {e}")
+        puml_text = ""
+        puml_raw_content = ""
+
+    # SVG needed by the graphical rules (LDR11-LDR16)
+    svg_file = await svg_task
+    if svg_file:
+        print(f"OK: {state.base_name} -> {svg_file.name}")
+        puml_write["svg_file"] = str(svg_file)
+        state.processed_results.setdefault("lucim_plantuml_diagram_generator", {})["svg_file"] = str(svg_file)
+    svg_path = state.processed_results.get("lucim_plantuml_diagram_generator", {}).get("svg_file")
+
+    # Pass raw_content for LDR0-PLANTUML-BLOCK-ONLY validation
+    # The auditor will automatically extract PlantUML from the text by searching for @startuml/@enduml
+    # Pass svg_path for graphical rules validation (LDR11-LDR16)
+    # Runs in a worker thread so the LLM auditor call keeps progressing on the event loop
+    py_puml_audit = await asyncio.to_thread(py_audit_diagram, puml_text, raw_content=puml_raw_content, svg_path=svg_path)
+    state.processed_results.setdefault("python_audits", {})["diagram"] = py_puml_audit
+    return py_puml_audit
+
+
+async def prepare_file_state(orchestrator_instance, state: FileRunState) -> Optional[Dict[str, Any]]:
+    """
+    Create (or reuse, when resuming) the run directory, load the mandatory inputs and
+    initialize the per-file state.
+
     Args:
         orchestrator_instance: Orchestrator instance
-        file_info: Dictionary containing file information
-        
+        state: Per-file run state
+
     Returns:
-        Dictionary containing all processing results
+        None, or the early-exit result when a mandatory input is missing
     """
-    base_name = file_info["base_name"]
-    orchestrator_instance.processed_results = {}
+    base_name = state.base_name
     
     # Ensure reasoning_effort and text_verbosity are initialized (defensive check)
     if not hasattr(orchestrator_instance, "reasoning_effort"):
@@ -62,94 +279,100 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
     
     tv = orchestrator_instance.agent_configs["lucim_operation_model_generator"].get("text_verbosity", "medium")
     reff = orchestrator_instance.agent_configs["lucim_operation_model_generator"].get("reasoning_effort", "medium")
-    run_dir = orchestrator_instance.fileio.create_run_directory(
-        orchestrator_instance.timestamp, base_name, orchestrator_instance.model, 
-        reff, tv, orchestrator_instance.selected_persona_set, version="v3-adk"
-    )
+    state.reasoning_effort, state.text_verbosity = reff, tv
+    resume_run_dir = getattr(orchestrator_instance, "resume_run_dir", None)
+    if resume_run_dir:
+        run_dir = Path(resume_run_dir)
+    else:
+        run_dir = orchestrator_instance.fileio.create_run_directory(
+            orchestrator_instance.timestamp, base_name, orchestrator_instance.model, 
+            reff, tv, orchestrator_instance.selected_persona_set, version="v3-adk"
+        )
+        write_run_manifest(
+            run_dir,
+            base_name=base_name,
+            model=orchestrator_instance.model,
+            timestamp=orchestrator_instance.timestamp,
+            reasoning_effort=reff,
+            reasoning_summary=orchestrator_instance.agent_configs["lucim_operation_model_generator"].get("reasoning_summary", "auto"),
+            text_verbosity=tv,
+            persona_set=orchestrator_instance.selected_persona_set,
+        )
+    state.run_dir = run_dir
     
-    total_orchestration_start_time = time.time()
-    orchestrator_instance.adk_monitor.start_monitoring()
+    state.start_time = time.time()
     orchestrator_instance.logger.info(f"[ADK] Starting v3 pipeline processing for {base_name} (ADK mode)...")
     
     try:
-        code_content = orchestrator_instance.fileio.read_netlogo_code(file_info["code_file"])
-        operation_rules_content = orchestrator_instance.fileio.load_rules_operation_model()
-        scenario_rules_content = orchestrator_instance.fileio.load_rules_scenario()
-        netlogo_lucim_mapping_content = load_netlogo_lucim_mapping(orchestrator_instance)
+        state.inputs = {
+            "code": orchestrator_instance.fileio.read_netlogo_code(state.file_info["code_file"]),
+            "operation_rules": orchestrator_instance.fileio.load_rules_operation_model(),
+            "scenario_rules": orchestrator_instance.fileio.load_rules_scenario(),
+            "netlogo_lucim_mapping": load_netlogo_lucim_mapping(orchestrator_instance),
+        }
     except (FileNotFoundError, Exception) as e:
         orchestrator_instance.logger.error(f"MANDATORY INPUT MISSING: {e}")
-        return {"error": f"MANDATORY INPUT MISSING: {e}", "results": {}}
-    
-    # Local helper to ensure a directory exists and return its Path
-    def _ensure_dir(path: Path) -> Path:
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        state.result = {"error": f"MANDATORY INPUT MISSING: {e}", "results": {}}
+        return state.result
 
     # Prepare stage roots per new folder structure (prefixed with execution order)
-    operation_model_root = _ensure_dir(run_dir / "1_lucim_operation_model")
-    scenario_root = _ensure_dir(run_dir / "2_lucim_scenario")
-    lucim_plantuml_diagram_root = _ensure_dir(run_dir / "3_lucim_plantuml_diagram")
+    state.stage_roots = {
+        "operation_model": _ensure_dir(run_dir / "1_lucim_operation_model"),
+        "scenario": _ensure_dir(run_dir / "2_lucim_scenario"),
+        "plantuml_diagram": _ensure_dir(run_dir / "3_lucim_plantuml_diagram"),
+    }
 
-    # Lightweight writers for per-iteration artifacts
-    def _dump_json(folder: Path, filename: str, obj: Any) -> None:
-        try:
-            (folder / filename).write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
-        except Exception:
-            pass
-    def _dump_text(folder: Path, filename: str, text: str) -> None:
-        try:
-            (folder / filename).write_text(text or "", encoding="utf-8")
-        except Exception:
-            pass
+    state.max_audit = getattr(orchestrator_instance, "max_audit", 3)
+    state.artifact_memo = ArtifactMemo(enabled=ARTIFACT_MEMO)
+    if resume_run_dir:
+        state.resume_states = detect_resume_point(run_dir, state.max_audit)
+        orchestrator_instance.logger.info(f"[ADK] Resuming {run_dir}: {describe_resume_point(state.resume_states)}")
+    return None
 
-    def _write_reasoning(folder: Path, title: str, verdict_value: Any, violations_list: Any) -> None:
-        try:
-            verdict_str = "compliant" if (verdict_value is True or verdict_value == "compliant") else "non-compliant"
-            vlist = violations_list if isinstance(violations_list, list) else []
-            lines = [
-                f"# {title}",
-                "",
-                f"- verdict: {verdict_str}",
-                f"- violations: {len(vlist)}",
-            ]
-            if vlist:
-                lines.append("")
-                lines.append("## Violations")
-                for v in vlist:
-                    vid = (v or {}).get("id") or "unknown"
-                    msg = (v or {}).get("message") or ""
-                    loc = (v or {}).get("location") or (v or {}).get("line")
-                    extra = f" (at {loc})" if loc is not None else ""
-                    lines.append(f"- {vid}: {msg}{extra}")
-            _dump_text(folder, "output-reasoning.md", "\n".join(lines))
-        except Exception:
-            _dump_text(folder, "output-reasoning.md", title)
+
+async def run_operation_model_stage(orchestrator_instance, state: FileRunState) -> Optional[Dict[str, Any]]:
+    """
+    Stage 1: Operation Model Generator → Auditor iterations.
+
+    Returns:
+        None, or the FAIL result when no usable Operation Model was produced
+    """
+    processed_results = state.processed_results
+    base_name, reff, max_audit, resume_states = state.base_name, state.reasoning_effort, state.max_audit, state.resume_states
+    code_content = state.inputs["code"]
+    netlogo_lucim_mapping_content = state.inputs["netlogo_lucim_mapping"]
+    operation_model_root = state.stage_roots["operation_model"]
+    audit_policy = get_audit_policy()
+    budget = budget_of(orchestrator_instance)
 
     # Iterative Step 1: Operation Model (Generator → Auditor), with per-iteration persistence
-    operation_model_attempt = 0
-    prev_operation_model = None
-    prev_operation_audit = None
-    max_audit = getattr(orchestrator_instance, "max_audit", 3)
-    while operation_model_attempt < max_audit:
+    operation_model_resume = apply_stage_resume(processed_results, resume_states.get("operation_model"))
+    operation_model_attempt = operation_model_resume["attempt"]
+    prev_operation_model = operation_model_resume["prev_artifact"]
+    prev_operation_audit = operation_model_resume["prev_audit"]
+    while not operation_model_resume["done"] and operation_model_attempt < max_audit:
         iter_index = operation_model_attempt + 1
         operation_model_iter_dir = _ensure_dir(operation_model_root / f"iter-{iter_index}")
         # New naming convention: subfolders under iter-<k>
         operation_model_generator_dir = _ensure_dir(operation_model_iter_dir / "1-generator")
+        _budget_decision(state, budget.lower_reasoning_effort(orchestrator_instance, "operation_model", iter_index))
         # 1.1 Generator (dual role: initial generation or corrective update)
-        operation_model_result = orchestrator_instance.lucim_operation_model_generator_agent.generate_lucim_operation_model(
+        operation_model_result = await orchestrator_instance.lucim_operation_model_generator_agent.agenerate_lucim_operation_model(
             code_content,
             netlogo_lucim_mapping_content,
             auditor_feedback=prev_operation_audit,
             previous_operation_model=prev_operation_model,
             output_dir=operation_model_generator_dir,
         )
-        orchestrator_instance.processed_results["lucim_operation_model_generator"] = operation_model_result
+        processed_results["lucim_operation_model_generator"] = operation_model_result
         try:
             orchestrator_instance.lucim_operation_model_generator_agent.save_results(
                 operation_model_result, base_name, orchestrator_instance.model, step_number=1, output_dir=operation_model_generator_dir
             )
         except Exception:
             pass
+        # Scenario generation can start on this Operation Model while it is audited
+        _speculate_scenario(orchestrator_instance, state, operation_model_result)
 
         operation_model_data = operation_model_result.get("data") or {}
         # 1.2 Auditor — outputs under lucim_operation_model/iter-<k>/2-auditor
@@ -162,16 +385,39 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
                 operation_model_raw_content = output_data_file.read_text(encoding="utf-8")
         except Exception:
             operation_model_raw_content = ""
-        # Delegate input-instructions.md writing to the auditor (includes persona + rules + OM raw content)
-        operation_model_audit = audit_operation_model(
-            operation_model_raw_content,
-            netlogo_lucim_mapping_content,
-            code_content,
-            str(operation_model_auditor_dir),
-            orchestrator_instance.model
-        )
+        # An artifact identical to an earlier iteration reuses its audits (no LLM / Python audit)
+        memo = state.artifact_memo.observe("operation_model", iter_index, operation_model_raw_content)
+        py_operation_model_task = None
+        if memo.entry is not None:
+            skip_reason = memo.describe()
+            orchestrator_instance.logger.info(f"[MEMO] Operation Model iteration {iter_index}: audit reused ({skip_reason}).")
+            operation_model_audit = reused_audit(memo)
+        else:
+            # Python deterministic audit (no-LLM) in a worker thread, concurrently with the LLM auditor.
+            # The audit policy waits for it first when it may skip the LLM auditor.
+            py_operation_model_task = asyncio.create_task(
+                asyncio.to_thread(_python_audit_operation_model, operation_model_data, operation_model_raw_content)
+            )
+            budget_skip = _budget_decision(state, budget.skip_llm_audit("operation_model", iter_index))
+            skip_reason = budget_skip.reason if budget_skip else audit_policy.skip_reason(
+                await py_operation_model_task if audit_policy.python_first else None
+            )
+            if skip_reason:
+                orchestrator_instance.logger.info(f"[AUDIT-POLICY] Operation Model iteration {iter_index}: LLM auditor skipped ({skip_reason}).")
+                processed_results.setdefault("audit_policy", {})["operation_model"] = skip_reason
+                operation_model_audit = python_audit_report(await py_operation_model_task, skip_reason)
+            else:
+                # Delegate input-instructions.md writing to the auditor (includes persona + rules + OM raw content)
+                operation_model_audit = await aaudit_operation_model(
+                    operation_model_raw_content,
+                    netlogo_lucim_mapping_content,
+                    code_content,
+                    str(operation_model_auditor_dir),
+                    orchestrator_instance.model,
+                    **_run_reasoning_settings(orchestrator_instance),
+                )
         operation_model_core = extract_audit_core(operation_model_audit)
-        orchestrator_instance.processed_results["lucim_operation_model_auditor"] = {
+        processed_results["lucim_operation_model_auditor"] = {
             "data": operation_model_core["data"],
             "verdict": operation_model_core["verdict"],
             "non-compliant-rules": operation_model_core["non_compliant_rules"],
@@ -213,44 +459,19 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         # Note: _write_reasoning is no longer called here to avoid overwriting the detailed
         # output-reasoning.md file created by write_all_output_files. The verdict and violations
         # information is already included in the output-reasoning.md file via write_reasoning_md_from_payload.
-        # Python deterministic audit (no-LLM)
-        # Parse operation_model_data as JSON if it's a string (new standardized format)
-        # Handle standardized response structure: extract content from "data" if present
-        parsed_operation_model = {}
-        if isinstance(operation_model_data, dict):
-            # Check if it's the standardized structure {"data": {...}, "errors": null}
-            if "data" in operation_model_data and operation_model_data.get("data") is not None:
-                # Extract the actual operation model from the "data" field
-                parsed_operation_model = operation_model_data.get("data")
-            else:
-                # Direct operation model structure (no wrapping)
-                parsed_operation_model = operation_model_data
-        elif isinstance(operation_model_data, str) and operation_model_data.strip():
-            try:
-                parsed_json = json.loads(operation_model_data)
-                # Check if it's the standardized structure
-                if isinstance(parsed_json, dict) and "data" in parsed_json and parsed_json.get("data") is not None:
-                    parsed_operation_model = parsed_json.get("data")
-                else:
-                    parsed_operation_model = parsed_json
-            except (json.JSONDecodeError, ValueError):
-                # If parsing fails, use empty dict (raw_content will still be used for LOM0 validation)
-                parsed_operation_model = {}
-        # Pass raw_content for LOM0-JSON-BLOCK-ONLY validation
-        py_operation_model_audit = py_audit_environment(
-            parsed_operation_model,
-            raw_content=operation_model_raw_content
-        )
-        orchestrator_instance.processed_results.setdefault("python_audits", {})["operation_model"] = py_operation_model_audit
-        # Build dict for compare_verdicts (maps non-compliant-rules to violations)
-        operation_model_audit_for_compare = {
-            "verdict": operation_model_audit.get("verdict"),
-            "violations": operation_model_audit.get("non-compliant-rules") or []  # Map non-compliant-rules to violations for compare_verdicts
-        }
-        # Compare
-        cmp_operation_model = compare_verdicts(operation_model_audit_for_compare, py_operation_model_audit)
-        orchestrator_instance.processed_results.setdefault("auditor_vs_python", {})["operation_model"] = cmp_operation_model
-        log_comparison(orchestrator_instance.logger, "Operation Model", cmp_operation_model)
+        py_operation_model_audit = await py_operation_model_task if py_operation_model_task else memo.entry.py_audit
+        processed_results.setdefault("python_audits", {})["operation_model"] = py_operation_model_audit
+        state.artifact_memo.record(memo, operation_model_audit, py_operation_model_audit)
+        # Compare (only when the LLM auditor ran)
+        if not skip_reason:
+            # Build dict for compare_verdicts (maps non-compliant-rules to violations)
+            operation_model_audit_for_compare = {
+                "verdict": operation_model_audit.get("verdict"),
+                "violations": operation_model_audit.get("non-compliant-rules") or []  # Map non-compliant-rules to violations for compare_verdicts
+            }
+            cmp_operation_model = compare_verdicts(operation_model_audit_for_compare, py_operation_model_audit)
+            processed_results.setdefault("auditor_vs_python", {})["operation_model"] = cmp_operation_model
+            log_comparison(orchestrator_instance.logger, "Operation Model", cmp_operation_model)
         # Write markdown report listing non-compliant rules (dynamic extraction, no hardcoding)
         try:
             operation_model_md_path = operation_model_auditor_dir / "output_python_operation_model.md"
@@ -316,7 +537,15 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
                 f"[ADK] Operation Model still non-compliant at cap (iteration {iter_index}); proceeding to Scenario stage as per MAX_AUDIT policy."
             )
             break
-        # Prepare next iteration inputs
+        if memo.oscillation:
+            orchestrator_instance.logger.warning(
+                f"[MEMO] Operation Model generator oscillates ({memo.describe()}, iteration {iter_index}); proceeding to Scenario stage early."
+            )
+            break
+        if _budget_decision(state, budget.cap_iterations("operation_model", iter_index, max_audit)):
+            break
+        # Prepare next iteration inputs (the Scenario speculated on this Operation Model is obsolete)
+        await _discard_speculation(state, "scenario")
         prev_operation_model = operation_model_data
         prev_operation_audit = operation_model_audit
         operation_model_attempt += 1
@@ -326,14 +555,13 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
     # Validate Operation Model Generator output before proceeding to Scenario stage
     # Get the operation model from the last iteration (stored in processed_results)
     # output-data.json contains raw text (may include markdown fences), not parsed JSON
-    operation_model_result = orchestrator_instance.processed_results.get("lucim_operation_model_generator", {})
+    operation_model_result = processed_results.get("lucim_operation_model_generator", {})
     operation_model_raw_data = operation_model_result.get("data") if operation_model_result else None
     
     # Validate that operation model raw text exists (no JSON parsing - treat as raw text)
     if not operation_model_raw_data:
         orchestrator_instance.logger.error("[ADK] Operation Model Generator produced no data; cannot proceed to Scenario stage.")
-        orchestrator_instance.adk_monitor.stop_monitoring()
-        return {"status": "FAIL", "stage": "operation_model", "results": orchestrator_instance.processed_results}
+        return state.fail("operation_model")
     
     # Ensure it's a string (raw text from LLM response)
     if not isinstance(operation_model_raw_data, str):
@@ -343,33 +571,60 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
     # Check that the raw text is not empty
     if not operation_model_raw_data.strip():
         orchestrator_instance.logger.error("[ADK] Operation Model data is empty; cannot proceed to Scenario stage.")
-        orchestrator_instance.adk_monitor.stop_monitoring()
-        return {"status": "FAIL", "stage": "operation_model", "results": orchestrator_instance.processed_results}
+        return state.fail("operation_model")
     
     # Pass raw text directly to Scenario Generator (no JSON parsing, no markdown extraction)
     # The Scenario Generator will use this raw text in <LUCIM-OPERATION-MODEL> tag
     operation_model_data_for_scenario = operation_model_raw_data
+    state.operation_model_text = operation_model_data_for_scenario
     
     orchestrator_instance.logger.info(f"[ADK] Operation Model raw text validated ({len(operation_model_raw_data)} chars). Proceeding to Scenario stage.")
+    return None
+
+
+async def run_scenario_stage(orchestrator_instance, state: FileRunState) -> Optional[Dict[str, Any]]:
+    """
+    Stage 2: Scenario Generator → Auditor iterations.
+
+    Returns:
+        None, or the FAIL result when the scenario could not be produced or audited
+    """
+    processed_results = state.processed_results
+    base_name, reff, max_audit, resume_states = state.base_name, state.reasoning_effort, state.max_audit, state.resume_states
+    scenario_rules_content = state.inputs["scenario_rules"]
+    scenario_root = state.stage_roots["scenario"]
+    audit_policy = get_audit_policy()
+    budget = budget_of(orchestrator_instance)
+    operation_model_data_for_scenario = state.operation_model_text
 
     # Step 2: Scenario (Generator → Auditor) with iterations
-    scen_attempt = 0
-    prev_scenario = None
-    prev_scenario_audit = None
-    while scen_attempt < max_audit:
+    scenario_resume = apply_stage_resume(processed_results, resume_states.get("scenario"))
+    scen_attempt = scenario_resume["attempt"]
+    prev_scenario = scenario_resume["prev_artifact"]
+    prev_scenario_audit = scenario_resume["prev_audit"]
+    speculation = await take_speculation(state.speculations, "scenario", operation_model_data_for_scenario)
+    while not scenario_resume["done"] and scen_attempt < max_audit:
         iter_index = scen_attempt + 1
         scenario_iterator_dir = _ensure_dir(scenario_root / f"iter-{iter_index}")
         # New naming convention: subfolders under iter-<k>
         scenario_generator_dir = _ensure_dir(scenario_iterator_dir / "1-generator")
-        # 2.1 Generator (dual role)
-        scen_result = orchestrator_instance.lucim_scenario_generator_agent.generate_scenarios(
-            operation_model_data_for_scenario,
-            scenario_rules_content,
-            scenario_auditor_feedback=prev_scenario_audit,
-            previous_scenario=prev_scenario,
-            output_dir=scenario_generator_dir
-        )
-        orchestrator_instance.processed_results["lucim_scenario_generator"] = scen_result
+        if _budget_decision(state, budget.lower_reasoning_effort(orchestrator_instance, "scenario", iter_index)) and speculation is not None:
+            # The speculative generation started at the previous effort: regenerate at the lowered one
+            await speculation.discard()
+            speculation = None
+        # 2.1 Generator (dual role); iteration 1 may already be running since the Operation Model audit
+        if speculation is not None and prev_scenario_audit is None:
+            scen_result = await speculation.commit()
+        else:
+            scen_result = await orchestrator_instance.lucim_scenario_generator_agent.agenerate_scenarios(
+                operation_model_data_for_scenario,
+                scenario_rules_content,
+                scenario_auditor_feedback=prev_scenario_audit,
+                previous_scenario=prev_scenario,
+                output_dir=scenario_generator_dir
+            )
+        speculation = None
+        processed_results["lucim_scenario_generator"] = scen_result
         try:
             orchestrator_instance.lucim_scenario_generator_agent.save_results(scen_result, base_name, orchestrator_instance.model, step_number=2, output_dir=scenario_generator_dir)
         except Exception:
@@ -377,8 +632,9 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         scen_data = scen_result.get("data")
         if scen_data is None:
             orchestrator_instance.logger.error("[ADK] Scenario synthesis produced no data.")
-            orchestrator_instance.adk_monitor.stop_monitoring()
-            return {"status": "FAIL", "stage": "scenario", "results": orchestrator_instance.processed_results}
+            return state.fail("scenario")
+        # PlantUML generation can start on this Scenario while it is audited
+        _speculate_plantuml_diagram(orchestrator_instance, state, scen_result)
 
         # 2.2 Auditor — outputs under lucim_scenario/iter-<k>/2-auditor
         scenario_auditor_dir = _ensure_dir(scenario_iterator_dir / "2-auditor")
@@ -386,7 +642,7 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         try:
             # Load Scenario Auditor persona from persona set
             persona_scen_path = INPUT_PERSONA_DIR / orchestrator_instance.selected_persona_set / "PSN_LUCIM_Scenario_Auditor.md"
-            persona_scen_text = persona_scen_path.read_text(encoding="utf-8") if persona_scen_path.exists() else ""
+            persona_scen_text = read_prompt_text(persona_scen_path) if persona_scen_path.exists() else ""
         except Exception:
             persona_scen_text = ""
         
@@ -474,14 +730,51 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         # Ensure operation_model_data_for_scenario is available (mandatory parameter)
         if operation_model_data_for_scenario is None:
             orchestrator_instance.logger.error("[ADK] LUCIM operation model data is missing; cannot proceed with scenario audit.")
-            orchestrator_instance.adk_monitor.stop_monitoring()
-            return {"status": "FAIL", "stage": "lucim_scenario_auditor", "results": orchestrator_instance.processed_results}
-        scen_audit = audit_scenario_text(
-            scen_raw_content,
-            operation_model_data_for_scenario,
-            output_dir=scenario_auditor_dir, 
-            model_name=orchestrator_instance.model
-        )
+            return state.fail("lucim_scenario_auditor")
+        # Python deterministic audit (no-LLM)
+        # Pass JSON raw content first (preferred), fallback to PlantUML text
+        # The audit_scenario function will automatically detect JSON vs PlantUML text
+        # Pass operation model raw text for rules requiring it (LSC5, LSC6, LSC12-LSC17)
+        # Validate operation model is available before calling audit
+        if not operation_model_data_for_scenario:
+            orchestrator_instance.logger.warning(f"[ADK] Scenario audit iteration {iter_index}: Operation model data is None or empty. Python audit may report false violations.")
+        else:
+            # Log operation model info for debugging (raw text, no parsing)
+            text_length = len(operation_model_data_for_scenario) if isinstance(operation_model_data_for_scenario, str) else 0
+            orchestrator_instance.logger.debug(f"[ADK] Scenario audit iteration {iter_index}: Using operation model raw text ({text_length} chars) for Python audit.")
+        
+        # An artifact identical to an earlier iteration reuses its audits (no LLM / Python audit)
+        memo = state.artifact_memo.observe("scenario", iter_index, scen_raw_content if scen_raw_content else scen_text)
+        py_scen_task = None
+        if memo.entry is not None:
+            skip_reason = memo.describe()
+            orchestrator_instance.logger.info(f"[MEMO] Scenario iteration {iter_index}: audit reused ({skip_reason}).")
+            scen_audit = reused_audit(memo)
+        else:
+            # Runs in a worker thread, concurrently with the LLM auditor; the audit policy waits
+            # for it first when it may skip the LLM auditor
+            py_scen_task = asyncio.create_task(asyncio.to_thread(
+                py_audit_scenario,
+                scen_raw_content if scen_raw_content else scen_text,
+                raw_content=scen_raw_content if scen_raw_content else None,
+                operation_model=operation_model_data_for_scenario
+            ))
+            budget_skip = _budget_decision(state, budget.skip_llm_audit("scenario", iter_index))
+            skip_reason = budget_skip.reason if budget_skip else audit_policy.skip_reason(
+                await py_scen_task if audit_policy.python_first else None
+            )
+            if skip_reason:
+                orchestrator_instance.logger.info(f"[AUDIT-POLICY] Scenario iteration {iter_index}: LLM auditor skipped ({skip_reason}).")
+                processed_results.setdefault("audit_policy", {})["scenario"] = skip_reason
+                scen_audit = python_audit_report(await py_scen_task, skip_reason)
+            else:
+                scen_audit = await aaudit_scenario_text(
+                    scen_raw_content,
+                    operation_model_data_for_scenario,
+                    output_dir=scenario_auditor_dir,
+                    model_name=orchestrator_instance.model,
+                    **_run_reasoning_settings(orchestrator_instance),
+                )
         try:
             # Persona + scenario raw content + rules (insert rules once)
             # Note: scen_raw_content is the raw text from output-data.json, may or may not be valid JSON
@@ -490,7 +783,7 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         except Exception:
             pass
         scen_core = extract_audit_core(scen_audit)
-        orchestrator_instance.processed_results["lucim_scenario_auditor"] = {
+        processed_results["lucim_scenario_auditor"] = {
             "data": scen_core["data"],
             "verdict": scen_core["verdict"],
             "non-compliant-rules": scen_core["non_compliant_rules"],
@@ -532,33 +825,19 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         # Note: _write_reasoning is no longer called here to avoid overwriting the detailed
         # output-reasoning.md file created by write_all_output_files. The verdict and violations
         # information is already included in the output-reasoning.md file via write_reasoning_md_from_payload.
-        # Python deterministic audit (no-LLM)
-        # Pass JSON raw content first (preferred), fallback to PlantUML text
-        # The audit_scenario function will automatically detect JSON vs PlantUML text
-        # Pass operation model raw text for rules requiring it (LSC5, LSC6, LSC12-LSC17)
-        # Validate operation model is available before calling audit
-        if not operation_model_data_for_scenario:
-            orchestrator_instance.logger.warning(f"[ADK] Scenario audit iteration {iter_index}: Operation model data is None or empty. Python audit may report false violations.")
-        else:
-            # Log operation model info for debugging (raw text, no parsing)
-            text_length = len(operation_model_data_for_scenario) if isinstance(operation_model_data_for_scenario, str) else 0
-            orchestrator_instance.logger.debug(f"[ADK] Scenario audit iteration {iter_index}: Using operation model raw text ({text_length} chars) for Python audit.")
-        
-        py_scen_audit = py_audit_scenario(
-            scen_raw_content if scen_raw_content else scen_text,
-            raw_content=scen_raw_content if scen_raw_content else None,
-            operation_model=operation_model_data_for_scenario
-        )
-        orchestrator_instance.processed_results.setdefault("python_audits", {})["scenario"] = py_scen_audit
-        # Build dict for compare_verdicts (maps non-compliant-rules to violations)
-        scen_audit_for_compare = {
-            "verdict": scen_audit.get("verdict"),
-            "violations": scen_audit.get("non-compliant-rules") or []  # Map non-compliant-rules to violations for compare_verdicts
-        }
-        # Compare
-        cmp_scen = compare_verdicts(scen_audit_for_compare, py_scen_audit)
-        orchestrator_instance.processed_results.setdefault("auditor_vs_python", {})["scenario"] = cmp_scen
-        log_comparison(orchestrator_instance.logger, "Scenario", cmp_scen)
+        py_scen_audit = await py_scen_task if py_scen_task else memo.entry.py_audit
+        processed_results.setdefault("python_audits", {})["scenario"] = py_scen_audit
+        state.artifact_memo.record(memo, scen_audit, py_scen_audit)
+        # Compare (only when the LLM auditor ran)
+        if not skip_reason:
+            # Build dict for compare_verdicts (maps non-compliant-rules to violations)
+            scen_audit_for_compare = {
+                "verdict": scen_audit.get("verdict"),
+                "violations": scen_audit.get("non-compliant-rules") or []  # Map non-compliant-rules to violations for compare_verdicts
+            }
+            cmp_scen = compare_verdicts(scen_audit_for_compare, py_scen_audit)
+            processed_results.setdefault("auditor_vs_python", {})["scenario"] = cmp_scen
+            log_comparison(orchestrator_instance.logger, "Scenario", cmp_scen)
         # Write markdown report (dynamic extraction, no hardcoding)
         try:
             scenario_python_md_path = scenario_auditor_dir / "output_python_scenario.md"
@@ -612,27 +891,65 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
                 f"[ADK] Scenario still non-compliant at cap (iteration {iter_index}); proceeding to PlantUML as per MAX_AUDIT policy."
             )
             break
+        if memo.oscillation:
+            orchestrator_instance.logger.warning(
+                f"[MEMO] Scenario generator oscillates ({memo.describe()}, iteration {iter_index}); proceeding to PlantUML early."
+            )
+            break
+        if _budget_decision(state, budget.cap_iterations("scenario", iter_index, max_audit)):
+            break
+        # The PlantUML diagram speculated on this Scenario is obsolete
+        await _discard_speculation(state, "plantuml_diagram")
         prev_scenario = scen_result.get("data")
         prev_scenario_audit = scen_audit
         scen_attempt += 1
         continue
+    return None
+
+
+async def run_plantuml_diagram_stage(orchestrator_instance, state: FileRunState) -> Optional[Dict[str, Any]]:
+    """
+    Stage 3: PlantUML Diagram Generator → Auditor iterations.
+
+    Returns:
+        None, or the FAIL result when the diagram could not be produced or audited
+    """
+    processed_results = state.processed_results
+    base_name, max_audit, resume_states = state.base_name, state.max_audit, state.resume_states
+    lucim_plantuml_diagram_root = state.stage_roots["plantuml_diagram"]
+    audit_policy = get_audit_policy()
+    budget = budget_of(orchestrator_instance)
+
+    if processed_results.get("lucim_scenario_generator", {}).get("data") is None:
+        orchestrator_instance.logger.error("[ADK] Scenario data is missing; cannot proceed to PlantUML stage.")
+        return state.fail("scenario")
 
     # Step 3: PlantUML Diagram (Generator → Auditor) with iterations
-    puml_attempt = 0
-    prev_puml_audit = None
-    prev_puml_diagram = None
-    while puml_attempt < max_audit:
+    puml_state = resume_states.get("plantuml_diagram")
+    puml_resume = apply_stage_resume(processed_results, puml_state)
+    puml_attempt = puml_resume["attempt"]
+    # The PlantUML generator takes the audit data and the previous .puml text
+    prev_puml_audit = (puml_resume["prev_audit"] or {}).get("data")
+    prev_puml_diagram = ((puml_state or {}).get("generator") or {}).get("plantuml_text") if puml_attempt else None
+    speculation = await take_speculation(
+        state.speculations, "plantuml_diagram", processed_results["lucim_scenario_generator"]["data"]
+    )
+    while not puml_resume["done"] and puml_attempt < max_audit:
         iter_index = puml_attempt + 1
         puml_iter_dir = _ensure_dir(lucim_plantuml_diagram_root / f"iter-{iter_index}")
         # New naming convention: subfolders under iter-<k>
         writer_base_dir = _ensure_dir(puml_iter_dir / "1-generator")
+        if _budget_decision(state, budget.lower_reasoning_effort(orchestrator_instance, "plantuml_diagram", iter_index)) and speculation is not None:
+            # The speculative generation started at the previous effort: regenerate at the lowered one
+            await speculation.discard()
+            speculation = None
         # Write input-instructions.md for writer with exact system_prompt (TASK + persona + DSL + scenario data)
         try:
             persona_dir = INPUT_PERSONA_DIR / orchestrator_instance.selected_persona_set
             persona_writer_path = persona_dir / "PSN_LUCIM_PlantUML_Diagram_Generator.md"
-            persona_writer_text = persona_writer_path.read_text(encoding="utf-8") if persona_writer_path.exists() else ""
+            persona_writer_text = read_prompt_text(persona_writer_path) if persona_writer_path.exists() else ""
             # Use raw text copy (no json.dumps or normalization)
-            scen_data = orchestrator_instance.processed_results["lucim_scenario_generator"]["data"]
+            scen_data = processed_results["lucim_scenario_generator"]["data"]
             if isinstance(scen_data, str):
                 scen_data_text = scen_data
             else:
@@ -642,45 +959,78 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
             _dump_text(writer_base_dir, "input-instructions.md", system_prompt_writer)
         except Exception:
             pass
-        # 3.1 PlantUML Generator
-        puml_write = orchestrator_instance.lucim_plantuml_diagram_generator_agent.generate_plantuml_diagrams(
-            orchestrator_instance.processed_results["lucim_scenario_generator"]["data"],
-            prev_puml_audit,
-            prev_puml_diagram,
-            output_dir=writer_base_dir,
-        )
-        orchestrator_instance.processed_results["lucim_plantuml_diagram_generator"] = puml_write
+        # 3.1 PlantUML Generator; iteration 1 may already be running since the Scenario audit
+        if speculation is not None and prev_puml_audit is None:
+            puml_write = await speculation.commit()
+        else:
+            puml_write = await orchestrator_instance.lucim_plantuml_diagram_generator_agent.agenerate_plantuml_diagrams(
+                processed_results["lucim_scenario_generator"]["data"],
+                prev_puml_audit,
+                prev_puml_diagram,
+                output_dir=writer_base_dir,
+            )
+        speculation = None
+        processed_results["lucim_plantuml_diagram_generator"] = puml_write
         try:
-            orchestrator_instance.lucim_plantuml_diagram_generator_agent.save_results(puml_write, base_name, orchestrator_instance.model, step_number=3, output_dir=writer_base_dir)
+            orchestrator_instance.lucim_plantuml_diagram_generator_agent.save_results(puml_write, base_name, orchestrator_instance.model, step_number=3, output_dir=writer_base_dir, render_svg=False)
         except Exception:
             pass
 
-        # Extract SVG path from generator results if available
-        svg_file_path = puml_write.get("svg_file")
-        if svg_file_path:
-            orchestrator_instance.processed_results.setdefault("lucim_plantuml_diagram_generator", {})["svg_file"] = svg_file_path
-
         # Resolve .puml path written by writer
         plantuml_file_path = orchestrator_instance.fileio.get_plantuml_file_path(writer_base_dir)
         if not plantuml_file_path or not orchestrator_instance.fileio.validate_plantuml_file(plantuml_file_path):
             orchestrator_instance.logger.error("[ADK] PlantUML file missing or invalid after writer. Ending workflow as FAIL.")
-            orchestrator_instance.adk_monitor.stop_monitoring()
-            return {"status": "FAIL", "stage": "lucim_plantuml_diagram_generator", "results": orchestrator_instance.processed_results}
+            return state.fail("lucim_plantuml_diagram_generator")
+
+        # An artifact identical to an earlier iteration reuses its audits and SVG (no render, no LLM / Python audit)
+        try:
+            puml_artifact_text = Path(str(plantuml_file_path)).read_text(encoding="utf-8")
+        except Exception:
+            puml_artifact_text = ""
+        memo = state.artifact_memo.observe("plantuml_diagram", iter_index, puml_artifact_text)
+        svg_task = None
+        if memo.entry is None:
+            # Submit the SVG render to the persistent renderer; it runs while the LLM auditor works
+            svg_task = asyncio.create_task(arender_svg_file(Path(plantuml_file_path), writer_base_dir))
 
         # 3.2 PlantUML Auditor — outputs under plantuml/iter-<k>/2-auditor
         auditor_iter_dir = _ensure_dir(puml_iter_dir / "2-auditor")
         # Ensure lucim_scenario is available (mandatory parameter)
-        lucim_scenario_for_audit = orchestrator_instance.processed_results.get("lucim_scenario_generator", {}).get("data")
+        lucim_scenario_for_audit = processed_results.get("lucim_scenario_generator", {}).get("data")
         if lucim_scenario_for_audit is None:
             orchestrator_instance.logger.error("[ADK] LUCIM scenario data is missing; cannot proceed with PlantUML diagram audit.")
-            orchestrator_instance.adk_monitor.stop_monitoring()
-            return {"status": "FAIL", "stage": "lucim_plantuml_diagram_auditor", "results": orchestrator_instance.processed_results}
-        audit_res = orchestrator_instance.lucim_plantuml_diagram_auditor_agent.audit_plantuml_diagrams(
-            str(plantuml_file_path),
-            lucim_scenario_for_audit,
-            auditor_iter_dir
-        )
-        orchestrator_instance.processed_results["lucim_plantuml_diagram_auditor"] = audit_res
+            if svg_task is not None:
+                svg_task.cancel()
+            return state.fail("lucim_plantuml_diagram_auditor")
+        py_puml_task = None
+        if memo.entry is not None:
+            skip_reason = memo.describe()
+            orchestrator_instance.logger.info(f"[MEMO] PlantUML Diagram iteration {iter_index}: audit reused ({skip_reason}).")
+            audit_res = reused_audit(memo)
+            if memo.entry.svg_file:
+                puml_write["svg_file"] = memo.entry.svg_file
+                processed_results.setdefault("lucim_plantuml_diagram_generator", {})["svg_file"] = memo.entry.svg_file
+        else:
+            # Python audit (after the SVG render) runs concurrently with the LLM auditor; the audit
+            # policy waits for it first when it may skip the LLM auditor
+            py_puml_task = asyncio.create_task(
+                _apython_audit_diagram(orchestrator_instance, state, plantuml_file_path, svg_task, puml_write)
+            )
+            budget_skip = _budget_decision(state, budget.skip_llm_audit("plantuml_diagram", iter_index))
+            skip_reason = budget_skip.reason if budget_skip else audit_policy.skip_reason(
+                await py_puml_task if audit_policy.python_first else None
+            )
+            if skip_reason:
+                orchestrator_instance.logger.info(f"[AUDIT-POLICY] PlantUML Diagram iteration {iter_index}: LLM auditor skipped ({skip_reason}).")
+                processed_results.setdefault("audit_policy", {})["diagram"] = skip_reason
+                audit_res = python_audit_report(await py_puml_task, skip_reason)
+            else:
+                audit_res = await orchestrator_instance.lucim_plantuml_diagram_auditor_agent.aaudit_plantuml_diagrams(
+                    str(plantuml_file_path),
+                    lucim_scenario_for_audit,
+                    auditor_iter_dir
+                )
+        processed_results["lucim_plantuml_diagram_auditor"] = audit_res
         try:
             orchestrator_instance.lucim_plantuml_diagram_auditor_agent.save_results(audit_res, base_name, orchestrator_instance.model, step_number=4, output_dir=auditor_iter_dir)
         except Exception:
@@ -705,7 +1055,7 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
                 "coverage": {"total_rules_in_dsl": "0", "evaluated": [], "not_applicable": [], "missing_evaluation": []},
                 "errors": ["extract_audit_core returned non-dict"],
             }
-        orchestrator_instance.processed_results["lucim_plantuml_diagram_auditor"] = {
+        processed_results["lucim_plantuml_diagram_auditor"] = {
             "data": puml_core.get("data", {}),
             "verdict": puml_core.get("verdict", "non-compliant"),
             "non-compliant-rules": puml_core.get("non_compliant_rules", []),
@@ -719,50 +1069,30 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
             "violations": puml_core.get("non_compliant_rules", [])  # Map non-compliant-rules to violations for compare_verdicts
         }
         verdict = puml_core.get("verdict", "non-compliant")
-        # Python deterministic audit (no-LLM) on .puml text
-        # Read raw content - the auditor will automatically extract PlantUML by searching for @startuml/@enduml
-        # This is robust even if the file contains JSON or corrupted JSON
-        try:
-            import pathlib
-            puml_file_content = pathlib.Path(str(plantuml_file_path)).read_text(encoding="utf-8")
-            # Pass raw content directly to auditor - it will extract PlantUML automatically
-            # raw_content is used for LDR0 validation (checking for text outside PlantUML block)
-            # text parameter will also be set to raw_content, and auditor extracts PlantUML from it
-            puml_raw_content = puml_file_content
-            puml_text = puml_file_content
-            orchestrator_instance.logger.info("[ADK] Reading diagram.puml for Python audit (auditor will extract PlantUML automatically)")
-        except Exception as e:
-            orchestrator_instance.logger.error(f"[ADK] Failed to read PlantUML file: {e}")
-            puml_text = ""
-            puml_raw_content = ""
-        
-        # Extract SVG path from generator results if available
-        svg_path = orchestrator_instance.processed_results.get("lucim_plantuml_diagram_generator", {}).get("svg_file")
-        
-        # Pass raw_content for LDR0-PLANTUML-BLOCK-ONLY validation
-        # The auditor will automatically extract PlantUML from the text by searching for @startuml/@enduml
-        # Pass svg_path for graphical rules validation (LDR11-LDR16)
-        py_puml_audit = py_audit_diagram(puml_text, raw_content=puml_raw_content, svg_path=svg_path)
-        orchestrator_instance.processed_results.setdefault("python_audits", {})["diagram"] = py_puml_audit
-        # Compare agent 6 verdict vs python verdict (use puml_audit_for_compare with proper structure)
-        # Wrap in try/except to ensure Python audit report is always created even if comparison fails
-        try:
-            cmp_puml = compare_verdicts(puml_audit_for_compare, py_puml_audit)
-            orchestrator_instance.processed_results.setdefault("auditor_vs_python", {})["diagram"] = cmp_puml
-            log_comparison(orchestrator_instance.logger, "Diagram", cmp_puml)
-        except Exception as e:
-            orchestrator_instance.logger.error(f"[ADK] Failed to compare Diagram verdicts: {e}")
-            import traceback
-            orchestrator_instance.logger.error(f"[ADK] Traceback: {traceback.format_exc()}")
-            # Create a default comparison result
-            cmp_puml = {
-                "match": False,
-                "agent_verdict": None,
-                "python_verdict": None,
-                "agent_violations_count": 0,
-                "python_violations_count": len(py_puml_audit.get("violations", [])) if isinstance(py_puml_audit, dict) else 0,
-            }
-            orchestrator_instance.processed_results.setdefault("auditor_vs_python", {})["diagram"] = cmp_puml
+        py_puml_audit = await py_puml_task if py_puml_task else memo.entry.py_audit
+        state.artifact_memo.record(
+            memo, audit_res, py_puml_audit, svg_file=processed_results.get("lucim_plantuml_diagram_generator", {}).get("svg_file")
+        )
+        # Compare agent 6 verdict vs python verdict, when the LLM auditor ran
+        if not skip_reason:
+            # Wrap in try/except to ensure Python audit report is always created even if comparison fails
+            try:
+                cmp_puml = compare_verdicts(puml_audit_for_compare, py_puml_audit)
+                processed_results.setdefault("auditor_vs_python", {})["diagram"] = cmp_puml
+                log_comparison(orchestrator_instance.logger, "Diagram", cmp_puml)
+            except Exception as e:
+                orchestrator_instance.logger.error(f"[ADK] Failed to compare Diagram verdicts: {e}")
+                import traceback
+                orchestrator_instance.logger.error(f"[ADK] Traceback: {traceback.format_exc()}")
+                # Create a default comparison result
+                cmp_puml = {
+                    "match": False,
+                    "agent_verdict": None,
+                    "python_verdict": None,
+                    "agent_violations_count": 0,
+                    "python_violations_count": len(py_puml_audit.get("violations", [])) if isinstance(py_puml_audit, dict) else 0,
+                }
+                processed_results.setdefault("auditor_vs_python", {})["diagram"] = cmp_puml
         # Write markdown report (dynamic extraction, no hardcoding)
         try:
             diag_md_path = auditor_iter_dir / "output_python_diagram.md"
@@ -829,6 +1159,13 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
                 f"[ADK] PlantUML Diagram still non-compliant at cap (iteration {iter_index}); ending workflow as per MAX_AUDIT policy."
             )
             break
+        if memo.oscillation:
+            orchestrator_instance.logger.warning(
+                f"[MEMO] PlantUML Diagram generator oscillates ({memo.describe()}, iteration {iter_index}); ending workflow early."
+            )
+            break
+        if _budget_decision(state, budget.cap_iterations("plantuml_diagram", iter_index, max_audit)):
+            break
         # Prepare next iteration: pass full audit report and previous diagram text/data
         prev_puml_audit = (audit_res or {}).get("data")
         try:
@@ -837,24 +1174,41 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
             prev_puml_diagram = None
         puml_attempt += 1
         continue
-    
-    total_orchestration_time = time.time() - total_orchestration_start_time
+    state.end_time = time.time()
+    return None
+
+
+def finalize_file_state(orchestrator_instance, state: FileRunState) -> Dict[str, Any]:
+    """
+    Log the per-file summary and return the file result (the early-exit result for failed files).
+
+    Args:
+        orchestrator_instance: Orchestrator instance
+        state: Per-file run state
+
+    Returns:
+        Dictionary containing all processing results of the file
+    """
+    # Speculations whose stage never ran (failed or stopped file)
+    cancel_speculations(state.speculations)
+    if state.failed:
+        return state.result
+    base_name = state.base_name
+    processed_results = state.processed_results
+    total_orchestration_time = state.elapsed()
     orchestrator_instance.execution_times["total_orchestration"] = total_orchestration_time
     
     orchestrator_instance.logger.info(f"[ADK] Workflow execution completed in {total_orchestration_time:.2f}s")
-    orchestrator_instance.adk_monitor.stop_monitoring()
-    orchestrator_instance.logger.info(f"[ADK] Generating ADK monitoring summary...")
-    orchestrator_instance.adk_monitor.log_summary()
     
     orchestrator_instance.logger.info(f"Completed processing for {base_name}")
     orchestrator_instance.logger.info(f"Total orchestration time: {FormatUtils.format_duration(total_orchestration_time)}")
     
-    orchestrator_instance.processed_results["execution_times"] = orchestrator_instance.execution_times.copy()
-    orchestrator_instance.processed_results["token_usage"] = orchestrator_instance.token_usage.copy()
-    orchestrator_instance.processed_results["detailed_timing"] = orchestrator_instance.detailed_timing.copy()
+    processed_results["execution_times"] = {**orchestrator_instance.execution_times, "total_orchestration": total_orchestration_time}
+    processed_results["token_usage"] = orchestrator_instance.token_usage.copy()
+    processed_results["detailed_timing"] = orchestrator_instance.detailed_timing.copy()
     
     adk_metrics_summary = orchestrator_instance.adk_monitor.get_metrics_summary()
-    orchestrator_instance.processed_results["adk_metrics"] = adk_metrics_summary
+    processed_results["adk_metrics"] = adk_metrics_summary
     orchestrator_instance.logger.info(
         f"[ADK] ADK metrics summary: {adk_metrics_summary.get('total_agents_executed', 0)} agents executed, "
         f"{adk_metrics_summary.get('successful_executions', 0)} successful, "
@@ -862,5 +1216,45 @@ async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str
         f"{adk_metrics_summary.get('total_retries', 0)} retries"
     )
     
-    return orchestrator_instance.processed_results
+    return processed_results
 
+
+# Ordered (stage name, stage coroutine) pairs; names match PIPELINE_STAGE_WORKERS keys
+FILE_STAGES = [
+    ("prepare", prepare_file_state),
+    ("operation_model", run_operation_model_stage),
+    ("scenario", run_scenario_stage),
+    ("plantuml_diagram", run_plantuml_diagram_stage),
+]
+
+
+async def process_netlogo_file_v3_adk(orchestrator_instance, file_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process a single NetLogo file using ADK Sequential workflow.
+    
+    Runs the FILE_STAGES one after the other; run_orchestrator_v3 pipelines the same
+    stages across files instead.
+    
+    Args:
+        orchestrator_instance: Orchestrator instance
+        file_info: Dictionary containing file information
+        
+    Returns:
+        Dictionary containing all processing results
+    """
+    state = FileRunState(file_info)
+    orchestrator_instance.processed_results = state.processed_results
+    results_by_file = getattr(orchestrator_instance, "processed_results_by_file", None)
+    if results_by_file is None:
+        results_by_file = orchestrator_instance.processed_results_by_file = {}
+    results_by_file[state.base_name] = state.processed_results
+    orchestrator_instance.adk_monitor.start_monitoring()
+    try:
+        for _, stage in FILE_STAGES:
+            await stage(orchestrator_instance, state)
+            if state.failed:
+                return state.result
+        return finalize_file_state(orchestrator_instance, state)
+    finally:
+        orchestrator_instance.adk_monitor.stop_monitoring()
+        orchestrator_instance.adk_monitor.log_summary()
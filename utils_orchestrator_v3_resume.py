@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Orchestrator V3 Resume Utility
+Detects the last completed stage/iteration of an existing run directory from its
+on-disk layout (<N>_lucim_<stage>/iter-<k>/{1-generator, 2-auditor}) and rehydrates
+the Generator→Auditor loop state so that a run can continue from exactly there.
+"""
+
+import json
+import pathlib
+import re
+from typing import Any, Dict, List, Optional
+
+from utils_audit_core import extract_audit_core
+
+RUN_MANIFEST_FILENAME = "run-manifest.json"
+
+# (stage key, stage folder, generator result key, auditor result key)
+STAGES = [
+    ("operation_model", "1_lucim_operation_model", "lucim_operation_model_generator", "lucim_operation_model_auditor"),
+    ("scenario", "2_lucim_scenario", "lucim_scenario_generator", "lucim_scenario_auditor"),
+    ("plantuml_diagram", "3_lucim_plantuml_diagram", "lucim_plantuml_diagram_generator", "lucim_plantuml_diagram_auditor"),
+]
+
+_RESPONSE_FILENAME = "output-response-full.json"
+# Inverse of utils_path short codes (combination folder suffix "-RXX-VXX")
+_REASONING_FROM_SHORT = {"RMI": "minimal", "RLO": "low", "RME": "medium", "RHI": "high"}
+_VERBOSITY_FROM_SHORT = {"VLO": "low", "VME": "medium", "VHI": "high"}
+
+
+def write_run_manifest(run_dir: pathlib.Path, **params: Any) -> None:
+    """Persist the run parameters needed by --resume (base name, model, reasoning, verbosity, ...)."""
+    try:
+        (pathlib.Path(run_dir) / RUN_MANIFEST_FILENAME).write_text(
+            json.dumps(params, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+    except Exception:
+        pass
+
+
+def _read_json(path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def read_run_manifest(run_dir: pathlib.Path) -> Dict[str, Any]:
+    """
+    Return the parameters of an existing run.
+
+    Uses run-manifest.json when present; for runs created before the manifest existed,
+    falls back to the first generator output-response-full.json (base name, model,
+    timestamp) and the combination folder suffix (reasoning effort, verbosity).
+
+    Raises:
+        FileNotFoundError: If run_dir does not exist or holds no recognizable artifacts
+    """
+    run_dir = pathlib.Path(run_dir)
+    if not run_dir.is_dir():
+        raise FileNotFoundError(f"Run directory not found: {run_dir}")
+    manifest = _read_json(run_dir / RUN_MANIFEST_FILENAME)
+    if manifest:
+        return manifest
+
+    first_response = _read_json(run_dir / STAGES[0][1] / "iter-1" / "1-generator" / _RESPONSE_FILENAME)
+    if not first_response:
+        raise FileNotFoundError(f"No {RUN_MANIFEST_FILENAME} nor Operation Model artifacts in {run_dir}")
+    params: Dict[str, Any] = {
+        "base_name": first_response.get("base_name"),
+        "model": first_response.get("model"),
+        "timestamp": first_response.get("timestamp"),
+        "reasoning_summary": "auto",
+    }
+    match = re.search(r"-(R[A-Z]{2})-(V[A-Z]{2})$", run_dir.name)
+    if match:
+        params["reasoning_effort"] = _REASONING_FROM_SHORT.get(match.group(1), "medium")
+        params["text_verbosity"] = _VERBOSITY_FROM_SHORT.get(match.group(2), "medium")
+    return params
+
+
+def _as_text(value: Any) -> Any:
+    """Generators consume previous artifacts as raw text."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+
+def _load_generator(gen_dir: pathlib.Path) -> Optional[Dict[str, Any]]:
+    response = _read_json(gen_dir / _RESPONSE_FILENAME)
+    if response is None:
+        return None
+    result = {"data": _as_text(response.get("data")), "errors": response.get("errors")}
+    puml_files = sorted(gen_dir.glob("*.puml"))
+    if puml_files:
+        result["plantuml_file"] = str(puml_files[0])
+        try:
+            result["plantuml_text"] = puml_files[0].read_text(encoding="utf-8")
+        except Exception:
+            result["plantuml_text"] = None
+    svg_files = sorted(gen_dir.glob("*.svg"))
+    if svg_files:
+        result["svg_file"] = str(svg_files[0])
+    return result
+
+
+def _load_audit(aud_dir: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """Rebuild the auditor result dict (same keys as the agent auditors) from output-response-full.json."""
+    response = _read_json(aud_dir / _RESPONSE_FILENAME)
+    if response is None:
+        return None
+    core = extract_audit_core(response.get("data"))
+    total_output_tokens = response.get("total_output_tokens", 0) or 0
+    return {
+        "reasoning_summary": response.get("reasoning_summary", ""),
+        "data": core["data"],
+        "verdict": core["verdict"],
+        "non-compliant-rules": core["non_compliant_rules"],
+        "coverage": core["coverage"],
+        "errors": response.get("errors"),
+        "tokens_used": response.get("tokens_used", 0),
+        "input_tokens": response.get("input_tokens", 0),
+        "visible_output_tokens": response.get("visible_output_tokens", 0),
+        "raw_usage": {
+            "total_tokens": response.get("tokens_used", 0),
+            "input_tokens": response.get("input_tokens", 0),
+            "output_tokens": total_output_tokens,
+            "reasoning_tokens": response.get("reasoning_tokens", 0),
+        },
+        "reasoning_tokens": response.get("reasoning_tokens", 0),
+        "total_output_tokens": total_output_tokens,
+        "raw_response": response.get("raw_response"),
+    }
+
+
+def _iteration_indices(stage_root: pathlib.Path) -> List[int]:
+    if not stage_root.is_dir():
+        return []
+    indices = []
+    for child in stage_root.iterdir():
+        match = re.fullmatch(r"iter-(\d+)", child.name)
+        if match and child.is_dir():
+            indices.append(int(match.group(1)))
+    return sorted(indices)
+
+
+def load_stage_state(stage_root: pathlib.Path, max_audit: int) -> Dict[str, Any]:
+    """
+    Inspect one stage folder and return its resume state.
+
+    An iteration counts as completed only when both its generator and auditor
+    output-response-full.json exist; a partially written iteration is re-run.
+
+    Returns:
+        Dict with completed_iterations, compliant, done, generator (last completed
+        generator result or None) and audit (last completed auditor result or None)
+    """
+    completed = 0
+    generator = None
+    audit = None
+    for index in _iteration_indices(stage_root):
+        if index != completed + 1:
+            break
+        iter_dir = stage_root / f"iter-{index}"
+        gen = _load_generator(iter_dir / "1-generator")
+        aud = _load_audit(iter_dir / "2-auditor")
+        if gen is None or aud is None:
+            break
+        completed, generator, audit = index, gen, aud
+    compliant = bool(audit) and audit.get("verdict") == "compliant"
+    return {
+        "completed_iterations": completed,
+        "compliant": compliant,
+        "done": completed > 0 and (compliant or completed >= max_audit),
+        "generator": generator,
+        "audit": audit,
+    }
+
+
+def detect_resume_point(run_dir: pathlib.Path, max_audit: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the resume state of every stage of a run directory.
+
+    A stage is also considered done when a later stage already holds a completed
+    iteration (the workflow only moves forward).
+
+    Args:
+        run_dir: Existing run directory
+        max_audit: MAX_AUDIT cap used for the resumed run
+
+    Returns:
+        Mapping stage key → load_stage_state() result (plus generator_key/auditor_key)
+    """
+    run_dir = pathlib.Path(run_dir)
+    states: Dict[str, Dict[str, Any]] = {}
+    for stage, folder, gen_key, aud_key in STAGES:
+        state = load_stage_state(run_dir / folder, max_audit)
+        state["generator_key"] = gen_key
+        state["auditor_key"] = aud_key
+        states[stage] = state
+    later_started = False
+    for stage, _, _, _ in reversed(STAGES):
+        if later_started and states[stage]["completed_iterations"] > 0:
+            states[stage]["done"] = True
+        later_started = later_started or states[stage]["completed_iterations"] > 0
+    return states
+
+
+def describe_resume_point(states: Dict[str, Dict[str, Any]]) -> str:
+    """Human-readable summary of a resume point for logs."""
+    parts = []
+    for stage, _, _, _ in STAGES:
+        state = states.get(stage) or {}
+        n = state.get("completed_iterations", 0)
+        status = "done" if state.get("done") else (f"resume at iter-{n + 1}" if n else "start")
+        parts.append(f"{stage}: {n} completed ({status})")
+    return " | ".join(parts)
+
+
+def apply_stage_resume(processed_results: Dict[str, Any], state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Seed processed_results from a stage resume state and return the loop variables.
+
+    Returns:
+        Dict with attempt (iterations already completed), prev_artifact, prev_audit and done
+    """
+    if not state or not state.get("completed_iterations"):
+        return {"attempt": 0, "prev_artifact": None, "prev_audit": None, "done": False}
+    generator = state["generator"]
+    audit = state["audit"]
+    processed_results[state["generator_key"]] = {
+        k: v for k, v in generator.items() if k not in ("plantuml_text", "plantuml_file")
+    }
+    processed_results[state["auditor_key"]] = {
+        "data": audit["data"],
+        "verdict": audit["verdict"],
+        "non-compliant-rules": audit["non-compliant-rules"],
+        "coverage": audit["coverage"],
+        "errors": audit["errors"],
+    }
+    return {
+        "attempt": state["completed_iterations"],
+        "prev_artifact": generator.get("data"),
+        "prev_audit": audit,
+        "done": bool(state.get("done")),
+    }
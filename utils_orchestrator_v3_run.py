@@ -1,16 +1,26 @@
 #!/usr/bin/env python3
 """
 Orchestrator V3 Run Utility
-Handles the main run orchestration flow.
+Handles the main run orchestration flow. The NetLogo files of a run go through a
+stage pipeline (utils_orchestrator_v3_pipeline) so that independent files overlap
+across the Operation Model, Scenario and PlantUML Diagram stages.
 """
 
+import functools
 from typing import Dict, Any
 
 from utils_logging import setup_orchestration_logger, format_parameter_bundle, attach_stdio_to_logger
 from utils_orchestrator_logging import OrchestratorLogger
-from utils_adk_monitoring import get_global_monitor
+from utils_adk_monitoring import ADKMonitor
 from utils_orchestrator_compliance import extract_compliance_from_results
 from utils_audit_compare import summarize_comparisons
+from utils_response_cache import begin_run_stats, get_run_stats, format_cache_stats, get_response_cache
+from utils_plantuml import begin_svg_cache_run_stats, get_svg_cache_run_stats, get_svg_cache
+from utils_prompt_layout import begin_prompt_cache_run_stats, get_prompt_cache_run_stats, format_prompt_cache_stats
+from utils_budget import budget_of
+from utils_orchestrator_v3_pipeline import FileRunState, StagePipeline
+from utils_orchestrator_v3_process import FILE_STAGES, finalize_file_state
+from utils_config_constants import PIPELINE_STAGE_WORKERS
 
 
 async def run_orchestrator_v3(orchestrator_instance, base_name: str) -> Dict[str, Any]:
@@ -37,7 +47,17 @@ async def run_orchestrator_v3(orchestrator_instance, base_name: str) -> Dict[str
     
     orchestrator_instance.orchestrator_logger = OrchestratorLogger(orchestrator_instance.logger)
     attach_stdio_to_logger(orchestrator_instance.logger)
-    orchestrator_instance.adk_monitor = get_global_monitor(external_logger=orchestrator_instance.logger)
+    combination_position = getattr(orchestrator_instance, "combination_position", None)
+    if combination_position:
+        orchestrator_instance.ui.print_combination_header(*combination_position)
+    # One monitor per orchestrator: concurrent sweep combinations must not share metrics
+    orchestrator_instance.adk_monitor = ADKMonitor(external_logger=orchestrator_instance.logger)
+    # Per-run cache counters (isolated per sweep combination through contextvars)
+    begin_run_stats()
+    begin_svg_cache_run_stats()
+    begin_prompt_cache_run_stats()
+    # Provider responses of this run are charged to its budget (context variable, like the counters above)
+    budget_of(orchestrator_instance).begin(orchestrator_instance.logger)
     
     orchestrator_instance.logger.info("[ADK] ADK monitoring initialized with orchestrator logger")
     orchestrator_instance.logger.info(f"Using persona set: {orchestrator_instance.selected_persona_set}")
@@ -46,17 +66,46 @@ async def run_orchestrator_v3(orchestrator_instance, base_name: str) -> Dict[str
         reasoning_effort=reff, reasoning_summary=rsum, text_verbosity=tv
     ))
     orchestrator_instance.logger.info(f"Starting v3 pipeline processing for base name: {base_name} (ADK mode)")
+    cache = get_response_cache()
+    if cache.enabled:
+        orchestrator_instance.logger.info(f"[CACHE] LLM response cache mode={cache.mode} dir={cache.cache_dir}")
     
     files = orchestrator_instance.fileio.find_netlogo_files(base_name)
     if not files:
         return {"error": f"No files found for base name '{base_name}'", "results": {}}
     
+    def _on_stage_error(state: FileRunState, stage: str, error: Exception) -> None:
+        # Isolate failures: one broken file must not stop the other files
+        state.result = {"status": "FAIL", "stage": stage, "error": f"{type(error).__name__}: {error}",
+                        "results": state.processed_results}
+
+    states = [FileRunState(file_info) for file_info in files]
+    pipeline = StagePipeline(
+        [(name, functools.partial(stage, orchestrator_instance)) for name, stage in FILE_STAGES],
+        workers=PIPELINE_STAGE_WORKERS,
+        should_skip=lambda state: state.failed,
+        on_error=_on_stage_error,
+        external_logger=orchestrator_instance.logger,
+    )
+    # One monitoring session around the whole pipeline: files share the monitor
+    orchestrator_instance.adk_monitor.start_monitoring()
+    try:
+        await pipeline.run(states)
+    finally:
+        orchestrator_instance.adk_monitor.stop_monitoring()
+        orchestrator_instance.logger.info("[ADK] Generating ADK monitoring summary...")
+        orchestrator_instance.adk_monitor.log_summary()
+
     results = {}
-    for file_info in files:
-        base_name = file_info["base_name"]
-        results[base_name] = await orchestrator_instance.process_netlogo_file_v3_adk(file_info)
+    for state in states:
+        base_name = state.base_name
+        results[base_name] = finalize_file_state(orchestrator_instance, state)
         orchestrator_instance.orchestrator_logger.log_workflow_status(base_name, results[base_name])
         orchestrator_instance.orchestrator_logger.log_error_details(results[base_name])
+    # Results of every file by base name; processed_results keeps the last file's, as the sequential loop left it
+    orchestrator_instance.processed_results_by_file = {state.base_name: state.processed_results for state in states}
+    if states:
+        orchestrator_instance.processed_results = states[-1].processed_results
     
     return finalize_run_results(orchestrator_instance, base_name, files, results)
 
@@ -72,7 +121,9 @@ def finalize_run_results(orchestrator_instance, base_name: str, files: list, res
     effective_results = final_result.get("results", final_result) if isinstance(final_result, dict) else {}
     orchestrator_instance.orchestrator_logger.log_execution_timing(orchestrator_instance.execution_times)
     orchestrator_instance.orchestrator_logger.log_detailed_agent_status(effective_results)
-    orchestrator_instance.orchestrator_logger.log_audit_analysis(effective_results)
+    orchestrator_instance.orchestrator_logger.log_audit_analysis(
+        effective_results, persona_set=orchestrator_instance.selected_persona_set
+    )
     orchestrator_instance.orchestrator_logger.log_output_files(
         base_name, orchestrator_instance.timestamp, orchestrator_instance.model, effective_results
     )
@@ -94,6 +145,19 @@ def finalize_run_results(orchestrator_instance, base_name: str, files: list, res
 
     orchestrator_instance.logger.info(f"{'='*60}")
 
+    if get_response_cache().enabled:
+        orchestrator_instance.logger.info(f"[CACHE] {format_cache_stats(get_run_stats())}")
+    if get_svg_cache().enabled:
+        orchestrator_instance.logger.info(f"[PLANTUML] SVG cache {format_cache_stats(get_svg_cache_run_stats())}")
+    prompt_cache_stats = get_prompt_cache_run_stats()
+    if prompt_cache_stats:
+        orchestrator_instance.logger.info(f"[CACHE] Provider prompt cache (cached/input tokens): {format_prompt_cache_stats(prompt_cache_stats)}")
+    budget = budget_of(orchestrator_instance)
+    if budget.enabled:
+        orchestrator_instance.logger.info(
+            f"[BUDGET] {budget.describe()} | {len(budget.decisions)} degradation decision(s)"
+        )
+
     # SUMMARY: auditor vs python unit-test-like deterministic auditors
     comparisons = (final_result or {}).get("auditor_vs_python") or {}
     if comparisons:
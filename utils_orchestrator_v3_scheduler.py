@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Orchestrator V3 Sweep Scheduler Utility
+Runs independent sweep combinations (model × base name × reasoning × verbosity)
+concurrently on a single event loop with a global cap and per-provider limits.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils_format import FormatUtils
+
+logger = logging.getLogger(__name__)
+
+def build_combinations(models: List[str], base_names: List[str],
+                       reasoning_levels: List[Dict[str, str]],
+                       verbosity_levels: List[str]) -> List[Dict[str, Any]]:
+    """
+    Expand the sweep selection into an ordered list of combinations.
+
+    The order matches the historical nested loops (model → base → reasoning → verbosity)
+    and each combination carries the same result key as the sequential sweep.
+
+    Args:
+        models: Selected model names
+        base_names: Selected case study base names
+        reasoning_levels: List of {"effort": ..., "summary": ...} dicts
+        verbosity_levels: Selected text verbosity levels
+
+    Returns:
+        List of combination dicts (index, model, base_name, reasoning_effort,
+        reasoning_summary, text_verbosity, result_key)
+    """
+    combinations = []
+    for model in models:
+        for base_name in base_names:
+            for reasoning_config in reasoning_levels:
+                for verbosity in verbosity_levels:
+                    reasoning_suffix = f"{reasoning_config['effort']}-{reasoning_config['summary']}"
+                    combinations.append({
+                        "index": len(combinations) + 1,
+                        "model": model,
+                        "base_name": base_name,
+                        "reasoning_effort": reasoning_config["effort"],
+                        "reasoning_summary": reasoning_config["summary"],
+                        "text_verbosity": verbosity,
+                        "result_key": f"{base_name}_{model}_{reasoning_suffix}_{verbosity}",
+                    })
+    return combinations
+
+
+def _default_provider_resolver(model_name: str) -> str:
+    """Resolve the provider of a model (late import keeps this module dependency-free)."""
+    from utils_api_key import get_provider_for_model
+    return get_provider_for_model(model_name)
+
+
+class CombinationScheduler:
+    """
+    Bounded-concurrency scheduler for sweep combinations.
+
+    A combination first acquires its provider slot and only then a global slot, so a
+    combination waiting on a saturated provider never blocks another provider's work.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 provider_limits: Optional[Dict[str, int]] = None,
+                 provider_resolver: Optional[Callable[[str], str]] = None,
+                 external_logger: Optional[logging.Logger] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Global cap on concurrently running combinations (>= 1;
+                             default: utils_config_constants.SWEEP_MAX_CONCURRENCY)
+            provider_limits: Per-provider caps (e.g. {"openai": 3, "router": 2});
+                             providers not listed are bounded by the global cap only
+                             (default: utils_config_constants.SWEEP_PROVIDER_CONCURRENCY)
+            provider_resolver: Callable mapping a model name to its provider key
+            external_logger: Optional logger for progress lines (defaults to module logger)
+        """
+        if max_concurrency is None or provider_limits is None:
+            # Late import keeps this module dependency-free when limits are given
+            from utils_config_constants import SWEEP_MAX_CONCURRENCY, SWEEP_PROVIDER_CONCURRENCY
+            max_concurrency = SWEEP_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+            provider_limits = SWEEP_PROVIDER_CONCURRENCY if provider_limits is None else provider_limits
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.provider_limits = dict(provider_limits)
+        self.provider_resolver = provider_resolver or _default_provider_resolver
+        self.logger = external_logger or logger
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._provider_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.total = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.start_time: Optional[float] = None
+
+    def _provider_semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Return (creating on first use) the semaphore bounding a provider."""
+        if provider not in self._provider_semaphores:
+            limit = self.provider_limits.get(provider) or self.max_concurrency
+            self._provider_semaphores[provider] = asyncio.Semaphore(max(1, int(limit)))
+        return self._provider_semaphores[provider]
+
+    def throughput_per_hour(self, now: Optional[float] = None) -> float:
+        """Completed combinations per hour since the sweep started."""
+        if not self.start_time or self.completed == 0:
+            return 0.0
+        elapsed = max((now or time.time()) - self.start_time, 1e-9)
+        return self.completed * 3600.0 / elapsed
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Snapshot of sweep progress (counts, elapsed time, throughput and ETA)."""
+        now = time.time()
+        elapsed = (now - self.start_time) if self.start_time else 0.0
+        throughput = self.throughput_per_hour(now)
+        remaining = self.total - self.completed
+        eta = (remaining * 3600.0 / throughput) if throughput > 0 else None
+        return {
+            "total": self.total,
+            "started": self.started,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.running,
+            "elapsed_seconds": elapsed,
+            "throughput_per_hour": throughput,
+            "eta_seconds": eta,
+        }
+
+    def _log_progress(self, combination: Dict[str, Any], status: str) -> None:
+        """Emit a single progress line after a combination finishes."""
+        progress = self.get_progress()
+        eta = progress["eta_seconds"]
+        self.logger.info(
+            f"[SWEEP] {status} {combination.get('result_key')} | "
+            f"{progress['completed']}/{progress['total']} done ({progress['failed']} failed, {progress['running']} running) | "
+            f"elapsed {FormatUtils.format_duration(progress['elapsed_seconds'])} | "
+            f"throughput {progress['throughput_per_hour']:.1f} combinations/hour | "
+            f"ETA {FormatUtils.format_duration(eta) if eta is not None else 'N/A'}"
+        )
+
+    async def _run_one(self, combination: Dict[str, Any],
+                       runner: Callable[[Dict[str, Any]], Awaitable[Any]]) -> Any:
+        """Run one combination under its provider slot and a global slot."""
+        try:
+            provider = self.provider_resolver(combination["model"])
+        except Exception:
+            provider = "unknown"
+        async with self._provider_semaphore(provider):
+            async with self._global_semaphore:
+                self.started += 1
+                self.running += 1
+                self.logger.info(
+                    f"[SWEEP] Starting {combination.get('result_key')} "
+                    f"({self.started}/{self.total}, provider={provider}, running={self.running})"
+                )
+                status = "Completed"
+                try:
+                    result = await runner(combination)
+                    if isinstance(result, dict) and result.get("error"):
+                        self.failed += 1
+                        status = "Failed"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Isolate failures: one broken combination must not stop the sweep
+                    self.failed += 1
+                    status = "Failed"
+                    self.logger.error(f"[SWEEP] Combination {combination.get('result_key')} raised: {e}")
+                    result = {"error": f"{type(e).__name__}: {e}", "results": {}}
+                finally:
+                    self.running -= 1
+                    self.completed += 1
+                self._log_progress(combination, status)
+                return result
+
+    async def run(self, combinations: List[Dict[str, Any]],
+                  runner: Callable[[Dict[str, Any]], Awaitable[Any]]) -> Dict[str, Any]:
+        """
+        Run all combinations concurrently within the configured limits.
+
+        Args:
+            combinations: Combinations as produced by build_combinations()
+            runner: Coroutine function executing one combination and returning its result
+
+        Returns:
+            Dictionary mapping result_key to the combination result, in submission order
+        """
+        self.total = len(combinations)
+        self.started = self.completed = self.failed = self.running = 0
+        self.start_time = time.time()
+        self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._provider_semaphores = {}
+        self.logger.info(
+            f"[SWEEP] Scheduling {self.total} combinations "
+            f"(max_concurrency={self.max_concurrency}, provider_limits={self.provider_limits})"
+        )
+        outcomes = await asyncio.gather(*(self._run_one(c, runner) for c in combinations))
+        return {c["result_key"]: outcome for c, outcome in zip(combinations, outcomes)}
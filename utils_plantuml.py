@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 """
 PlantUML Utilities for Post-Processing
-Provides functions to clean escape characters from PlantUML diagram files and generate SVG files.
+Provides functions to clean escape characters from PlantUML diagram files and generate SVG files,
+with a content-addressed SVG cache so that unchanged diagrams are rendered only once.
 """
 
+import contextvars
+import hashlib
 import re
 import pathlib
+import shutil
 import subprocess
 import os
 import sys
 import urllib.request
 import urllib.error
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
+
+from utils_disk_cache import CACHE_STAT_KEYS as _SVG_CACHE_STAT_KEYS, DiskLRUCache, format_cache_stats
+from utils_summary_stats import register_summary_stats
 
 
 def clean_plantuml_escapes(content: str) -> str:
@@ -328,10 +335,142 @@ def _find_plantuml_jar() -> Optional[pathlib.Path]:
     return None
 
 
+# Content-addressed SVG cache (see SvgRenderCache)
+_svg_cache_run_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("svg_cache_run_stats", default=None)
+
+
+def plantuml_jar_fingerprint(jar_path: Optional[pathlib.Path] = None) -> str:
+    """
+    Identify the PlantUML JAR that renders (default: _find_plantuml_jar()) by resolved path, size and mtime.
+
+    PLANTUML_JAR or the cached JAR may be another release than PLANTUML_VERSION, so SVGs are
+    cached per actual JAR; "no-jar" when none is available.
+    """
+    jar_path = jar_path or _find_plantuml_jar()
+    if jar_path is None:
+        return "no-jar"
+    try:
+        st = pathlib.Path(jar_path).stat()
+    except OSError:
+        return "no-jar"
+    return f"{pathlib.Path(jar_path).resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def compute_svg_cache_key(content: str, jar_path: Optional[pathlib.Path] = None) -> str:
+    """Return the SHA-256 cache key of a diagram: normalized text plus the rendering JAR (plantuml_jar_fingerprint)."""
+    payload = f"plantuml {plantuml_jar_fingerprint(jar_path)}\n{clean_plantuml_escapes(content)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def begin_svg_cache_run_stats() -> Dict[str, int]:
+    """Start fresh per-run SVG cache counters in the current context (call once per orchestrator run)."""
+    stats = {k: 0 for k in _SVG_CACHE_STAT_KEYS}
+    _svg_cache_run_stats.set(stats)
+    return stats
+
+
+def get_svg_cache_run_stats() -> Dict[str, int]:
+    """Return the SVG cache counters of the current run."""
+    return dict(_svg_cache_run_stats.get() or {k: 0 for k in _SVG_CACHE_STAT_KEYS})
+
+
+class SvgRenderCache(DiskLRUCache):
+    """
+    On-disk cache of rendered SVGs keyed by compute_svg_cache_key.
+
+    Entries live under <cache_dir>/<key[:2]>/<key>.svg and are hard-linked (or copied
+    when linking is not possible) into output directories; least-recently-used entries
+    are evicted first (see utils_disk_cache.DiskLRUCache).
+    """
+
+    def __init__(self, cache_dir: pathlib.Path, enabled: bool = True,
+                 max_entries: int = 5000, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root directory of the cache
+            enabled: When False, lookups always miss and nothing is stored
+            max_entries: Maximum number of cached SVGs (<= 0 disables the limit)
+            max_bytes: Maximum total size in bytes (<= 0 disables the limit)
+        """
+        super().__init__(cache_dir, ".svg", max_entries=max_entries, max_bytes=max_bytes,
+                         run_stats=_svg_cache_run_stats)
+        self.enabled = enabled
+
+    @staticmethod
+    def _place(source: pathlib.Path, destination: pathlib.Path) -> None:
+        """Hard-link source to destination, copying when linking fails (e.g. across devices)."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if destination.exists() or destination.is_symlink():
+            destination.unlink()
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+    def fetch(self, key: str, destination: pathlib.Path) -> bool:
+        """Place the cached SVG for key at destination; returns False on a miss."""
+        if not self.enabled:
+            return False
+        path = self._path_for(key)
+        try:
+            self._place(path, destination)
+            os.utime(path, None)
+        except FileNotFoundError:
+            self._count("misses")
+            return False
+        except OSError as e:
+            print(f"[WARNING] SVG cache entry {key[:12]} unusable: {e}")
+            self._count("errors")
+            return False
+        self._count("hits")
+        return True
+
+    def store(self, key: str, svg_file: pathlib.Path) -> None:
+        """Add a rendered SVG to the cache (failures are reported, never raised)."""
+        if not self.enabled:
+            return
+        try:
+            self._write_entry(key, lambda tmp_path: shutil.copyfile(svg_file, tmp_path))
+        except OSError as e:
+            print(f"[WARNING] Could not cache SVG {svg_file}: {e}")
+            self._count("errors")
+
+
+_svg_cache: Optional[SvgRenderCache] = None
+
+
+def get_svg_cache() -> SvgRenderCache:
+    """Return the process-wide SVG cache configured from utils_config_constants (PLANTUML_SVG_CACHE_*)."""
+    global _svg_cache
+    if _svg_cache is None:
+        from utils_config_constants import (
+            PLANTUML_SVG_CACHE, PLANTUML_SVG_CACHE_DIR, PLANTUML_SVG_CACHE_MAX_ENTRIES, PLANTUML_SVG_CACHE_MAX_MB,
+        )
+        _svg_cache = SvgRenderCache(
+            PLANTUML_SVG_CACHE_DIR, enabled=PLANTUML_SVG_CACHE,
+            max_entries=PLANTUML_SVG_CACHE_MAX_ENTRIES, max_bytes=PLANTUML_SVG_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _svg_cache
+
+
+def _svg_cache_summary_stats() -> Optional[Dict[str, int]]:
+    cache = get_svg_cache()
+    return cache.stats if cache.enabled else None
+
+
+register_summary_stats("SVG render cache", _svg_cache_summary_stats, format_cache_stats)
+
+
 def generate_svg_from_puml(puml_file: pathlib.Path, output_dir: pathlib.Path) -> Optional[pathlib.Path]:
     """
     Generate SVG file from PlantUML file using PlantUML JAR.
     
+    Diagrams already in the SVG cache are linked into output_dir without rendering.
+    Otherwise uses the process-wide persistent renderer (utils_plantuml_renderer) unless
+    PLANTUML_RENDER_MODE is "cli", and falls back to one JVM invocation per diagram.
+    
     Args:
         puml_file: Path to input .puml file
         output_dir: Directory where SVG will be generated (same name as .puml file)
@@ -344,6 +483,28 @@ def generate_svg_from_puml(puml_file: pathlib.Path, output_dir: pathlib.Path) ->
             print(f"[WARNING] PlantUML file not found: {puml_file}")
             return None
         
+        svg_cache = get_svg_cache()
+        cache_key = compute_svg_cache_key(puml_file.read_text(encoding="utf-8"))
+        expected_svg = output_dir / f"{puml_file.stem}.svg"
+        if svg_cache.fetch(cache_key, expected_svg):
+            return expected_svg
+        # A previous SVG may be a hard link to a cache entry: never render into it in place
+        if expected_svg.exists():
+            expected_svg.unlink()
+        
+        try:
+            from utils_plantuml_renderer import get_plantuml_renderer, PlantUMLSyntaxError
+            renderer = get_plantuml_renderer()
+            if renderer.mode == "pipe":
+                svg_path = renderer.render_file(puml_file, output_dir)
+                svg_cache.store(cache_key, svg_path)
+                return svg_path
+        except PlantUMLSyntaxError as e:
+            print(f"[WARNING] SVG generation failed: {e}")
+            return None
+        except Exception as e:
+            print(f"[WARNING] Persistent PlantUML renderer unavailable ({e}); using one-shot JVM")
+        
         # Find PlantUML JAR
         jar_path = _find_plantuml_jar()
         if not jar_path:
@@ -377,8 +538,8 @@ def generate_svg_from_puml(puml_file: pathlib.Path, output_dir: pathlib.Path) ->
             return None
         
         # Find generated SVG file (PlantUML generates with same base name)
-        expected_svg = output_dir / f"{puml_file.stem}.svg"
         if expected_svg.exists():
+            svg_cache.store(cache_key, expected_svg)
             return expected_svg
         else:
             print(f"[WARNING] SVG file not created: {expected_svg}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+PlantUML Sequence Diagram IR Utility
+Single-pass tokenizer/parser turning a LUCIM PlantUML sequence diagram into a compact
+typed IR (participants, messages, activations and a line map). Blank lines and comments
+(LDR19) are skipped once here, so rule checks never rescan the text.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+_PARTICIPANT_RE = re.compile(r"^participant\s+\"?(?P<label>[^\"]+)\"?\s+as\s+(?P<alias>\w+)(\s+#[0-9A-Fa-f]{6})?\s*$")
+_SYSTEM_SIMPLE_RE = re.compile(r"^participant\s+System\s+as\s+system(\s+#[0-9A-Fa-f]{6})?\s*$")
+_MSG_RE = re.compile(r"^(?P<lhs>\S+)\s*(?P<arrow>--?>)\s*(?P<rhs>\S+)\s*:\s*(?P<name>\w+)\s*\((?P<params>[^)]*)\)\s*$")
+_ACTIVATE_RE = re.compile(r"^activate\s+(?P<who>\w+)\b")
+_DEACTIVATE_RE = re.compile(r"^deactivate\s+(?P<who>\w+)\b")
+
+
+def is_system_token(tok: str) -> bool:
+    t = tok.strip()
+    return t == "system" or t == "System"
+
+
+def is_comment_line(line: str) -> bool:
+    """
+    Check if a line is a PlantUML comment (LDR19 compliance).
+
+    PlantUML supports multiple comment syntaxes:
+    - // comment (single-line comment)
+    - ' comment (alternative single-line comment)
+    - /note right/ or /note left/ (note blocks)
+    - note right: text or note left: text (note syntax)
+    - note over participant (notes over participants)
+
+    Args:
+        line: Line to check (should be stripped)
+
+    Returns:
+        True if the line is a comment, False otherwise
+    """
+    if not line:
+        return False
+
+    stripped = line.strip()
+
+    # // comment (most common)
+    if stripped.startswith("//"):
+        return True
+
+    # ' comment (alternative syntax)
+    if stripped.startswith("'"):
+        return True
+
+    # /note right/ or /note left/ (note blocks - start and end markers)
+    if stripped.startswith("/note ") and stripped.endswith("/"):
+        return True
+
+    # note right: or note left: (note syntax with text)
+    if stripped.startswith("note ") and ":" in stripped:
+        return True
+
+    # note over participant (notes over participants)
+    if stripped.startswith("note over "):
+        return True
+
+    return False
+
+
+@dataclass
+class Participant:
+    """A participant declaration (System or actor)."""
+    line: int
+    text: str  # stripped line
+    raw: str  # original line without trailing whitespace
+    alias: str
+    label: str
+    simple_system: bool  # exact "participant System as system" form
+
+    @property
+    def quoted(self) -> bool:
+        """True when the label is quoted before ' as '."""
+        return not (" as " in self.text and '"' not in self.text.split(" as ")[0])
+
+
+@dataclass
+class Message:
+    """An event arrow: lhs -> rhs : name(params)."""
+    line: int
+    text: str
+    raw: str
+    lhs: str
+    arrow: str
+    rhs: str
+    name: str
+    params: str
+    lhs_is_system: bool = field(init=False)
+    rhs_is_system: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.lhs_is_system = is_system_token(self.lhs)
+        self.rhs_is_system = is_system_token(self.rhs)
+
+
+@dataclass
+class Activation:
+    """An activate / deactivate statement."""
+    line: int
+    text: str
+    raw: str
+    who: str
+    activate: bool
+    on_system: bool = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.on_system = is_system_token(self.who)
+
+
+Node = Union[Participant, Message, Activation]
+
+
+@dataclass
+class DiagramIR:
+    """Parsed diagram: nodes in source order plus a map of significant lines."""
+    lines: List[str]
+    nodes: List[Node] = field(default_factory=list)
+    participants: List[Participant] = field(default_factory=list)
+    messages: List[Message] = field(default_factory=list)
+    activations: List[Activation] = field(default_factory=list)
+    # Line numbers (1-based) of non-blank, non-comment lines
+    significant_lines: List[int] = field(default_factory=list)
+    # next_significant[i]: first significant line >= i (index 0 unused, len(lines) + 1 → None)
+    next_significant: List[Optional[int]] = field(default_factory=list)
+
+    def next_significant_line(self, start: int) -> Optional[int]:
+        """First non-blank, non-comment line at or after start (None past the end)."""
+        if start < 1:
+            start = 1
+        if start >= len(self.next_significant):
+            return None
+        return self.next_significant[start]
+
+    def line_content(self, line: int) -> str:
+        return self.lines[line - 1].rstrip() if 1 <= line <= len(self.lines) else ""
+
+    def first_significant_content(self) -> str:
+        return self.line_content(self.significant_lines[0]) if self.significant_lines else ""
+
+
+def parse_plantuml(plantuml_text: str) -> DiagramIR:
+    """
+    Parse PlantUML text into a DiagramIR in one pass over its lines.
+
+    Each significant line becomes at most one node, tried in this order: System
+    declaration, participant, activate, deactivate, message. Other lines (skinparam,
+    @startuml, ...) only count as significant lines.
+    """
+    lines = (plantuml_text or "").splitlines()
+    ir = DiagramIR(lines=lines)
+    next_significant: List[Optional[int]] = [None] * (len(lines) + 2)
+    pending_from = 1
+
+    for idx, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or is_comment_line(line):
+            continue
+        for gap in range(pending_from, idx + 1):
+            next_significant[gap] = idx
+        pending_from = idx + 1
+        ir.significant_lines.append(idx)
+
+        node: Optional[Node] = None
+        if line.startswith("participant"):
+            if _SYSTEM_SIMPLE_RE.match(line):
+                node = Participant(idx, line, raw.rstrip(), "system", "System", True)
+            else:
+                mp = _PARTICIPANT_RE.match(line)
+                if mp:
+                    node = Participant(idx, line, raw.rstrip(), mp.group("alias"), mp.group("label"), False)
+            if node is not None:
+                ir.participants.append(node)
+        if node is None:
+            ma = _ACTIVATE_RE.match(line) or _DEACTIVATE_RE.match(line)
+            if ma:
+                node = Activation(idx, line, raw.rstrip(), ma.group("who"), line.startswith("activate"))
+                ir.activations.append(node)
+            else:
+                mm = _MSG_RE.match(line)
+                if mm:
+                    node = Message(idx, line, raw.rstrip(), mm.group("lhs"), mm.group("arrow"), mm.group("rhs"),
+                                   mm.group("name"), mm.group("params"))
+                    ir.messages.append(node)
+        if node is not None:
+            ir.nodes.append(node)
+
+    ir.next_significant = next_significant
+    return ir
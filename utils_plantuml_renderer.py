@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+PlantUML Renderer Utility
+Long-lived PlantUML rendering instead of one JVM per diagram: a small pool of warm
+`java -jar plantuml.jar -pipe` processes fronted by a request queue, with a sync
+(render_svg/render_file) and an async (arender_svg/arender_file) API, plus a batch
+mode rendering every .puml file of a run directory in a single JVM invocation.
+"""
+
+import argparse
+import asyncio
+import atexit
+import logging
+import os
+import pathlib
+import queue
+import re
+import select
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils_plantuml import _find_plantuml_jar
+
+logger = logging.getLogger(__name__)
+
+RENDER_MODES = ("pipe", "cli")
+
+# Printed by PlantUML on stdout after each diagram rendered in -pipe mode
+PIPE_DELIMITER = "---plantuml-render-done---"
+
+# Text PlantUML draws in the SVG it returns for a diagram it cannot parse
+_ERROR_IMAGE_MARKERS = ("Syntax Error?", "An error has occured")
+
+_UML_BLOCK_RE = re.compile(r"@startuml[\s\S]*?@enduml")
+
+
+class PlantUMLRenderError(RuntimeError):
+    """Raised when a diagram cannot be rendered (no Java/JAR, dead JVM, timeout)."""
+
+
+class PlantUMLSyntaxError(PlantUMLRenderError):
+    """Raised when PlantUML rendered an error image instead of the diagram."""
+
+
+def extract_uml_block(text: str) -> str:
+    """
+    Return the first @startuml ... @enduml block of a text.
+
+    Only one block may be sent to a pipe process per request, otherwise the extra
+    images would be read as the answer to the next request.
+    """
+    match = _UML_BLOCK_RE.search(text or "")
+    if not match:
+        raise PlantUMLRenderError("No @startuml ... @enduml block found")
+    return match.group(0)
+
+
+def is_error_svg(svg: str) -> bool:
+    """Tell whether an SVG is the error image PlantUML renders for invalid syntax."""
+    return any(marker in svg for marker in _ERROR_IMAGE_MARKERS)
+
+
+def build_pipe_command(jar_path: pathlib.Path) -> List[str]:
+    """Command line of one persistent -pipe rendering process."""
+    return [
+        "java", "-Djava.awt.headless=true", "-jar", str(jar_path),
+        "-tsvg", "-charset", "UTF-8", "-pipe", "-pipedelimitor", PIPE_DELIMITER,
+    ]
+
+
+def build_batch_command(jar_path: pathlib.Path, puml_files: Iterable[pathlib.Path]) -> List[str]:
+    """Command line rendering many .puml files (each SVG next to its source) in one JVM."""
+    return [
+        "java", "-Djava.awt.headless=true", "-jar", str(jar_path),
+        "-tsvg", "-charset", "UTF-8", *[str(p) for p in puml_files],
+    ]
+
+
+class _PipeWorker:
+    """One warm JVM running PlantUML in -pipe mode (one request at a time)."""
+
+    def __init__(self, command: List[str]):
+        self.command = command
+        self.process: Optional[subprocess.Popen] = None
+        self.rendered = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        try:
+            self.process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise PlantUMLRenderError(f"Cannot start PlantUML process: {e}") from e
+
+    def render(self, uml_text: str, timeout: float) -> str:
+        if not self.alive:
+            self.start()
+        proc = self.process
+        try:
+            proc.stdin.write(uml_text.encode("utf-8") + b"\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.close()
+            raise PlantUMLRenderError(f"PlantUML process closed its input: {e}") from e
+
+        delimiter = PIPE_DELIMITER.encode("utf-8")
+        fd = proc.stdout.fileno()
+        buffer = b""
+        deadline = time.monotonic() + timeout
+        while delimiter not in buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise PlantUMLRenderError(f"PlantUML rendering timed out after {timeout:.0f}s")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self.close()
+                raise PlantUMLRenderError("PlantUML process exited while rendering")
+            buffer += chunk
+        self.rendered += 1
+        return buffer.split(delimiter, 1)[0].decode("utf-8", errors="replace").strip()
+
+    def close(self) -> None:
+        proc, self.process = self.process, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+
+class PlantUMLRenderer:
+    """
+    Pool of persistent PlantUML processes.
+
+    Requests wait on a queue of idle workers, so at most `workers` diagrams are rendered
+    at once and every JVM is reused across diagrams. Workers are started lazily and
+    restarted after a crash or a timeout. In "cli" mode, or when the pipe cannot be used,
+    rendering falls back to one `java -jar plantuml.jar -tsvg` invocation per diagram.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 60.0, mode: str = "pipe",
+                 jar_path: Optional[pathlib.Path] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            workers: Number of JVMs kept warm
+            timeout: Per-diagram rendering timeout in seconds
+            mode: "pipe" (persistent processes) or "cli" (one JVM per diagram)
+            jar_path: PlantUML JAR (defaults to utils_plantuml._find_plantuml_jar())
+        """
+        self.mode = mode if mode in RENDER_MODES else "pipe"
+        self.timeout = float(timeout)
+        self.size = max(1, int(workers or 1))
+        self._jar_path = jar_path
+        self._idle: "queue.Queue[_PipeWorker]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._workers: List[_PipeWorker] = []
+        self.stats = {"rendered": 0, "errors": 0, "fallbacks": 0}
+
+    def _jar(self) -> pathlib.Path:
+        if self._jar_path is None:
+            self._jar_path = _find_plantuml_jar()
+        if self._jar_path is None:
+            raise PlantUMLRenderError("PlantUML JAR not found. Set PLANTUML_JAR environment variable or install PlantUML.")
+        return self._jar_path
+
+    def _acquire(self) -> _PipeWorker:
+        with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                worker = _PipeWorker(build_pipe_command(self._jar()))
+                self._created += 1
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _render_cli(self, uml_text: str) -> str:
+        """Render through a one-shot JVM (legacy path, also used as fallback)."""
+        try:
+            result = subprocess.run(
+                ["java", "-Djava.awt.headless=true", "-jar", str(self._jar()), "-tsvg", "-charset", "UTF-8", "-pipe"],
+                input=uml_text.encode("utf-8"), capture_output=True, timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired as e:
+            raise PlantUMLRenderError(f"PlantUML rendering timed out after {self.timeout:.0f}s") from e
+        except OSError as e:
+            raise PlantUMLRenderError(f"Cannot start PlantUML process: {e}") from e
+        svg = result.stdout.decode("utf-8", errors="replace").strip()
+        if result.returncode != 0 and not svg:
+            error_msg = result.stderr.decode("utf-8", errors="replace").strip() or "Unknown error"
+            raise PlantUMLRenderError(error_msg)
+        return svg
+
+    def render_svg(self, text: str) -> str:
+        """
+        Render the first @startuml ... @enduml block of a text to SVG.
+
+        Returns:
+            The SVG document
+
+        Raises:
+            PlantUMLSyntaxError: PlantUML could not parse the diagram
+            PlantUMLRenderError: The diagram could not be rendered at all
+        """
+        uml_text = extract_uml_block(text)
+        if self.mode == "cli":
+            svg = self._render_cli(uml_text)
+        else:
+            worker = self._acquire()
+            try:
+                svg = worker.render(uml_text, self.timeout)
+            except PlantUMLRenderError as e:
+                logger.warning(f"[PLANTUML] Persistent renderer failed ({e}); falling back to one-shot JVM")
+                self.stats["fallbacks"] += 1
+                svg = self._render_cli(uml_text)
+            finally:
+                self._idle.put(worker)
+        if not svg:
+            self.stats["errors"] += 1
+            raise PlantUMLRenderError("PlantUML returned an empty document")
+        if is_error_svg(svg):
+            self.stats["errors"] += 1
+            raise PlantUMLSyntaxError("PlantUML reported a syntax error")
+        self.stats["rendered"] += 1
+        return svg
+
+    def render_file(self, puml_file: pathlib.Path, output_dir: pathlib.Path) -> pathlib.Path:
+        """Render a .puml file to output_dir/<stem>.svg and return the SVG path."""
+        puml_file = pathlib.Path(puml_file)
+        output_dir = pathlib.Path(output_dir)
+        svg = self.render_svg(puml_file.read_text(encoding="utf-8"))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        svg_path = output_dir / f"{puml_file.stem}.svg"
+        svg_path.write_text(svg, encoding="utf-8")
+        return svg_path
+
+    async def arender_svg(self, text: str) -> str:
+        """Awaitable render_svg: waits for an idle worker without blocking the event loop."""
+        return await asyncio.to_thread(self.render_svg, text)
+
+    async def arender_file(self, puml_file: pathlib.Path, output_dir: pathlib.Path) -> pathlib.Path:
+        """Awaitable render_file."""
+        return await asyncio.to_thread(self.render_file, puml_file, output_dir)
+
+    def render_batch(self, puml_files: Iterable[pathlib.Path],
+                     timeout: Optional[float] = None) -> Dict[pathlib.Path, Optional[pathlib.Path]]:
+        """
+        Render many .puml files in one JVM invocation; each SVG is written next to its source.
+
+        Returns:
+            Mapping .puml path → SVG path (None when no SVG was produced)
+        """
+        files = [pathlib.Path(p) for p in puml_files]
+        if not files:
+            return {}
+        # An SVG left by a previous render must not pass for this one
+        for puml_file in files:
+            puml_file.with_suffix(".svg").unlink(missing_ok=True)
+        try:
+            result = subprocess.run(
+                build_batch_command(self._jar(), files), capture_output=True, text=True,
+                timeout=timeout or self.timeout * max(1, len(files)),
+            )
+            if result.returncode != 0:
+                logger.warning(f"[PLANTUML] Batch rendering reported errors: {result.stderr.strip()[:500]}")
+        except subprocess.TimeoutExpired:
+            logger.warning(f"[PLANTUML] Batch rendering of {len(files)} file(s) timed out")
+        except OSError as e:
+            raise PlantUMLRenderError(f"Cannot start PlantUML process: {e}") from e
+        rendered: Dict[pathlib.Path, Optional[pathlib.Path]] = {}
+        for puml_file in files:
+            svg_path = puml_file.with_suffix(".svg")
+            ok = svg_path.exists() and not is_error_svg(svg_path.read_text(encoding="utf-8", errors="replace"))
+            rendered[puml_file] = svg_path if ok else None
+        return rendered
+
+    def render_run_directory(self, run_dir: pathlib.Path) -> Dict[pathlib.Path, Optional[pathlib.Path]]:
+        """Render every .puml file found under a run directory in one JVM invocation."""
+        return self.render_batch(sorted(pathlib.Path(run_dir).rglob("*.puml")))
+
+    def close(self) -> None:
+        """Stop every persistent process."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._created = 0
+            self._idle = queue.Queue()
+        for worker in workers:
+            worker.close()
+
+
+_renderer: Optional[PlantUMLRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_plantuml_renderer() -> PlantUMLRenderer:
+    """Return the process-wide renderer configured from utils_config_constants (PLANTUML_RENDER_*)."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            from utils_config_constants import PLANTUML_RENDER_MODE, PLANTUML_RENDER_WORKERS, PLANTUML_RENDER_TIMEOUT
+            _renderer = PlantUMLRenderer(
+                workers=PLANTUML_RENDER_WORKERS, timeout=PLANTUML_RENDER_TIMEOUT, mode=PLANTUML_RENDER_MODE,
+            )
+            atexit.register(_renderer.close)
+        return _renderer
+
+
+async def arender_svg_file(puml_file: pathlib.Path, output_dir: pathlib.Path) -> Optional[pathlib.Path]:
+    """
+    Awaitable utils_plantuml.generate_svg_from_puml (SVG cache, then the process-wide
+    renderer) that does not block the event loop.
+
+    Returns:
+        Path to the generated SVG file, or None on failure (a warning is printed)
+    """
+    from utils_plantuml import generate_svg_from_puml
+    return await asyncio.to_thread(generate_svg_from_puml, pathlib.Path(puml_file), pathlib.Path(output_dir))
+
+
+def main():
+    """Render every .puml file of one or more run directories in a single JVM invocation."""
+    parser = argparse.ArgumentParser(description="Batch-render PlantUML files of run directories to SVG")
+    parser.add_argument("run_dirs", nargs="+", type=pathlib.Path, help="Run directories to scan for .puml files")
+    args = parser.parse_args()
+
+    files: List[pathlib.Path] = []
+    for run_dir in args.run_dirs:
+        files.extend(sorted(run_dir.rglob("*.puml")))
+    try:
+        rendered = PlantUMLRenderer().render_batch(files)
+    except PlantUMLRenderError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    failed = [str(p) for p, svg in rendered.items() if svg is None]
+    print(f"Rendered {len(rendered) - len(failed)}/{len(rendered)} diagram(s)")
+    for path in failed:
+        print(f"[WARNING] No SVG produced for {path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
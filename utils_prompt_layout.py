@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Prompt Layout Utility
+Assembles agent prompts as a byte-stable static prefix (persona, drivers, mapping, rules)
+sent once as `instructions`, followed by the per-call content sent once as `input`, so
+provider-side prompt caching can reuse the prefix across iterations and combinations.
+Also keeps per-run prompt-cache counters (input vs cached input tokens) per agent.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from utils_summary_stats import register_summary_stats
+
+_STAT_KEYS = ("calls", "input_tokens", "cached_tokens")
+
+# Per-run counters keyed by agent (one dict per asyncio task / sweep combination)
+_run_stats: contextvars.ContextVar[Optional[Dict[str, Dict[str, int]]]] = contextvars.ContextVar(
+    "prompt_cache_run_stats", default=None
+)
+_process_stats: Dict[str, Dict[str, int]] = {}
+_process_prefixes: Dict[str, set] = {}
+_stats_lock = threading.Lock()
+
+
+def stable_text(text: Optional[str]) -> str:
+    """Normalize line endings so that identical prompt files yield identical bytes on every platform."""
+    return (text or "").replace("\r\n", "\n").replace("\r", "\n")
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """
+    Static prefix + per-call input of one agent call.
+
+    `system_prompt` is the exact text persisted as input-instructions.md; the request
+    carries the same text once (instructions, then input) instead of twice.
+    """
+
+    agent: str
+    instructions: str
+    input_text: str
+
+    @property
+    def system_prompt(self) -> str:
+        if not self.instructions:
+            return self.input_text
+        return f"{self.instructions}\n\n{self.input_text}"
+
+    @property
+    def prefix_sha256(self) -> str:
+        return hashlib.sha256(self.instructions.encode("utf-8")).hexdigest()
+
+    @property
+    def prompt_cache_key(self) -> str:
+        """Routing hint for provider prompt caches: same agent + same prefix => same key."""
+        return f"{self.agent}-{self.prefix_sha256[:16]}"
+
+    def apply(self, api_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Set instructions, input and prompt_cache_key on a Responses-style api_config (in place)."""
+        api_config["instructions"] = self.instructions
+        api_config["input"] = [{"role": "user", "content": self.input_text}]
+        api_config["prompt_cache_key"] = self.prompt_cache_key
+        return api_config
+
+
+def build_prompt_layout(agent: str, instructions: str, input_text: str) -> PromptLayout:
+    """Create the layout of an agent call from its static instructions and per-call input."""
+    return PromptLayout(agent=agent, instructions=stable_text(instructions), input_text=stable_text(input_text))
+
+
+def prompt_cache_agent(api_config: Dict[str, Any]) -> Optional[str]:
+    """Return the agent of a request built from a PromptLayout (None for other requests)."""
+    key = (api_config or {}).get("prompt_cache_key")
+    if not isinstance(key, str) or "-" not in key:
+        return None
+    return key.rsplit("-", 1)[0]
+
+
+def begin_prompt_cache_run_stats() -> Dict[str, Dict[str, int]]:
+    """Start fresh per-run prompt-cache counters in the current context (call once per orchestrator run)."""
+    stats: Dict[str, Dict[str, int]] = {}
+    _run_stats.set(stats)
+    return stats
+
+
+def get_prompt_cache_run_stats() -> Dict[str, Dict[str, int]]:
+    """Return the per-agent counters of the current run (empty when begin_prompt_cache_run_stats was not called)."""
+    with _stats_lock:
+        return {agent: dict(counts) for agent, counts in (_run_stats.get() or {}).items()}
+
+
+def get_prompt_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return the per-agent counters of the process, with the number of distinct prefixes sent."""
+    with _stats_lock:
+        return {
+            agent: dict(counts, prefixes=len(_process_prefixes.get(agent, ())))
+            for agent, counts in _process_stats.items()
+        }
+
+
+def record_prompt_cache_usage(api_config: Dict[str, Any], usage: Dict[str, int]) -> None:
+    """Add the input / cached input tokens of a completed provider call to the counters of its agent."""
+    agent = prompt_cache_agent(api_config)
+    if agent is None:
+        return
+    with _stats_lock:
+        targets = [_process_stats.setdefault(agent, {k: 0 for k in _STAT_KEYS})]
+        run = _run_stats.get()
+        if run is not None:
+            targets.append(run.setdefault(agent, {k: 0 for k in _STAT_KEYS}))
+        for counts in targets:
+            counts["calls"] += 1
+            counts["input_tokens"] += int(usage.get("input_tokens", 0) or 0)
+            counts["cached_tokens"] += int(usage.get("cached_tokens", 0) or 0)
+        _process_prefixes.setdefault(agent, set()).add(api_config["prompt_cache_key"])
+
+
+def format_prompt_cache_stats(stats: Dict[str, Dict[str, int]]) -> str:
+    """One-line summary of per-agent prompt-cache hit ratios (cached / input tokens) for run logs."""
+    parts = []
+    for agent in sorted(stats):
+        counts = stats[agent]
+        input_tokens = counts.get("input_tokens", 0)
+        ratio = (counts.get("cached_tokens", 0) / input_tokens * 100) if input_tokens else 0.0
+        parts.append(f"{agent}={ratio:.1f}% ({counts.get('cached_tokens', 0):,}/{input_tokens:,} tokens, {counts.get('calls', 0)} calls)")
+    return " | ".join(parts) if parts else "no calls"
+
+
+register_summary_stats("Provider prompt cache", get_prompt_cache_stats, format_prompt_cache_stats)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Utility
+Client-side token buckets (requests/minute and tokens/minute) shared by every LLM call of
+the process, one limiter per provider and model. Calls reserve their estimated tokens
+before being sent, reconcile them with the reported usage afterwards, and the limits
+adapt to 429 / Retry-After signals (multiplicative decrease, additive recovery).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Continuously refilled bucket holding up to `limit` units per minute.
+
+    The level may go negative (debt) when reconciliation reveals that more units were
+    used than reserved; the debt is paid back by the refill before new reservations.
+    """
+
+    def __init__(self, limit_per_minute: float, now: Optional[float] = None):
+        self.limit = float(limit_per_minute)
+        self.level = self.limit
+        self.updated = time.monotonic() if now is None else now
+
+    @property
+    def rate(self) -> float:
+        return self.limit / 60.0
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the limit wait for a full bucket)."""
+        self.refill(now)
+        needed = min(amount, self.limit)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.limit, self.level + amount)
+
+    def set_limit(self, limit_per_minute: float) -> None:
+        self.limit = float(limit_per_minute)
+        self.level = min(self.level, self.limit)
+
+
+class RateLimiter:
+    """
+    Requests/minute and tokens/minute limiter of one provider + model.
+
+    A limit <= 0 disables the corresponding bucket. After a 429, calls are held until the
+    Retry-After delay has elapsed and both limits are scaled by `decrease`; every successful
+    call then recovers `recovery` of the configured limits until they are reached again.
+    """
+
+    def __init__(self, name: str, rpm: int, tpm: int, decrease: float = 0.7,
+                 recovery: float = 0.02, min_fraction: float = 0.1):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Label used in logs ("<provider>/<model>")
+            rpm: Configured requests per minute (<= 0 = unlimited)
+            tpm: Configured tokens per minute (<= 0 = unlimited)
+            decrease: Factor applied to the current limits on each 429
+            recovery: Fraction of the configured limits regained per successful call
+            min_fraction: Lowest fraction of the configured limits the adaptation may reach
+        """
+        self.name = name
+        self.ceilings = {"rpm": float(rpm), "tpm": float(tpm)}
+        self.decrease = decrease
+        self.recovery = recovery
+        self.min_fraction = min_fraction
+        self._buckets: Dict[str, TokenBucket] = {k: TokenBucket(v) for k, v in self.ceilings.items() if v > 0}
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._consecutive_429 = 0
+        self.stats = {"requests": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def limits(self) -> Dict[str, float]:
+        """Return the current (adapted) limits."""
+        with self._lock:
+            return {k: b.limit for k, b in self._buckets.items()}
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens, or return the seconds to wait first."""
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self._blocked_until - now)
+            amounts = {"rpm": 1, "tpm": max(0, tokens)}
+            for key, bucket in self._buckets.items():
+                wait = max(wait, bucket.wait_time(amounts[key], now))
+            if wait > 0:
+                return wait
+            for key, bucket in self._buckets.items():
+                bucket.take(amounts[key])
+            self.stats["requests"] += 1
+            return 0.0
+
+    def _log_wait(self, wait: float) -> None:
+        self.stats["waited_seconds"] += wait
+        if wait >= 1.0:
+            logger.info(f"[RATE] {self.name}: waiting {wait:.1f}s for capacity")
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one request carrying `tokens` estimated tokens fits in the limits."""
+        while True:
+            wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return
+            self._log_wait(wait)
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Async twin of acquire (waits with asyncio.sleep)."""
+        while True:
+            wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return
+            self._log_wait(wait)
+            await asyncio.sleep(wait)
+
+    def release(self, tokens: int) -> None:
+        """Give back the tokens reserved by an attempt that failed (the request itself stays counted)."""
+        with self._lock:
+            bucket = self._buckets.get("tpm")
+            if bucket is not None and tokens > 0:
+                bucket.give_back(tokens)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the tokens bucket with the usage reported for a completed call and recover the limits."""
+        with self._lock:
+            bucket = self._buckets.get("tpm")
+            if bucket is not None and actual_tokens:
+                delta = actual_tokens - max(0, estimated_tokens)
+                if delta > 0:
+                    bucket.take(delta)
+                else:
+                    bucket.give_back(-delta)
+            self._consecutive_429 = 0
+            for key, b in self._buckets.items():
+                if b.limit < self.ceilings[key]:
+                    b.set_limit(min(self.ceilings[key], b.limit + self.ceilings[key] * self.recovery))
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Record a 429: hold calls for retry_after seconds and scale the limits down.
+
+        Without a Retry-After hint the hold doubles with each consecutive 429 (2s ... 60s).
+
+        Returns:
+            The hold duration in seconds
+        """
+        with self._lock:
+            self._consecutive_429 += 1
+            hold = retry_after if retry_after and retry_after > 0 else min(60.0, 2.0 ** self._consecutive_429)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + hold)
+            for key, bucket in self._buckets.items():
+                floor = self.ceilings[key] * self.min_fraction
+                bucket.set_limit(max(floor, bucket.limit * self.decrease))
+            self.stats["throttled"] += 1
+            limits = {k: round(b.limit) for k, b in self._buckets.items()}
+        logger.warning(f"[RATE] {self.name}: rate limited, holding {hold:.1f}s, limits now {limits}")
+        return hold
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model_name: str) -> Optional[RateLimiter]:
+    """
+    Return the process-wide limiter of a provider + model (None when rate limiting is off).
+
+    Limits come from utils_config_constants (LLM_RATE_LIMIT, LLM_RATE_LIMITS).
+    """
+    from utils_config_constants import LLM_RATE_LIMIT, LLM_RATE_LIMITS
+    if not LLM_RATE_LIMIT:
+        return None
+    key = (provider, model_name)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            rpm, tpm = LLM_RATE_LIMITS.get(provider, (0, 0))
+            if rpm <= 0 and tpm <= 0:
+                return None
+            limiter = _limiters[key] = RateLimiter(f"{provider}/{model_name}", rpm, tpm)
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, float]]:
+    """Return the counters of every limiter created so far, keyed by "<provider>/<model>"."""
+    with _limiters_lock:
+        return {limiter.name: dict(limiter.stats) for limiter in _limiters.values()}
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Utility
+Content-addressed on-disk cache of model responses keyed on the normalized api_config
+(model, reasoning, verbosity, instructions, input), with LRU/size eviction and
+per-process and per-run hit/miss counters.
+
+Modes:
+- off (alias: bypass): never read nor write the cache
+- on: return cached responses, call the provider and store on miss
+- refresh: always call the provider and overwrite the cached entry
+- replay: read-only; a miss raises ResponseCacheMiss instead of calling the provider
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import time
+from typing import Any, Dict, Optional
+
+from utils_disk_cache import CACHE_STAT_KEYS as _STAT_KEYS, DiskLRUCache, format_cache_stats
+from utils_response_dump import ResponseNamespace, serialize_response_to_dict, to_attr_namespace
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+CACHE_MODES = ("off", "on", "refresh", "replay")
+_MODE_ALIASES = {"bypass": "off", "readwrite": "on", "read-write": "on"}
+
+# api_config keys that do not influence the model output
+_VOLATILE_KEYS = {"stream", "timeout", "user", "metadata", "extra_headers", "prompt_cache_key"}
+
+# Per-run counters (one dict per asyncio task / sweep combination)
+_run_stats: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("response_cache_run_stats", default=None)
+
+
+class ResponseCacheMiss(RuntimeError):
+    """Raised in replay mode when no cached response exists for a request."""
+
+
+def normalize_mode(mode: Optional[str]) -> str:
+    """Normalize a cache mode string; unknown values fall back to 'off'."""
+    value = (mode or "off").strip().lower()
+    value = _MODE_ALIASES.get(value, value)
+    if value not in CACHE_MODES:
+        logger.warning(f"[CACHE] Unknown cache mode '{mode}', cache disabled")
+        return "off"
+    return value
+
+
+def compute_cache_key(api_config: Dict[str, Any]) -> str:
+    """Return the SHA-256 content address of a request configuration."""
+    normalized = {k: v for k, v in (api_config or {}).items() if k not in _VOLATILE_KEYS}
+    payload = json.dumps(
+        {"v": CACHE_FORMAT_VERSION, "request": normalized},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def begin_run_stats() -> Dict[str, int]:
+    """Start fresh per-run counters in the current context (call once per orchestrator run)."""
+    stats = {k: 0 for k in _STAT_KEYS}
+    _run_stats.set(stats)
+    return stats
+
+
+def get_run_stats() -> Dict[str, int]:
+    """Return the counters of the current run (zeros when begin_run_stats was not called)."""
+    return dict(_run_stats.get() or {k: 0 for k in _STAT_KEYS})
+
+
+class ResponseCache(DiskLRUCache):
+    """
+    On-disk content-addressed response cache.
+
+    Entries live under <cache_dir>/<key[:2]>/<key>.json and are evicted least-recently-used
+    first (see utils_disk_cache.DiskLRUCache).
+    """
+
+    def __init__(self, cache_dir: pathlib.Path | str, mode: str = "off",
+                 max_entries: int = 2000, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root directory of the cache
+            mode: One of CACHE_MODES (aliases accepted, see normalize_mode)
+            max_entries: Maximum number of cached responses (<= 0 disables the limit)
+            max_bytes: Maximum total size in bytes (<= 0 disables the limit)
+        """
+        super().__init__(cache_dir, ".json", max_entries=max_entries, max_bytes=max_bytes, run_stats=_run_stats)
+        self.mode = normalize_mode(mode)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def lookup(self, api_config: Dict[str, Any]) -> Optional[ResponseNamespace]:
+        """
+        Return the cached response for api_config, or None when the provider must be called.
+
+        Raises:
+            ResponseCacheMiss: In replay mode when no entry exists
+        """
+        if self.mode in ("off", "refresh"):
+            return None
+        key = compute_cache_key(api_config)
+        path = self._path_for(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            response = to_attr_namespace(entry["response"])
+            os.utime(path, None)
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            logger.warning(f"[CACHE] Unreadable entry {key[:12]}: {e}")
+            self._count("errors")
+            entry = None
+        if entry is None:
+            self._count("misses")
+            if self.mode == "replay":
+                raise ResponseCacheMiss(
+                    f"No cached response for model '{(api_config or {}).get('model')}' (key {key[:12]}) in replay mode"
+                )
+            return None
+        self._count("hits")
+        logger.info(f"[CACHE] Hit {key[:12]} (model={entry.get('model')})")
+        return response
+
+    def store(self, api_config: Dict[str, Any], response: Any) -> None:
+        """Persist a provider response (no-op in off/replay modes; failures are logged, never raised)."""
+        if self.mode not in ("on", "refresh"):
+            return
+        key = compute_cache_key(api_config)
+        entry = {
+            "version": CACHE_FORMAT_VERSION,
+            "key": key,
+            "model": (api_config or {}).get("model"),
+            "created_at": time.time(),
+            "response": serialize_response_to_dict(response),
+        }
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            self._write_entry(key, lambda tmp_path: tmp_path.write_bytes(data))
+        except Exception as e:
+            logger.warning(f"[CACHE] Could not store entry {key[:12]}: {e}")
+            self._count("errors")
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide cache configured from utils_config_constants (LLM_CACHE_*)."""
+    global _response_cache
+    if _response_cache is None:
+        from utils_config_constants import LLM_CACHE_MODE, LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_MB
+        _response_cache = ResponseCache(
+            LLM_CACHE_DIR, mode=LLM_CACHE_MODE,
+            max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return _response_cache
+
+
+def set_response_cache_mode(mode: str) -> ResponseCache:
+    """Switch the process-wide cache mode at runtime (e.g. from the CLI)."""
+    cache = get_response_cache()
+    cache.mode = normalize_mode(mode)
+    return cache
+
+
+def _summary_stats() -> Optional[Dict[str, int]]:
+    cache = get_response_cache()
+    return cache.stats if cache.enabled else None
+
+
+register_summary_stats("LLM response cache", _summary_stats, format_cache_stats)
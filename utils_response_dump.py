@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """
-Utilities to serialize OpenAI Responses API objects to JSON-serializable dicts,
-write response.json files, and verify exact key equality against expected schema.
+Utilities to serialize OpenAI Responses API objects to JSON-serializable dicts (and back to
+attribute-access objects), write response.json files, and verify exact key equality
+against expected schema.
 """
 
 import json
 import pathlib
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any, Dict, Tuple, Set, Optional
 
 
@@ -55,6 +57,19 @@ def serialize_response_to_dict(response: Any) -> Dict[str, Any]:
         return {"error": "failed to serialize response"}
 
 
+class ResponseNamespace(SimpleNamespace):
+    """Attribute-access view of a serialized response (compatible with the get_* extractors)."""
+
+
+def to_attr_namespace(value: Any) -> Any:
+    """Rebuild an attribute-access response from serialized data (dicts become ResponseNamespace, recursively)."""
+    if isinstance(value, dict):
+        return ResponseNamespace(**{str(k): to_attr_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_attr_namespace(v) for v in value]
+    return value
+
+
 def verify_exact_keys(emitted: Dict[str, Any], expected_keys: Set[str]) -> Tuple[bool, Set[str], Set[str]]:
     """Check exact key equality on the top-level dict.
 
@@ -509,19 +524,20 @@ def _write_special_files(output_dir: pathlib.Path, special_files: Dict[str, Any]
                     except Exception as e:
                         print(f"[WARNING] Post-processing failed for {puml_filename}: {e}")
                 
-                # Generate SVG from PlantUML file
-                try:
-                    svg_path = generate_svg_from_puml(puml_file, output_dir)
-                    if svg_path:
-                        print(f"OK: {base_name} -> diagram.svg")
-                        if hasattr(special_files, '__setitem__'):
-                            special_files["svg_file"] = str(svg_path)
-                        # Store SVG path in results for orchestrator access
-                        results["svg_file"] = str(svg_path)
-                    else:
-                        print(f"[WARNING] Failed to generate SVG from {puml_filename}")
-                except Exception as e:
-                    print(f"[WARNING] SVG generation failed for {puml_filename}: {e}")
+                # Generate SVG from PlantUML file (skipped when the caller renders it asynchronously)
+                if special_files.get("render_svg", True):
+                    try:
+                        svg_path = generate_svg_from_puml(puml_file, output_dir)
+                        if svg_path:
+                            print(f"OK: {base_name} -> diagram.svg")
+                            if hasattr(special_files, '__setitem__'):
+                                special_files["svg_file"] = str(svg_path)
+                            # Store SVG path in results for orchestrator access
+                            results["svg_file"] = str(svg_path)
+                        else:
+                            print(f"[WARNING] Failed to generate SVG from {puml_filename}")
+                    except Exception as e:
+                        print(f"[WARNING] SVG generation failed for {puml_filename}: {e}")
                 
                 # Surface the path for orchestrator logging/downstream use
                 if hasattr(special_files, '__setitem__'):
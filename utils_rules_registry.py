@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Rules Registry Utility
+Process-wide registry of compiled persona and rules markdown files. Each file is read and
+parsed once (text, <RULE-ID>...</RULE-ID> blocks, per-model token counts) and reused by
+generators, auditors, logging and tests until its mtime/size — then its SHA-256 — changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pathlib
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Union
+
+RULE_ID_PATTERN = re.compile(r"<(?P<id>[A-Z]{3}\d+-[A-Z0-9\-]+)>(?P<body>.*?)</(?P=id)>", re.DOTALL)
+
+# Stage key → rules file name inside a persona set
+STAGE_RULES_FILES = {
+    "operation_model": "RULES_LUCIM_Operation_model.md",
+    "scenario": "RULES_LUCIM_Scenario.md",
+    "diagram": "RULES_LUCIM_PlantUML_Diagram.md",
+}
+
+PathLike = Union[str, pathlib.Path]
+
+
+@dataclass
+class CompiledRuleFile:
+    """A persona/rules markdown file compiled once: text, rule blocks and token counts."""
+    path: pathlib.Path
+    sha256: str
+    mtime_ns: int
+    size: int
+    text: str
+    # Rule ID → rule text (block content), in document order
+    rules: Dict[str, str]
+    _token_counts: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    @property
+    def rule_ids(self) -> FrozenSet[str]:
+        return frozenset(self.rules)
+
+    def token_count(self, model_name: str) -> int:
+        """Return the token count of the file text for model_name (computed once per model)."""
+        if model_name not in self._token_counts:
+            try:
+                from utils_tokenizer import get_tokenizer_service
+                self._token_counts[model_name] = get_tokenizer_service().count_static(self.text, model_name)
+            except Exception:
+                return len(self.text) // 4
+        return self._token_counts[model_name]
+
+
+_registry: Dict[pathlib.Path, CompiledRuleFile] = {}
+_registry_lock = threading.Lock()
+_registry_stats = {"hits": 0, "compiles": 0, "revalidations": 0}
+
+
+def parse_rules(text: str) -> Dict[str, str]:
+    """Parse <RULE-ID>...</RULE-ID> blocks of a RULES_LUCIM markdown text into {rule id: rule text}."""
+    return {m.group("id").strip(): m.group("body").strip() for m in RULE_ID_PATTERN.finditer(text)}
+
+
+def compile_rule_file(path: PathLike) -> CompiledRuleFile:
+    """
+    Return the compiled form of a persona/rules markdown file.
+
+    The file is only re-read when its mtime or size changed, and only re-parsed when its
+    SHA-256 changed too.
+
+    Raises:
+        OSError: If the file cannot be read (FileNotFoundError when it does not exist)
+    """
+    key = pathlib.Path(path).resolve()
+    st = key.stat()
+    with _registry_lock:
+        cached = _registry.get(key)
+        if cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+            _registry_stats["hits"] += 1
+            return cached
+
+    data = key.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    with _registry_lock:
+        cached = _registry.get(key)
+        if cached is not None and cached.sha256 == digest:
+            # Touched but unchanged: keep the parsed rules and token counts
+            cached.mtime_ns, cached.size = st.st_mtime_ns, st.st_size
+            _registry_stats["revalidations"] += 1
+            return cached
+        text = data.decode("utf-8")
+        compiled = CompiledRuleFile(key, digest, st.st_mtime_ns, st.st_size, text, parse_rules(text))
+        _registry[key] = compiled
+        _registry_stats["compiles"] += 1
+        return compiled
+
+
+def read_prompt_text(path: PathLike) -> str:
+    """
+    Return the text of a persona/rules file through the registry.
+
+    Drop-in replacement for pathlib.Path(path).read_text(encoding="utf-8"); raises the same
+    OSError when the file cannot be read.
+    """
+    return compile_rule_file(path).text
+
+
+def get_rule_ids(path: PathLike) -> FrozenSet[str]:
+    """Return the rule IDs declared in a RULES_LUCIM markdown file."""
+    return compile_rule_file(path).rule_ids
+
+
+def get_stage_rule_ids(stage: str, persona_set: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Return the rule IDs of a stage ("operation_model", "scenario", "diagram") in a persona set.
+
+    Returns an empty set when the stage is unknown or its rules file is unavailable.
+    """
+    from utils_config_constants import DEFAULT_PERSONA_SET, INPUT_PERSONA_DIR
+    file_name = STAGE_RULES_FILES.get(stage)
+    if not file_name:
+        return frozenset()
+    try:
+        return get_rule_ids(INPUT_PERSONA_DIR / (persona_set or DEFAULT_PERSONA_SET) / file_name)
+    except (OSError, UnicodeDecodeError):
+        return frozenset()
+
+
+def load_persona_set(persona_set: Optional[str] = None) -> Dict[str, CompiledRuleFile]:
+    """
+    Compile every markdown file of a persona set (default: DEFAULT_PERSONA_SET) up front.
+
+    Returns:
+        File name → compiled file, for the files that could be read
+    """
+    from utils_config_constants import DEFAULT_PERSONA_SET, INPUT_PERSONA_DIR
+    persona_dir = INPUT_PERSONA_DIR / (persona_set or DEFAULT_PERSONA_SET)
+    compiled: Dict[str, CompiledRuleFile] = {}
+    for md_file in sorted(persona_dir.glob("*.md")):
+        try:
+            compiled[md_file.name] = compile_rule_file(md_file)
+        except (OSError, UnicodeDecodeError):
+            continue
+    return compiled
+
+
+def get_registry_stats() -> Dict[str, int]:
+    """Return registry counters (hits, compiles, revalidations) and the number of compiled files."""
+    with _registry_lock:
+        return {**_registry_stats, "files": len(_registry)}
+
+
+def clear_rules_registry() -> None:
+    """Forget every compiled file (next access re-reads from disk)."""
+    with _registry_lock:
+        _registry.clear()
+        for k in _registry_stats:
+            _registry_stats[k] = 0
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Speculative Execution Utility
+Starts the first generator call of a downstream stage (Scenario, PlantUML Diagram) on the
+upstream artifact of the current iteration while the upstream auditor is still running.
+The upstream stage keeps the speculation when its verdict lets the pipeline advance
+(compliant, or MAX_AUDIT reached) and cancels it otherwise; the downstream stage commits it
+when its first-iteration input is exactly the artifact the speculation started from.
+Hits, misses, overlap time saved and tokens spent on discarded results are counted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from utils_summary_stats import register_summary_stats
+
+logger = logging.getLogger(__name__)
+
+_STAT_KEYS = ("launched", "committed", "discarded", "cancelled", "wasted_tokens", "saved_seconds")
+
+
+class Speculation:
+    """A downstream generator call started ahead of its stage, keyed by its upstream input."""
+
+    def __init__(self, stage: str, key: Any, coro: Awaitable[Any], tracker: "SpeculationTracker"):
+        self.stage = stage
+        self.key = key
+        self.tracker = tracker
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.task = asyncio.ensure_future(coro)
+        self.task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: "asyncio.Future") -> None:
+        self.finished = time.monotonic()
+        if not task.cancelled():
+            # Retrieve the exception so a discarded failing speculation is not reported as unhandled
+            task.exception()
+
+    async def commit(self) -> Any:
+        """
+        Wait for the speculative result and use it as the real downstream result.
+
+        Raises:
+            Exception: Whatever the generator call raised (as if it had been called directly)
+        """
+        # Time the downstream call had already been running when its stage reached it
+        saved = (self.finished or time.monotonic()) - self.started
+        result = await self.task
+        self.tracker._record(self.stage, "committed", saved_seconds=saved)
+        return result
+
+    async def discard(self) -> None:
+        """Cancel the speculation (or drop its finished result, counting its tokens as wasted)."""
+        if not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.tracker._record(self.stage, "cancelled")
+            return
+        tokens = 0
+        if not self.task.cancelled() and self.task.exception() is None and isinstance(self.task.result(), dict):
+            tokens = int(self.task.result().get("tokens_used") or 0)
+        self.tracker._record(self.stage, "discarded", wasted_tokens=tokens)
+
+    def cancel(self) -> None:
+        """Synchronous discard for cleanup paths (the cancellation completes on the event loop)."""
+        if not self.task.done():
+            self.task.cancel()
+            self.tracker._record(self.stage, "cancelled")
+        else:
+            self.tracker._record(self.stage, "discarded")
+
+
+class SpeculationTracker:
+    """Starts speculations and keeps process-wide hit/waste counters."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stats: Dict[str, float] = {k: 0 for k in _STAT_KEYS}
+
+    def start(self, stage: str, key: Any, coro: Awaitable[Any]) -> Speculation:
+        """Schedule coro now (key: the upstream artifact it was started from)."""
+        self.stats["launched"] += 1
+        logger.info(f"[SPECULATE] {stage}: generator started ahead of the upstream verdict")
+        return Speculation(stage, key, coro, self)
+
+    def _record(self, stage: str, outcome: str, wasted_tokens: int = 0, saved_seconds: float = 0.0) -> None:
+        self.stats[outcome] += 1
+        self.stats["wasted_tokens"] += wasted_tokens
+        self.stats["saved_seconds"] += saved_seconds
+        if outcome == "committed":
+            logger.info(f"[SPECULATE] {stage}: speculative result committed ({saved_seconds:.1f}s ahead)")
+        else:
+            logger.info(f"[SPECULATE] {stage}: speculation {outcome} ({wasted_tokens} tokens wasted)")
+
+
+async def take_speculation(speculations: Dict[str, Speculation], stage: str, key: Any) -> Optional[Speculation]:
+    """
+    Pop the speculation of a stage: return it when it was started from key, discard it otherwise.
+
+    Returns:
+        The speculation to commit, or None when the stage must run its generator itself
+    """
+    speculation = speculations.pop(stage, None)
+    if speculation is None:
+        return None
+    if speculation.key == key:
+        return speculation
+    await speculation.discard()
+    return None
+
+
+def cancel_speculations(speculations: Dict[str, Speculation]) -> None:
+    """Cancel every pending speculation (file finished or failed before its stage ran)."""
+    while speculations:
+        _, speculation = speculations.popitem()
+        speculation.cancel()
+
+
+def format_speculation_stats(stats: Dict[str, float]) -> str:
+    """One-line summary of speculation counters for run logs."""
+    launched = stats.get("launched", 0)
+    committed = stats.get("committed", 0)
+    hit_rate = f"{committed / launched:.0%}" if launched else "n/a"
+    return (
+        f"launched={launched} committed={committed} (hit rate {hit_rate}) | discarded={stats.get('discarded', 0)} "
+        f"cancelled={stats.get('cancelled', 0)} wasted tokens={stats.get('wasted_tokens', 0)} | "
+        f"saved {stats.get('saved_seconds', 0.0):.1f}s"
+    )
+
+
+_tracker: Optional[SpeculationTracker] = None
+
+
+def get_speculation_tracker() -> SpeculationTracker:
+    """Return the process-wide tracker configured from utils_config_constants (SPECULATIVE_EXECUTION)."""
+    global _tracker
+    if _tracker is None:
+        from utils_config_constants import SPECULATIVE_EXECUTION
+        _tracker = SpeculationTracker(enabled=SPECULATIVE_EXECUTION)
+    return _tracker
+
+
+def _summary_stats() -> Optional[Dict[str, float]]:
+    tracker = get_speculation_tracker()
+    return tracker.stats if tracker.enabled else None
+
+
+register_summary_stats("Speculative execution", _summary_stats, format_speculation_stats)
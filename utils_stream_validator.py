@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Stream Validator Utility
+Incremental validation of streamed LLM output. A streaming JSON tokenizer and an
+@startuml detector inspect each text delta as it arrives, so a generation that is
+certain to violate LOM0/LSC0-JSON-BLOCK-ONLY or LDR0-PLANTUML-BLOCK-ONLY (prose before
+the block, text after it) is cancelled instead of being awaited to the end. Wrappers
+that write_all_output_files strips before writing output-data.json (```json fences,
+<raw_json_output> tags) are not violations. Streams also record time-to-first-token.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from utils_tokenizer import estimate_tokens
+
+STARTUML = "@startuml"
+
+# Stage -> (expected output, rule reported when the output is certain to break it,
+# whether malformed or trailing JSON is fatal too). Stage names match
+# utils_rules_registry.STAGE_RULES_FILES.
+STREAM_STAGES = {
+    "operation_model": ("json", "LOM0-JSON-BLOCK-ONLY", True),
+    "scenario": ("json", "LSC0-JSON-BLOCK-ONLY", False),
+    "diagram": ("plantuml", "LDR0-PLANTUML-BLOCK-ONLY", False),
+}
+
+# JSON key whose string value becomes diagram.puml (see agent_lucim_plantuml_diagram_generator)
+PLANTUML_JSON_KEY = "plantuml-diagram"
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", '"': '"', "\\": "\\", "/": "/"}
+_CLOSERS = {"}": "{", "]": "["}
+
+# Wrappers removed by remove_markdown_fences (utils_response_dump) around a JSON block
+_TAG_OPEN = "<raw_json_output>"
+_TAG_CLOSE = "</raw_json_output>"
+_TAG_OPEN_RE = re.compile(r"<\s*raw_json_output\s*>", re.IGNORECASE)
+_TAG_CLOSE_RE = re.compile(r"<\s*/\s*raw_json_output\s*>", re.IGNORECASE)
+
+
+def _skip_wrappers(text: str, closing: bool) -> Optional[str]:
+    """
+    Strip the (opening or closing) JSON wrappers at the start of text, each at most once.
+
+    Returns the text left after the wrappers, or None while the text may still grow into
+    a wrapper.
+    """
+    fences = ("```",) if closing else ("```json", "```")
+    tag_re, tag = (_TAG_CLOSE_RE, _TAG_CLOSE) if closing else (_TAG_OPEN_RE, _TAG_OPEN)
+    used = set()
+    while True:
+        text = text.lstrip()
+        if not text:
+            return ""
+        if "fence" not in used and text.startswith("`"):
+            if any(fence.startswith(text) for fence in fences):
+                return None  # "``" may still become "```", "```js" may become "```json"
+            fence = next((f for f in fences if text.startswith(f)), None)
+            if fence is not None:
+                used.add("fence")
+                text = text[len(fence):]
+                continue
+        if "tag" not in used and text.startswith("<"):
+            match = tag_re.match(text)
+            if match:
+                used.add("tag")
+                text = text[match.end():]
+                continue
+            if tag.startswith(re.sub(r"\s+", "", text).lower()):
+                return None
+        return text
+
+
+class StreamAbort(Exception):
+    """Raised by StreamValidator.feed when the output is certain to violate a block-only rule."""
+
+    def __init__(self, rule_id: str, reason: str):
+        super().__init__(f"{rule_id}: {reason}")
+        self.rule_id = rule_id
+        self.reason = reason
+
+
+class JsonStreamTokenizer:
+    """
+    Character-level JSON scanner fed in arbitrary chunks.
+
+    Tracks bracket nesting, strings and escapes, object keys, and whether the top-level
+    value is complete; whatever follows that value is kept in `trailing`. The decoded characters of string values stored under `watch_key`
+    are passed to on_watched_char (used to check the PlantUML text embedded in JSON).
+    """
+
+    def __init__(self, watch_key: Optional[str] = None, on_watched_char=None):
+        self.stack: List[str] = []
+        self.started = False
+        self.complete = False
+        self.in_string = False
+        self.error: Optional[str] = None
+        self.trailing: List[str] = []  # characters after the complete top-level value
+        self.watch_key = watch_key
+        self.on_watched_char = on_watched_char
+        self._escape: Optional[str] = None  # None, "" after a backslash, or the \u hex digits read so far
+        self._expect_key = False
+        self._string_is_key = False
+        self._string_watched = False
+        self._key_chars: List[str] = []
+        self._last_key: Optional[str] = None
+
+    def feed(self, chunk: str) -> None:
+        for ch in chunk:
+            if self.error is not None:
+                return
+            if self.in_string:
+                self._string_char(ch)
+            else:
+                self._structural_char(ch)
+
+    def _string_char(self, ch: str) -> None:
+        if self._escape is not None:
+            if self._escape == "":
+                if ch == "u":
+                    self._escape = "u"
+                else:
+                    self._escape = None
+                    self._emit(_ESCAPES.get(ch, ch))
+                return
+            self._escape += ch
+            if len(self._escape) == 5:  # "u" + 4 hex digits
+                try:
+                    decoded = chr(int(self._escape[1:], 16))
+                except ValueError:
+                    self.error = f"invalid unicode escape \\{self._escape}"
+                    return
+                self._escape = None
+                self._emit(decoded)
+            return
+        if ch == "\\":
+            self._escape = ""
+        elif ch == '"':
+            self.in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._key_chars)
+        else:
+            self._emit(ch)
+
+    def _emit(self, ch: str) -> None:
+        if self._string_is_key:
+            self._key_chars.append(ch)
+        elif self._string_watched and self.on_watched_char is not None:
+            self.on_watched_char(ch)
+
+    def _structural_char(self, ch: str) -> None:
+        if self.complete:
+            self.trailing.append(ch)
+            return
+        if ch.isspace():
+            return
+        if not self.started:
+            if ch not in "{[":
+                self.error = f"output starts with {ch!r} instead of a JSON object"
+                return
+            self.started = True
+        if ch in "{[":
+            self.stack.append(ch)
+            self._expect_key = ch == "{"
+        elif ch in "}]":
+            if not self.stack or self.stack[-1] != _CLOSERS[ch]:
+                self.error = f"unbalanced {ch!r}"
+                return
+            self.stack.pop()
+            self._expect_key = False
+            if not self.stack:
+                self.complete = True
+        elif ch == '"':
+            self.in_string = True
+            self._string_is_key = bool(self.stack) and self.stack[-1] == "{" and self._expect_key
+            self._string_watched = (not self._string_is_key and self.watch_key is not None
+                                    and self._last_key == self.watch_key)
+            self._key_chars = []
+        elif ch == ":":
+            self._expect_key = False
+        elif ch == ",":
+            self._expect_key = bool(self.stack) and self.stack[-1] == "{"
+
+
+class StreamValidator:
+    """
+    Decide, delta by delta, whether a streamed generation already violates its block-only rule.
+
+    - operation_model / scenario: the output must be one JSON object; prose before it is
+      fatal. A ```json / ``` fence or <raw_json_output> tag around the object is not, as
+      write_all_output_files strips it. For the operation model an unbalanced bracket or
+      other text after the object is fatal as well (LOM0 also requires the block to parse).
+    - diagram: raw output must start with @startuml; JSON output is checked on the decoded
+      value of "plantuml-diagram", which becomes diagram.puml. Prose before a JSON object is
+      not fatal there because the diagram generator still extracts the object.
+
+    Only violations that cannot be fixed by later tokens abort the stream.
+    """
+
+    def __init__(self, stage: str):
+        kind, rule_id, strict_json = STREAM_STAGES[stage]
+        self.stage = stage
+        self.kind = kind
+        self.rule_id = rule_id
+        self.strict_json = strict_json
+        self.mode: Optional[str] = None  # "json" | "plantuml" | "lenient" once decided
+        self._lead: List[str] = []  # leading non-whitespace characters of raw PlantUML output
+        self._puml_lead: List[str] = []  # leading non-whitespace characters of the embedded PlantUML
+        self._pending: Optional[str] = None
+        self._head = ""  # leading text of JSON output until the object starts
+        self.tokenizer: Optional[JsonStreamTokenizer] = None
+
+    def feed(self, delta: str) -> None:
+        """Consume a text delta; raise StreamAbort once a fatal violation is certain."""
+        if not delta or self.mode == "lenient":
+            return
+        if self.mode is None:
+            delta = self._decide_mode(delta)
+        if self.mode == "json":
+            self.tokenizer.feed(delta)
+            if self._pending is not None:
+                raise StreamAbort(self.rule_id, self._pending)
+            if self.tokenizer.error is not None:
+                if not self.strict_json:
+                    self.mode = "lenient"
+                    return
+                raise StreamAbort(self.rule_id, self.tokenizer.error)
+            if self.strict_json and self.tokenizer.trailing and self._skip_trailing():
+                raise StreamAbort(self.rule_id, "text after the top-level JSON value")
+        elif self.mode == "plantuml":
+            self._check_startuml(self._lead, delta, "output")
+
+    def _decide_mode(self, delta: str) -> str:
+        if self.kind == "json":
+            self._head += delta
+            stripped = _skip_wrappers(self._head, closing=False)
+            if stripped is None:
+                return ""
+        else:
+            stripped = delta.lstrip()
+        if not stripped:
+            return ""
+        first = stripped[0]
+        if first == "{":
+            self.mode = "json"
+            watch = PLANTUML_JSON_KEY if self.kind == "plantuml" else None
+            self.tokenizer = JsonStreamTokenizer(watch_key=watch, on_watched_char=self._on_puml_char)
+            return stripped
+        if self.kind == "plantuml":
+            self.mode = "plantuml" if first == "@" else "lenient"
+            return stripped
+        raise StreamAbort(self.rule_id, f"text before the JSON object: {stripped[:40]!r}")
+
+    def _skip_trailing(self) -> str:
+        """Text after the JSON object that is not a closing fence or tag ("" while it may still be one)."""
+        return _skip_wrappers("".join(self.tokenizer.trailing), closing=True) or ""
+
+    def _check_startuml(self, lead: List[str], text: str, where: str) -> None:
+        for ch in text:
+            if len(lead) >= len(STARTUML):
+                return
+            if ch.isspace() and not lead:
+                continue
+            lead.append(ch)
+            if STARTUML[:len(lead)] != "".join(lead):
+                raise StreamAbort(self.rule_id, f"{where} does not start with {STARTUML}: {''.join(lead)!r}")
+
+    def _on_puml_char(self, ch: str) -> None:
+        if self._pending is not None or len(self._puml_lead) >= len(STARTUML):
+            return
+        try:
+            self._check_startuml(self._puml_lead, ch, PLANTUML_JSON_KEY)
+        except StreamAbort as abort:
+            self._pending = abort.reason  # raised by feed() once the tokenizer returns
+
+
+class StreamSession:
+    """Accumulates one streamed generation: text, validation and timing."""
+
+    def __init__(self, stage: Optional[str] = None, validate: bool = True):
+        self.started = time.monotonic()
+        self.first_token_at: Optional[float] = None
+        self.parts: List[str] = []
+        self.validator = StreamValidator(stage) if stage and validate else None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return round((self.first_token_at - self.started) * 1000.0, 1)
+
+    def feed(self, delta: Optional[str]) -> None:
+        """Record a text delta and validate it (raises StreamAbort)."""
+        if not delta:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+        self.parts.append(delta)
+        if self.validator is not None:
+            self.validator.feed(delta)
+
+    def metrics(self, aborted: Optional[StreamAbort] = None) -> Dict[str, Any]:
+        return {
+            "ttft_ms": self.ttft_ms,
+            "duration_ms": round((time.monotonic() - self.started) * 1000.0, 1),
+            "output_chars": sum(len(p) for p in self.parts),
+            "aborted_rule": aborted.rule_id if aborted else None,
+            "abort_reason": aborted.reason if aborted else None,
+        }
+
+
+class AbortedStreamResponse:
+    """
+    Response-like object of a cancelled stream (status "incomplete").
+
+    Its output is the partial text received so far, so the generator stores it as usual
+    and the deterministic auditor reports the block-only violation on the next step.
+    Providers report no usage for a cancelled stream, so `usage` holds an estimate (the
+    prompt tokens and the streamed text) that the budget and the rate limiter charge.
+    """
+
+    def __init__(self, session: StreamSession, abort: StreamAbort, response_id: str = "",
+                 input_tokens: int = 0, output_tokens: Optional[int] = None):
+        self.id = response_id or f"stream_aborted_{int(time.time() * 1000)}"
+        self.status = "incomplete"
+        self.output_text = session.text
+        self.output = [{"type": "message", "content": [{"type": "output_text", "text": session.text}]}]
+        if output_tokens is None:
+            output_tokens = estimate_tokens(session.text)
+        self.usage = SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                                     total_tokens=input_tokens + output_tokens)
+        self.stream_metrics = session.metrics(abort)
+
+
+def is_aborted_stream(response: Any) -> bool:
+    """True for responses produced by a stream cancelled on a format violation."""
+    return isinstance(response, AbortedStreamResponse)
+
+
+_stats_lock = threading.Lock()
+_stats = {"streams": 0, "aborted": 0, "ttft_ms_total": 0.0, "ttft_count": 0}
+
+
+def record_stream(metrics: Dict[str, Any]) -> None:
+    """Add the metrics of a finished or aborted stream to the process-wide counters."""
+    with _stats_lock:
+        _stats["streams"] += 1
+        if metrics.get("aborted_rule"):
+            _stats["aborted"] += 1
+        if metrics.get("ttft_ms") is not None:
+            _stats["ttft_ms_total"] += metrics["ttft_ms"]
+            _stats["ttft_count"] += 1
+
+
+def get_stream_stats() -> Dict[str, float]:
+    """Return stream counters with the mean time-to-first-token (ms)."""
+    with _stats_lock:
+        count = _stats["ttft_count"]
+        return {
+            "streams": _stats["streams"],
+            "aborted": _stats["aborted"],
+            "mean_ttft_ms": round(_stats["ttft_ms_total"] / count, 1) if count else 0.0,
+        }
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Summary Statistics Registry Utility
+Features that keep process-wide counters (caches, Batch API, hedging, budgets, ...) register
+a (label, stats getter, formatter) entry when their module is imported. The final sweep
+summary prints one line per entry whose getter returns counters; a getter returns None
+(or an empty dict) when its feature is off, and the line is skipped.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SummaryStats:
+    """One line of the final summary."""
+    label: str
+    get_stats: Callable[[], Optional[Dict[str, Any]]]
+    format_stats: Callable[[Dict[str, Any]], str]
+
+
+_entries: Dict[str, SummaryStats] = {}
+_entries_lock = threading.Lock()
+
+
+def register_summary_stats(label: str, get_stats: Callable[[], Optional[Dict[str, Any]]],
+                           format_stats: Callable[[Dict[str, Any]], str]) -> None:
+    """
+    Add a line to the final summary (registering a label again replaces its entry).
+
+    Args:
+        label: Line label (e.g. "Request hedging")
+        get_stats: Returns the counters, or None when the feature is off
+        format_stats: Formats the counters as a one-line summary
+    """
+    with _entries_lock:
+        _entries[label] = SummaryStats(label, get_stats, format_stats)
+
+
+def get_summary_stats_lines() -> List[Tuple[str, str]]:
+    """Return (label, formatted counters) for every registered feature that has counters, in registration order."""
+    with _entries_lock:
+        entries = list(_entries.values())
+    lines: List[Tuple[str, str]] = []
+    for entry in entries:
+        try:
+            stats = entry.get_stats()
+            if stats:
+                lines.append((entry.label, entry.format_stats(stats)))
+        except Exception as e:
+            # A broken counter must not hide the rest of the summary
+            logger.warning(f"[SUMMARY] Could not summarize {entry.label}: {e}")
+    return lines
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Sweep Planner Utility
+Pre-flight estimate of a sweep before it is launched: the first-iteration prompt of every
+agent is assembled statically (persona/rules files + NetLogo code + upstream artifacts)
+and tokenized, then scaled with per-model output sizes, iteration counts and call
+latencies mined from previous run directories. The plan predicts input/output tokens,
+cost and wall-clock time, sequentially and with the sweep scheduler's concurrency caps.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+import statistics
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils_format import FormatUtils
+from utils_mock_provider import AGENT_ARTIFACTS, is_mock_model
+from utils_orchestrator_v3_resume import STAGES
+
+logger = logging.getLogger(__name__)
+
+# Static prompt files of each agent (inside the persona set)
+AGENT_PROMPT_FILES = {
+    "lucim_operation_model_generator": ("PSN_LUCIM_Operation_Model_Generator.md",
+                                        "RULES_MAPPING_NETLOGO_TO_OPERATION_MODEL.md", "RULES_LUCIM_Operation_model.md"),
+    "lucim_operation_model_auditor": ("PSN_LUCIM_Operation_Model_Auditor.md", "RULES_LUCIM_Operation_model.md"),
+    "lucim_scenario_generator": ("PSN_LUCIM_Scenario_Generator.md", "RULES_LUCIM_Scenario.md"),
+    "lucim_scenario_auditor": ("PSN_LUCIM_Scenario_Auditor.md", "RULES_LUCIM_Scenario.md"),
+    "lucim_plantuml_diagram_generator": ("PSN_LUCIM_PlantUML_Diagram_Generator.md", "RULES_LUCIM_PlantUML_Diagram.md"),
+    "lucim_plantuml_diagram_auditor": ("PSN_LUCIM_PlantUML_Diagram_Auditor.md", "RULES_LUCIM_PlantUML_Diagram.md"),
+}
+# Dynamic inputs of each agent's first-iteration prompt: "code" or the artifact of an upstream agent
+AGENT_DYNAMIC_INPUTS = {
+    "lucim_operation_model_generator": ("code",),
+    "lucim_operation_model_auditor": ("code", "lucim_operation_model_generator"),
+    "lucim_scenario_generator": ("lucim_operation_model_generator",),
+    "lucim_scenario_auditor": ("lucim_operation_model_generator", "lucim_scenario_generator"),
+    "lucim_plantuml_diagram_generator": ("lucim_scenario_generator",),
+    "lucim_plantuml_diagram_auditor": ("lucim_scenario_generator", "lucim_plantuml_diagram_generator"),
+}
+
+# Fallbacks when no previous run of a model (nor of any model) is available
+DEFAULT_OUTPUT_TOKENS = {"generator": 6000, "auditor": 3000}
+DEFAULT_ARTIFACT_TOKENS = {"generator": 2000, "auditor": 600}
+DEFAULT_ITERATIONS = 1.5
+DEFAULT_OUTPUT_TOKENS_PER_SECOND = 50.0
+DEFAULT_CALL_OVERHEAD_SECONDS = 2.0
+
+_RESPONSE_FILENAME = "output-response-full.json"
+
+
+def _role(agent: str) -> str:
+    return "generator" if agent.endswith("_generator") else "auditor"
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return statistics.fmean(values) if values else None
+
+
+@dataclass
+class RunHistory:
+    """Per-model call statistics mined from previous run directories."""
+    # (model, agent) → observed values per call
+    input_tokens: Dict[Tuple[str, str], List[int]] = field(default_factory=lambda: defaultdict(list))
+    output_tokens: Dict[Tuple[str, str], List[int]] = field(default_factory=lambda: defaultdict(list))
+    artifact_tokens: Dict[Tuple[str, str], List[int]] = field(default_factory=lambda: defaultdict(list))
+    seconds: Dict[Tuple[str, str], List[float]] = field(default_factory=lambda: defaultdict(list))
+    # (model, stage folder) → iterations run per combination
+    iterations: Dict[Tuple[str, str], List[int]] = field(default_factory=lambda: defaultdict(list))
+    runs: int = 0
+
+    @classmethod
+    def mine(cls, runs_dir: Optional[pathlib.Path | str]) -> "RunHistory":
+        """
+        Collect token counts, call durations and iteration counts from a run tree.
+
+        Run directories follow <combination>/<N>_lucim_<stage>/iter-<k>/<role>/output-response-full.json;
+        unreadable files are skipped.
+        """
+        history = cls()
+        root = pathlib.Path(runs_dir) if runs_dir else None
+        if root is None or not root.is_dir():
+            return history
+        by_folders = {folders: agent for agent, folders in AGENT_ARTIFACTS.items()}
+        stage_iterations: Dict[Tuple[pathlib.Path, str], Tuple[str, int]] = {}
+        for path in root.rglob(_RESPONSE_FILENAME):
+            parts = path.parent.parts
+            if len(parts) < 4 or not parts[-2].startswith("iter-"):
+                continue
+            agent = by_folders.get((parts[-3], parts[-1]))
+            try:
+                iteration = int(parts[-2][len("iter-"):])
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            model = payload.get("model") if isinstance(payload, dict) else None
+            if not agent or not model:
+                continue
+            key = (model, agent)
+            if payload.get("input_tokens"):
+                history.input_tokens[key].append(int(payload["input_tokens"]))
+            if payload.get("total_output_tokens"):
+                history.output_tokens[key].append(int(payload["total_output_tokens"]))
+            if payload.get("visible_output_tokens"):
+                history.artifact_tokens[key].append(int(payload["visible_output_tokens"]))
+            raw = payload.get("raw_response") if isinstance(payload.get("raw_response"), dict) else {}
+            started, completed = raw.get("created_at"), raw.get("completed_at")
+            if isinstance(started, (int, float)) and isinstance(completed, (int, float)) and completed > started:
+                history.seconds[key].append(float(completed - started))
+            stage_key = (path.parents[3], parts[-3])
+            previous = stage_iterations.get(stage_key, (model, 0))[1]
+            stage_iterations[stage_key] = (model, max(previous, iteration))
+        for (combination_dir, stage_folder), (model, iterations) in stage_iterations.items():
+            history.iterations[(model, stage_folder)].append(iterations)
+        history.runs = len({combination_dir for combination_dir, _ in stage_iterations})
+        return history
+
+    def _lookup(self, table: Dict[Tuple[str, str], List[Any]], model: str, name: str) -> Optional[float]:
+        """Mean for (model, name), else over every model, else None."""
+        own = _mean(table.get((model, name), []))
+        if own is not None:
+            return own
+        return _mean([v for (_, other), values in table.items() if other == name for v in values])
+
+    def output_tokens_per_call(self, model: str, agent: str) -> float:
+        value = self._lookup(self.output_tokens, model, agent)
+        return value if value is not None else DEFAULT_OUTPUT_TOKENS[_role(agent)]
+
+    def artifact_tokens_per_call(self, model: str, agent: str) -> float:
+        value = self._lookup(self.artifact_tokens, model, agent)
+        return value if value is not None else DEFAULT_ARTIFACT_TOKENS[_role(agent)]
+
+    def seconds_per_call(self, model: str, agent: str) -> Optional[float]:
+        return _mean(self.seconds.get((model, agent), []))
+
+    def iterations_per_stage(self, model: str, stage_folder: str, max_iterations: int) -> float:
+        value = self._lookup(self.iterations, model, stage_folder)
+        return min(max(value if value is not None else DEFAULT_ITERATIONS, 1.0), float(max(1, max_iterations)))
+
+
+@dataclass
+class CombinationEstimate:
+    """Predicted cost of one sweep combination."""
+    combination: Dict[str, Any]
+    provider: str
+    input_tokens: int
+    output_tokens: int
+    cost_usd: Optional[float]
+    seconds: float
+
+
+@dataclass
+class SweepPlan:
+    """Predicted totals of a sweep (see plan_sweep)."""
+    estimates: List[CombinationEstimate]
+    max_concurrency: int
+    sequential_seconds: float
+    parallel_seconds: float
+    history_runs: int
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(e.input_tokens for e in self.estimates)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(e.output_tokens for e in self.estimates)
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(e.cost_usd or 0.0 for e in self.estimates)
+
+    @property
+    def unpriced_models(self) -> List[str]:
+        return sorted({e.combination["model"] for e in self.estimates if e.cost_usd is None})
+
+
+def price_for_model(model: str, pricing: Optional[Dict[str, Tuple[float, float]]] = None) -> Optional[Tuple[float, float]]:
+    """
+    USD per 1M (input, output) tokens of a model (mock models are free), None when unknown.
+
+    Args:
+        model: Model name
+        pricing: Price table (utils_config_constants.LLM_PRICING)
+    """
+    if is_mock_model(model):
+        return (0.0, 0.0)
+    table = pricing or {}
+    if model in table:
+        return table[model]
+    # Dated snapshots priced as their base name (e.g. "<model>-2025-08-07" → "<model>")
+    return next((price for name, price in table.items() if model.startswith(name)), None)
+
+
+def simulate_makespan(jobs: Iterable[Tuple[str, float]], max_concurrency: int,
+                      provider_limits: Optional[Dict[str, int]] = None) -> float:
+    """
+    Wall-clock seconds to run (provider, seconds) jobs in order under CombinationScheduler limits.
+
+    A job starts as soon as its provider and the global cap both have a free slot; a job
+    waiting on a saturated provider does not hold back other providers' jobs.
+    """
+    waiting = list(jobs)
+    running: List[Tuple[float, str]] = []
+    limits = provider_limits or {}
+    now = 0.0
+    makespan = 0.0
+    max_concurrency = max(1, int(max_concurrency))
+    while waiting:
+        started = False
+        for job in list(waiting):
+            provider, seconds = job
+            limit = limits.get(provider) or max_concurrency
+            if len(running) < max_concurrency and sum(1 for _, p in running if p == provider) < limit:
+                waiting.remove(job)
+                running.append((now + seconds, provider))
+                makespan = max(makespan, now + seconds)
+                started = True
+        if waiting and not started:
+            running.sort()
+            now = running.pop(0)[0]
+    return makespan
+
+
+class SweepPlanner:
+    """Assembles first-iteration prompts of a sweep and predicts its tokens, cost and duration."""
+
+    def __init__(self, history: RunHistory, persona_dir: pathlib.Path, max_iterations: int = 2,
+                 pricing: Optional[Dict[str, Tuple[float, float]]] = None,
+                 latency_lookup: Optional[Callable[[str], Optional[float]]] = None,
+                 provider_resolver: Optional[Callable[[str], str]] = None,
+                 code_loader: Optional[Callable[[str], str]] = None,
+                 tokenizer: Optional[Any] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            history: Statistics of previous runs (RunHistory.mine)
+            persona_dir: Persona set directory holding the agents' static prompt files
+            max_iterations: Iteration cap per stage (MAX_AUDIT)
+            pricing: USD per 1M (input, output) token prices per model (utils_config_constants.LLM_PRICING)
+            latency_lookup: Optional model → typical call seconds (e.g. hedging latency histograms)
+            provider_resolver: Model → provider key (default: utils_api_key.get_provider_for_model)
+            code_loader: Base name → NetLogo code (default: the case's *-netlogo-code.md / *-code.md file)
+            tokenizer: TokenizerService used to count prompts (default: utils_tokenizer.get_tokenizer_service())
+        """
+        self.history = history
+        self.persona_dir = pathlib.Path(persona_dir)
+        self.max_iterations = max(1, int(max_iterations))
+        self.pricing = pricing
+        self.latency_lookup = latency_lookup
+        self.provider_resolver = provider_resolver
+        self.code_loader = code_loader or _read_netlogo_code
+        self.tokenizer = tokenizer
+        self._static_texts: Dict[str, str] = {}
+        self._code: Dict[str, str] = {}
+
+    def _static_text(self, agent: str) -> str:
+        if agent not in self._static_texts:
+            from utils_rules_registry import read_prompt_text
+            texts = []
+            for file_name in AGENT_PROMPT_FILES[agent]:
+                try:
+                    texts.append(read_prompt_text(self.persona_dir / file_name))
+                except (OSError, UnicodeDecodeError):
+                    logger.debug(f"[PLAN] Prompt file not found: {self.persona_dir / file_name}")
+            self._static_texts[agent] = "\n\n".join(texts)
+        return self._static_texts[agent]
+
+    def _netlogo_code(self, base_name: str) -> str:
+        if base_name not in self._code:
+            try:
+                self._code[base_name] = self.code_loader(base_name) or ""
+            except Exception:
+                self._code[base_name] = ""
+        return self._code[base_name]
+
+    def _count(self, text: str, model: str, static: bool = False) -> int:
+        """Token count of a prompt part; character estimate when the model's encoder cannot be resolved (e.g. offline)."""
+        from utils_tokenizer import estimate_tokens, get_tokenizer_service
+        try:
+            tokenizer = self.tokenizer or get_tokenizer_service()
+            return tokenizer.count_static(text, model) if static else tokenizer.count(text, model)
+        except Exception as e:
+            logger.debug(f"[PLAN] Tokenizer unavailable for {model} ({e}); using character estimates")
+            return estimate_tokens(text)
+
+    def first_iteration_input_tokens(self, model: str, base_name: str, agent: str) -> int:
+        """Input tokens of an agent's first call: static prompt + code + (historical) upstream artifacts."""
+        tokens = self._count(self._static_text(agent), model, static=True)
+        for source in AGENT_DYNAMIC_INPUTS[agent]:
+            if source == "code":
+                tokens += self._count(self._netlogo_code(base_name), model)
+            else:
+                tokens += int(self.history.artifact_tokens_per_call(model, source))
+        return tokens
+
+    def _seconds_per_call(self, model: str, agent: str, output_tokens: float) -> float:
+        seconds = self.history.seconds_per_call(model, agent)
+        if seconds is None and self.latency_lookup is not None:
+            seconds = self.latency_lookup(model)
+        if seconds is None:
+            seconds = DEFAULT_CALL_OVERHEAD_SECONDS + output_tokens / DEFAULT_OUTPUT_TOKENS_PER_SECOND
+        return seconds
+
+    def estimate(self, combination: Dict[str, Any]) -> CombinationEstimate:
+        """Predict the tokens, cost and duration of one combination."""
+        model, base_name = combination["model"], combination["base_name"]
+        input_tokens = output_tokens = 0.0
+        seconds = 0.0
+        for _, stage_folder, generator, auditor in STAGES:
+            iterations = self.history.iterations_per_stage(model, stage_folder, self.max_iterations)
+            # Later iterations also carry the previous artifact and the audit report
+            retry_tokens = (self.history.artifact_tokens_per_call(model, generator)
+                            + self.history.artifact_tokens_per_call(model, auditor))
+            for agent in (generator, auditor):
+                first_input = self.first_iteration_input_tokens(model, base_name, agent)
+                retries = (iterations - 1) * (retry_tokens if agent == generator else 0)
+                call_output = self.history.output_tokens_per_call(model, agent)
+                input_tokens += first_input * iterations + retries
+                output_tokens += call_output * iterations
+                seconds += self._seconds_per_call(model, agent, call_output) * iterations
+        price = price_for_model(model, self.pricing)
+        cost = None if price is None else (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+        provider = self.provider_resolver(model) if self.provider_resolver else _default_provider(model)
+        return CombinationEstimate(combination, provider, int(input_tokens), int(output_tokens), cost, seconds)
+
+    def plan(self, combinations: List[Dict[str, Any]], max_concurrency: int,
+             provider_limits: Optional[Dict[str, int]] = None) -> SweepPlan:
+        """Estimate every combination and the sweep duration, sequential and with the scheduler caps."""
+        estimates = [self.estimate(c) for c in combinations]
+        jobs = [(e.provider, e.seconds) for e in estimates]
+        return SweepPlan(
+            estimates=estimates,
+            max_concurrency=max(1, int(max_concurrency)),
+            sequential_seconds=sum(e.seconds for e in estimates),
+            parallel_seconds=simulate_makespan(jobs, max_concurrency, provider_limits),
+            history_runs=self.history.runs,
+        )
+
+
+def _default_provider(model_name: str) -> str:
+    from utils_api_key import get_provider_for_model
+    return get_provider_for_model(model_name)
+
+
+def _read_netlogo_code(base_name: str) -> str:
+    from utils_orchestrator_fileio import OrchestratorFileIO
+    files = OrchestratorFileIO().find_netlogo_files(base_name)
+    return files[0]["code_file"].read_text(encoding="utf-8") if files else ""
+
+
+def format_sweep_plan(plan: SweepPlan) -> str:
+    """Multi-line pre-flight report: one line per combination, then the sweep totals."""
+    lines = [f"📋 Sweep plan ({len(plan.estimates)} combinations, history from {plan.history_runs} previous run(s))"]
+    for e in plan.estimates:
+        c = e.combination
+        cost = f"${e.cost_usd:.2f}" if e.cost_usd is not None else "n/a"
+        lines.append(
+            f"  {c['index']:>3}. {c['model']} | {c['base_name']} | {c['reasoning_effort']}/{c['text_verbosity']} | "
+            f"in {e.input_tokens:,} out {e.output_tokens:,} tokens | {cost} | {FormatUtils.format_duration(e.seconds)}"
+        )
+    lines.append(f"  Total tokens: input {plan.input_tokens:,} | output {plan.output_tokens:,}")
+    unpriced = f" (no price for: {', '.join(plan.unpriced_models)})" if plan.unpriced_models else ""
+    lines.append(f"  Estimated cost: ${plan.cost_usd:.2f}{unpriced}")
+    lines.append(
+        f"  Wall-clock: sequential {FormatUtils.format_duration(plan.sequential_seconds)} | "
+        f"{plan.max_concurrency}-way parallel {FormatUtils.format_duration(plan.parallel_seconds)}"
+    )
+    return "\n".join(lines)
+
+
+def drop_combinations(combinations: List[Dict[str, Any]], spec: str) -> List[Dict[str, Any]]:
+    """
+    Remove combinations by index ("3", "2,5", "4-7") and renumber the rest from 1.
+
+    Raises:
+        ValueError: On a malformed spec
+    """
+    dropped = set()
+    for item in (part.strip() for part in spec.split(",")):
+        if not item:
+            continue
+        start, _, end = item.partition("-")
+        dropped.update(range(int(start), int(end or start) + 1))
+    kept = [dict(c) for c in combinations if c["index"] not in dropped]
+    for index, combination in enumerate(kept, start=1):
+        combination["index"] = index
+    return kept
+
+
+def build_sweep_planner(max_iterations: int) -> SweepPlanner:
+    """Planner configured from utils_config_constants (SWEEP_PLAN_HISTORY_DIR, LLM_PRICING, LLM_LATENCY_FILE)."""
+    from utils_config_constants import DEFAULT_PERSONA_SET, INPUT_PERSONA_DIR, LLM_PRICING, SWEEP_PLAN_HISTORY_DIR
+    from utils_hedging import get_request_hedger
+
+    store = get_request_hedger().store
+
+    def typical_latency(model: str) -> Optional[float]:
+        return store.percentile(model, 50, min_samples=5)
+
+    return SweepPlanner(
+        RunHistory.mine(SWEEP_PLAN_HISTORY_DIR), INPUT_PERSONA_DIR / DEFAULT_PERSONA_SET,
+        max_iterations=max_iterations, pricing=LLM_PRICING, latency_lookup=typical_latency,
+    )
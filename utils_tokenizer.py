@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Tokenizer Service Utility
+Process-wide token counting for every model: the native encoder of a model (tiktoken,
+or a HuggingFace tokenizer for Mistral/Llama) is resolved and loaded once, token counts
+of static prompt segments (persona, rules, task instructions) are memoized by content
+hash, so each prompt only tokenizes its per-call dynamic suffix. Counts can also run in
+a small thread pool, off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+# HuggingFace tokenizers tried in order, per model family
+HF_TOKENIZERS = {
+    "mistral": ("mistralai/Mistral-7B-v0.1", "mistralai/Mistral-7B-Instruct-v0.1"),
+    "llama": ("meta-llama/Meta-Llama-3-8B", "meta-llama/Llama-2-7b-hf"),
+}
+# Static segments shorter than this are counted directly (hashing costs about as much)
+MIN_STATIC_CHARS = 512
+DEFAULT_MAX_STATIC_ENTRIES = 1024
+# Formatting overhead of one chat message (approximate)
+MESSAGE_OVERHEAD_TOKENS = 4
+PROMPT_SEPARATOR = "\n\n"
+
+_STAT_KEYS = ("counts", "static_hits", "static_misses", "encoders_loaded")
+
+
+def estimate_tokens(text: str) -> int:
+    """Character-based estimate (~4 characters per token), used when no tokenizer is available."""
+    return len(text or "") // 4
+
+
+def _load_tiktoken(model_name: Optional[str] = None) -> Optional[Tuple[str, Callable[[str], int]]]:
+    """Return (encoder key, counter) of the tiktoken encoding for model_name (default: cl100k_base)."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.debug("tiktoken not available, using character-based token estimates")
+        return None
+    encoding = None
+    if model_name:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except (KeyError, ValueError):
+            encoding = None
+    if encoding is None:
+        encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    return f"tiktoken:{encoding.name}", lambda text: len(encoding.encode(text))
+
+
+def _load_hf_tokenizer(tokenizer_name: str) -> Optional[Tuple[str, Callable[[str], int]]]:
+    """Return (encoder key, counter) of a HuggingFace tokenizer, None when transformers cannot load it."""
+    os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
+    try:
+        with warnings.catch_warnings():
+            # transformers warns about missing PyTorch/TensorFlow/Flax (only tokenizers are needed)
+            warnings.filterwarnings("ignore", message=".*PyTorch.*")
+            warnings.filterwarnings("ignore", message=".*TensorFlow.*")
+            warnings.filterwarnings("ignore", message=".*Flax.*")
+            warnings.filterwarnings("ignore", message=".*Models won't be available.*")
+            from transformers import AutoTokenizer
+            tokenizer = AutoTokenizer.from_pretrained(tokenizer_name, use_fast=True)
+    except ImportError:
+        logger.debug("transformers library not available. Install with: pip install transformers")
+        return None
+    except Exception as e:
+        logger.debug(f"Failed to load tokenizer {tokenizer_name}: {e}")
+        return None
+    return f"hf:{tokenizer_name}", lambda text: len(tokenizer.encode(text))
+
+
+def resolve_encoder(model_name: str) -> Tuple[str, Callable[[str], int]]:
+    """
+    Load the native encoder of a model.
+
+    - OpenAI models: tiktoken encoding of the model (cl100k_base when unknown)
+    - Gemini and other models: tiktoken cl100k_base
+    - Mistral (including codestral) / Llama models: HuggingFace tokenizer, tiktoken fallback
+
+    Returns:
+        (encoder key shared by models using the same encoder, text → token count)
+    """
+    model_lower = (model_name or "").lower()
+    family = "mistral" if ("mistral" in model_lower or "codestral" in model_lower) else (
+        "llama" if "llama" in model_lower else None)
+    for tokenizer_name in HF_TOKENIZERS.get(family, ()):
+        loaded = _load_hf_tokenizer(tokenizer_name)
+        if loaded is not None:
+            return loaded
+    if family:
+        logger.debug(f"No {family} tokenizer available, using tiktoken fallback for {model_name} (token counts may differ)")
+    from utils_api_key import get_provider_for_model
+    is_openai = get_provider_for_model(model_name) == "openai"
+    return _load_tiktoken(model_name if is_openai else None) or ("estimate", estimate_tokens)
+
+
+class TokenizerService:
+    """
+    Token counts with memoized encoders and static-segment counts.
+
+    Encoders are resolved once per model name. Static segments are cached by
+    (encoder key, SHA-256 of the text), so models sharing an encoder share counts.
+    A prompt count is static count + separator + dynamic count: it may differ from
+    tokenizing the concatenated text by a token or two at the seams.
+    """
+
+    def __init__(self, max_static_entries: int = DEFAULT_MAX_STATIC_ENTRIES, max_workers: int = 2,
+                 resolver: Callable[[str], Tuple[str, Callable[[str], int]]] = resolve_encoder):
+        """
+        Initialize the service.
+
+        Args:
+            max_static_entries: Static segment counts kept (least recently used are dropped)
+            max_workers: Threads of the pool used by submit() / the async counters
+            resolver: Model name → (encoder key, counter); resolve_encoder by default
+        """
+        self.max_static_entries = max(1, int(max_static_entries))
+        self.max_workers = max(1, int(max_workers))
+        self.resolver = resolver
+        self.stats = {k: 0 for k in _STAT_KEYS}
+        self._encoders: Dict[str, Tuple[str, Callable[[str], int]]] = {}
+        self._static: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def encoder(self, model_name: str) -> Tuple[str, Callable[[str], int]]:
+        """Return the (encoder key, counter) of a model, loading it on first use."""
+        with self._lock:
+            cached = self._encoders.get(model_name)
+        if cached is not None:
+            return cached
+        loaded = self.resolver(model_name)
+        with self._lock:
+            if model_name not in self._encoders:
+                self._encoders[model_name] = loaded
+                self.stats["encoders_loaded"] += 1
+            return self._encoders[model_name]
+
+    def count(self, text: str, model_name: str) -> int:
+        """Tokenize text with the native encoder of model_name (character estimate if encoding fails)."""
+        if not text:
+            return 0
+        key, counter = self.encoder(model_name)
+        self.stats["counts"] += 1
+        try:
+            return counter(text)
+        except Exception as e:
+            logger.debug(f"Error encoding with {key}: {e}, using character-based estimate")
+            return estimate_tokens(text)
+
+    def count_static(self, text: str, model_name: str) -> int:
+        """Token count of a static segment (persona, rules, instructions), computed once per content and encoder."""
+        if not text or len(text) < MIN_STATIC_CHARS:
+            return self.count(text, model_name)
+        cache_key = (self.encoder(model_name)[0], hashlib.sha256(text.encode("utf-8")).hexdigest())
+        with self._lock:
+            if cache_key in self._static:
+                self._static.move_to_end(cache_key)
+                self.stats["static_hits"] += 1
+                return self._static[cache_key]
+        tokens = self.count(text, model_name)
+        with self._lock:
+            self.stats["static_misses"] += 1
+            self._static[cache_key] = tokens
+            while len(self._static) > self.max_static_entries:
+                self._static.popitem(last=False)
+        return tokens
+
+    def count_prompt(self, static_text: str, dynamic_text: str, model_name: str,
+                     separator: str = PROMPT_SEPARATOR) -> int:
+        """Token count of static_text + separator + dynamic_text, with the static part memoized."""
+        return (self.count_static(static_text, model_name) + self.count(separator, model_name)
+                + self.count(dynamic_text, model_name))
+
+    def count_messages(self, messages: List[Dict[str, Any]], model_name: str) -> int:
+        """
+        Token count of chat messages (role + text content + per-message overhead).
+
+        System messages are static prompt segments and are memoized; other messages are counted.
+        """
+        total = 0
+        for message in messages:
+            role = message.get("role", "")
+            content = message.get("content", "")
+            count = self.count_static if role == "system" else self.count
+            total += self.count(role, model_name)
+            if isinstance(content, str):
+                total += count(content, model_name)
+            elif isinstance(content, list):
+                # Multimodal content (e.g., text + images): only text parts are counted
+                for item in content:
+                    text = item.get("text", "") if isinstance(item, dict) else item if isinstance(item, str) else ""
+                    total += count(text, model_name)
+            total += MESSAGE_OVERHEAD_TOKENS
+        return total
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run fn(*args) in the tokenizer thread pool (e.g. service.submit(service.count, text, model))."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tokenizer")
+            executor = self._executor
+        return executor.submit(fn, *args)
+
+    async def acount_messages(self, messages: List[Dict[str, Any]], model_name: str) -> int:
+        """Async count_messages, tokenized in the thread pool so the event loop keeps running."""
+        return await asyncio.wrap_future(self.submit(self.count_messages, messages, model_name))
+
+    def clear(self) -> None:
+        """Forget loaded encoders and static counts."""
+        with self._lock:
+            self._encoders.clear()
+            self._static.clear()
+
+
+_tokenizer_service: Optional[TokenizerService] = None
+_tokenizer_service_lock = threading.Lock()
+
+
+def get_tokenizer_service() -> TokenizerService:
+    """Return the process-wide tokenizer service."""
+    global _tokenizer_service
+    with _tokenizer_service_lock:
+        if _tokenizer_service is None:
+            _tokenizer_service = TokenizerService()
+        return _tokenizer_service